@@ -2,19 +2,192 @@
 Servidor principal para la aplicación de antropometría deportiva.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
 import os
-from utils.calculators import process_anthropometric_data
+import time
+from functools import lru_cache
+from utils.calculators import CALCULATION_VERSION, process_anthropometric_data
+from utils.cache import ResultCache, SqliteResultStore
+from utils.recommendations import RULES_PATH, get_recommendations_for, load_rules
+from utils.thresholds import threshold_tables
+from utils.metrics import SqliteMetricsStore, collect_metrics, count_validation_failures, registry as metrics
+from utils.profiling import SamplingProfiler
+from utils.uncertainty import estimate_uncertainty, parse_uncertainty_options
+from utils.encoding import (
+    FORMAT_JSON,
+    NegotiatingJSONProvider,
+    compress,
+    compress_response,
+    negotiate_encoding,
+    negotiate_format,
+)
+from models.anthropometric import MeasurementStore
+from models.archive import open_archive
+from models.jobs import DEFAULT_LEASE_SECONDS, JobQueue
+from routes.measurement_routes import measurement_bp
+from routes.cohort_routes import cohort_bp
+from routes.repeated_routes import repeated_bp
+from routes.somatotype_routes import somatotype_bp
+from routes.trend_routes import trend_bp
+from routes.job_routes import job_bp
+from routes.projection_routes import projection_bp
+from routes.archive_routes import archive_bp
+from utils.schema import ERROR_REQUIRED, REQUIRED_FIELDS
+from utils.batch_io import (
+    NDJSON_MIMETYPES,
+    columnar_batch_results,
+    iter_ndjson_records,
+    load_json_array_records,
+    stream_batch_results,
+)
 
 app = Flask(__name__)
+# JSON o MessagePack según la cabecera Accept
+app.json = NegotiatingJSONProvider(app)
+
+# Límites del endpoint por lotes (configurables por variables de entorno)
+app.config['BATCH_CHUNK_SIZE'] = int(os.environ.get('BATCH_CHUNK_SIZE', 500))
+app.config['BATCH_MAX_CHUNK_SIZE'] = int(os.environ.get('BATCH_MAX_CHUNK_SIZE', 5000))
+app.config['BATCH_MAX_RECORDS'] = int(os.environ.get('BATCH_MAX_RECORDS', 100000))
+app.config['BATCH_MAX_CONTENT_LENGTH'] = int(os.environ.get('BATCH_MAX_CONTENT_LENGTH', 50 * 1024 * 1024))
+# Muestras máximas por atleta del modo de incertidumbre de /api/calculate
+app.config['UNCERTAINTY_MAX_SAMPLES'] = int(os.environ.get('UNCERTAINTY_MAX_SAMPLES', 5000))
+# Sesiones máximas de una serie enviada a /api/trends
+app.config['TREND_MAX_SESSIONS'] = int(os.environ.get('TREND_MAX_SESSIONS', 500))
+# Tamaño máximo de una simulación de /api/projection (atletas × escenarios × días)
+app.config['PROJECTION_MAX_CELLS'] = int(os.environ.get('PROJECTION_MAX_CELLS', 5000000))
+# Tamaño máximo de equipo para devolver la matriz SAD completa en /api/somatotype/squad
+app.config['SOMATOTYPE_MAX_MATRIX'] = int(os.environ.get('SOMATOTYPE_MAX_MATRIX', 1000))
+
+# Fichero de reglas de las recomendaciones personalizadas (se compila una vez al arrancar)
+app.config['RECOMMENDATION_RULES_PATH'] = os.environ.get('RECOMMENDATION_RULES_PATH', RULES_PATH)
+app.extensions['recommendation_rules'] = load_rules(app.config['RECOMMENDATION_RULES_PATH'])
+
+# Tamaño mínimo (bytes) para comprimir las respuestas con gzip o brotli (0 lo desactiva)
+app.config['COMPRESSION_MIN_SIZE'] = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+
+# Caché de resultados de /api/calculate. RESULT_CACHE_PATH activa un almacén
+# SQLite compartido por todos los workers de gunicorn, limitado a
+# RESULT_CACHE_STORE_SIZE entradas.
+app.config['RESULT_CACHE_SIZE'] = int(os.environ.get('RESULT_CACHE_SIZE', 4096))
+app.config['RESULT_CACHE_TTL'] = float(os.environ.get('RESULT_CACHE_TTL', 3600))
+app.config['RESULT_CACHE_PATH'] = os.environ.get('RESULT_CACHE_PATH')
+app.config['RESULT_CACHE_STORE_SIZE'] = int(os.environ.get('RESULT_CACHE_STORE_SIZE', 100000))
+
+result_cache = ResultCache(
+    max_size=app.config['RESULT_CACHE_SIZE'],
+    ttl=app.config['RESULT_CACHE_TTL'],
+    store=SqliteResultStore(
+        app.config['RESULT_CACHE_PATH'],
+        app.config['RESULT_CACHE_TTL'],
+        max_entries=app.config['RESULT_CACHE_STORE_SIZE'],
+    ) if app.config['RESULT_CACHE_PATH'] else None
+)
+# Métricas de /api/metrics. METRICS_DB_PATH activa la agregación entre los
+# workers de gunicorn (gunicorn.conf.py lo define automáticamente).
+app.config['METRICS_DB_PATH'] = os.environ.get('METRICS_DB_PATH')
+app.config['METRICS_FLUSH_INTERVAL'] = float(os.environ.get('METRICS_FLUSH_INTERVAL', 1.0))
+
+metrics_store = SqliteMetricsStore(
+    app.config['METRICS_DB_PATH'], app.config['METRICS_FLUSH_INTERVAL']
+) if app.config['METRICS_DB_PATH'] else None
+
+# Perfilado por muestreo (desactivado por defecto): 1 de cada N peticiones
+app.config['PROFILE_SAMPLE_EVERY'] = int(os.environ.get('PROFILE_SAMPLE_EVERY', 0))
+app.config['PROFILE_DIR'] = os.environ.get('PROFILE_DIR', 'profiles')
+app.config['PROFILE_MAX_FILES'] = int(os.environ.get('PROFILE_MAX_FILES', 100))
+
+profiler = SamplingProfiler(
+    app.config['PROFILE_SAMPLE_EVERY'], app.config['PROFILE_DIR'], app.config['PROFILE_MAX_FILES']
+)
+
 # Permitir solicitudes desde GitHub Pages
 CORS(app, resources={r"/api/*": {"origins": ["https://martamakes.github.io", "http://localhost:3000"]}})
 
+# Los ficheros de datos van por defecto en la carpeta de instancia (backend/instance),
+# no en el directorio desde el que se arranca el servidor
+os.makedirs(app.instance_path, exist_ok=True)
+
+# Historial persistente de mediciones
+app.config['MEASUREMENT_DB_PATH'] = os.environ.get(
+    'MEASUREMENT_DB_PATH', os.path.join(app.instance_path, 'measurements.db')
+)
+# Archivo columnar de los resultados para consultas analíticas (vacío lo desactiva)
+app.config['MEASUREMENT_ARCHIVE_DIR'] = os.environ.get(
+    'MEASUREMENT_ARCHIVE_DIR', os.path.join(app.instance_path, 'measurement_archive')
+)
+# Altas, modificaciones y borrados sueltos que se archivan juntos, y espera máxima (segundos)
+app.config['ARCHIVE_BUFFER_ROWS'] = int(os.environ.get('ARCHIVE_BUFFER_ROWS', 256))
+app.config['ARCHIVE_FLUSH_INTERVAL'] = float(os.environ.get('ARCHIVE_FLUSH_INTERVAL', 5))
+app.extensions['measurement_archive'] = open_archive(
+    app.config['MEASUREMENT_ARCHIVE_DIR'],
+    buffer_rows=app.config['ARCHIVE_BUFFER_ROWS'],
+    flush_interval=app.config['ARCHIVE_FLUSH_INTERVAL'],
+)
+app.extensions['measurement_store'] = MeasurementStore(
+    app.config['MEASUREMENT_DB_PATH'], archive=app.extensions['measurement_archive']
+)
+# Mediciones máximas por envío de /api/measurements/sync (cola sin conexión del frontend)
+app.config['SYNC_MAX_MEASUREMENTS'] = int(os.environ.get('SYNC_MAX_MEASUREMENTS', 500))
+app.register_blueprint(measurement_bp)
+app.register_blueprint(cohort_bp)
+app.register_blueprint(repeated_bp)
+app.register_blueprint(somatotype_bp)
+app.register_blueprint(trend_bp)
+app.register_blueprint(projection_bp)
+app.register_blueprint(archive_bp)
+
+# Cola de trabajos en segundo plano (los ejecuta python jobs.py)
+app.config['JOB_DB_PATH'] = os.environ.get('JOB_DB_PATH', os.path.join(app.instance_path, 'jobs.db'))
+app.config['JOB_DATA_DIR'] = os.environ.get('JOB_DATA_DIR', os.path.join(app.instance_path, 'job_files'))
+app.config['JOB_MAX_UPLOAD_SIZE'] = int(os.environ.get('JOB_MAX_UPLOAD_SIZE', 200 * 1024 * 1024))
+app.config['JOB_LEASE_SECONDS'] = float(os.environ.get('JOB_LEASE_SECONDS', DEFAULT_LEASE_SECONDS))
+app.extensions['job_queue'] = JobQueue(app.config['JOB_DB_PATH'], app.config['JOB_LEASE_SECONDS'])
+app.register_blueprint(job_bp)
+
+@app.before_request
+def _start_request_instrumentation():
+    g.request_started = time.perf_counter()
+    g.profile = profiler.start()
+
+@app.after_request
+def _compress_response(response):
+    """Comprime las respuestas según Accept-Encoding (incluido el streaming por lotes)."""
+    return compress_response(response, app.config['COMPRESSION_MIN_SIZE'])
+
+@app.after_request
+def _record_request_metrics(response):
+    """
+    Registra la latencia y el código de estado de cada petición.
+    
+    La medición termina al cerrar la respuesta, por lo que las respuestas en
+    streaming (/api/calculate/batch) se miden completas.
+    """
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    profile = g.pop('profile', None)
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    endpoint = request.endpoint or 'unmatched'
+    labels = (('route', route), ('method', request.method))
+    status = str(response.status_code)
+    
+    def finish():
+        metrics.observe('http_request_duration_seconds', time.perf_counter() - started, labels)
+        metrics.inc('http_requests_total', labels + (('status', status),))
+        if profile is not None:
+            profiler.stop(profile, endpoint)
+        if metrics_store is not None:
+            metrics_store.ensure_flushing(metrics)
+    
+    response.call_on_close(finish)
+    return response
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Endpoint para verificar que el servidor está funcionando."""
-    return jsonify({"status": "ok"})
+    return jsonify({"status": "ok", "calculation_version": CALCULATION_VERSION})
 
 @app.route('/api/calculate', methods=['POST'])
 def calculate_anthropometry():
@@ -22,128 +195,197 @@ def calculate_anthropometry():
     Endpoint principal para procesar datos antropométricos.
     
     Espera un JSON con todos los datos de medición antropométrica
-    y devuelve los resultados calculados.
+    y devuelve los resultados calculados. Con 'uncertainty' (true o un objeto
+    con 'samples', 'confidence', 'seed', 'tem' y 'tem_percent') se añaden los
+    intervalos de confianza de Monte Carlo y la probabilidad de que cambie el
+    objetivo recomendado.
     """
     data = request.json
     
     if not data:
         return jsonify({"success": False, "error": "No se proporcionaron datos"}), 400
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "Se esperaba un objeto JSON"}), 400
     
     # Validar datos requeridos
-    required_fields = ['gender', 'age', 'weight', 'height', 'waist', 'hip']
-    for field in required_fields:
+    for field in REQUIRED_FIELDS:
         if field not in data:
+            metrics.inc('validation_failures_total', (('field', field), ('code', ERROR_REQUIRED)))
             return jsonify({
                 "success": False, 
                 "error": f"Campo requerido faltante: {field}"
             }), 400
     
-    # Procesar datos antropométricos
-    results = process_anthropometric_data(data)
+    # Procesar datos antropométricos (o reutilizar un resultado cacheado)
+    results = result_cache.get_or_compute(data, process_anthropometric_data)
     
     if not results.get('success'):
+        count_validation_failures(results)
         return jsonify(results), 400
     
+    # Incertidumbre (no se cachea: el resultado cacheado es compartido)
+    if data.get('uncertainty'):
+        try:
+            options = parse_uncertainty_options(data['uncertainty'], app.config['UNCERTAINTY_MAX_SAMPLES'])
+        except ValueError as exc:
+            return jsonify({"success": False, "error": str(exc)}), 400
+        results = dict(results, uncertainty=estimate_uncertainty(data, results, options))
+    
     return jsonify(results)
 
+@app.route('/api/calculate/batch', methods=['POST'])
+def calculate_anthropometry_batch():
+    """
+    Procesa un lote de mediciones antropométricas.
+    
+    Acepta un array JSON o JSON delimitado por líneas (Content-Type
+    application/x-ndjson) y devuelve en streaming una línea NDJSON por
+    registro, con los errores de validación de cada registro en lugar de
+    rechazar el lote completo. El parámetro ?chunk_size= ajusta el número
+    de registros procesados por bloque. Con ?layout=columns se devuelve una
+    sola respuesta (JSON o MessagePack) con una lista por métrica. Con
+    ?recommendations=1 se añaden las cantidades de las recomendaciones
+    personalizadas de cada registro.
+    """
+    max_length = app.config['BATCH_MAX_CONTENT_LENGTH']
+    if request.content_length is not None and request.content_length > max_length:
+        return jsonify({
+            "success": False,
+            "error": f"El cuerpo de la petición supera el máximo de {max_length} bytes"
+        }), 413
+    
+    chunk_size = request.args.get('chunk_size', app.config['BATCH_CHUNK_SIZE'], type=int)
+    chunk_size = max(1, min(chunk_size, app.config['BATCH_MAX_CHUNK_SIZE']))
+    layout = request.args.get('layout', 'records')
+    if layout not in ('records', 'columns'):
+        return jsonify({"success": False, "error": "'layout' debe ser 'records' o 'columns'"}), 400
+    rules = app.extensions['recommendation_rules'] if request.args.get('recommendations') in ('1', 'true') else None
+    
+    if request.mimetype in NDJSON_MIMETYPES:
+        records = iter_ndjson_records(request.stream, max_bytes=max_length)
+    else:
+        try:
+            records = load_json_array_records(request.get_data())
+        except ValueError as exc:
+            return jsonify({"success": False, "error": str(exc)}), 400
+    
+    if layout == 'columns':
+        try:
+            return jsonify(columnar_batch_results(records, chunk_size, app.config['BATCH_MAX_RECORDS'], rules))
+        except ValueError as exc:
+            return jsonify({"success": False, "error": str(exc)}), 400
+    
+    return Response(
+        stream_with_context(stream_batch_results(records, chunk_size, app.config['BATCH_MAX_RECORDS'], rules)),
+        mimetype='application/x-ndjson'
+    )
+
 @app.route('/api/recommendations', methods=['POST'])
 def get_recommendations():
     """
     Proporciona recomendaciones detalladas basadas en los resultados antropométricos.
+    
+    Con 'measurements' (las mediciones de /api/calculate más 'sport' y
+    'training_hours' opcionales) se devuelven recomendaciones personalizadas
+    con las cantidades del atleta, calculadas con el fichero de reglas. Con
+    solo 'goal' se devuelven las recomendaciones generales del objetivo.
     """
     data = request.json
+    if data and not isinstance(data, dict):
+        return jsonify({"success": False, "error": "Se esperaba un objeto JSON"}), 400
+    
+    if data and isinstance(data.get('measurements'), dict):
+        return _personalized_recommendations(data['measurements'])
     
     if not data or 'goal' not in data:
         return jsonify({"success": False, "error": "Datos insuficientes"}), 400
-    
-    # Aquí se podrían implementar recomendaciones más avanzadas
-    # basadas en los perfiles deportivos, detalles de entrenamiento, etc.
+    if not isinstance(data['goal'], dict):
+        return jsonify({"success": False, "error": "'goal' debe ser un objeto JSON"}), 400
     
     primary_goal = data['goal'].get('primary_goal')
+    if not isinstance(primary_goal, str):
+        primary_goal = None
     
-    recommendations = {
-        "Reducción visceral": {
-            "nutrition": [
-                "Déficit calórico moderado (15-20%)",
-                "Enfoque en alimentos con bajo índice glucémico",
-                "Priorizar proteínas (2g/kg) y grasas saludables",
-                "Considerar ayuno intermitente 16/8"
-            ],
-            "training": [
-                "3-4 sesiones semanales HIIT",
-                "2-3 sesiones semanales de fuerza",
-                "Monitorizar perímetro abdominal semanalmente"
-            ],
-            "supplements": [
-                "Omega-3 (2-4g/día)",
-                "Té verde o EGCG",
-                "Considerar L-carnitina pre-entrenamiento"
-            ]
-        },
-        "Hipertrofia": {
-            "nutrition": [
-                "Superávit calórico moderado (250-500 kcal)",
-                "Proteínas: 2.2-2.5g/kg de peso",
-                "Distribución de proteínas: 4-5 comidas",
-                "Carbohidratos peri-entrenamiento"
-            ],
-            "training": [
-                "Entrenamiento de fuerza 4-5 días/semana",
-                "Enfoque en hipertrofia (8-12 repeticiones)",
-                "Programación con sobrecarga progresiva",
-                "Descanso óptimo entre series (60-90s)"
-            ],
-            "supplements": [
-                "Creatina monohidrato (5g/día)",
-                "Proteína de suero post-entrenamiento",
-                "Considerar beta-alanina para entrenamientos intensos"
-            ]
-        },
-        "Recomposición avanzada": {
-            "nutrition": [
-                "Mantenimiento calórico con ciclado nutricional",
-                "Superávit en días de entrenamiento (+10%)",
-                "Déficit en días de descanso (-10%)",
-                "Proteínas elevadas constantes (2.2g/kg)"
-            ],
-            "training": [
-                "Entrenamiento mixto: fuerza-metabólico",
-                "Periodización ondulante",
-                "Incluir entrenamiento concurrente estratégico",
-                "Monitorizar rendimiento y recuperación"
-            ],
-            "supplements": [
-                "Creatina (5g/día)",
-                "Cafeína pre-entrenamiento",
-                "Proteína de digestión rápida y lenta"
-            ]
-        },
-        "Plan estándar": {
-            "nutrition": [
-                "Balance calórico ajustado a objetivo específico",
-                "Distribución macronutrientes balanceada",
-                "Enfoque en calidad nutricional",
-                "Hidratación óptima (35ml/kg)"
-            ],
-            "training": [
-                "Programa combinado fuerza-resistencia",
-                "3-4 sesiones semanales",
-                "Progresión gradual de intensidad",
-                "Incluir componente de movilidad y flexibilidad"
-            ],
-            "supplements": [
-                "Multivitamínico básico",
-                "Proteína de suero si es necesario",
-                "Considerar creatina según objetivos específicos"
-            ]
-        }
-    }
+    body, mimetype, encoding = _recommendations_body(
+        primary_goal, negotiate_format(request.accept_mimetypes), negotiate_encoding(request.accept_encodings)
+    )
+    response = Response(body, mimetype=mimetype)
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.update(('Accept', 'Accept-Encoding'))
+    return response
+
+def _personalized_recommendations(measurements):
+    """Recomendaciones personalizadas de un atleta según las reglas cargadas."""
+    for field in REQUIRED_FIELDS:
+        if field not in measurements:
+            return jsonify({"success": False, "error": f"Campo requerido faltante: {field}"}), 400
     
+    results = result_cache.get_or_compute(measurements, process_anthropometric_data)
+    if not results.get('success'):
+        count_validation_failures(results)
+        return jsonify(results), 400
+    
+    try:
+        recommendation = app.extensions['recommendation_rules'].recommend(measurements, results)
+    except ValueError as exc:
+        return jsonify({"success": False, "error": str(exc)}), 400
+    return jsonify({"success": True, "goal": results['goal'], **recommendation})
+
+@lru_cache(maxsize=256)
+def _recommendations_body(primary_goal, fmt=FORMAT_JSON, encoding=None):
+    """
+    Serializa (y comprime) una sola vez la respuesta de recomendaciones de
+    cada objetivo, formato y codificación.
+    
+    Returns:
+        tuple: (bytes, str, str|None) - (cuerpo, mimetype, Content-Encoding)
+    """
+    body, mimetype = app.json.encode({
+        "success": True,
+        "recommendations": get_recommendations_for(primary_goal)
+    }, fmt)
+    min_size = app.config['COMPRESSION_MIN_SIZE']
+    if encoding is None or min_size <= 0 or len(body) < min_size:
+        return body, mimetype, None
+    return compress(body, encoding), mimetype, encoding
+
+@app.route('/api/thresholds', methods=['GET'])
+def get_thresholds():
+    """Devuelve las tablas de umbrales con las que se clasifica cada métrica."""
+    return jsonify({"success": True, "thresholds": threshold_tables()})
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Devuelve los contadores de la caché de resultados de este worker."""
     return jsonify({
         "success": True,
-        "recommendations": recommendations.get(primary_goal, {"message": "No hay recomendaciones específicas para este objetivo"})
+        "result_cache": result_cache.stats(),
+        "recommendations_cache": _recommendations_body.cache_info()._asdict()
     })
 
+def _cache_metrics():
+    """Contadores de las cachés de este worker para /api/metrics."""
+    stats = result_cache.stats()
+    recommendations = _recommendations_body.cache_info()
+    return [
+        ('result_cache_lookups_total', (('result', 'hit'),), stats['hits']),
+        ('result_cache_lookups_total', (('result', 'shared_hit'),), stats['shared_hits']),
+        ('result_cache_lookups_total', (('result', 'miss'),), stats['misses']),
+        ('result_cache_evictions_total', (), stats['evictions']),
+        ('result_cache_expirations_total', (), stats['expirations']),
+        ('result_cache_entries', (), stats['size']),
+        ('recommendations_cache_lookups_total', (('result', 'hit'),), recommendations.hits),
+        ('recommendations_cache_lookups_total', (('result', 'miss'),), recommendations.misses),
+    ]
+
+metrics.register_collector(_cache_metrics)
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Métricas en formato de texto de Prometheus, sumadas para todos los workers."""
+    return Response(collect_metrics(metrics, metrics_store), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port)
\ No newline at end of file
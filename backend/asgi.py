@@ -0,0 +1,21 @@
+"""
+Punto de entrada ASGI con las mismas rutas que app.py.
+
+Permite servir la API con un servidor asíncrono (uvicorn, o gunicorn con
+workers de uvicorn); cada petición Flask se ejecuta en el pool de hilos del
+adaptador, de modo que las conexiones lentas no bloquean un worker.
+
+    uvicorn asgi:app --workers 4
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn asgi:app
+
+ASGI_THREADS fija el número de hilos del adaptador (10). Requiere los
+paquetes opcionales a2wsgi y uvicorn.
+"""
+
+import os
+
+from a2wsgi import WSGIMiddleware
+
+from app import app as flask_app
+
+app = WSGIMiddleware(flask_app, workers=int(os.environ.get('ASGI_THREADS', 10)))
@@ -0,0 +1,4 @@
+"""
+Benchmarks de rendimiento del backend. Se ejecutan como módulos desde backend/,
+por ejemplo: python -m benchmarks.bench_validation
+"""
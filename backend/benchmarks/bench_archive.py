@@ -0,0 +1,100 @@
+"""
+Compara las consultas analíticas sobre el historial guardado leyendo las
+mediciones en JSON desde SQLite con las mismas consultas sobre el archivo
+columnar en memoria mapeada.
+
+Uso:
+    python -m benchmarks.bench_archive [--size 100000] [--repeat 3]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+import timeit
+
+import numpy as np
+
+from models.anthropometric import MeasurementStore
+from models.archive import ResultArchive
+from tests.synthetic import synthetic_cohort
+from utils.cohort import METRIC_SPECS, CohortAccumulator
+
+SPORTS = ('rowing', 'judo', 'athletics', 'swimming', None)
+
+
+def fill(store, size, chunk_size=5000):
+    """Importa una cohorte sintética repartida en cinco temporadas y cinco deportes."""
+    records = synthetic_cohort(size)
+    for start in range(0, size, chunk_size):
+        rows = []
+        for index in range(start, min(start + chunk_size, size)):
+            record = dict(records[index], sport=SPORTS[index % len(SPORTS)])
+            rows.append((f"athlete-{index % 2000}", f"{2019 + index % 5}-{index % 12 + 1:02d}-01", record))
+        store.import_chunk('bench', start, rows)
+
+
+def json_cohort(store):
+    accumulator = CohortAccumulator()
+    for records, results in store.iter_chunks():
+        accumulator.add_records(records, results)
+    return accumulator
+
+
+def archive_cohort(archive):
+    accumulator = CohortAccumulator()
+    genders, sports = archive.dictionary('gender'), archive.dictionary('sport')
+    for part in archive.scan(('sport', 'gender', 'age') + tuple(METRIC_SPECS)):
+        accumulator.add_columns(sports[part['sport']], genders[part['gender']], part['age'], part)
+    return accumulator
+
+
+def json_query(store):
+    """FFMI de las remeras por año leyendo el JSON de cada medición."""
+    years = {}
+    connection = store._connection()
+    for raw, results, session_date in connection.execute("SELECT raw, results, session_date FROM measurements"):
+        record = json.loads(raw)
+        if record.get('gender') != 'F' or record.get('sport') != 'rowing':
+            continue
+        value = json.loads(results).get('fat_free_mass_index')
+        if value is not None:
+            years.setdefault(session_date[:4], []).append(value)
+    return {year: np.percentile(values, 50) for year, values in years.items()}
+
+
+def best_of(function, repeat):
+    """Devuelve el mejor tiempo por llamada en segundos."""
+    return min(timeit.repeat(function, repeat=repeat, number=1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        archive = ResultArchive(f"{directory}/archive")
+        store = MeasurementStore(f"{directory}/measurements.db", archive=archive)
+        started = time.perf_counter()
+        fill(store, args.size)
+        print(f"Importación de {args.size} mediciones (con archivo): {time.perf_counter() - started:.1f} s")
+        started = time.perf_counter()
+        archive.compact(full=True)
+        print(f"Compactación completa: {(time.perf_counter() - started) * 1e3:.0f} ms")
+
+        cases = (
+            ('cohorte completa', lambda: json_cohort(store), lambda: archive_cohort(archive)),
+            ('FFMI de remeras por año', lambda: json_query(store),
+             lambda: archive.summarize('fat_free_mass_index', 'year', gender='F', sport='rowing')),
+        )
+        print(f"{'Consulta':<40}{'JSON':>12}{'Columnar':>12}{'Mejora':>10}")
+        for label, baseline, columnar in cases:
+            slow = best_of(baseline, args.repeat)
+            fast = best_of(columnar, args.repeat)
+            print(f"{label:<40}{slow * 1e3:>9.1f} ms{fast * 1e3:>9.1f} ms{slow / fast:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Mide el rendimiento de bulk.py (filas/s) con distinto número de procesos y
+tamaños de fichero, junto con la memoria máxima del proceso principal y de
+los procesos del pool, para comprobar que escala con los núcleos y que la
+memoria depende del tamaño de bloque y no del fichero.
+
+Uso:
+    python -m benchmarks.bench_bulk [--rows 200000 1000000] [--workers 1 2 4 8] [--chunk-size 10000]
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COLUMNS = (
+    'athlete', 'gender', 'age', 'weight', 'height', 'waist', 'hip',
+    'triceps_fold', 'subscapular_fold', 'suprailiac_fold',
+)
+
+_RUN_SCRIPT = """
+import json, resource, sys
+from bulk import run_bulk
+summary = run_bulk({input!r}, {output!r}, workers={workers}, chunk_size={chunk_size})
+summary['parent_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+summary['worker_mb'] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+print(json.dumps(summary))
+"""
+
+
+def generate_csv(path, rows, seed=42):
+    """Genera un CSV sintético con un 0,3 % de filas no válidas."""
+    rng = random.Random(seed)
+    with open(path, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(COLUMNS)
+        for index in range(rows):
+            row = [
+                f"athlete-{index}", rng.choice('MF'), rng.randint(18, 70),
+                round(rng.uniform(50, 110), 1), round(rng.uniform(155, 200), 1),
+                round(rng.uniform(65, 100), 1), round(rng.uniform(101, 120), 1),
+                round(rng.uniform(5, 25), 1), round(rng.uniform(6, 30), 1), round(rng.uniform(5, 30), 1),
+            ]
+            if index % 1000 == 0:
+                row[3] = 'n/a'
+            elif index % 1000 == 1:
+                row[4] = ''
+            elif index % 1000 == 2:
+                row[5] = 500
+            writer.writerow(row)
+
+
+def run(input_path, output_path, workers, chunk_size):
+    """Ejecuta bulk.run_bulk en un proceso nuevo para medir su memoria por separado."""
+    script = _RUN_SCRIPT.format(input=input_path, output=output_path, workers=workers, chunk_size=chunk_size)
+    completed = subprocess.run(
+        [sys.executable, '-c', script], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[200000])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"Núcleos disponibles: {os.cpu_count()}, bloques de {args.chunk_size} filas")
+    print(f"{'Filas':>10}{'Procesos':>10}{'Segundos':>10}{'filas/s':>11}{'Aceleración':>13}"
+          f"{'RSS princ. MB':>15}{'RSS pool MB':>13}")
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            input_path = os.path.join(directory, f"input-{rows}.csv")
+            generate_csv(input_path, rows)
+            baseline = None
+            for workers in args.workers:
+                summary = run(input_path, os.path.join(directory, 'output.csv'), workers, args.chunk_size)
+                rate = summary['rows'] / summary['seconds']
+                baseline = baseline or rate
+                print(
+                    f"{rows:>10}{workers:>10}{summary['seconds']:>10.2f}{rate:>11.0f}{rate / baseline:>12.2f}x"
+                    f"{summary['parent_mb']:>15.1f}{summary['worker_mb']:>13.1f}"
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Compara el tamaño y el tiempo de serialización de las respuestas por lotes
+en sus distintos formatos: NDJSON por registro frente a la disposición en
+columnas (?layout=columns), en JSON y MessagePack, sin comprimir y con gzip o
+brotli. Los formatos cuyas dependencias opcionales (msgpack, brotli) no están
+instaladas se omiten.
+
+Uso:
+    python -m benchmarks.bench_encoding [--records 1 100 10000] [--repeat 5]
+"""
+
+import argparse
+import json
+import time
+
+from tests.synthetic import synthetic_cohort
+from utils.batch_io import columnar_batch_results, process_record_chunk
+from utils.encoding import (
+    ENCODING_BROTLI,
+    ENCODING_GZIP,
+    compress,
+    encode_msgpack,
+    optional_module,
+)
+
+
+def encode_ndjson(results):
+    """Cuerpo NDJSON de /api/calculate/batch (una línea por registro)."""
+    return ''.join(
+        json.dumps({"index": index, **result}) + '\n' for index, result in enumerate(results)
+    ).encode('utf-8')
+
+
+def encode_json(payload):
+    """Cuerpo JSON compacto, como jsonify fuera del modo de depuración."""
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+def formats():
+    """Pares (nombre, disposición, serializador) disponibles en este entorno."""
+    serializers = [
+        ('ndjson', 'records', encode_ndjson),
+        ('json', 'columns', encode_json),
+    ]
+    if optional_module('msgpack') is not None:
+        serializers.append(('msgpack', 'records', encode_msgpack))
+        serializers.append(('msgpack', 'columns', encode_msgpack))
+    return serializers
+
+
+def encodings():
+    """Codificaciones de contenido disponibles (None = sin comprimir)."""
+    available = [None, ENCODING_GZIP]
+    if optional_module('brotli') is not None:
+        available.append(ENCODING_BROTLI)
+    return available
+
+
+def best_time(function, repeat):
+    """Mejor tiempo (ms) de varias ejecuciones y el resultado de la última."""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best * 1e3, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, nargs='+', default=[1, 100, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if optional_module('msgpack') is None:
+        print("msgpack no está instalado: se omite MessagePack")
+    if optional_module('brotli') is None:
+        print("brotli no está instalado: se omite brotli")
+    print(f"{'Registros':>10}  {'Formato':<18}{'Compresión':<12}{'Bytes':>12}{'B/registro':>12}"
+          f"{'Serializar ms':>15}{'Comprimir ms':>14}")
+    for size in args.records:
+        records = [(record, None) for record in synthetic_cohort(size)]
+        payloads = {
+            'records': process_record_chunk(records),
+            'columns': columnar_batch_results(records, max(size, 1), size),
+        }
+        for name, layout, serializer in formats():
+            encode_ms, body = best_time(lambda: serializer(payloads[layout]), args.repeat)
+            for encoding in encodings():
+                compress_ms, compressed = (0.0, body) if encoding is None else best_time(
+                    lambda: compress(body, encoding), args.repeat
+                )
+                print(f"{size:>10}  {name + '/' + layout:<18}{encoding or '-':<12}{len(compressed):>12}"
+                      f"{len(compressed) / size:>12.1f}{encode_ms:>15.2f}{compress_ms:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
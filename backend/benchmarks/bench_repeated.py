@@ -0,0 +1,78 @@
+"""
+Compara el análisis vectorizado de mediciones repetidas (matriz atletas ×
+puntos × repeticiones) con el procesamiento lista a lista mediante
+validate_cv_measurements, a escala de plantilla y de federación.
+
+Uso:
+    python -m benchmarks.bench_repeated [--squad 30] [--federation 20000] [--sites 25] [--repeat 3]
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+
+from utils.equations import FOLD_SITES
+from utils.repeated_measures import analyze_repeats, site_tolerance
+from utils.validators import validate_cv_measurements
+
+
+def generate_matrix(athletes, sites, seed=42):
+    """
+    Genera repeticiones sintéticas deterministas: la mitad de los atletas
+    con tres repeticiones y el resto con dos.
+    """
+    rng = np.random.default_rng(seed)
+    true_values = rng.uniform(5, 120, (athletes, sites))
+    matrix = true_values[..., None] * (1 + rng.normal(0, 0.02, (athletes, sites, 3)))
+    matrix[athletes // 2:, :, 2] = np.nan
+    return np.round(matrix, 1)
+
+
+def site_names(count):
+    """Nombres de puntos de medida: los pliegues del registro y perímetros genéricos."""
+    names = list(FOLD_SITES[:count])
+    names += [f'girth_{i}' for i in range(count - len(names))]
+    return names
+
+
+def per_list(matrix, sites):
+    """Ruta anterior: una llamada por atleta y punto sobre listas de Python."""
+    output = []
+    for athlete in matrix.tolist():
+        for site, repeats in zip(sites, athlete):
+            repeats = [value for value in repeats if value == value]
+            _, cv = validate_cv_measurements(repeats)
+            first, second = repeats[0], repeats[1]
+            difference = abs(first - second) / ((first + second) / 2) * 100
+            selected = float(np.median(repeats)) if len(repeats) >= 3 else sum(repeats) / len(repeats)
+            output.append((selected, cv, len(repeats) == 2 and difference > site_tolerance(site)))
+    return output
+
+
+def best_of(function, repeat):
+    """Devuelve el mejor tiempo por llamada en segundos."""
+    return min(timeit.repeat(function, repeat=repeat, number=1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--squad', type=int, default=30)
+    parser.add_argument('--federation', type=int, default=20000)
+    parser.add_argument('--sites', type=int, default=25)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    sites = site_names(args.sites)
+    print(f"{'Caso':<44}{'Tiempo':>14}{'Mejora':>10}")
+    for label, athletes in (('plantilla', args.squad), ('federación', args.federation)):
+        matrix = generate_matrix(athletes, args.sites)
+        loop = best_of(lambda: per_list(matrix, sites), args.repeat)
+        vector = best_of(lambda: analyze_repeats(matrix, sites), args.repeat)
+        size = f'{athletes}×{args.sites}'
+        print(f"{f'{label} {size}, lista a lista':<44}{loop * 1e3:>11.2f} ms{'':>10}")
+        print(f"{f'{label} {size}, vectorizado':<44}{vector * 1e3:>11.2f} ms{loop / vector:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
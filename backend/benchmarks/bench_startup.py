@@ -0,0 +1,128 @@
+"""
+Mide el tiempo de importación de la aplicación (python -X importtime) y la
+latencia de la primera petición a /api/calculate y /api/recommendations en
+procesos nuevos, y falla (código de salida 1) si se superan los umbrales o si
+la ruta escalar importa NumPy o pandas.
+
+Uso:
+    python -m benchmarks.bench_startup [--runs 5] [--max-import-ms 400] [--max-first-request-ms 100]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que no deben cargarse al arrancar ni al atender peticiones escalares
+HEAVY_MODULES = ('numpy', 'pandas')
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+_FIRST_REQUEST_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from app import app
+imported = time.perf_counter()
+client = app.test_client()
+client.post('/api/calculate', json={payload})
+calculated = time.perf_counter()
+client.post('/api/recommendations', json={{'goal': {{'primary_goal': 'Hipertrofia'}}}})
+recommended = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - start) * 1e3,
+    'calculate_ms': (calculated - imported) * 1e3,
+    'recommendations_ms': (recommended - calculated) * 1e3,
+    'heavy_modules': [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+SAMPLE_PAYLOAD = {
+    'gender': 'M', 'age': 30, 'weight': 75, 'height': 180, 'waist': 85, 'hip': 95,
+    'triceps_fold': 12, 'subscapular_fold': 15, 'suprailiac_fold': 18,
+}
+
+
+def _run(arguments, environment):
+    return subprocess.run(
+        [sys.executable] + arguments, cwd=BACKEND_DIR, env=environment,
+        capture_output=True, text=True, check=True
+    )
+
+
+def import_profile(environment):
+    """
+    Importa app en un proceso nuevo con -X importtime.
+
+    Returns:
+        tuple: (float, dict, set) - (ms acumulados de 'app', ms de cada
+            dependencia directa agrupada por paquete, paquetes importados)
+    """
+    output = _run(['-X', 'importtime', '-c', 'import app'], environment).stderr
+    total = None
+    packages = {}
+    imported = set()
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        package = name.split('.')[0]
+        imported.add(package)
+        if name == 'app':
+            total = int(cumulative) / 1e3
+        elif len(indent) == 3:
+            packages[package] = packages.get(package, 0) + int(cumulative) / 1e3
+    return total, packages, imported
+
+
+def first_request(environment):
+    """Mide la importación y la primera petición de cada endpoint en un proceso nuevo."""
+    script = _FIRST_REQUEST_SCRIPT.format(payload=SAMPLE_PAYLOAD, heavy=HEAVY_MODULES)
+    return json.loads(_run(['-c', script], environment).stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-import-ms', type=float, default=400.0)
+    parser.add_argument('--max-first-request-ms', type=float, default=100.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        environment = dict(os.environ, MEASUREMENT_DB_PATH=os.path.join(directory, 'measurements.db'))
+        profiles = [import_profile(environment) for _ in range(args.runs)]
+        requests = [first_request(environment) for _ in range(args.runs)]
+
+    import_ms, packages, imported = min(profiles, key=lambda profile: profile[0])
+    calculate_ms = min(run['calculate_ms'] for run in requests)
+    recommendations_ms = min(run['recommendations_ms'] for run in requests)
+    heavy = sorted({name for run in requests for name in run['heavy_modules']} |
+                   {name for name in HEAVY_MODULES if name in imported})
+
+    print(f"Importación de app (mejor de {args.runs}): {import_ms:.1f} ms (umbral {args.max_import_ms:.0f} ms)")
+    for package, elapsed in sorted(packages.items(), key=lambda item: -item[1])[:8]:
+        print(f"  {package:<24}{elapsed:>9.1f} ms")
+    print(f"Primera petición /api/calculate: {calculate_ms:.1f} ms (umbral {args.max_first_request_ms:.0f} ms)")
+    print(f"Primera petición /api/recommendations: {recommendations_ms:.1f} ms")
+
+    failures = []
+    if import_ms > args.max_import_ms:
+        failures.append(f"la importación tarda {import_ms:.1f} ms")
+    if max(calculate_ms, recommendations_ms) > args.max_first_request_ms:
+        failures.append(f"la primera petición tarda {max(calculate_ms, recommendations_ms):.1f} ms")
+    if heavy:
+        failures.append(f"la ruta escalar importa {', '.join(heavy)}")
+
+    if failures:
+        print("REGRESIÓN: " + "; ".join(failures))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == '__main__':
+    main()
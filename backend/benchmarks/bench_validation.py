@@ -0,0 +1,134 @@
+"""
+Compara el esquema de validación compilado con la validación en dos pasadas
+anterior (validate_measurements + validate_anthropometric_input), tanto para
+un único registro como para lotes.
+
+Uso:
+    python -m benchmarks.bench_validation [--rows 100000] [--repeat 5]
+"""
+
+import argparse
+import random
+import timeit
+
+import numpy as np
+
+from utils.batch_calculators import records_to_columns
+from utils.schema import validate_columns, validate_record
+from utils.validators import (
+    is_valid_age,
+    is_valid_circumference,
+    is_valid_gender,
+    is_valid_height,
+    is_valid_skinfold,
+    is_valid_weight,
+)
+
+
+def legacy_validate_measurements(data):
+    """Copia de la validación de utils/calculators.py previa al esquema compilado."""
+    errors = []
+    if data.get('weight', 0) < 30 or data.get('weight', 0) > 300:
+        errors.append("El peso debe estar entre 30 y 300 kg")
+    if data.get('height', 0) < 100 or data.get('height', 0) > 250:
+        errors.append("La estatura debe estar entre 100 y 250 cm")
+    if data.get('waist', 0) < 50 or data.get('waist', 0) > 200:
+        errors.append("La circunferencia de cintura debe estar entre 50 y 200 cm")
+    if data.get('waist', 0) > data.get('hip', 0):
+        errors.append("La circunferencia de cadera debe ser mayor que la de cintura")
+    for fold_name in ['triceps_fold', 'subscapular_fold', 'suprailiac_fold']:
+        if fold_name in data:
+            if data[fold_name] < 3 or data[fold_name] > 70:
+                errors.append(f"El pliegue {fold_name} debe estar entre 3 y 70 mm")
+    return len(errors) == 0, errors
+
+
+def legacy_validate_anthropometric_input(data):
+    """Copia de la validación de utils/validators.py previa al esquema compilado."""
+    errors = {}
+    if 'gender' not in data or not is_valid_gender(data['gender']):
+        errors['gender'] = "El género debe ser 'M' o 'F'"
+    if 'age' not in data or not is_valid_age(data['age']):
+        errors['age'] = "La edad debe estar entre 10 y 120 años"
+    if 'weight' not in data or not is_valid_weight(data['weight']):
+        errors['weight'] = "El peso debe estar entre 30 y 300 kg"
+    if 'height' not in data or not is_valid_height(data['height']):
+        errors['height'] = "La estatura debe estar entre 100 y 250 cm"
+    if 'waist' not in data or not is_valid_circumference(data['waist']):
+        errors['waist'] = "La circunferencia de cintura debe estar entre 50 y 200 cm"
+    if 'hip' not in data or not is_valid_circumference(data['hip'], 'hip'):
+        errors['hip'] = "La circunferencia de cadera debe estar entre 50 y 200 cm"
+    for fold_name in ['triceps_fold', 'subscapular_fold', 'suprailiac_fold']:
+        if fold_name in data and not is_valid_skinfold(data[fold_name]):
+            errors[fold_name] = "El pliegue debe estar entre 3 y 70 mm"
+    if 'waist' in data and 'hip' in data:
+        if data['waist'] > data['hip']:
+            errors['waist_hip'] = "La circunferencia de cadera debe ser mayor que la de cintura"
+    if 'weight' in data and 'height' in data:
+        weight = float(data['weight'])
+        height = float(data['height']) / 100
+        imc = weight / (height ** 2)
+        if imc < 12 or imc > 60:
+            errors['bmi_coherence'] = "La relación peso-estatura no es fisiológicamente coherente"
+    return len(errors) == 0, errors
+
+
+def legacy_two_pass(data):
+    """Ruta anterior: ambas validaciones sobre el mismo registro."""
+    legacy_validate_anthropometric_input(data)
+    return legacy_validate_measurements(data)
+
+
+def generate_records(size, seed=42):
+    """Genera registros sintéticos deterministas (una parte de ellos fuera de rango)."""
+    rng = random.Random(seed)
+    records = []
+    for _ in range(size):
+        record = {
+            'gender': rng.choice('MF'),
+            'age': rng.randint(10, 80),
+            'weight': round(rng.uniform(28, 140), 1),
+            'height': round(rng.uniform(140, 205), 1),
+            'waist': round(rng.uniform(55, 120), 1),
+            'hip': round(rng.uniform(80, 130), 1),
+        }
+        for fold_name in ('triceps_fold', 'subscapular_fold', 'suprailiac_fold'):
+            record[fold_name] = round(rng.uniform(3, 72), 1)
+        records.append(record)
+    return records
+
+
+def best_of(function, repeat, number=1):
+    """Devuelve el mejor tiempo por llamada en segundos."""
+    return min(timeit.repeat(function, repeat=repeat, number=number)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    record = generate_records(1)[0]
+    single_legacy = best_of(lambda: legacy_two_pass(record), args.repeat, number=10000)
+    single_schema = best_of(lambda: validate_record(record), args.repeat, number=10000)
+
+    records = generate_records(args.rows)
+    columns = records_to_columns(records)
+    batch_legacy = best_of(lambda: [legacy_two_pass(r) for r in records], args.repeat)
+    batch_schema = best_of(lambda: [validate_record(r) for r in records], args.repeat)
+    batch_vector = best_of(lambda: validate_columns(columns), args.repeat)
+
+    invalid = int(np.count_nonzero(validate_columns(columns)))
+
+    print(f"{'Caso':<40}{'Tiempo':>14}{'Mejora':>10}")
+    print(f"{'1 registro, dos pasadas (anterior)':<40}{single_legacy * 1e6:>11.2f} µs{'':>10}")
+    print(f"{'1 registro, esquema compilado':<40}{single_schema * 1e6:>11.2f} µs{single_legacy / single_schema:>9.1f}x")
+    print(f"{f'{args.rows} filas, dos pasadas (anterior)':<40}{batch_legacy * 1e3:>11.2f} ms{'':>10}")
+    print(f"{f'{args.rows} filas, esquema por registro':<40}{batch_schema * 1e3:>11.2f} ms{batch_legacy / batch_schema:>9.1f}x")
+    print(f"{f'{args.rows} filas, esquema vectorizado':<40}{batch_vector * 1e3:>11.2f} ms{batch_legacy / batch_vector:>9.1f}x")
+    print(f"Registros no válidos: {invalid}")
+
+
+if __name__ == '__main__':
+    main()
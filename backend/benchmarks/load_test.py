@@ -0,0 +1,191 @@
+"""
+Prueba de carga sin dependencias externas para /api/calculate y
+/api/recommendations.
+
+Un cliente asyncio mantiene N conexiones HTTP/1.1 concurrentes contra un
+servidor local durante un tiempo fijo y muestra req/s y latencias p50/p95/p99
+por endpoint, para comparar configuraciones de servicio. Con --serve se
+arranca el propio servidor y se detiene al terminar.
+
+Uso:
+    python -m benchmarks.load_test --serve "gunicorn -c gunicorn.conf.py app:app" --url http://127.0.0.1:8000
+    python -m benchmarks.load_test --url http://127.0.0.1:5000 --concurrency 64 --duration 20
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import shlex
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from utils.calculators import GOAL_PROFILES
+
+
+def calculate_payloads(size, seed=42):
+    """Payloads de /api/calculate variados (para no medir solo aciertos de caché)."""
+    rng = random.Random(seed)
+    payloads = []
+    for _ in range(size):
+        payloads.append({
+            'gender': rng.choice('MF'),
+            'age': rng.randint(18, 60),
+            'weight': round(rng.uniform(50, 110), 1),
+            'height': round(rng.uniform(155, 200), 1),
+            'waist': round(rng.uniform(65, 100), 1),
+            'hip': round(rng.uniform(101, 120), 1),
+            'triceps_fold': round(rng.uniform(5, 25), 1),
+            'subscapular_fold': round(rng.uniform(6, 30), 1),
+            'suprailiac_fold': round(rng.uniform(5, 30), 1),
+        })
+    return payloads
+
+
+def recommendation_payloads():
+    return [{'goal': {'primary_goal': profile['primary_goal']}} for profile in GOAL_PROFILES]
+
+
+class Connection:
+    """Conexión HTTP/1.1 mínima con keep-alive y reconexión automática."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, path, body):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode('ascii') + body
+        )
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Conexión cerrada por el servidor")
+        status = int(status_line.split()[1])
+        length = 0
+        keep_alive = True
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            name = name.strip().lower()
+            if name == 'content-length':
+                length = int(value)
+            elif name == 'connection' and value.strip().lower() == 'close':
+                keep_alive = False
+        await self.reader.readexactly(length)
+        if not keep_alive:
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def worker(host, port, targets, deadline, samples, errors):
+    connection = Connection(host, port)
+    index = random.randrange(1000)
+    while time.perf_counter() < deadline:
+        endpoint, path, bodies = targets[index % len(targets)]
+        body = bodies[index % len(bodies)]
+        index += 1
+        start = time.perf_counter()
+        try:
+            status = await connection.request(path, body)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            connection.close()
+            errors[endpoint] += 1
+            continue
+        samples[endpoint].append(time.perf_counter() - start)
+        if status >= 500:
+            errors[endpoint] += 1
+    connection.close()
+
+
+async def run_load(url, concurrency, duration, endpoints):
+    parts = urlsplit(url)
+    calculate = [json.dumps(payload).encode('utf-8') for payload in calculate_payloads(1000)]
+    recommendations = [json.dumps(payload).encode('utf-8') for payload in recommendation_payloads()]
+    available = {
+        'calculate': ('calculate', '/api/calculate', calculate),
+        'recommendations': ('recommendations', '/api/recommendations', recommendations),
+    }
+    targets = [available[name] for name in endpoints]
+    samples = {name: [] for name in endpoints}
+    errors = {name: 0 for name in endpoints}
+
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        worker(parts.hostname, parts.port or 80, targets, deadline, samples, errors)
+        for _ in range(concurrency)
+    ))
+    return samples, errors, time.perf_counter() - started
+
+
+def wait_for_server(url, timeout=30):
+    """Espera a que /api/health responda."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/api/health", timeout=1):
+                return
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.2)
+    raise RuntimeError(f"El servidor no respondió en {timeout} s")
+
+
+def report(samples, errors, elapsed):
+    print(f"{'Endpoint':<18}{'Peticiones':>11}{'Errores':>9}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for endpoint, latencies in samples.items():
+        if latencies:
+            p50, p95, p99 = np.percentile(np.array(latencies) * 1e3, [50, 95, 99])
+        else:
+            p50 = p95 = p99 = float('nan')
+        print(
+            f"{endpoint:<18}{len(latencies):>11}{errors[endpoint]:>9}{len(latencies) / elapsed:>10.1f}"
+            f"{p50:>9.2f}{p95:>9.2f}{p99:>9.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--endpoints', nargs='+', default=['calculate', 'recommendations'],
+                        choices=['calculate', 'recommendations'])
+    parser.add_argument('--serve', help="Comando para arrancar el servidor durante la prueba")
+    args = parser.parse_args()
+
+    server = subprocess.Popen(shlex.split(args.serve)) if args.serve else None
+    try:
+        wait_for_server(args.url)
+        samples, errors, elapsed = asyncio.run(
+            run_load(args.url, args.concurrency, args.duration, args.endpoints)
+        )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    print(f"{args.concurrency} conexiones durante {elapsed:.1f} s contra {args.url}")
+    report(samples, errors, elapsed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,332 @@
+"""
+Procesamiento masivo de ficheros CSV/Parquet desde la línea de comandos.
+
+Lee la entrada por bloques de tamaño fijo, reparte los bloques entre un pool
+de procesos que ejecutan el motor de cálculo por lotes y escribe los
+resultados de forma incremental, en el mismo orden de entrada, con columnas
+de error por fila. La memoria máxima depende del tamaño de bloque y del
+número de procesos, no del tamaño del fichero.
+
+Uso:
+    python bulk.py mediciones.csv resultados.csv [--workers 8] [--chunk-size 10000]
+    python bulk.py mediciones.parquet resultados.parquet
+
+Parquet requiere el paquete opcional pyarrow.
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.batch_io import process_record_chunk
+from utils.growth import GROWTH_MEASURES
+from utils.schema import NUMERIC_FIELDS
+from utils.thresholds import METRIC_CLOSED_SIDE
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# Columnas de resultado añadidas a cada fila de entrada
+RESULT_COLUMNS = (
+    'success',
+    'error',
+    'error_codes',
+    'bmi',
+    'waist_hip_ratio',
+    'waist_height_ratio',
+    'body_roundness_index',
+    'body_fat_equation',
+    'density_conversion',
+    'body_fat_percentage',
+    'fat_free_mass',
+    'fat_free_mass_index',
+    'fat_mass',
+    'goal',
+) + tuple(f'status_{metric}' for metric in METRIC_CLOSED_SIDE) + tuple(f'z_{name}' for name in GROWTH_MEASURES)
+
+_FLOAT_COLUMNS = {
+    'bmi', 'waist_hip_ratio', 'waist_height_ratio', 'body_roundness_index', 'body_fat_percentage',
+    'fat_free_mass', 'fat_free_mass_index', 'fat_mass',
+} | {f'z_{name}' for name in GROWTH_MEASURES}
+
+
+def _file_format(path, explicit=None):
+    if explicit:
+        return explicit
+    return 'parquet' if path.lower().endswith(('.parquet', '.pq')) else 'csv'
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit("El formato Parquet requiere el paquete pyarrow (pip install pyarrow)")
+    return pyarrow, pyarrow.parquet
+
+
+def read_chunks(path, file_format, chunk_size):
+    """
+    Lee el fichero de entrada por bloques.
+
+    Yields:
+        tuple: (list, list) - (nombres de columna, filas del bloque como listas de valores)
+    """
+    if file_format == 'parquet':
+        _, parquet = _require_pyarrow()
+        source = parquet.ParquetFile(path)
+        for batch in source.iter_batches(batch_size=chunk_size):
+            yield batch.schema.names, list(zip(*(column.to_pylist() for column in batch.columns)))
+        return
+
+    with open(path, newline='', encoding='utf-8-sig') as handle:
+        reader = csv.reader(handle)
+        columns = next(reader, None)
+        if columns is None:
+            return
+        chunk = []
+        emitted = False
+        for row in reader:
+            if not row:
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield columns, chunk
+                chunk = []
+                emitted = True
+        if chunk or not emitted:
+            # Un fichero sin filas produce igualmente la cabecera de salida
+            yield columns, chunk
+
+
+def parse_row(columns, row):
+    """Convierte una fila de entrada al formato de /api/calculate (los CSV llegan como texto)."""
+    record = {}
+    for name, value in zip(columns, row):
+        if value is None or value == '':
+            continue
+        if name in NUMERIC_FIELDS and isinstance(value, str):
+            try:
+                value = float(value)
+            except ValueError:
+                pass
+        record[name] = value
+    return record
+
+
+def flatten_result(result):
+    """Aplana un resultado de process_anthropometric_data en columnas de RESULT_COLUMNS."""
+    row = dict.fromkeys(RESULT_COLUMNS)
+    row['success'] = result.get('success', False)
+    if not row['success']:
+        row['error'] = '; '.join(result.get('errors') or [result.get('error', '')])
+        row['error_codes'] = ';'.join(
+            f"{error['field']}:{error['code']}" for error in result.get('error_codes', [])
+        ) or None
+        return row
+    for name in RESULT_COLUMNS:
+        if name in result:
+            row[name] = result[name]
+    if 'goal' in result:
+        row['goal'] = result['goal']['primary_goal']
+    for metric, status in result.get('status', {}).items():
+        row[f'status_{metric}'] = status
+    for name in GROWTH_MEASURES:
+        score = result.get('growth', {}).get(name)
+        if score is not None:
+            row[f'z_{name}'] = score['z']
+    return row
+
+
+def output_columns(input_columns):
+    """Columnas del fichero de salida: las de entrada seguidas de las de resultado."""
+    return list(input_columns) + [name for name in RESULT_COLUMNS if name not in input_columns]
+
+
+def process_rows(columns, rows, output_format):
+    """
+    Calcula y serializa un bloque de filas (se ejecuta en los procesos del pool).
+
+    El formateo de la salida también se hace aquí para que el proceso
+    principal solo tenga que leer y escribir.
+
+    Args:
+        columns (list): Nombres de las columnas de entrada
+        rows (list): Filas del bloque como listas de valores
+        output_format (str): 'csv' o 'parquet'
+
+    Returns:
+        tuple: (str|dict, int) - (bloque CSV ya serializado o columnas para
+            Parquet, número de filas con error)
+    """
+    records = [(parse_row(columns, row), None) for row in rows]
+    results = [flatten_result(result) for result in process_record_chunk(records)]
+    failed = sum(1 for result in results if not result['success'])
+    extra = [name for name in RESULT_COLUMNS if name not in columns]
+
+    if output_format == 'parquet':
+        data = {name: [row[index] for row in rows] for index, name in enumerate(columns)}
+        for name in extra:
+            data[name] = [result[name] for result in results]
+        return data, failed
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        list(row) + [result[name] for name in extra]
+        for row, result in zip(rows, results)
+    )
+    return buffer.getvalue(), failed
+
+
+class CsvResultWriter:
+    """Escribe los bloques CSV ya serializados de forma incremental."""
+
+    def __init__(self, path, columns):
+        self.handle = open(path, 'w', newline='', encoding='utf-8')
+        csv.writer(self.handle).writerow(columns)
+
+    def write(self, block):
+        self.handle.write(block)
+
+    def close(self):
+        self.handle.close()
+
+
+class ParquetResultWriter:
+    """Escribe los resultados en Parquet, un grupo de filas por bloque."""
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        self.writer = None
+        self.schema = None
+
+    def write(self, data):
+        pyarrow, parquet = _require_pyarrow()
+        if self.writer is None:
+            fields = []
+            for name in self.columns:
+                if name in _FLOAT_COLUMNS:
+                    field_type = pyarrow.float64()
+                elif name == 'success':
+                    field_type = pyarrow.bool_()
+                elif name in RESULT_COLUMNS:
+                    field_type = pyarrow.string()
+                else:
+                    field_type = pyarrow.array(data[name]).type
+                    if pyarrow.types.is_null(field_type):
+                        field_type = pyarrow.string()
+                fields.append(pyarrow.field(name, field_type))
+            self.schema = pyarrow.schema(fields)
+            self.writer = parquet.ParquetWriter(self.path, self.schema)
+        self.writer.write_table(pyarrow.Table.from_pydict(data, schema=self.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def run_bulk(input_path, output_path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+             input_format=None, output_format=None, progress=None):
+    """
+    Procesa un fichero completo.
+
+    Como máximo hay 2 × workers bloques en vuelo, de modo que la lectura no
+    se adelanta al cálculo y la memoria queda acotada.
+
+    Args:
+        input_path (str): Fichero de entrada (CSV o Parquet)
+        output_path (str): Fichero de salida (CSV o Parquet)
+        workers (int): Procesos del pool (por defecto, núcleos disponibles; 1 = sin pool)
+        chunk_size (int): Filas por bloque
+        input_format (str): 'csv' o 'parquet' (por defecto, según la extensión)
+        output_format (str): 'csv' o 'parquet' (por defecto, según la extensión)
+        progress (callable): Función opcional llamada con el número de filas procesadas
+
+    Returns:
+        dict: Filas procesadas, filas con error y segundos transcurridos
+    """
+    workers = workers or os.cpu_count() or 1
+    input_format = _file_format(input_path, input_format)
+    output_format = _file_format(output_path, output_format)
+    writer_class = ParquetResultWriter if output_format == 'parquet' else CsvResultWriter
+    writer = None
+
+    started = time.perf_counter()
+    total = failed = 0
+
+    def emit(columns, size, payload):
+        nonlocal writer, total, failed
+        block, block_failed = payload
+        if writer is None:
+            writer = writer_class(output_path, output_columns(columns))
+        writer.write(block)
+        total += size
+        failed += block_failed
+        if progress:
+            progress(total)
+
+    try:
+        chunks = read_chunks(input_path, input_format, chunk_size)
+        if workers == 1:
+            for columns, rows in chunks:
+                emit(columns, len(rows), process_rows(columns, rows, output_format))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for columns, rows in chunks:
+                    future = pool.submit(process_rows, columns, rows, output_format)
+                    pending.append((columns, len(rows), future))
+                    del rows
+                    if len(pending) >= 2 * workers:
+                        columns, size, future = pending.popleft()
+                        emit(columns, size, future.result())
+                while pending:
+                    columns, size, future = pending.popleft()
+                    emit(columns, size, future.result())
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return {"rows": total, "failed": failed, "seconds": time.perf_counter() - started}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help="Fichero de entrada (.csv o .parquet)")
+    parser.add_argument('output', help="Fichero de salida (.csv o .parquet)")
+    parser.add_argument('--workers', type=int, default=None, help="Procesos (por defecto, núcleos disponibles)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--input-format', choices=['csv', 'parquet'])
+    parser.add_argument('--output-format', choices=['csv', 'parquet'])
+    parser.add_argument('--quiet', action='store_true')
+    args = parser.parse_args()
+
+    def progress(rows):
+        print(f"\r{rows} filas procesadas", end='', file=sys.stderr, flush=True)
+
+    summary = run_bulk(
+        args.input, args.output,
+        workers=args.workers,
+        chunk_size=max(1, args.chunk_size),
+        input_format=args.input_format,
+        output_format=args.output_format,
+        progress=None if args.quiet else progress,
+    )
+    if not args.quiet:
+        print(file=sys.stderr)
+    rate = summary['rows'] / summary['seconds'] if summary['seconds'] else 0
+    print(
+        f"{summary['rows']} filas ({summary['failed']} con error) en {summary['seconds']:.2f} s "
+        f"({rate:.0f} filas/s)",
+        file=sys.stderr
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Configuración de gunicorn para servir la API con alta concurrencia.
+
+gunicorn carga este fichero automáticamente al arrancar desde backend/.
+Todos los valores se pueden ajustar con variables de entorno:
+
+- WEB_CONCURRENCY: número de procesos (por defecto 2 × núcleos + 1, máximo GUNICORN_MAX_WORKERS)
+- GUNICORN_MAX_WORKERS: límite del valor calculado por defecto (8)
+- GUNICORN_THREADS: hilos por proceso (4)
+- GUNICORN_WORKER_CLASS: clase de worker (gthread)
+- GUNICORN_TIMEOUT: segundos antes de reiniciar un worker bloqueado (30)
+- PORT: puerto de escucha (8000)
+- METRICS_DB_PATH: fichero donde los workers publican sus métricas (por defecto,
+  uno temporal por arranque del maestro que se borra al terminar)
+"""
+
+import multiprocessing
+import os
+import tempfile
+
+# Un hilo de BLAS por worker: los procesos y los hilos de gunicorn ya reparten
+# los núcleos y NumPy con varios hilos por worker solo añade contención.
+for _variable in ('OPENBLAS_NUM_THREADS', 'OMP_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(_variable, '1')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+
+workers = int(os.environ.get(
+    'WEB_CONCURRENCY',
+    min(multiprocessing.cpu_count() * 2 + 1, int(os.environ.get('GUNICORN_MAX_WORKERS', 8)))
+))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Reciclar los workers periódicamente (con variación para no reiniciarlos a la vez)
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+
+# Cargar la aplicación (y NumPy) en el proceso maestro antes del fork: los
+# workers comparten esas páginas de memoria y arrancan sin coste de importación.
+preload_app = True
+
+# En contenedores /tmp puede estar en disco; el latido de los workers va a memoria.
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+# /api/metrics suma las instantáneas que cada worker guarda en este fichero.
+# Se define antes de precargar la aplicación para que la vean todos los workers.
+_metrics_default = os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+    f"anthrocalc-metrics-{os.getpid()}.db"
+)
+os.environ.setdefault('METRICS_DB_PATH', _metrics_default)
+
+
+def _remove_metrics_db():
+    for suffix in ('', '-wal', '-shm'):
+        try:
+            os.remove(_metrics_default + suffix)
+        except OSError:
+            pass
+
+
+# Descartar las métricas de un arranque anterior con el mismo PID (aquí y no
+# en on_starting, que se ejecuta después de precargar la aplicación)
+if os.environ['METRICS_DB_PATH'] == _metrics_default:
+    _remove_metrics_db()
+
+
+def on_exit(server):
+    """Borra el fichero temporal de métricas al detener el maestro."""
+    if os.environ['METRICS_DB_PATH'] == _metrics_default:
+        _remove_metrics_db()
+
+
+def worker_exit(server, worker):
+    """Guarda las últimas métricas del worker antes de que termine."""
+    from app import metrics_store
+    from utils.metrics import registry
+
+    if metrics_store is not None:
+        metrics_store.flush(registry)
+
+
+def when_ready(server):
+    """Ejecuta un cálculo completo en el maestro para precalentar NumPy y las tablas."""
+    from utils.batch_calculators import process_anthropometric_batch, records_to_columns
+    from utils.calculators import process_anthropometric_data
+
+    sample = {
+        'gender': 'M', 'age': 30, 'weight': 75, 'height': 180, 'waist': 85, 'hip': 95,
+        'triceps_fold': 12, 'subscapular_fold': 15, 'suprailiac_fold': 18,
+    }
+    process_anthropometric_data(sample)
+    process_anthropometric_batch(records_to_columns([sample]))
+    server.log.info("Motor de cálculo precargado (%s workers × %s hilos)", workers, threads)
@@ -0,0 +1,287 @@
+"""
+Procesos de trabajos en segundo plano (recálculo del historial, importación
+de ficheros de temporada y mantenimiento del archivo columnar).
+
+Toman los trabajos de la cola SQLite (models/jobs.py) que encolan las rutas
+/api/jobs y los ejecutan por bloques con el motor vectorizado, fuera de los
+workers de gunicorn. Tras cada bloque se guarda un punto de control: si un
+proceso muere, otro retoma el trabajo desde el último bloque completado.
+
+Uso:
+    python jobs.py [--processes 2] [--chunk-size 1000] [--poll-interval 1.0]
+
+Usa las mismas variables de entorno que la aplicación (MEASUREMENT_DB_PATH,
+MEASUREMENT_ARCHIVE_DIR, JOB_DB_PATH, JOB_LEASE_SECONDS, JOB_CHUNK_SIZE).
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+
+from bulk import parse_row, read_chunks
+from models.anthropometric import MeasurementStore
+from models.archive import open_archive
+from models.jobs import DEFAULT_LEASE_SECONDS, FINISHED_STATUSES, JobQueue
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Carpeta de instancia de la aplicación (app.instance_path), con los ficheros de datos por defecto
+INSTANCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
+
+# Errores por fila que se guardan en el resultado de una importación
+MAX_REPORTED_ERRORS = 100
+
+
+def run_recalculate(store, params, checkpoint, result, chunk_size):
+    """
+    Recalcula los resultados guardados (p. ej. tras un cambio de ecuaciones).
+
+    Args:
+        store (MeasurementStore): Almacén de mediciones
+        params (dict): 'athlete_ids' (opcional) y 'force' (recalcular también
+            las mediciones calculadas con la versión actual)
+        checkpoint (dict): Último punto de control ('last_id', 'total') o None
+        result (dict): Resultado parcial del punto de control o None
+        chunk_size (int): Mediciones por bloque
+
+    Yields:
+        tuple: (punto de control, procesados, total, resultado parcial) tras cada bloque
+    """
+    athlete_ids = params.get('athlete_ids')
+    force = params.get('force', False)
+    if checkpoint is None:
+        checkpoint = {'last_id': 0, 'total': store.count_recompute(athlete_ids, force)}
+        result = {'recomputed': 0}
+
+    last_id = checkpoint['last_id']
+    while True:
+        count, chunk_last_id = store.recompute_chunk(last_id, chunk_size, athlete_ids, force)
+        if chunk_last_id is None:
+            break
+        last_id = chunk_last_id
+        result = {'recomputed': result['recomputed'] + count}
+        yield dict(checkpoint, last_id=last_id), result['recomputed'], checkpoint['total'], result
+    yield dict(checkpoint, last_id=last_id), result['recomputed'], checkpoint['total'], result
+
+
+def count_rows(path, file_format):
+    """Número de filas de datos de un fichero CSV o Parquet (total del progreso)."""
+    if file_format == 'parquet':
+        from bulk import _require_pyarrow
+
+        _, parquet = _require_pyarrow()
+        return parquet.ParquetFile(path).metadata.num_rows
+    with open(path, 'rb') as handle:
+        lines = sum(1 for line in handle if line.strip())
+    return max(lines - 1, 0)
+
+
+def run_import(store, params, checkpoint, result, chunk_size):
+    """
+    Importa un fichero de temporada (CSV o Parquet) al historial de mediciones.
+
+    Cada fila necesita 'athlete_id' y 'session_date' además de las mediciones.
+    Las filas no válidas se cuentan y se informan (hasta MAX_REPORTED_ERRORS)
+    sin detener la importación.
+
+    Args:
+        store (MeasurementStore): Almacén de mediciones
+        params (dict): 'path', 'format' ('csv' o 'parquet') y 'source'
+        checkpoint (dict): Último punto de control ('rows', 'total') o None
+        result (dict): Resultado parcial del punto de control o None
+        chunk_size (int): Filas por bloque
+
+    Yields:
+        tuple: (punto de control, procesados, total, resultado parcial) tras cada bloque
+    """
+    if checkpoint is None:
+        checkpoint = {'rows': 0, 'total': count_rows(params['path'], params['format'])}
+        result = {'rows': 0, 'imported': 0, 'failed': 0, 'errors': []}
+
+    skip = checkpoint['rows']
+    offset = 0
+    for columns, rows in read_chunks(params['path'], params['format'], chunk_size):
+        # Al retomar, las filas anteriores al punto de control ya están guardadas
+        if offset + len(rows) <= skip:
+            offset += len(rows)
+            continue
+        rows = rows[max(skip - offset, 0):]
+        start = max(skip, offset)
+        entries = []
+        for row in rows:
+            record = parse_row(columns, row)
+            entries.append((record.pop('athlete_id', None), record.pop('session_date', None), record))
+
+        outcomes = store.import_chunk(params['source'], start, entries)
+        errors = list(result['errors'])
+        for index, outcome in enumerate(outcomes):
+            if outcome is not None and len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(dict(outcome, row=start + index))
+        failed = sum(1 for outcome in outcomes if outcome is not None)
+        result = {
+            'rows': result['rows'] + len(rows),
+            'imported': result['imported'] + len(rows) - failed,
+            'failed': result['failed'] + failed,
+            'errors': errors,
+        }
+        offset = start + len(rows)
+        yield dict(checkpoint, rows=offset), offset, checkpoint['total'], result
+    yield dict(checkpoint, rows=max(offset, skip)), result['rows'], checkpoint['total'], result
+
+
+def run_archive(store, params, checkpoint, result, chunk_size):
+    """
+    Compacta el archivo columnar en un único segmento o, con 'rebuild', lo
+    reconstruye antes desde el almacén de mediciones.
+
+    Al retomar una reconstrucción, los bloques ya copiados se vuelven a
+    copiar sin duplicarse (el archivo sustituye las filas por id).
+
+    Args:
+        store (MeasurementStore): Almacén de mediciones (con su archivo)
+        params (dict): 'rebuild' (reconstruir desde el almacén)
+        checkpoint (dict): Último punto de control ('last_id', 'total') o None
+        result (dict): Resultado parcial del punto de control o None
+        chunk_size (int): Mediciones por bloque
+
+    Yields:
+        tuple: (punto de control, procesados, total, resultado parcial) tras cada bloque
+    """
+    archive = store.archive
+    if archive is None:
+        raise ValueError("El archivo columnar está desactivado (MEASUREMENT_ARCHIVE_DIR)")
+    if checkpoint is None:
+        checkpoint = {'last_id': 0, 'total': store.fingerprint()[0] if params.get('rebuild') else 0}
+        result = {'archived': 0, 'merged_segments': 0}
+        if params.get('rebuild'):
+            archive.reset()
+
+    last_id = checkpoint['last_id']
+    while params.get('rebuild'):
+        count, chunk_last_id = store.archive_chunk(last_id, chunk_size)
+        if chunk_last_id is None:
+            break
+        last_id = chunk_last_id
+        result = dict(result, archived=result['archived'] + count)
+        yield dict(checkpoint, last_id=last_id), result['archived'], checkpoint['total'], result
+    result = dict(result, merged_segments=archive.compact(full=True), **archive.stats())
+    yield dict(checkpoint, last_id=last_id), result['archived'], checkpoint['total'], result
+
+
+def cleanup_import(params):
+    """Borra el fichero subido de una importación terminada."""
+    try:
+        os.remove(params['path'])
+    except OSError:
+        pass
+
+
+# Tipo de trabajo -> (función que lo ejecuta por bloques, limpieza al terminar)
+JOB_HANDLERS = {
+    'recalculate': (run_recalculate, None),
+    'import': (run_import, cleanup_import),
+    'archive': (run_archive, None),
+}
+
+
+def run_job(queue, store, job, worker, chunk_size, stop=None):
+    """
+    Ejecuta un trabajo asignado guardando un punto de control tras cada bloque.
+
+    Args:
+        queue (JobQueue): Cola de trabajos
+        store (MeasurementStore): Almacén de mediciones
+        job (dict): Trabajo devuelto por JobQueue.claim
+        worker (str): Identificador del proceso
+        chunk_size (int): Elementos por bloque
+        stop (Event): Si se activa, el trabajo se devuelve a la cola tras el bloque en curso
+
+    Returns:
+        str: Estado final del trabajo ('succeeded', 'failed', 'cancelled' o
+            'queued' si se devolvió a la cola)
+    """
+    handler, cleanup = JOB_HANDLERS[job['type']]
+    result = job['result']
+    try:
+        for checkpoint, done, total, result in handler(
+            store, job['params'], job['checkpoint'], result, chunk_size
+        ):
+            if not queue.checkpoint(job['id'], worker, checkpoint, done, total, result):
+                break
+            if stop is not None and stop.is_set():
+                queue.release(job['id'], worker)
+                return queue.get(job['id'])['status']
+        else:
+            queue.complete(job['id'], worker, result)
+    except (Exception, SystemExit) as exc:
+        # SystemExit: dependencias opcionales ausentes (pyarrow)
+        queue.fail(job['id'], worker, str(exc) or exc.__class__.__name__)
+
+    status = queue.get(job['id'])['status']
+    if cleanup is not None and status in FINISHED_STATUSES:
+        cleanup(job['params'])
+    return status
+
+
+def worker_loop(queue, store, worker, chunk_size, poll_interval, stop):
+    """Toma y ejecuta trabajos hasta que se activa 'stop'."""
+    while not stop.is_set():
+        job = queue.claim(worker)
+        if job is None:
+            stop.wait(poll_interval)
+            continue
+        run_job(queue, store, job, worker, chunk_size, stop)
+
+
+def _worker_main(index, chunk_size, poll_interval):
+    """Punto de entrada de cada proceso: abre sus propias conexiones SQLite."""
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+    os.makedirs(INSTANCE_DIR, exist_ok=True)
+    queue = JobQueue(
+        os.environ.get('JOB_DB_PATH', os.path.join(INSTANCE_DIR, 'jobs.db')),
+        float(os.environ.get('JOB_LEASE_SECONDS', DEFAULT_LEASE_SECONDS))
+    )
+    store = MeasurementStore(
+        os.environ.get('MEASUREMENT_DB_PATH', os.path.join(INSTANCE_DIR, 'measurements.db')),
+        archive=open_archive(
+            os.environ.get('MEASUREMENT_ARCHIVE_DIR', os.path.join(INSTANCE_DIR, 'measurement_archive'))
+        )
+    )
+    worker = f"{socket.gethostname()}:{os.getpid()}:{index}"
+    print(f"Proceso de trabajos {worker} iniciado", file=sys.stderr, flush=True)
+    worker_loop(queue, store, worker, chunk_size, poll_interval, stop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=int(os.environ.get('JOB_PROCESSES', 1)))
+    parser.add_argument('--chunk-size', type=int, default=int(os.environ.get('JOB_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)))
+    parser.add_argument('--poll-interval', type=float, default=1.0)
+    args = parser.parse_args()
+    chunk_size = max(1, args.chunk_size)
+
+    if args.processes <= 1:
+        _worker_main(0, chunk_size, args.poll_interval)
+        return
+
+    processes = [
+        multiprocessing.Process(target=_worker_main, args=(index, chunk_size, args.poll_interval))
+        for index in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    # Los procesos hijos reciben SIGINT del terminal; SIGTERM se les reenvía
+    signal.signal(signal.SIGTERM, lambda *_: [process.terminate() for process in processes])
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for process in processes:
+        process.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,699 @@
+"""
+Modelo persistente de mediciones antropométricas.
+
+Guarda en SQLite las mediciones originales de cada atleta y sesión junto con
+los resultados derivados. Los resultados solo se recalculan cuando cambian
+las mediciones (hash canónico de la entrada) o la versión de las fórmulas
+(CALCULATION_VERSION); el historial se pagina por clave (fecha de sesión, id).
+
+Los agregados longitudinales de cada atleta (utils/longitudinal.py) se
+guardan junto al historial y se actualizan en O(1) al añadir una sesión
+posterior a la última; al modificar o eliminar una sesión, o al insertar una
+anterior, se descartan y se reconstruyen en la siguiente consulta.
+
+Si se indica un archivo columnar (models/archive.py), cada resultado
+guardado, recalculado o borrado se refleja también en él para las consultas
+analíticas. Las escrituras sueltas se acumulan y se archivan juntas; un fallo
+del archivo se registra sin hacer fallar la escritura, porque SQLite es la
+fuente de verdad y el archivo se puede reconstruir.
+"""
+
+import base64
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import date
+
+from utils.batch_calculators import batch_to_records, process_anthropometric_batch, records_to_columns
+from utils.batch_io import process_record_chunk
+from utils.cache import canonical_key
+from utils.calculators import CALCULATION_VERSION, process_anthropometric_data
+from utils.longitudinal import (
+    DEFAULT_WINDOW,
+    TrendAccumulator,
+    analyze_series,
+    default_error_options,
+    session_errors,
+    session_values,
+)
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS measurements (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        athlete_id TEXT NOT NULL,
+        session_date TEXT NOT NULL,
+        raw TEXT NOT NULL,
+        input_hash TEXT NOT NULL,
+        results TEXT NOT NULL,
+        calculation_version INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_measurements_athlete_session "
+    "ON measurements (athlete_id, session_date, id)",
+    "CREATE INDEX IF NOT EXISTS idx_measurements_session "
+    "ON measurements (session_date)",
+    "CREATE INDEX IF NOT EXISTS idx_measurements_version "
+    "ON measurements (calculation_version)",
+    """
+    CREATE TABLE IF NOT EXISTS athlete_trends (
+        athlete_id TEXT PRIMARY KEY,
+        state TEXT NOT NULL,
+        last_session_date TEXT NOT NULL,
+        last_id INTEGER NOT NULL,
+        calculation_version INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS session_deltas (
+        measurement_id INTEGER PRIMARY KEY,
+        athlete_id TEXT NOT NULL,
+        session_date TEXT NOT NULL,
+        deltas TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_session_deltas_athlete "
+    "ON session_deltas (athlete_id, session_date, measurement_id)",
+    """
+    CREATE TABLE IF NOT EXISTS imported_rows (
+        source TEXT NOT NULL,
+        row_index INTEGER NOT NULL,
+        measurement_id INTEGER NOT NULL,
+        PRIMARY KEY (source, row_index)
+    )
+    """,
+)
+
+_COLUMNS = "id, athlete_id, session_date, raw, results, calculation_version, created_at, updated_at"
+
+
+class MeasurementError(ValueError):
+    """Error de validación de una medición que se intenta guardar."""
+
+    def __init__(self, message, details=None):
+        super().__init__(message)
+        self.details = details
+
+
+def parse_session_date(value):
+    """
+    Normaliza una fecha de sesión en formato ISO (AAAA-MM-DD).
+
+    Raises:
+        MeasurementError: Si la fecha no es válida
+    """
+    try:
+        return date.fromisoformat(str(value)).isoformat()
+    except ValueError:
+        raise MeasurementError("La fecha de sesión debe tener formato AAAA-MM-DD")
+
+
+def encode_cursor(session_date, measurement_id):
+    """Codifica la posición de paginación (fecha de sesión, id) como cadena opaca."""
+    payload = json.dumps([session_date, measurement_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    Decodifica un cursor de paginación.
+
+    Raises:
+        MeasurementError: Si el cursor no es válido
+    """
+    try:
+        session_date, measurement_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return str(session_date), int(measurement_id)
+    except (ValueError, TypeError):
+        raise MeasurementError("Cursor de paginación no válido")
+
+
+def _row_to_dict(row):
+    return {
+        "id": row[0],
+        "athlete_id": row[1],
+        "session_date": row[2],
+        "measurements": json.loads(row[3]),
+        "results": json.loads(row[4]),
+        "calculation_version": row[5],
+        "created_at": row[6],
+        "updated_at": row[7],
+    }
+
+
+def _compute(data):
+    """
+    Calcula los resultados de una medición y rechaza las no válidas.
+
+    Raises:
+        MeasurementError: Si las mediciones no superan la validación
+    """
+    results = process_anthropometric_data(data)
+    if not results.get('success'):
+        raise MeasurementError("Mediciones no válidas", details=results)
+    return results
+
+
+class MeasurementStore:
+    """
+    Almacén SQLite de mediciones y resultados.
+
+    Cada hilo usa su propia conexión; el modo WAL permite lecturas
+    concurrentes desde varios workers de gunicorn.
+
+    Args:
+        path (str): Ruta del fichero SQLite
+        archive (ResultArchive): Archivo columnar que se mantiene al día (opcional)
+    """
+
+    def __init__(self, path, archive=None):
+        self.path = path
+        self.archive = archive
+        self._local = threading.local()
+        # Conexión temporal: con preload_app el almacén se crea en el proceso
+        # maestro de gunicorn y las conexiones SQLite no deben heredarse al hacer fork.
+        connection = self._open()
+        for statement in _SCHEMA:
+            connection.execute(statement)
+        connection.close()
+
+    def _open(self):
+        connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self._open()
+        return connection
+
+    def create(self, athlete_id, session_date, data):
+        """
+        Guarda una nueva medición calculando sus resultados.
+
+        Args:
+            athlete_id (str): Identificador del atleta
+            session_date (str): Fecha de la sesión (AAAA-MM-DD)
+            data (dict): Mediciones antropométricas
+
+        Returns:
+            dict: Medición guardada con sus resultados
+        """
+        session_date = parse_session_date(session_date)
+        results = _compute(data)
+        now = time.time()
+        cursor = self._connection().execute(
+            "INSERT INTO measurements (athlete_id, session_date, raw, input_hash, results, "
+            "calculation_version, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (str(athlete_id), session_date, json.dumps(data), canonical_key(data),
+             json.dumps(results), CALCULATION_VERSION, now, now)
+        )
+        measurement = self.get(cursor.lastrowid)
+        self._append_trend(measurement)
+        self._archive_single(measurements=[measurement])
+        return measurement
+
+    def update(self, measurement_id, data=None, session_date=None):
+        """
+        Actualiza una medición. Los resultados solo se recalculan si cambian
+        las mediciones o si fueron calculados con otra versión de las fórmulas.
+
+        Returns:
+            dict: Medición actualizada, o None si no existe
+        """
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT input_hash, calculation_version, session_date, athlete_id FROM measurements WHERE id = ?",
+            (measurement_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        input_hash, version, current_date, athlete_id = row
+        session_date = parse_session_date(session_date) if session_date is not None else current_date
+        now = time.time()
+
+        if data is not None and (canonical_key(data) != input_hash or version != CALCULATION_VERSION):
+            results = _compute(data)
+            connection.execute(
+                "UPDATE measurements SET session_date = ?, raw = ?, input_hash = ?, results = ?, "
+                "calculation_version = ?, updated_at = ? WHERE id = ?",
+                (session_date, json.dumps(data), canonical_key(data), json.dumps(results),
+                 CALCULATION_VERSION, now, measurement_id)
+            )
+        elif data is not None:
+            connection.execute(
+                "UPDATE measurements SET session_date = ?, raw = ?, updated_at = ? WHERE id = ?",
+                (session_date, json.dumps(data), now, measurement_id)
+            )
+        else:
+            connection.execute(
+                "UPDATE measurements SET session_date = ?, updated_at = ? WHERE id = ?",
+                (session_date, now, measurement_id)
+            )
+        self._invalidate_trend(athlete_id)
+        measurement = self.get(measurement_id)
+        self._archive_single(measurements=[measurement])
+        return measurement
+
+    def get(self, measurement_id):
+        """
+        Devuelve una medición, recalculando sus resultados si la versión de
+        las fórmulas ha cambiado desde que se guardaron.
+
+        Returns:
+            dict: Medición con sus resultados, o None si no existe
+        """
+        row = self._connection().execute(
+            f"SELECT {_COLUMNS} FROM measurements WHERE id = ?", (measurement_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[5] != CALCULATION_VERSION:
+            self.recompute_stale(ids=[measurement_id])
+            return self.get(measurement_id)
+        return _row_to_dict(row)
+
+    def delete(self, measurement_id):
+        """Elimina una medición. Devuelve True si existía."""
+        connection = self._connection()
+        row = connection.execute("SELECT athlete_id FROM measurements WHERE id = ?", (measurement_id,)).fetchone()
+        if row is None:
+            return False
+        connection.execute("DELETE FROM measurements WHERE id = ?", (measurement_id,))
+        self._invalidate_trend(row[0])
+        self._archive_single(deleted=[measurement_id])
+        return True
+
+    def _archive(self, measurements):
+        """Refleja en el archivo columnar un bloque de mediciones ya guardadas."""
+        if self.archive is None:
+            return
+        try:
+            self.archive.append(measurements)
+        except Exception:
+            logger.exception("No se pudieron archivar %d mediciones", len(measurements))
+
+    def _archive_single(self, measurements=(), deleted=()):
+        """Acumula en el archivo columnar una escritura suelta (alta, modificación o borrado)."""
+        if self.archive is None:
+            return
+        try:
+            self.archive.buffer(measurements, deleted)
+        except Exception:
+            logger.exception("No se pudo archivar la escritura de la medición")
+
+    def _invalidate_trend(self, athlete_id):
+        """Descarta los agregados longitudinales de un atleta."""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        self._delete_trends(connection, (athlete_id,))
+        connection.execute("COMMIT")
+
+    @staticmethod
+    def _delete_trends(connection, athlete_ids):
+        """Borra los agregados de varios atletas dentro de la transacción en curso."""
+        parameters = [(athlete_id,) for athlete_id in athlete_ids]
+        connection.executemany("DELETE FROM athlete_trends WHERE athlete_id = ?", parameters)
+        connection.executemany("DELETE FROM session_deltas WHERE athlete_id = ?", parameters)
+
+    def _append_trend(self, measurement):
+        """
+        Añade una medición recién guardada a los agregados de su atleta.
+
+        Solo las sesiones posteriores a la última se añaden en O(1); en otro
+        caso los agregados se descartan para reconstruirlos al consultarlos.
+        """
+        athlete_id = measurement['athlete_id']
+        position = (measurement['session_date'], measurement['id'])
+        values = session_values(measurement['measurements'], measurement['results'])
+        errors = session_errors(measurement['measurements'], measurement['results'], default_error_options())
+
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT state, last_session_date, last_id, calculation_version FROM athlete_trends "
+                "WHERE athlete_id = ?", (athlete_id,)
+            ).fetchone()
+            if row is None:
+                count = connection.execute(
+                    "SELECT COUNT(*) FROM measurements WHERE athlete_id = ?", (athlete_id,)
+                ).fetchone()[0]
+                # Primera sesión del atleta: la serie empieza aquí
+                accumulator = TrendAccumulator(DEFAULT_WINDOW) if count == 1 else None
+            elif row[3] != CALCULATION_VERSION or position < (row[1], row[2]):
+                accumulator = None
+                connection.execute("DELETE FROM athlete_trends WHERE athlete_id = ?", (athlete_id,))
+                connection.execute("DELETE FROM session_deltas WHERE athlete_id = ?", (athlete_id,))
+            else:
+                accumulator = TrendAccumulator.from_dict(json.loads(row[0]))
+
+            if accumulator is not None:
+                deltas = accumulator.append(measurement['session_date'], values, errors)
+                self._write_trend(connection, athlete_id, accumulator, position, [(position, deltas)])
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _write_trend(self, connection, athlete_id, accumulator, position, rows):
+        connection.executemany(
+            "INSERT OR REPLACE INTO session_deltas (measurement_id, athlete_id, session_date, deltas) "
+            "VALUES (?, ?, ?, ?)",
+            [(row_id, athlete_id, session_date, json.dumps(deltas)) for (session_date, row_id), deltas in rows]
+        )
+        connection.execute(
+            "INSERT OR REPLACE INTO athlete_trends (athlete_id, state, last_session_date, last_id, "
+            "calculation_version) VALUES (?, ?, ?, ?, ?)",
+            (athlete_id, json.dumps(accumulator.to_dict()), position[0], position[1], CALCULATION_VERSION)
+        )
+
+    def trends(self, athlete_id):
+        """
+        Devuelve las diferencias entre sesiones y los agregados longitudinales
+        de un atleta, reconstruyéndolos desde el historial si no están al día.
+
+        Returns:
+            tuple: (list, TrendAccumulator|None) - (filas con measurement_id,
+                session_date y deltas en orden cronológico, agregados; None si
+                el atleta no tiene mediciones)
+        """
+        athlete_id = str(athlete_id)
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT state, calculation_version FROM athlete_trends WHERE athlete_id = ?", (athlete_id,)
+        ).fetchone()
+        if row is None or row[1] != CALCULATION_VERSION:
+            return self._rebuild_trend(athlete_id)
+
+        rows = connection.execute(
+            "SELECT measurement_id, session_date, deltas FROM session_deltas WHERE athlete_id = ? "
+            "ORDER BY session_date, measurement_id", (athlete_id,)
+        ).fetchall()
+        return [
+            {"measurement_id": row_id, "session_date": session_date, "deltas": json.loads(deltas)}
+            for row_id, session_date, deltas in rows
+        ], TrendAccumulator.from_dict(json.loads(row[0]))
+
+    def _rebuild_trend(self, athlete_id):
+        """Recalcula los agregados de un atleta recorriendo su historial (sin recalcular resultados)."""
+        connection = self._connection()
+        fingerprint_query = "SELECT COUNT(*), MAX(updated_at) FROM measurements WHERE athlete_id = ?"
+        fingerprint = connection.execute(fingerprint_query, (athlete_id,)).fetchone()
+        measurements = []
+        cursor = None
+        while True:
+            page, cursor = self.history(athlete_id, limit=500, cursor=cursor)
+            measurements.extend(page)
+            if cursor is None:
+                break
+        if not measurements:
+            return [], None
+
+        sessions = [dict(item['measurements'], session_date=item['session_date']) for item in measurements]
+        rows, accumulator = analyze_series(
+            sessions, [item['results'] for item in measurements], DEFAULT_WINDOW, default_error_options()
+        )
+        positions = [(item['session_date'], item['id']) for item in measurements]
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Solo se guarda si ninguna sesión ha cambiado durante la reconstrucción
+            if connection.execute(fingerprint_query, (athlete_id,)).fetchone() == fingerprint:
+                connection.execute("DELETE FROM session_deltas WHERE athlete_id = ?", (athlete_id,))
+                self._write_trend(
+                    connection, athlete_id, accumulator, positions[-1],
+                    [(position, row['deltas']) for position, row in zip(positions, rows)]
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+        return [
+            {"measurement_id": position[1], "session_date": position[0], "deltas": row['deltas']}
+            for position, row in zip(positions, rows)
+        ], accumulator
+
+    def history(self, athlete_id, limit=50, cursor=None, date_from=None, date_to=None):
+        """
+        Pagina el historial de un atleta por orden de fecha de sesión.
+
+        La paginación es por clave (session_date, id) sobre el índice del
+        atleta, de modo que el coste no depende de la posición de la página.
+
+        Args:
+            athlete_id (str): Identificador del atleta
+            limit (int): Número máximo de mediciones por página
+            cursor (str): Cursor devuelto por la página anterior
+            date_from (str): Fecha mínima de sesión (incluida)
+            date_to (str): Fecha máxima de sesión (incluida)
+
+        Returns:
+            tuple: (list, str|None) - (mediciones, cursor de la página siguiente)
+        """
+        query = f"SELECT {_COLUMNS} FROM measurements WHERE athlete_id = ?"
+        params = [str(athlete_id)]
+        if cursor:
+            after_date, after_id = decode_cursor(cursor)
+            query += " AND (session_date, id) > (?, ?)"
+            params += [after_date, after_id]
+        if date_from:
+            query += " AND session_date >= ?"
+            params.append(parse_session_date(date_from))
+        if date_to:
+            query += " AND session_date <= ?"
+            params.append(parse_session_date(date_to))
+        query += " ORDER BY session_date, id LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self._connection().execute(query, params).fetchall()
+        stale = [row[0] for row in rows[:limit] if row[5] != CALCULATION_VERSION]
+        if stale:
+            self.recompute_stale(ids=stale)
+            return self.history(athlete_id, limit, cursor, date_from, date_to)
+
+        page = [_row_to_dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last[2], last[0])
+        return page, next_cursor
+
+    def fingerprint(self):
+        """
+        Devuelve un identificador del estado del almacén (número de mediciones y
+        última modificación) para invalidar agregados derivados.
+        """
+        return tuple(self._connection().execute(
+            "SELECT COUNT(*), MAX(updated_at), MAX(calculation_version) FROM measurements"
+        ).fetchone())
+
+    def iter_chunks(self, chunk_size=1000):
+        """
+        Recorre todas las mediciones por bloques paginando por id.
+
+        Yields:
+            tuple: (list, list) - (mediciones originales, resultados) de cada bloque
+        """
+        connection = self._connection()
+        last_id = 0
+        while True:
+            rows = connection.execute(
+                "SELECT id, raw, results FROM measurements WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, chunk_size)
+            ).fetchall()
+            if not rows:
+                break
+            yield [json.loads(row[1]) for row in rows], [json.loads(row[2]) for row in rows]
+            last_id = rows[-1][0]
+
+    def _recompute_filter(self, athlete_ids=None, force=False):
+        clauses = []
+        params = []
+        if not force:
+            clauses.append("calculation_version != ?")
+            params.append(CALCULATION_VERSION)
+        if athlete_ids is not None:
+            clauses.append(f"athlete_id IN ({','.join('?' * len(athlete_ids))})")
+            params.extend(str(athlete_id) for athlete_id in athlete_ids)
+        return clauses, params
+
+    def count_recompute(self, athlete_ids=None, force=False):
+        """Número de mediciones que recalcularía recompute_chunk con los mismos filtros."""
+        clauses, params = self._recompute_filter(athlete_ids, force)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._connection().execute(f"SELECT COUNT(*) FROM measurements{where}", params).fetchone()[0]
+
+    def recompute_chunk(self, after_id=0, chunk_size=1000, athlete_ids=None, force=False, ids=None):
+        """
+        Recalcula con el motor vectorizado un bloque de mediciones, en orden de id.
+
+        Args:
+            after_id (int): Recalcular a partir del id siguiente
+            chunk_size (int): Mediciones del bloque
+            athlete_ids (list): Limitar el recálculo a estos atletas (opcional)
+            force (bool): Recalcular también las calculadas con la versión actual
+            ids (list): Limitar el recálculo a estas mediciones (opcional)
+
+        Returns:
+            tuple: (int, int|None) - (mediciones recalculadas, último id del
+                bloque; None si no quedan mediciones)
+        """
+        clauses, params = self._recompute_filter(athlete_ids, force)
+        clauses.append("id > ?")
+        params.append(after_id)
+        if ids is not None:
+            clauses.append(f"id IN ({','.join('?' * len(ids))})")
+            params.extend(ids)
+        params.append(chunk_size)
+
+        connection = self._connection()
+        rows = connection.execute(
+            f"SELECT id, raw, athlete_id, session_date FROM measurements WHERE {' AND '.join(clauses)} "
+            "ORDER BY id LIMIT ?",
+            params
+        ).fetchall()
+        if not rows:
+            return 0, None
+
+        raw_records = [json.loads(row[1]) for row in rows]
+        results = batch_to_records(process_anthropometric_batch(records_to_columns(raw_records)))
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                "UPDATE measurements SET results = ?, calculation_version = ?, updated_at = ? WHERE id = ?",
+                [(json.dumps(result), CALCULATION_VERSION, now, row[0]) for row, result in zip(rows, results)]
+            )
+            self._delete_trends(connection, {row[2] for row in rows})
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        self._archive([
+            {"id": row[0], "session_date": row[3], "measurements": raw, "results": result}
+            for row, raw, result in zip(rows, raw_records, results)
+        ])
+        return len(rows), rows[-1][0]
+
+    def archive_chunk(self, after_id=0, chunk_size=1000):
+        """
+        Copia al archivo columnar un bloque de mediciones, en orden de id
+        (reconstrucción del archivo desde el almacén).
+
+        Returns:
+            tuple: (int, int|None) - (mediciones copiadas, último id del
+                bloque; None si no quedan mediciones)
+        """
+        rows = self._connection().execute(
+            f"SELECT {_COLUMNS} FROM measurements WHERE id > ? ORDER BY id LIMIT ?", (after_id, chunk_size)
+        ).fetchall()
+        if not rows:
+            return 0, None
+        # Sin capturar errores: una reconstrucción incompleta debe hacer fallar el trabajo
+        self.archive.append([_row_to_dict(row) for row in rows])
+        return len(rows), rows[-1][0]
+
+    def recompute_stale(self, ids=None, chunk_size=1000):
+        """
+        Recalcula con el motor vectorizado los resultados guardados con una
+        versión anterior de las fórmulas.
+
+        Args:
+            ids (list): Limitar el recálculo a estas mediciones (opcional)
+            chunk_size (int): Mediciones recalculadas por bloque
+
+        Returns:
+            int: Número de mediciones recalculadas
+        """
+        recomputed = 0
+        last_id = 0
+        while True:
+            count, last_id = self.recompute_chunk(last_id, chunk_size, ids=ids)
+            if last_id is None:
+                return recomputed
+            recomputed += count
+
+    def import_chunk(self, source, start, rows):
+        """
+        Guarda un bloque de mediciones importadas de un fichero, una sola vez
+        por fila del origen.
+
+        Las filas ya guardadas por un intento anterior del mismo origen (un
+        trabajo que se retoma tras una caída) no se duplican y se cuentan como
+        guardadas, de modo que repetir un bloque devuelve el mismo resultado.
+
+        Args:
+            source (str): Identificador del origen (p. ej. 'import:<token>')
+            start (int): Índice de la primera fila del bloque en el origen
+            rows (list): Tuplas (athlete_id, session_date, mediciones)
+
+        Returns:
+            list: None por cada fila guardada, o un dict con 'error' (y, si los
+                hay, 'errors' y 'error_codes') por cada fila rechazada
+        """
+        outcomes = [None] * len(rows)
+        dates = [None] * len(rows)
+        records = []
+        for index, (athlete_id, session_date, data) in enumerate(rows):
+            try:
+                if athlete_id in (None, ''):
+                    raise MeasurementError("Campo requerido faltante: athlete_id")
+                dates[index] = parse_session_date(session_date)
+            except MeasurementError as error:
+                outcomes[index] = {"error": str(error)}
+                records.append((None, str(error)))
+                continue
+            records.append((data, None))
+
+        results = process_record_chunk(records)
+        connection = self._connection()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            existing = {row[0] for row in connection.execute(
+                "SELECT row_index FROM imported_rows WHERE source = ? AND row_index >= ? AND row_index < ?",
+                (source, start, start + len(rows))
+            )}
+            athletes = set()
+            archived = []
+            for index, ((athlete_id, _, data), result) in enumerate(zip(rows, results)):
+                if not result['success']:
+                    if outcomes[index] is None:
+                        outcomes[index] = {"error": "Mediciones no válidas", **{
+                            key: value for key, value in result.items() if key != 'success'
+                        }}
+                    continue
+                if start + index in existing:
+                    continue
+                cursor = connection.execute(
+                    "INSERT INTO measurements (athlete_id, session_date, raw, input_hash, results, "
+                    "calculation_version, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (str(athlete_id), dates[index], json.dumps(data), canonical_key(data),
+                     json.dumps(result), CALCULATION_VERSION, now, now)
+                )
+                connection.execute(
+                    "INSERT INTO imported_rows (source, row_index, measurement_id) VALUES (?, ?, ?)",
+                    (source, start + index, cursor.lastrowid)
+                )
+                athletes.add(str(athlete_id))
+                archived.append({
+                    "id": cursor.lastrowid, "session_date": dates[index], "measurements": data, "results": result
+                })
+            self._delete_trends(connection, athletes)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        self._archive(archived)
+        return outcomes
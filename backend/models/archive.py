@@ -0,0 +1,571 @@
+"""
+Archivo columnar de resultados para consultas analíticas.
+
+Copia de solo anexado de los resultados guardados en models/anthropometric.py
+organizada por columnas: cada segmento es un directorio con un fichero .npy
+por columna (id, fecha de sesión, género y deporte codificados con un
+diccionario, edad y métricas) que se abre con memoria mapeada, de modo que
+filtrar y agregar todo el historial no vuelve a parsear JSON ni a recalcular
+métricas.
+
+Cada escritura en bloque (recálculo, importación) añade un segmento pequeño;
+las altas, modificaciones y borrados sueltos se acumulan en memoria y se
+escriben juntos en un segmento al reunir BUFFER_ROWS, al pasar
+FLUSH_INTERVAL segundos o antes de la siguiente lectura del proceso. Una
+modificación es una fila nueva con el mismo id y un borrado, un segmento sin
+filas que marca el id como sustituido. Una fila solo está viva si
+ningún segmento posterior contiene su id. La compactación fusiona los
+segmentos pequeños del final en uno ordenado por fecha (el índice de fechas
+que usan los filtros por rango) y la compactación completa deja un único
+segmento sin filas muertas.
+
+El manifiesto (manifest.json) lista los segmentos publicados y los
+diccionarios; se sustituye de forma atómica, así que los lectores de otros
+procesos ven siempre un estado completo. Las escrituras de varios procesos se
+serializan con un bloqueo de fichero. SQLite sigue siendo la fuente de
+verdad: el archivo se puede reconstruir desde el almacén en cualquier momento.
+"""
+
+import atexit
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo un proceso escritor
+    fcntl = None
+
+from utils.cohort import SUMMARY_PERCENTILES, sum_of_skinfolds
+from utils.lazy_imports import lazy_import
+from utils.longitudinal import TREND_METRICS
+
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMAT = 1
+
+# Métricas archivadas (NaN si no constan)
+ARCHIVE_METRICS = ('weight', 'height') + TREND_METRICS
+
+DICTIONARY_FIELDS = ('gender', 'sport')
+
+# Columnas de cada segmento y su tipo
+_COLUMN_DTYPES = dict(
+    {'id': 'int64', 'session_date': 'datetime64[D]', 'gender': 'int8', 'sport': 'int16', 'age': 'float64'},
+    **{metric: 'float64' for metric in ARCHIVE_METRICS}
+)
+
+# Los segmentos con menos filas se fusionan al compactar
+SMALL_SEGMENT_ROWS = 65536
+
+# Segmentos pequeños al final del archivo a partir de los que una escritura compacta
+MAX_SMALL_SEGMENTS = 32
+
+# Escrituras sueltas acumuladas que se escriben juntas en un segmento
+BUFFER_ROWS = 256
+
+# Segundos máximos que una escritura suelta espera en memoria
+FLUSH_INTERVAL = 5.0
+
+GROUP_PERIODS = {'year': 'datetime64[Y]', 'month': 'datetime64[M]'}
+
+
+def _empty_manifest():
+    return {
+        "format": ARCHIVE_FORMAT,
+        "generation": 0,
+        "next_segment": 0,
+        "dictionaries": {field: [] for field in DICTIONARY_FIELDS},
+        "segments": [],
+    }
+
+
+def _dictionary_value(value):
+    return str(value) if value not in (None, '') else None
+
+
+def _live_masks(segments):
+    """
+    Filas vivas de cada segmento: las que ningún segmento posterior sustituye.
+
+    Returns:
+        list: ndarray booleano por segmento, o None si todas están vivas
+    """
+    masks = [None] * len(segments)
+    later = np.array([], dtype='int64')
+    for index in range(len(segments) - 1, -1, -1):
+        columns = segments[index]
+        if len(later):
+            alive = ~np.isin(columns['id'], later)
+            masks[index] = None if alive.all() else alive
+        later = np.union1d(later, np.concatenate([columns['id'], columns['superseded']]))
+    return masks
+
+
+class ResultArchive:
+    """
+    Archivo columnar de solo anexado con segmentos .npy en memoria mapeada.
+
+    Args:
+        directory (str): Directorio del archivo (se crea si no existe)
+        max_small_segments (int): Segmentos pequeños que disparan la compactación al escribir
+        buffer_rows (int): Escrituras sueltas que se acumulan antes de escribirlas
+        flush_interval (float): Segundos máximos que una escritura suelta espera en memoria
+    """
+
+    def __init__(self, directory, max_small_segments=MAX_SMALL_SEGMENTS, buffer_rows=BUFFER_ROWS,
+                 flush_interval=FLUSH_INTERVAL):
+        self.directory = directory
+        self.max_small_segments = max_small_segments
+        self.buffer_rows = buffer_rows
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._state = None
+        # Escrituras sueltas pendientes: id -> medición (None si se ha borrado)
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._flush_timer = None
+        atexit.register(self.flush_quietly)
+        os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(self._manifest_path()):
+            with self._write_lock():
+                if not os.path.exists(self._manifest_path()):
+                    self._publish(_empty_manifest())
+
+    def _manifest_path(self):
+        return os.path.join(self.directory, 'manifest.json')
+
+    @contextmanager
+    def _write_lock(self):
+        """Serializa las escrituras entre hilos y entre procesos."""
+        with self._lock:
+            with open(os.path.join(self.directory, '.lock'), 'a') as handle:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _read_manifest(self):
+        with open(self._manifest_path()) as handle:
+            return json.load(handle)
+
+    def _publish(self, manifest):
+        """Sustituye el manifiesto de forma atómica."""
+        manifest['generation'] += 1
+        temporary = os.path.join(self.directory, f"manifest-{uuid.uuid4().hex}.tmp")
+        with open(temporary, 'w') as handle:
+            json.dump(manifest, handle)
+        os.replace(temporary, self._manifest_path())
+
+    def _write_segment(self, manifest, columns, superseded, is_sorted=False):
+        """
+        Escribe un segmento y lo añade al manifiesto (sin publicarlo).
+
+        Args:
+            manifest (dict): Manifiesto en edición
+            columns (dict): Columna -> ndarray (todas las de _COLUMN_DTYPES)
+            superseded (ndarray): Ids que el segmento sustituye en los anteriores
+            is_sorted (bool): Las filas están ordenadas por fecha de sesión
+        """
+        name = f"seg-{manifest['next_segment']:08d}"
+        manifest['next_segment'] += 1
+        temporary = os.path.join(self.directory, f"tmp-{uuid.uuid4().hex}")
+        os.makedirs(temporary)
+        for column, dtype in _COLUMN_DTYPES.items():
+            np.save(os.path.join(temporary, f"{column}.npy"), np.asarray(columns[column], dtype=dtype))
+        np.save(os.path.join(temporary, 'superseded.npy'), np.asarray(superseded, dtype='int64'))
+        os.rename(temporary, os.path.join(self.directory, name))
+
+        dates = columns['session_date']
+        rows = len(columns['id'])
+        manifest['segments'].append({
+            "name": name,
+            "rows": rows,
+            "min_date": str(dates.min()) if rows else None,
+            "max_date": str(dates.max()) if rows else None,
+            "sorted": bool(is_sorted or rows <= 1),
+        })
+
+    def _load_segment(self, name):
+        path = os.path.join(self.directory, name)
+        columns = {column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode='r') for column in _COLUMN_DTYPES}
+        columns['superseded'] = np.load(os.path.join(path, 'superseded.npy'))
+        return columns
+
+    def _remove_segments(self, names):
+        # Los lectores que ya tienen mapeados los ficheros siguen pudiendo leerlos
+        for name in names:
+            shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def _current(self):
+        """
+        Estado publicado (manifiesto, segmentos mapeados y filas vivas).
+
+        Solo se relee cuando otro hilo o proceso publica un manifiesto nuevo.
+        Antes se escriben las escrituras sueltas pendientes de este proceso.
+        """
+        if self._pending:
+            self.flush_quietly()
+        for attempt in range(3):
+            status = os.stat(self._manifest_path())
+            key = (status.st_ino, status.st_mtime_ns, status.st_size)
+            with self._state_lock:
+                if self._state is not None and self._state['key'] == key:
+                    return self._state
+                # Los segmentos publicados no cambian: se reutilizan los ya mapeados
+                loaded = {} if self._state is None else dict(
+                    zip((segment['name'] for segment in self._state['manifest']['segments']), self._state['segments'])
+                )
+                try:
+                    manifest = self._read_manifest()
+                    segments = [
+                        loaded.get(segment['name']) or self._load_segment(segment['name'])
+                        for segment in manifest['segments']
+                    ]
+                except (OSError, ValueError):
+                    # Una compactación ha sustituido el manifiesto mientras se leía
+                    if attempt == 2:
+                        raise
+                    continue
+                self._state = {
+                    "key": key,
+                    "manifest": manifest,
+                    "segments": segments,
+                    "masks": _live_masks(segments),
+                }
+                return self._state
+
+    def _encode(self, manifest, measurements):
+        """Columnas de un bloque de mediciones guardadas (solo las calculadas con éxito)."""
+        rows = [item for item in measurements if item['results'].get('success')]
+        dictionaries = manifest['dictionaries']
+        codes = {field: {value: code for code, value in enumerate(dictionaries[field])} for field in DICTIONARY_FIELDS}
+
+        def encode(field, value):
+            value = _dictionary_value(value)
+            if value is None:
+                return -1
+            code = codes[field].get(value)
+            if code is None:
+                code = codes[field][value] = len(dictionaries[field])
+                dictionaries[field].append(value)
+            return code
+
+        columns = {
+            'id': [item['id'] for item in rows],
+            'session_date': [item['session_date'] for item in rows],
+            'gender': [encode('gender', item['measurements'].get('gender')) for item in rows],
+            'sport': [encode('sport', item['measurements'].get('sport')) for item in rows],
+            'age': [float(item['measurements'].get('age', 'nan')) for item in rows],
+        }
+        for metric in ARCHIVE_METRICS:
+            if metric == 'sum_of_skinfolds':
+                values = [sum_of_skinfolds(item['measurements']) for item in rows]
+            elif metric in ('weight', 'height'):
+                values = [item['measurements'].get(metric) for item in rows]
+            else:
+                values = [item['results'].get(metric) for item in rows]
+            columns[metric] = [np.nan if value is None else float(value) for value in values]
+        return {column: np.array(values, dtype=_COLUMN_DTYPES[column]) for column, values in columns.items()}
+
+    def append(self, measurements):
+        """
+        Añade (o sustituye, si el id ya estaba archivado) un bloque de mediciones.
+
+        Las mediciones cuyo cálculo no tuvo éxito se archivan como borradas.
+
+        Args:
+            measurements (list): Dicts con 'id', 'session_date', 'measurements' y 'results'
+        """
+        if not measurements:
+            return
+        # Las escrituras sueltas anteriores van antes para conservar el orden
+        self.flush()
+        # Dentro de un bloque, la última aparición de cada id es la vigente
+        self._write({item['id']: item for item in measurements})
+
+    def delete(self, ids):
+        """Marca como borradas las mediciones indicadas."""
+        if not ids:
+            return
+        self.flush()
+        self._write(dict.fromkeys(ids))
+
+    def _write(self, latest):
+        """
+        Escribe un segmento con las filas vigentes y marca como sustituidos todos los ids.
+
+        Args:
+            latest (dict): Id -> medición, o None si se ha borrado
+        """
+        with self._write_lock():
+            manifest = self._read_manifest()
+            columns = self._encode(manifest, [item for item in latest.values() if item is not None])
+            self._write_segment(manifest, columns, np.array(sorted(latest), dtype='int64'))
+            self._publish(manifest)
+            self._compact_locked(manifest, full=False, threshold=self.max_small_segments)
+
+    def buffer(self, measurements=(), deleted=()):
+        """
+        Acumula altas, modificaciones y borrados sueltos para escribirlos juntos.
+
+        Args:
+            measurements (list): Dicts con 'id', 'session_date', 'measurements' y 'results'
+            deleted (list): Ids de mediciones borradas
+        """
+        with self._pending_lock:
+            self._pending.update((item['id'], item) for item in measurements)
+            self._pending.update(dict.fromkeys(deleted))
+            full = len(self._pending) >= self.buffer_rows
+            if not full and self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush_quietly)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Escribe en un segmento las escrituras sueltas pendientes."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        if pending:
+            self._write(pending)
+
+    def flush_quietly(self):
+        """flush sin propagar errores: se registran y el archivo se reconstruye con el trabajo 'archive'."""
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("No se pudieron escribir las mediciones pendientes en el archivo columnar %s",
+                             self.directory)
+
+    def reset(self):
+        """Vacía el archivo (antes de reconstruirlo desde el almacén)."""
+        # Las escrituras pendientes ya están en el almacén, del que se reconstruye
+        with self._pending_lock:
+            self._pending = {}
+        with self._write_lock():
+            manifest = self._read_manifest()
+            names = [segment['name'] for segment in manifest['segments']]
+            manifest.update(
+                segments=[], dictionaries={field: [] for field in DICTIONARY_FIELDS}
+            )
+            self._publish(manifest)
+        self._remove_segments(names)
+
+    def compact(self, full=False):
+        """
+        Fusiona los segmentos pequeños del final del archivo en uno ordenado
+        por fecha; con full=True reescribe todo el archivo en un único
+        segmento sin filas muertas.
+
+        Returns:
+            int: Número de segmentos fusionados
+        """
+        self.flush()
+        with self._write_lock():
+            return self._compact_locked(self._read_manifest(), full, threshold=2)
+
+    def _compact_locked(self, manifest, full, threshold):
+        descriptors = manifest['segments']
+        start = 0
+        if not full:
+            start = len(descriptors)
+            while start > 0 and descriptors[start - 1]['rows'] < SMALL_SEGMENT_ROWS:
+                start -= 1
+            if len(descriptors) - start < threshold:
+                return 0
+        elif len(descriptors) == 0:
+            return 0
+
+        # Solo se leen los segmentos fusionados: los anteriores no cambian
+        segments = [self._load_segment(segment['name']) for segment in descriptors[start:]]
+        masks = _live_masks(segments)
+        columns = {}
+        for column in _COLUMN_DTYPES:
+            parts = [
+                segment[column] if mask is None else segment[column][mask]
+                for segment, mask in zip(segments, masks)
+            ]
+            columns[column] = np.concatenate(parts)
+        order = np.lexsort((columns['id'], columns['session_date']))
+        columns = {column: values[order] for column, values in columns.items()}
+
+        # Los ids de los segmentos fusionados siguen sustituyendo filas de los anteriores
+        superseded = np.array([], dtype='int64')
+        if start > 0:
+            superseded = np.unique(np.concatenate(
+                [segment['id'] for segment in segments] + [segment['superseded'] for segment in segments]
+            ))
+
+        names = [segment['name'] for segment in descriptors[start:]]
+        manifest['segments'] = descriptors[:start]
+        self._write_segment(manifest, columns, superseded, is_sorted=True)
+        self._publish(manifest)
+        self._remove_segments(names)
+        return len(names)
+
+    def stats(self):
+        """Segmentos, filas archivadas y filas vivas."""
+        state = self._current()
+        descriptors = state['manifest']['segments']
+        return {
+            "segments": len(descriptors),
+            "small_segments": sum(1 for segment in descriptors if segment['rows'] < SMALL_SEGMENT_ROWS),
+            "rows": sum(segment['rows'] for segment in descriptors),
+            "live_rows": self.live_rows(),
+            "generation": state['manifest']['generation'],
+        }
+
+    def live_rows(self):
+        """Número de mediciones vivas en el archivo."""
+        state = self._current()
+        return sum(
+            len(columns['id']) if mask is None else int(mask.sum())
+            for columns, mask in zip(state['segments'], state['masks'])
+        )
+
+    def dictionary(self, field):
+        """Valores del diccionario de 'gender' o 'sport' indexables por su código (-1 = None)."""
+        values = self._current()['manifest']['dictionaries'][field]
+        return np.array(list(values) + [None], dtype=object)
+
+    def scan(self, columns, gender=None, sport=None, date_from=None, date_to=None, min_age=None, max_age=None):
+        """
+        Recorre las filas vivas que cumplen los filtros, segmento a segmento.
+
+        En los segmentos ordenados el rango de fechas se resuelve con una
+        búsqueda binaria; si no hace falta ninguna máscara, las columnas
+        devueltas son vistas de los ficheros mapeados (sin copia).
+
+        Args:
+            columns (list): Columnas que se devuelven
+            gender (str): Filtrar por género (opcional)
+            sport (str): Filtrar por deporte (opcional)
+            date_from (str): Fecha mínima de sesión, AAAA-MM-DD (opcional)
+            date_to (str): Fecha máxima de sesión, AAAA-MM-DD (opcional)
+            min_age (float): Edad mínima (opcional)
+            max_age (float): Edad máxima (opcional)
+
+        Yields:
+            dict: Columna -> ndarray de cada segmento con filas seleccionadas
+        """
+        state = self._current()
+        manifest = state['manifest']
+        codes = {}
+        for field, value in (('gender', gender), ('sport', sport)):
+            if value is None:
+                continue
+            dictionary = manifest['dictionaries'][field]
+            if str(value) not in dictionary:
+                return
+            codes[field] = dictionary.index(str(value))
+        low = np.datetime64(date_from, 'D') if date_from else None
+        high = np.datetime64(date_to, 'D') if date_to else None
+
+        for descriptor, segment, mask in zip(manifest['segments'], state['segments'], state['masks']):
+            if not descriptor['rows']:
+                continue
+            if (date_from and descriptor['max_date'] < str(low)) or (date_to and descriptor['min_date'] > str(high)):
+                continue
+            dates = segment['session_date']
+            begin, end = 0, len(dates)
+            if descriptor['sorted']:
+                if low is not None:
+                    begin = int(np.searchsorted(dates, low, side='left'))
+                if high is not None:
+                    end = int(np.searchsorted(dates, high, side='right'))
+                if begin >= end:
+                    continue
+            selected = None if mask is None else mask[begin:end]
+
+            def restrict(condition):
+                return condition if selected is None else selected & condition
+
+            if not descriptor['sorted']:
+                if low is not None:
+                    selected = restrict(dates >= low)
+                if high is not None:
+                    selected = restrict(dates <= high)
+            for field, code in codes.items():
+                selected = restrict(segment[field][begin:end] == code)
+            if min_age is not None:
+                selected = restrict(segment['age'][begin:end] >= min_age)
+            if max_age is not None:
+                selected = restrict(segment['age'][begin:end] <= max_age)
+
+            if selected is None:
+                yield {column: segment[column][begin:end] for column in columns}
+            elif selected.any():
+                yield {column: segment[column][begin:end][selected] for column in columns}
+
+    def column(self, name, **filters):
+        """Columna completa de las filas vivas que cumplen los filtros de scan."""
+        parts = [part[name] for part in self.scan([name], **filters)]
+        return np.concatenate(parts) if parts else np.array([], dtype=_COLUMN_DTYPES[name])
+
+    def summarize(self, metric, group_by=None, **filters):
+        """
+        Resume una métrica: n, media, DE, mínimo, máximo y percentiles exactos,
+        en total o por año o mes de la sesión.
+
+        Args:
+            metric (str): Métrica de ARCHIVE_METRICS
+            group_by (str): None, 'year' o 'month'
+            **filters: Filtros de scan
+
+        Returns:
+            list: Un dict por periodo (o uno solo sin agrupar), en orden cronológico
+        """
+        values = []
+        periods = []
+        for part in self.scan([metric, 'session_date'], **filters):
+            values.append(part[metric])
+            if group_by is not None:
+                periods.append(part['session_date'].astype(GROUP_PERIODS[group_by]))
+        values = np.concatenate(values) if values else np.array([])
+        present = ~np.isnan(values)
+        values = values[present]
+        if group_by is None:
+            return [_summary(None, values)]
+        periods = np.concatenate(periods)[present] if periods else np.array([], dtype=GROUP_PERIODS[group_by])
+        labels, inverse = np.unique(periods, return_inverse=True)
+        order = np.argsort(inverse, kind='stable')
+        bounds = np.searchsorted(inverse[order], np.arange(len(labels) + 1))
+        grouped = values[order]
+        return [
+            _summary(str(label), grouped[bounds[index]:bounds[index + 1]])
+            for index, label in enumerate(labels)
+        ]
+
+
+def _summary(period, values):
+    summary = {"period": period, "count": int(len(values))}
+    if len(values):
+        percentiles = np.percentile(values, SUMMARY_PERCENTILES)
+        summary.update({
+            "mean": round(float(values.mean()), 2),
+            "std": round(float(values.std(ddof=1)), 2) if len(values) > 1 else 0.0,
+            "min": round(float(values.min()), 2),
+            "max": round(float(values.max()), 2),
+            "percentiles": {f"p{p}": round(float(value), 2) for p, value in zip(SUMMARY_PERCENTILES, percentiles)},
+        })
+    return summary
+
+
+def open_archive(directory, **options):
+    """Archivo del directorio indicado, o None si está desactivado (directorio vacío)."""
+    return ResultArchive(directory, **options) if directory else None
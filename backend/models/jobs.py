@@ -0,0 +1,285 @@
+"""
+Cola persistente de trabajos en segundo plano.
+
+Los trabajos largos (recálculo del historial, importación de ficheros de
+temporada) se encolan en SQLite y los ejecutan los procesos de jobs.py, fuera
+de los workers de gunicorn. Cada trabajo guarda tras cada bloque un punto de
+control con su progreso; si el proceso que lo ejecuta muere, su concesión
+caduca y otro proceso lo retoma desde el último bloque completado.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_SUCCEEDED = 'succeeded'
+STATUS_FAILED = 'failed'
+STATUS_CANCELLED = 'cancelled'
+
+FINISHED_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED, STATUS_CANCELLED)
+
+# Segundos sin punto de control tras los que se considera muerto al proceso que ejecuta un trabajo
+DEFAULT_LEASE_SECONDS = 60
+
+# Intentos máximos de un trabajo (los reinicios tras una caída cuentan como intento)
+MAX_ATTEMPTS = 5
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        params TEXT NOT NULL,
+        status TEXT NOT NULL,
+        done INTEGER NOT NULL DEFAULT 0,
+        total INTEGER,
+        checkpoint TEXT,
+        result TEXT,
+        error TEXT,
+        cancel_requested INTEGER NOT NULL DEFAULT 0,
+        worker TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        lease_expires REAL,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id)",
+)
+
+_COLUMNS = (
+    "id, kind, params, status, done, total, checkpoint, result, error, cancel_requested, "
+    "attempts, created_at, started_at, finished_at, updated_at"
+)
+
+
+def _row_to_dict(row):
+    done, total = row[4], row[5]
+    return {
+        "id": row[0],
+        "type": row[1],
+        "params": json.loads(row[2]),
+        "status": row[3],
+        "progress": {
+            "done": done,
+            "total": total,
+            "percent": round(100 * done / total, 1) if total else (100.0 if total == 0 else None),
+        },
+        "checkpoint": json.loads(row[6]) if row[6] else None,
+        "result": json.loads(row[7]) if row[7] else None,
+        "error": row[8],
+        "cancel_requested": bool(row[9]),
+        "attempts": row[10],
+        "created_at": row[11],
+        "started_at": row[12],
+        "finished_at": row[13],
+        "updated_at": row[14],
+    }
+
+
+class JobQueue:
+    """
+    Cola SQLite de trabajos, compartida por los workers web y los procesos de jobs.py.
+
+    Args:
+        path (str): Ruta del fichero SQLite
+        lease_seconds (float): Concesión de un trabajo en ejecución; cada punto
+            de control la renueva
+    """
+
+    def __init__(self, path, lease_seconds=DEFAULT_LEASE_SECONDS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+        # Conexión temporal: las conexiones SQLite no deben heredarse al hacer fork
+        connection = self._open()
+        for statement in _SCHEMA:
+            connection.execute(statement)
+        connection.close()
+
+    def _open(self):
+        connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self._open()
+        return connection
+
+    def submit(self, kind, params):
+        """
+        Encola un trabajo.
+
+        Args:
+            kind (str): Tipo de trabajo (clave de jobs.JOB_HANDLERS)
+            params (dict): Parámetros del trabajo
+
+        Returns:
+            dict: Trabajo encolado
+        """
+        now = time.time()
+        cursor = self._connection().execute(
+            "INSERT INTO jobs (kind, params, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (kind, json.dumps(params), STATUS_QUEUED, now, now)
+        )
+        return self.get(cursor.lastrowid)
+
+    def get(self, job_id):
+        """Devuelve un trabajo, o None si no existe."""
+        row = self._connection().execute(
+            f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return _row_to_dict(row) if row else None
+
+    def list(self, status=None, limit=50):
+        """Trabajos más recientes primero, opcionalmente filtrados por estado."""
+        query = f"SELECT {_COLUMNS} FROM jobs"
+        params = []
+        if status is not None:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        return [_row_to_dict(row) for row in self._connection().execute(query, params).fetchall()]
+
+    def claim(self, worker):
+        """
+        Asigna a un proceso el trabajo pendiente más antiguo.
+
+        Se retoman primero los trabajos en ejecución cuya concesión ha
+        caducado (su proceso murió), desde su último punto de control. Un
+        trabajo que supera MAX_ATTEMPTS se marca como fallido.
+
+        Args:
+            worker (str): Identificador del proceso
+
+        Returns:
+            dict|None: Trabajo asignado, o None si no hay ninguno pendiente
+        """
+        connection = self._connection()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            while True:
+                row = connection.execute(
+                    "SELECT id, attempts, cancel_requested FROM jobs "
+                    "WHERE status = ? OR (status = ? AND lease_expires < ?) ORDER BY status = ?, id LIMIT 1",
+                    (STATUS_QUEUED, STATUS_RUNNING, now, STATUS_QUEUED)
+                ).fetchone()
+                if row is None:
+                    connection.execute("COMMIT")
+                    return None
+                job_id, attempts, cancel_requested = row
+                if cancel_requested or attempts >= MAX_ATTEMPTS:
+                    status = STATUS_CANCELLED if cancel_requested else STATUS_FAILED
+                    error = None if cancel_requested else f"El trabajo falló tras {attempts} intentos"
+                    connection.execute(
+                        "UPDATE jobs SET status = ?, error = ?, worker = NULL, finished_at = ?, "
+                        "updated_at = ? WHERE id = ?",
+                        (status, error, now, now, job_id)
+                    )
+                    continue
+                connection.execute(
+                    "UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, lease_expires = ?, "
+                    "started_at = COALESCE(started_at, ?), updated_at = ? WHERE id = ?",
+                    (STATUS_RUNNING, worker, now + self.lease_seconds, now, now, job_id)
+                )
+                connection.execute("COMMIT")
+                return self.get(job_id)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def checkpoint(self, job_id, worker, checkpoint, done, total=None, result=None):
+        """
+        Guarda el progreso tras un bloque completado y renueva la concesión.
+
+        Args:
+            job_id (int): Trabajo
+            worker (str): Proceso que lo ejecuta
+            checkpoint (dict): Estado desde el que se retoma el trabajo
+            done (int): Elementos procesados
+            total (int): Elementos totales (opcional)
+            result (dict): Resultado parcial acumulado (opcional)
+
+        Returns:
+            bool: False si el trabajo se ha cancelado o lo ha retomado otro
+                proceso; quien lo ejecuta debe detenerse
+        """
+        now = time.time()
+        cursor = self._connection().execute(
+            "UPDATE jobs SET checkpoint = ?, done = ?, total = COALESCE(?, total), "
+            "result = COALESCE(?, result), lease_expires = ?, updated_at = ? "
+            "WHERE id = ? AND worker = ? AND status = ? AND cancel_requested = 0",
+            (json.dumps(checkpoint), done, total, json.dumps(result) if result is not None else None,
+             now + self.lease_seconds, now, job_id, worker, STATUS_RUNNING)
+        )
+        if cursor.rowcount:
+            return True
+        self._finish_cancelled(job_id, worker)
+        return False
+
+    def _finish(self, job_id, worker, status, result=None, error=None):
+        now = time.time()
+        cursor = self._connection().execute(
+            "UPDATE jobs SET status = ?, result = COALESCE(?, result), error = ?, worker = NULL, "
+            "lease_expires = NULL, finished_at = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = ?",
+            (status, json.dumps(result) if result is not None else None, error, now, now,
+             job_id, worker, STATUS_RUNNING)
+        )
+        return cursor.rowcount > 0
+
+    def _finish_cancelled(self, job_id, worker):
+        self._connection().execute(
+            "UPDATE jobs SET status = ?, worker = NULL, lease_expires = NULL, finished_at = ?, updated_at = ? "
+            "WHERE id = ? AND worker = ? AND status = ? AND cancel_requested = 1",
+            (STATUS_CANCELLED, time.time(), time.time(), job_id, worker, STATUS_RUNNING)
+        )
+
+    def complete(self, job_id, worker, result):
+        """Marca un trabajo como completado con su resultado."""
+        return self._finish(job_id, worker, STATUS_SUCCEEDED, result=result)
+
+    def fail(self, job_id, worker, error):
+        """Marca un trabajo como fallido con el mensaje de error."""
+        return self._finish(job_id, worker, STATUS_FAILED, error=error)
+
+    def release(self, job_id, worker):
+        """
+        Devuelve a la cola un trabajo en ejecución (parada ordenada del
+        proceso); se retomará desde su último punto de control.
+        """
+        cursor = self._connection().execute(
+            "UPDATE jobs SET status = ?, worker = NULL, lease_expires = NULL, attempts = attempts - 1, "
+            "updated_at = ? WHERE id = ? AND worker = ? AND status = ?",
+            (STATUS_QUEUED, time.time(), job_id, worker, STATUS_RUNNING)
+        )
+        return cursor.rowcount > 0
+
+    def cancel(self, job_id):
+        """
+        Cancela un trabajo. Los pendientes se cancelan al momento; los que están
+        en ejecución se detienen en su siguiente punto de control.
+
+        Returns:
+            dict|None: Trabajo actualizado, o None si no existe
+        """
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, updated_at = ? WHERE id = ? AND status = ?",
+            (STATUS_CANCELLED, now, now, job_id, STATUS_QUEUED)
+        )
+        connection.execute(
+            "UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ? AND status = ?",
+            (now, job_id, STATUS_RUNNING)
+        )
+        return self.get(job_id)
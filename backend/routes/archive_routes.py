@@ -0,0 +1,90 @@
+"""
+Rutas de consulta del archivo columnar de resultados (models/archive.py).
+"""
+
+from flask import Blueprint, current_app, jsonify, request
+
+from models.anthropometric import MeasurementError, parse_session_date
+from models.archive import ARCHIVE_METRICS, GROUP_PERIODS
+
+archive_bp = Blueprint('archive', __name__, url_prefix='/api/archive')
+
+
+def _archive():
+    archive = current_app.extensions['measurement_archive']
+    if archive is None:
+        return None, (jsonify({"success": False, "error": "El archivo columnar está desactivado"}), 404)
+    return archive, None
+
+
+def _query_filters(args):
+    """
+    Filtros de una consulta: gender, sport, from, to, min_age y max_age.
+
+    Raises:
+        ValueError: Si algún filtro no es válido
+    """
+    filters = {'gender': args.get('gender') or None, 'sport': args.get('sport') or None}
+    for name, key in (('from', 'date_from'), ('to', 'date_to')):
+        value = args.get(name)
+        try:
+            filters[key] = parse_session_date(value) if value else None
+        except MeasurementError as exc:
+            raise ValueError(f"'{name}': {exc}")
+    for name in ('min_age', 'max_age'):
+        value = args.get(name)
+        try:
+            filters[name] = float(value) if value not in (None, '') else None
+        except ValueError:
+            raise ValueError(f"'{name}' debe ser un número")
+    return filters
+
+
+@archive_bp.route('', methods=['GET'])
+def archive_stats():
+    """Segmentos y filas del archivo (las muertas desaparecen al compactar)."""
+    archive, error = _archive()
+    if error:
+        return error
+    store = current_app.extensions['measurement_store']
+    stats = archive.stats()
+    return jsonify({
+        "success": True,
+        "archive": stats,
+        "up_to_date": stats['live_rows'] == store.fingerprint()[0],
+    })
+
+
+@archive_bp.route('/query', methods=['GET'])
+def archive_query():
+    """
+    Resume una métrica de todo el historial guardado, en total o por periodo.
+
+    Parámetros: 'metric' (p. ej. fat_free_mass_index), 'group_by' ('year' o
+    'month', opcional) y los filtros 'gender', 'sport', 'from', 'to'
+    (AAAA-MM-DD), 'min_age' y 'max_age'.
+    """
+    archive, error = _archive()
+    if error:
+        return error
+    metric = request.args.get('metric')
+    if metric not in ARCHIVE_METRICS:
+        return jsonify({
+            "success": False,
+            "error": f"'metric' debe ser una de: {', '.join(ARCHIVE_METRICS)}"
+        }), 400
+    group_by = request.args.get('group_by') or None
+    if group_by is not None and group_by not in GROUP_PERIODS:
+        return jsonify({"success": False, "error": "'group_by' debe ser 'year' o 'month'"}), 400
+    try:
+        filters = _query_filters(request.args)
+    except ValueError as exc:
+        return jsonify({"success": False, "error": str(exc)}), 400
+
+    return jsonify({
+        "success": True,
+        "metric": metric,
+        "group_by": group_by,
+        "filters": filters,
+        "groups": archive.summarize(metric, group_by, **filters),
+    })
@@ -0,0 +1,180 @@
+"""
+Rutas de estadísticas de cohorte y ranking de atletas por percentiles.
+"""
+
+import threading
+from collections import OrderedDict
+
+from flask import Blueprint, current_app, jsonify, request
+
+from utils.batch_io import BODY_TOO_LARGE, NDJSON_MIMETYPES, iter_ndjson_records, load_json_array_records
+from utils.calculators import process_anthropometric_data
+from utils.cohort import GROUP_FIELDS, METRIC_SPECS, CohortAccumulator, accumulate_records, age_band, rank_athlete
+
+cohort_bp = Blueprint('cohort', __name__, url_prefix='/api/cohort')
+
+_stored_cohort = {'fingerprint': None, 'accumulator': None, 'tables': OrderedDict()}
+_stored_cohort_lock = threading.Lock()
+
+# Combinaciones de filtros cuyas tablas de percentiles se conservan por versión del almacén
+MAX_CACHED_TABLES = 256
+
+
+def _filters(source):
+    # Solo se filtra por textos: otros valores no pueden formar parte de la clave de un grupo
+    return {
+        field: value if isinstance(value, str) and value else None
+        for field, value in ((field, source.get(field)) for field in GROUP_FIELDS)
+    }
+
+
+def stored_cohort():
+    """
+    Devuelve el acumulador de las mediciones guardadas.
+
+    Se reconstruye solo cuando el almacén cambia; las consultas posteriores
+    trabajan sobre los contadores agregados. Si el archivo columnar está al
+    día se lee de sus columnas mapeadas; si no, se recorren en streaming las
+    mediciones guardadas.
+    """
+    store = current_app.extensions['measurement_store']
+    archive = store.archive
+    fingerprint = store.fingerprint()
+    with _stored_cohort_lock:
+        if _stored_cohort['fingerprint'] != fingerprint:
+            accumulator = CohortAccumulator()
+            if archive is not None and archive.live_rows() == fingerprint[0]:
+                genders, sports = archive.dictionary('gender'), archive.dictionary('sport')
+                for part in archive.scan(('sport', 'gender', 'age') + tuple(METRIC_SPECS)):
+                    accumulator.add_columns(
+                        sports[part['sport']], genders[part['gender']], part['age'],
+                        {metric: part[metric] for metric in METRIC_SPECS}
+                    )
+            else:
+                for records, results in store.iter_chunks():
+                    accumulator.add_records(records, results)
+            _stored_cohort.update(fingerprint=fingerprint, accumulator=accumulator, tables=OrderedDict())
+        return _stored_cohort['accumulator']
+
+
+def stored_percentile_tables(filters):
+    """
+    Devuelve las tablas de percentiles de la cohorte guardada para unos filtros.
+
+    Se calculan una vez por estado del almacén y combinación de filtros: las
+    escrituras cambian la huella del almacén, que descarta el acumulador y
+    con él las tablas.
+    """
+    accumulator = stored_cohort()
+    key = tuple(filters[field] for field in GROUP_FIELDS)
+    with _stored_cohort_lock:
+        tables = _stored_cohort['tables'].get(key) if _stored_cohort['accumulator'] is accumulator else None
+        if tables is not None:
+            _stored_cohort['tables'].move_to_end(key)
+            return tables
+
+    tables = accumulator.percentile_tables(**filters)
+    with _stored_cohort_lock:
+        if _stored_cohort['accumulator'] is accumulator:
+            cached = _stored_cohort['tables']
+            cached[key] = tables
+            while len(cached) > MAX_CACHED_TABLES:
+                cached.popitem(last=False)
+    return tables
+
+
+@cohort_bp.route('/stats', methods=['GET'])
+def stored_cohort_stats():
+    """
+    Resume las mediciones guardadas filtradas por sport, gender y age_band.
+    """
+    filters = _filters(request.args)
+    return jsonify({
+        "success": True,
+        "filters": filters,
+        "metrics": stored_cohort().summary(**filters)
+    })
+
+
+@cohort_bp.route('/stats', methods=['POST'])
+def cohort_stats():
+    """
+    Resume una cohorte enviada en la petición (array JSON o NDJSON) sin
+    guardarla. Los filtros se indican como parámetros de consulta. Se aplican
+    los mismos límites que a /api/calculate/batch (BATCH_MAX_CONTENT_LENGTH
+    bytes y BATCH_MAX_RECORDS registros).
+    """
+    max_length = current_app.config['BATCH_MAX_CONTENT_LENGTH']
+    max_records = current_app.config['BATCH_MAX_RECORDS']
+    if request.content_length is not None and request.content_length > max_length:
+        return jsonify({
+            "success": False,
+            "error": f"El cuerpo de la petición supera el máximo de {max_length} bytes"
+        }), 413
+
+    if request.mimetype in NDJSON_MIMETYPES:
+        records = iter_ndjson_records(request.stream, max_bytes=max_length)
+    else:
+        try:
+            records = load_json_array_records(request.get_data())
+        except ValueError as exc:
+            return jsonify({"success": False, "error": str(exc)}), 400
+
+    exceeded = []
+
+    def limited():
+        # Corta la lectura en el primer límite superado (sin NDJSON troceado no hay Content-Length)
+        for count, (record, parse_error) in enumerate(records, 1):
+            if parse_error == BODY_TOO_LARGE:
+                exceeded.append((413, f"El cuerpo de la petición supera el máximo de {max_length} bytes"))
+                return
+            if count > max_records:
+                exceeded.append((400, f"La cohorte supera el máximo de {max_records} registros"))
+                return
+            yield record, parse_error
+
+    accumulator = CohortAccumulator()
+    accepted, rejected = accumulate_records(accumulator, limited())
+    if exceeded:
+        status, error = exceeded[0]
+        return jsonify({"success": False, "error": error}), status
+    filters = _filters(request.args)
+    return jsonify({
+        "success": True,
+        "filters": filters,
+        "records": accepted,
+        "rejected": rejected,
+        "metrics": accumulator.summary(**filters)
+    })
+
+
+@cohort_bp.route('/rank', methods=['POST'])
+def rank():
+    """
+    Sitúa a un atleta respecto a la cohorte de mediciones guardadas.
+
+    Espera 'measurements' (mismo formato que /api/calculate) y, opcionalmente,
+    'cohort' con los filtros. Por defecto se compara con su deporte y género.
+    """
+    data = request.json
+    if not isinstance(data, dict) or not isinstance(data.get('measurements'), dict):
+        return jsonify({"success": False, "error": "Campo requerido faltante: measurements"}), 400
+
+    measurements = data['measurements']
+    results = process_anthropometric_data(measurements)
+    if not results.get('success'):
+        return jsonify(results), 400
+
+    filters = data.get('cohort')
+    if not isinstance(filters, dict):
+        filters = {'sport': measurements.get('sport'), 'gender': measurements.get('gender')}
+    filters = _filters(filters)
+
+    tables = stored_percentile_tables(filters)
+    return jsonify({
+        "success": True,
+        "filters": filters,
+        "age_band": age_band(float(measurements['age'])),
+        "cohort_size": max(table.count for table in tables.values()),
+        "ranking": rank_athlete(tables, measurements, results)
+    })
@@ -0,0 +1,209 @@
+"""
+Rutas de los trabajos en segundo plano: encolar, consultar el progreso,
+obtener el resultado y cancelar.
+
+Los trabajos los ejecutan los procesos de jobs.py; estas rutas solo leen y
+escriben en la cola, por lo que responden de inmediato aunque el trabajo
+tarde minutos.
+"""
+
+import os
+import uuid
+
+from flask import Blueprint, current_app, jsonify, request, url_for
+
+from models.jobs import FINISHED_STATUSES, STATUS_CANCELLED, STATUS_SUCCEEDED
+
+job_bp = Blueprint('jobs', __name__, url_prefix='/api')
+
+MAX_LIST_SIZE = 200
+
+PARQUET_MIMETYPES = ('application/vnd.apache.parquet', 'application/x-parquet')
+
+# Bloques en los que se copia al disco el fichero subido
+_UPLOAD_BLOCK_SIZE = 1024 * 1024
+
+
+def _queue():
+    return current_app.extensions['job_queue']
+
+
+def _public(job):
+    """Trabajo sin el estado interno (punto de control, fichero subido) y con el enlace a su resultado."""
+    body = {key: value for key, value in job.items() if key not in ('checkpoint', 'result')}
+    body['params'] = {key: value for key, value in job['params'].items() if key not in ('path', 'source')}
+    body['result_url'] = url_for('jobs.job_result', job_id=job['id'])
+    return body
+
+
+def _accepted(job):
+    response = jsonify({"success": True, "job": _public(job)})
+    response.status_code = 202
+    response.headers['Location'] = url_for('jobs.job_status', job_id=job['id'])
+    return response
+
+
+def _recalculate_params(data):
+    """
+    Valida los parámetros de un recálculo.
+
+    Raises:
+        ValueError: Si los parámetros no son válidos
+    """
+    athlete_ids = data.get('athlete_ids')
+    if athlete_ids is not None and (
+        not isinstance(athlete_ids, list) or not athlete_ids
+        or not all(isinstance(item, (str, int)) and not isinstance(item, bool) for item in athlete_ids)
+    ):
+        raise ValueError("'athlete_ids' debe ser una lista de identificadores")
+    force = data.get('force', False)
+    if not isinstance(force, bool):
+        raise ValueError("'force' debe ser true o false")
+    return {"athlete_ids": [str(item) for item in athlete_ids] if athlete_ids else None, "force": force}
+
+
+def _archive_params(data):
+    """
+    Valida los parámetros del mantenimiento del archivo columnar.
+
+    Raises:
+        ValueError: Si los parámetros no son válidos
+    """
+    if current_app.extensions['measurement_archive'] is None:
+        raise ValueError("El archivo columnar está desactivado")
+    rebuild = data.get('rebuild', False)
+    if not isinstance(rebuild, bool):
+        raise ValueError("'rebuild' debe ser true o false")
+    return {"rebuild": rebuild}
+
+
+# Tipo de trabajo encolable con POST /api/jobs -> validación de sus parámetros
+_PARAM_VALIDATORS = {
+    'recalculate': _recalculate_params,
+    'archive': _archive_params,
+}
+
+
+@job_bp.route('/jobs', methods=['POST'])
+def submit_job():
+    """
+    Encola un recálculo del historial guardado o el mantenimiento del archivo columnar.
+
+    Espera {"type": "recalculate", "params": {"athlete_ids": [...], "force": false}};
+    sin 'athlete_ids' se recalcula todo el historial y sin 'force' solo las
+    mediciones calculadas con una versión anterior de las fórmulas.
+    {"type": "archive", "params": {"rebuild": false}} compacta el archivo
+    columnar en un único segmento; con 'rebuild' lo reconstruye antes desde
+    el historial guardado.
+    """
+    data = request.json
+    job_type = data.get('type') if isinstance(data, dict) else None
+    if not isinstance(job_type, str) or job_type not in _PARAM_VALIDATORS:
+        return jsonify({
+            "success": False,
+            "error": "'type' debe ser 'recalculate' o 'archive' (las importaciones usan /api/jobs/import)"
+        }), 400
+    params = data.get('params') or {}
+    if not isinstance(params, dict):
+        return jsonify({"success": False, "error": "'params' debe ser un objeto"}), 400
+    try:
+        params = _PARAM_VALIDATORS[job_type](params)
+    except ValueError as exc:
+        return jsonify({"success": False, "error": str(exc)}), 400
+    return _accepted(_queue().submit(job_type, params))
+
+
+@job_bp.route('/jobs/import', methods=['POST'])
+def submit_import():
+    """
+    Sube un fichero de temporada (CSV o Parquet) y encola su importación.
+
+    El cuerpo es el fichero (Content-Type text/csv o application/vnd.apache.parquet);
+    cada fila necesita 'athlete_id', 'session_date' y las mediciones.
+    """
+    max_length = current_app.config['JOB_MAX_UPLOAD_SIZE']
+    if request.content_length is not None and request.content_length > max_length:
+        return jsonify({
+            "success": False,
+            "error": f"El fichero supera el máximo de {max_length} bytes"
+        }), 413
+
+    file_format = 'parquet' if request.mimetype in PARQUET_MIMETYPES else request.args.get('format', 'csv')
+    if file_format not in ('csv', 'parquet'):
+        return jsonify({"success": False, "error": "'format' debe ser 'csv' o 'parquet'"}), 400
+
+    directory = current_app.config['JOB_DATA_DIR']
+    os.makedirs(directory, exist_ok=True)
+    token = uuid.uuid4().hex
+    path = os.path.join(directory, f"import-{token}.{file_format}")
+    size = 0
+    with open(path, 'wb') as handle:
+        while True:
+            block = request.stream.read(_UPLOAD_BLOCK_SIZE)
+            if not block:
+                break
+            size += len(block)
+            if size > max_length:
+                break
+            handle.write(block)
+    if size == 0 or size > max_length:
+        os.remove(path)
+        if size == 0:
+            return jsonify({"success": False, "error": "No se proporcionó ningún fichero"}), 400
+        return jsonify({"success": False, "error": f"El fichero supera el máximo de {max_length} bytes"}), 413
+
+    # El origen identifica las filas ya guardadas si el trabajo se retoma tras una caída
+    return _accepted(_queue().submit('import', {
+        "path": path, "format": file_format, "bytes": size, "source": f"import:{token}"
+    }))
+
+
+@job_bp.route('/jobs', methods=['GET'])
+def list_jobs():
+    """Trabajos más recientes (parámetros 'status' y 'limit')."""
+    limit = max(1, min(request.args.get('limit', 50, type=int), MAX_LIST_SIZE))
+    jobs = _queue().list(status=request.args.get('status'), limit=limit)
+    return jsonify({"success": True, "jobs": [_public(job) for job in jobs]})
+
+
+@job_bp.route('/jobs/<int:job_id>', methods=['GET'])
+def job_status(job_id):
+    """Estado y progreso de un trabajo (para consultarlo periódicamente)."""
+    job = _queue().get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Trabajo no encontrado"}), 404
+    return jsonify({"success": True, "job": _public(job)})
+
+
+@job_bp.route('/jobs/<int:job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """Resultado de un trabajo terminado (409 mientras sigue en curso)."""
+    job = _queue().get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Trabajo no encontrado"}), 404
+    if job['status'] not in FINISHED_STATUSES:
+        return jsonify({"success": False, "error": "El trabajo no ha terminado", "job": _public(job)}), 409
+    return jsonify({
+        "success": job['status'] == STATUS_SUCCEEDED,
+        "status": job['status'],
+        "result": job['result'],
+        "error": job['error'],
+    })
+
+
+@job_bp.route('/jobs/<int:job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """
+    Cancela un trabajo. Un trabajo pendiente se cancela al momento; uno en
+    ejecución se detiene tras el bloque en curso (los bloques ya completados
+    se conservan).
+    """
+    job = _queue().cancel(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Trabajo no encontrado"}), 404
+    if job['status'] == STATUS_CANCELLED and job['type'] == 'import':
+        try:
+            os.remove(job['params']['path'])
+        except OSError:
+            pass
+    return jsonify({"success": True, "job": _public(job)})
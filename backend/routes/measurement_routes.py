@@ -0,0 +1,160 @@
+"""
+Rutas para el historial persistente de mediciones por atleta.
+"""
+
+from flask import Blueprint, current_app, jsonify, request
+
+from models.anthropometric import MeasurementError
+from utils.calculators import CALCULATION_VERSION
+
+measurement_bp = Blueprint('measurements', __name__, url_prefix='/api')
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_CLIENT_ID_LENGTH = 100
+
+
+def _store():
+    return current_app.extensions['measurement_store']
+
+
+def _error_response(error, status=400):
+    body = {"success": False, "error": str(error)}
+    if getattr(error, 'details', None):
+        body.update({key: value for key, value in error.details.items() if key != 'success'})
+    return jsonify(body), status
+
+
+@measurement_bp.route('/athletes/<athlete_id>/measurements', methods=['GET'])
+def list_measurements(athlete_id):
+    """
+    Devuelve una página del historial del atleta ordenado por fecha de sesión.
+
+    Parámetros: limit, cursor (de la respuesta anterior), from y to (AAAA-MM-DD).
+    """
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    try:
+        measurements, next_cursor = _store().history(
+            athlete_id,
+            limit=limit,
+            cursor=request.args.get('cursor'),
+            date_from=request.args.get('from'),
+            date_to=request.args.get('to'),
+        )
+    except MeasurementError as error:
+        return _error_response(error)
+
+    return jsonify({
+        "success": True,
+        "athlete_id": athlete_id,
+        "measurements": measurements,
+        "next_cursor": next_cursor
+    })
+
+
+@measurement_bp.route('/athletes/<athlete_id>/measurements', methods=['POST'])
+def create_measurement(athlete_id):
+    """
+    Guarda una medición del atleta. Espera 'session_date' y las mediciones
+    con el mismo formato que /api/calculate.
+    """
+    data = request.json
+    if not isinstance(data, dict) or 'session_date' not in data:
+        return jsonify({"success": False, "error": "Campo requerido faltante: session_date"}), 400
+
+    measurements = {key: value for key, value in data.items() if key != 'session_date'}
+    try:
+        measurement = _store().create(athlete_id, data['session_date'], measurements)
+    except MeasurementError as error:
+        return _error_response(error)
+
+    return jsonify({"success": True, "measurement": measurement}), 201
+
+
+@measurement_bp.route('/measurements/<int:measurement_id>', methods=['GET'])
+def get_measurement(measurement_id):
+    """Devuelve una medición con sus resultados."""
+    measurement = _store().get(measurement_id)
+    if measurement is None:
+        return jsonify({"success": False, "error": "Medición no encontrada"}), 404
+    return jsonify({"success": True, "measurement": measurement})
+
+
+@measurement_bp.route('/measurements/<int:measurement_id>', methods=['PUT'])
+def update_measurement(measurement_id):
+    """
+    Actualiza una medición. Los resultados solo se recalculan si cambian
+    las mediciones o la versión de las fórmulas.
+    """
+    data = request.json
+    if not isinstance(data, dict) or not data:
+        return jsonify({"success": False, "error": "No se proporcionaron datos"}), 400
+
+    measurements = {key: value for key, value in data.items() if key != 'session_date'}
+    try:
+        measurement = _store().update(
+            measurement_id,
+            data=measurements or None,
+            session_date=data.get('session_date')
+        )
+    except MeasurementError as error:
+        return _error_response(error)
+
+    if measurement is None:
+        return jsonify({"success": False, "error": "Medición no encontrada"}), 404
+    return jsonify({"success": True, "measurement": measurement})
+
+
+@measurement_bp.route('/measurements/<int:measurement_id>', methods=['DELETE'])
+def delete_measurement(measurement_id):
+    """Elimina una medición."""
+    if not _store().delete(measurement_id):
+        return jsonify({"success": False, "error": "Medición no encontrada"}), 404
+    return jsonify({"success": True})
+
+
+@measurement_bp.route('/measurements/sync', methods=['POST'])
+def sync_measurements():
+    """
+    Recibe las mediciones guardadas sin conexión en un dispositivo.
+
+    Espera 'client_id' (identificador del dispositivo), 'start' (número de
+    secuencia de la primera medición) y 'measurements' (con 'athlete_id',
+    'session_date' y las mediciones de /api/calculate). Cada medición se
+    guarda una sola vez por (client_id, número de secuencia): reenviar un
+    bloque tras un corte de red no la duplica. Los resultados se recalculan
+    en el servidor, que sigue siendo la referencia.
+    """
+    data = request.json
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "No se proporcionaron datos"}), 400
+
+    client_id = data.get('client_id')
+    start = data.get('start')
+    measurements = data.get('measurements')
+    if not isinstance(client_id, str) or not client_id or len(client_id) > MAX_CLIENT_ID_LENGTH:
+        return jsonify({"success": False, "error": "Campo requerido faltante: client_id"}), 400
+    if not isinstance(start, int) or isinstance(start, bool) or start < 0:
+        return jsonify({"success": False, "error": "'start' debe ser un entero no negativo"}), 400
+    if not isinstance(measurements, list) or not all(isinstance(item, dict) for item in measurements):
+        return jsonify({"success": False, "error": "'measurements' debe ser una lista de objetos"}), 400
+    max_measurements = current_app.config['SYNC_MAX_MEASUREMENTS']
+    if len(measurements) > max_measurements:
+        return jsonify({
+            "success": False,
+            "error": f"Como máximo {max_measurements} mediciones por envío"
+        }), 413
+
+    rows = []
+    for item in measurements:
+        record = dict(item)
+        rows.append((record.pop('athlete_id', None), record.pop('session_date', None), record))
+    outcomes = _store().import_chunk(f'sync:{client_id}', start, rows)
+
+    return jsonify({
+        "success": True,
+        "calculation_version": CALCULATION_VERSION,
+        "synced": sum(1 for outcome in outcomes if outcome is None),
+        "rejected": [dict(outcome, seq=start + index) for index, outcome in enumerate(outcomes) if outcome is not None],
+    })
@@ -0,0 +1,45 @@
+"""
+Rutas del simulador de proyección de la composición corporal.
+"""
+
+from flask import Blueprint, current_app, jsonify, request
+
+from utils.projection import parse_projection_options, project_athletes, projection_cells
+
+projection_bp = Blueprint('projection', __name__, url_prefix='/api')
+
+
+@projection_bp.route('/projection', methods=['POST'])
+def projection():
+    """
+    Proyección semana a semana de peso, masa grasa, MLG, IMLG y % de grasa.
+
+    Acepta las mediciones de un atleta (formato de /api/calculate) o de un
+    equipo en 'athletes', y los escenarios: 'balances' (kcal/día),
+    'balance_percent' (% del mantenimiento), 'horizons' (semanas),
+    'activity_factor' y 'prescribed' (incluir el balance de su objetivo).
+    Todos los atletas y escenarios se simulan en una sola pasada vectorizada.
+    """
+    data = request.json
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "Se esperaba un objeto JSON"}), 400
+    squad = 'athletes' in data
+    athletes = data['athletes'] if squad else [data]
+    if not isinstance(athletes, list) or not athletes or not all(isinstance(item, dict) for item in athletes):
+        return jsonify({"success": False, "error": "Se esperaba 'athletes' con una lista de objetos JSON"}), 400
+
+    try:
+        options = parse_projection_options(data)
+    except ValueError as exc:
+        return jsonify({"success": False, "error": str(exc)}), 400
+    max_cells = current_app.config['PROJECTION_MAX_CELLS']
+    if projection_cells(len(athletes), options) > max_cells:
+        return jsonify({
+            "success": False,
+            "error": f"La simulación supera el máximo de {max_cells} atletas × escenarios × días"
+        }), 400
+
+    results = project_athletes(athletes, options)
+    if not squad:
+        return jsonify(results[0]), 200 if results[0]['success'] else 400
+    return jsonify({"success": True, "horizons": options['horizons'], "athletes": results})
@@ -0,0 +1,50 @@
+"""
+Rutas para sesiones de mediciones repetidas (protocolo ISAK).
+"""
+
+from flask import Blueprint, current_app, jsonify, request
+
+from utils.repeated_measures import process_repeat_matrix, process_repeated_session, repeat_matrix
+
+repeated_bp = Blueprint('repeated', __name__, url_prefix='/api')
+
+
+@repeated_bp.route('/repeated-measurements', methods=['POST'])
+def repeated_measurements():
+    """
+    Analiza las repeticiones de una sesión: TEM, %TEM, CV, valor seleccionado
+    y aviso de tercera medición por atleta y punto.
+
+    Acepta 'athletes' (registros en los que cada punto repetido es una lista)
+    o la matriz completa: 'sites', 'repeats' (atletas × puntos × repeticiones)
+    y, opcionalmente, 'athletes' con los datos fijos de cada atleta. Con
+    ?calculate=0 no se calculan las métricas con los valores seleccionados.
+    """
+    data = request.json
+    if not isinstance(data, dict) or not isinstance(data.get('athletes', data.get('repeats')), list):
+        return jsonify({"success": False, "error": "Se esperaba 'athletes' o 'repeats'"}), 400
+
+    athletes = data.get('athletes') or []
+    if not all(isinstance(athlete, dict) for athlete in athletes):
+        return jsonify({"success": False, "error": "Cada atleta debe ser un objeto JSON"}), 400
+
+    calculate = request.args.get('calculate', '1') not in ('0', 'false')
+    try:
+        if 'repeats' in data:
+            sites = data.get('sites')
+            if not isinstance(sites, list) or not all(isinstance(site, str) for site in sites):
+                return jsonify({"success": False, "error": "Campo requerido faltante: sites"}), 400
+            matrix = repeat_matrix(sites, data['repeats'])
+            if athletes and len(athletes) != len(matrix):
+                return jsonify({"success": False, "error": "'athletes' y 'repeats' deben tener la misma longitud"}), 400
+            if len(matrix) > current_app.config['BATCH_MAX_RECORDS']:
+                raise ValueError(f"La sesión supera el máximo de {current_app.config['BATCH_MAX_RECORDS']} atletas")
+            session = process_repeat_matrix(sites, matrix, athletes or [{} for _ in range(len(matrix))], calculate)
+        else:
+            if len(athletes) > current_app.config['BATCH_MAX_RECORDS']:
+                raise ValueError(f"La sesión supera el máximo de {current_app.config['BATCH_MAX_RECORDS']} atletas")
+            session = process_repeated_session(athletes, data.get('sites'), calculate)
+    except ValueError as exc:
+        return jsonify({"success": False, "error": str(exc)}), 400
+
+    return jsonify({"success": True, **session})
@@ -0,0 +1,69 @@
+"""
+Rutas para el somatotipo de Heath-Carter y el fraccionamiento de Kerr.
+"""
+
+from flask import Blueprint, current_app, jsonify, request
+
+from utils.somatotype import (
+    process_somatotype,
+    process_somatotype_batch,
+    sad_matrix,
+    somatotype_attitudinal_mean,
+)
+
+somatotype_bp = Blueprint('somatotype', __name__, url_prefix='/api')
+
+
+@somatotype_bp.route('/somatotype', methods=['POST'])
+def somatotype():
+    """
+    Somatotipo, coordenadas en la somatocarta y fraccionamiento en cinco
+    componentes de un atleta.
+    """
+    data = request.json
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "Se esperaba un objeto JSON"}), 400
+    result = process_somatotype(data)
+    return jsonify(result), 200 if result['success'] else 400
+
+
+@somatotype_bp.route('/somatotype/squad', methods=['POST'])
+def somatotype_squad():
+    """
+    Somatotipos de un equipo ('athletes'), somatotipo medio, SAM y matriz de
+    distancias actitudinales (SAD) entre todos los pares de atletas.
+
+    La matriz se omite con ?matrix=0 o cuando el equipo supera
+    SOMATOTYPE_MAX_MATRIX atletas; las filas de atletas sin somatotipo son null.
+    """
+    data = request.json
+    athletes = data.get('athletes') if isinstance(data, dict) else None
+    if not isinstance(athletes, list) or not all(isinstance(athlete, dict) for athlete in athletes):
+        return jsonify({"success": False, "error": "Se esperaba 'athletes' con una lista de objetos JSON"}), 400
+    if len(athletes) > current_app.config['BATCH_MAX_RECORDS']:
+        return jsonify({
+            "success": False,
+            "error": f"El equipo supera el máximo de {current_app.config['BATCH_MAX_RECORDS']} atletas"
+        }), 400
+
+    results = process_somatotype_batch(athletes)
+    ratings = [
+        (result['somatotype']['endomorphy'], result['somatotype']['mesomorphy'], result['somatotype']['ectomorphy'])
+        if result.get('somatotype') else (float('nan'),) * 3
+        for result in results
+    ]
+    mean, sam, distances = somatotype_attitudinal_mean(ratings) if ratings else (None, None, [])
+    response = {
+        "success": True,
+        "athletes": results,
+        "mean_somatotype": dict(zip(('endomorphy', 'mesomorphy', 'ectomorphy'), [round(v, 2) for v in mean]))
+        if mean else None,
+        "sam": round(sam, 2) if sam is not None else None,
+        "sad_to_mean": [round(d, 2) if d == d else None for d in map(float, distances)],
+    }
+
+    include_matrix = request.args.get('matrix', '1') not in ('0', 'false')
+    if include_matrix and len(athletes) <= current_app.config['SOMATOTYPE_MAX_MATRIX']:
+        matrix = sad_matrix(ratings).round(2).tolist() if ratings else []
+        response['sad_matrix'] = [[value if value == value else None for value in row] for row in matrix]
+    return jsonify(response)
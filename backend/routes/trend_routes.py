@@ -0,0 +1,104 @@
+"""
+Rutas de cambio longitudinal y tendencias por atleta.
+"""
+
+from flask import Blueprint, current_app, jsonify, request
+
+from models.anthropometric import MeasurementError, parse_session_date
+from routes.cohort_routes import stored_cohort
+from utils.batch_calculators import batch_to_records, process_anthropometric_batch, records_to_columns
+from utils.batch_io import check_record
+from utils.longitudinal import (
+    DEFAULT_WINDOW,
+    MAX_WINDOW,
+    analyze_series,
+    default_error_options,
+    flag_changes,
+    parse_swc,
+    swc_from_cohort,
+)
+
+trend_bp = Blueprint('trends', __name__, url_prefix='/api')
+
+
+def _cohort_swc(gender):
+    """SWC a partir de la DE entre atletas de la cohorte guardada del mismo género."""
+    return swc_from_cohort(stored_cohort().summary(gender=gender))
+
+
+def _response(rows, accumulator, swc, window):
+    return jsonify({
+        "success": True,
+        "window": window,
+        "swc": swc,
+        "sessions": flag_changes(rows, swc),
+        "summary": accumulator.summary(swc),
+    })
+
+
+@trend_bp.route('/athletes/<athlete_id>/trends', methods=['GET'])
+def athlete_trends(athlete_id):
+    """
+    Diferencias entre sesiones consecutivas y tendencias del historial guardado.
+
+    Los agregados se actualizan al guardar cada sesión; el SWC es 0,2 veces la
+    DE entre atletas del mismo género en las mediciones guardadas.
+    """
+    store = current_app.extensions['measurement_store']
+    rows, accumulator = store.trends(athlete_id)
+    if accumulator is None:
+        return jsonify({"success": False, "error": "El atleta no tiene mediciones"}), 404
+    first, _ = store.history(athlete_id, limit=1)
+    swc = _cohort_swc(first[0]['measurements'].get('gender'))
+    return _response(rows, accumulator, swc, DEFAULT_WINDOW)
+
+
+@trend_bp.route('/trends', methods=['POST'])
+def series_trends():
+    """
+    Diferencias y tendencias de una serie enviada en la petición.
+
+    Espera 'sessions' (mediciones con 'session_date', en cualquier orden) y,
+    opcionalmente, 'window' (sesiones de la pendiente móvil), 'swc' (por
+    métrica; por defecto, el de la cohorte guardada) y 'tem'/'tem_percent'
+    con el error técnico de medida de cada punto.
+    """
+    data = request.json
+    sessions = data.get('sessions') if isinstance(data, dict) else None
+    if not isinstance(sessions, list) or not sessions or not all(isinstance(item, dict) for item in sessions):
+        return jsonify({"success": False, "error": "Se esperaba 'sessions' con una lista de mediciones"}), 400
+    if len(sessions) > current_app.config['TREND_MAX_SESSIONS']:
+        return jsonify({
+            "success": False,
+            "error": f"La serie supera el máximo de {current_app.config['TREND_MAX_SESSIONS']} sesiones"
+        }), 400
+
+    window = data.get('window', DEFAULT_WINDOW)
+    if isinstance(window, bool) or not isinstance(window, int) or not 2 <= window <= MAX_WINDOW:
+        return jsonify({"success": False, "error": f"'window' debe estar entre 2 y {MAX_WINDOW}"}), 400
+    try:
+        swc = parse_swc(data.get('swc'))
+        options = default_error_options({key: data[key] for key in ('tem', 'tem_percent') if key in data})
+        sessions = [dict(item, session_date=parse_session_date(item.get('session_date'))) for item in sessions]
+    except (ValueError, MeasurementError) as exc:
+        return jsonify({"success": False, "error": str(exc)}), 400
+
+    # Validar antes de construir las columnas: un valor no numérico no puede ir al motor vectorizado
+    for index, session in enumerate(sessions):
+        failure = check_record(session)
+        if failure is not None:
+            return jsonify({
+                "success": False,
+                "error": f"Mediciones no válidas en la sesión del {session['session_date']}",
+                "index": index,
+                "errors": failure['errors'],
+                "error_codes": failure['error_codes'],
+            }), 400
+
+    sessions.sort(key=lambda item: item['session_date'])
+    results = batch_to_records(process_anthropometric_batch(records_to_columns(sessions)))
+
+    rows, accumulator = analyze_series(sessions, results, window, options)
+    if swc is None:
+        swc = _cohort_swc(sessions[-1].get('gender'))
+    return _response(rows, accumulator, swc, window)
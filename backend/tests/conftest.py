@@ -0,0 +1,52 @@
+"""
+Configuración común de las pruebas de equivalencia y los benchmarks.
+
+Con --benchmark-autosave, los benchmarks (pytest-benchmark) guardan sus
+resultados en JSON en .benchmarks/, con el commit en los metadatos, para
+comparar entre commits:
+
+    pytest tests --benchmark-autosave
+    pytest tests --benchmark-compare
+    pytest-benchmark compare 0001 0002 --group-by=name
+
+Las cohortes mayores que --bench-max-size (100000 por defecto) se omiten;
+--bench-max-size=1000000 incluye la cohorte de un millón de registros.
+"""
+
+import os
+
+import pytest
+
+from tests.synthetic import synthetic_cohort
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--bench-max-size', type=int, default=100000,
+        help="Tamaño máximo de las cohortes sintéticas (1, 1000, 100000 o 1000000)"
+    )
+
+
+@pytest.fixture
+def cohort(request):
+    """Cohorte sintética del tamaño indicado en la parametrización (omitida si supera el máximo)."""
+    size = request.param
+    if size > request.config.getoption('--bench-max-size'):
+        pytest.skip(f"Cohorte de {size} registros (usa --bench-max-size={size})")
+    return synthetic_cohort(size)
+
+
+@pytest.fixture(scope='session')
+def client(tmp_path_factory):
+    """Cliente de pruebas de Flask con una base de datos de mediciones temporal."""
+    directory = tmp_path_factory.mktemp('app')
+    os.environ['MEASUREMENT_DB_PATH'] = str(directory / 'measurements.db')
+    os.environ['MEASUREMENT_ARCHIVE_DIR'] = str(directory / 'archive')
+    os.environ['JOB_DB_PATH'] = str(directory / 'jobs.db')
+    os.environ['JOB_DATA_DIR'] = str(directory / 'job_files')
+    os.environ.pop('RESULT_CACHE_PATH', None)
+    os.environ.pop('METRICS_DB_PATH', None)
+    from app import app
+
+    app.config['TESTING'] = True
+    return app.test_client()
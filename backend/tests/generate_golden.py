@@ -0,0 +1,62 @@
+"""
+Regenera el conjunto de resultados de referencia (golden) con la ruta escalar.
+
+Solo debe ejecutarse cuando un cambio de fórmulas o de formato es
+intencionado (y CALCULATION_VERSION se ha incrementado); el resto de cambios
+deben reproducir el fichero actual bit a bit. También reescribe la
+especificación del motor sin conexión del frontend (utils/engine_spec.py),
+que se valida con el mismo conjunto golden.
+
+Uso:
+    python -m tests.generate_golden
+"""
+
+import gzip
+import json
+import os
+
+from tests.synthetic import edge_cases, synthetic_cohort
+from utils.calculators import CALCULATION_VERSION, process_anthropometric_data
+from utils.engine_spec import ENGINE_SPEC_PATH, write_engine_spec
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden', 'golden.jsonl.gz')
+GOLDEN_SEED = 7
+GOLDEN_SIZE = 5000
+
+
+def golden_inputs():
+    """Registros del conjunto golden: casos límite seguidos de una cohorte amplia."""
+    return edge_cases() + list(synthetic_cohort(GOLDEN_SIZE, seed=GOLDEN_SEED, wide=True))
+
+
+def load_golden(path=GOLDEN_PATH):
+    """
+    Lee el conjunto golden.
+
+    Returns:
+        tuple: (dict, list) - (cabecera, pares (entrada, salida))
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as handle:
+        header = json.loads(next(handle))
+        cases = [json.loads(line) for line in handle]
+    return header, [(case['input'], case['output']) for case in cases]
+
+
+def main():
+    inputs = golden_inputs()
+    os.makedirs(os.path.dirname(GOLDEN_PATH), exist_ok=True)
+    # mtime=0 para que el mismo contenido produzca el mismo fichero comprimido
+    with open(GOLDEN_PATH, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as compressed:
+        header = {"calculation_version": CALCULATION_VERSION, "seed": GOLDEN_SEED, "records": len(inputs)}
+        compressed.write((json.dumps(header) + '\n').encode('utf-8'))
+        for record in inputs:
+            line = json.dumps({"input": record, "output": process_anthropometric_data(record)}, sort_keys=True)
+            compressed.write((line + '\n').encode('utf-8'))
+    print(f"{len(inputs)} casos escritos en {GOLDEN_PATH}")
+    if os.path.isdir(os.path.dirname(ENGINE_SPEC_PATH)):
+        write_engine_spec()
+        print(f"Especificación del motor escrita en {ENGINE_SPEC_PATH}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Cohortes sintéticas deterministas para las pruebas y los benchmarks.
+
+Se generan con random.Random y una semilla fija (sin NumPy), de modo que la
+misma semilla produce exactamente los mismos registros en cualquier máquina y
+versión de las dependencias.
+"""
+
+import random
+from functools import lru_cache
+
+from utils.equations import DENSITY_CONVERSIONS, EQUATIONS, FOLD_SITES
+
+COHORT_SIZES = (1, 1000, 100000, 1000000)
+DEFAULT_SEED = 20240501
+
+
+def _athlete(rng, wide=False):
+    """
+    Genera un registro de mediciones.
+
+    Con wide=True se cubren también los errores de validación: cada medida
+    puede quedar fuera de rango con probabilidad baja y se mezclan ecuaciones
+    y conversiones (incluidas las no válidas).
+    """
+    def measure(low, high, digits, out_low=None, out_high=None):
+        if wide and out_low is not None and rng.random() < 0.02:
+            return round(rng.choice((rng.uniform(out_low, low), rng.uniform(high, out_high))), digits)
+        return round(rng.uniform(low, high), digits)
+
+    gender = rng.choice('MF')
+    height = measure(150, 200, rng.choice((0, 1)), 90, 260)
+    weight = round(rng.uniform(17, 32) * (height / 100) ** 2, rng.choice((0, 1, 2)))
+    if wide and rng.random() < 0.02:
+        weight = round(weight * rng.choice((0.4, 2.5)), 1)
+    hip = measure(85, 125, 1, 40, 210)
+    waist = round(hip * rng.uniform(0.6, 1.05 if wide else 0.98), 1)
+    record = {
+        'gender': gender,
+        'age': rng.randint(10, 80) if wide else rng.randint(14, 65),
+        'weight': weight,
+        'height': height,
+        'waist': waist,
+        'hip': hip,
+    }
+    for fold in FOLD_SITES:
+        if rng.random() < 0.9:
+            record[fold] = measure(3, 40, rng.choice((0, 1)), 1, 80)
+    if wide:
+        if rng.random() < 0.5:
+            record['equation'] = rng.choice(tuple(EQUATIONS) + ('bogus',))
+        if rng.random() < 0.3:
+            record['conversion'] = rng.choice(tuple(DENSITY_CONVERSIONS))
+        if rng.random() < 0.01:
+            record['gender'] = 'X'
+    return record
+
+
+@lru_cache(maxsize=8)
+def synthetic_cohort(size, seed=DEFAULT_SEED, wide=False):
+    """
+    Devuelve una cohorte sintética determinista.
+
+    Los registros se comparten entre llamadas (lru_cache) y no deben modificarse.
+
+    Args:
+        size (int): Número de registros
+        seed (int): Semilla del generador
+        wide (bool): Incluir valores fuera de rango y opciones no válidas
+
+    Returns:
+        tuple: Registros de mediciones
+    """
+    rng = random.Random(seed)
+    return tuple(_athlete(rng, wide) for _ in range(size))
+
+
+def edge_cases():
+    """
+    Registros escritos a mano en los límites del esquema, de las franjas de
+    edad y de los umbrales de clasificación, y con empates de redondeo.
+
+    Returns:
+        list: Registros de mediciones
+    """
+    base = {
+        'gender': 'M', 'age': 30, 'weight': 75, 'height': 180, 'waist': 85, 'hip': 95,
+        'triceps_fold': 12, 'subscapular_fold': 15, 'suprailiac_fold': 18,
+    }
+    cases = [dict(base), dict(base, gender='F')]
+    for age in (10, 39, 39.99, 40, 59, 60, 120, 9.99, 120.01):
+        cases.append(dict(base, age=age))
+    for field, low, high in (('weight', 30, 300), ('height', 100, 250), ('waist', 50, 200), ('hip', 50, 200)):
+        cases.append(dict(base, **{field: low}))
+        cases.append(dict(base, **{field: high}))
+        cases.append(dict(base, **{field: low - 0.01}))
+        cases.append(dict(base, **{field: high + 0.01}))
+    for fold in ('triceps_fold', 'subscapular_fold', 'suprailiac_fold'):
+        for value in (3, 70, 2.99, 70.01, 0):
+            cases.append(dict(base, **{fold: value}))
+    # IMC exactamente en los umbrales 18.5, 25 y 30 (estatura 200 cm)
+    for weight in (74, 100, 120):
+        cases.append(dict(base, height=200, weight=weight, waist=90, hip=100))
+    # Índices cintura-cadera y cintura-estatura en los umbrales
+    cases.append(dict(base, waist=90, hip=100))
+    cases.append(dict(base, waist=100, hip=100))
+    cases.append(dict(base, gender='F', waist=85, hip=100))
+    cases.append(dict(base, waist=90, height=180, hip=120))
+    cases.append(dict(base, waist=100.5, hip=100))
+    # Coherencia peso-estatura
+    cases.append(dict(base, weight=300, height=100, waist=150, hip=160))
+    cases.append(dict(base, weight=30, height=250))
+    # Empates de redondeo (x.xx5) en las medidas
+    cases.append(dict(base, weight=72.125, height=172.5, waist=80.125, hip=98.375))
+    cases.append(dict(base, weight=64.005, height=165.005))
+    # Todas las ecuaciones con todos los pliegues, y con pliegues insuficientes
+    all_folds = {fold: 10 + index for index, fold in enumerate(FOLD_SITES)}
+    for equation in EQUATIONS:
+        for gender in 'MF':
+            for conversion in DENSITY_CONVERSIONS:
+                cases.append(dict(base, gender=gender, equation=equation, conversion=conversion, **all_folds))
+            cases.append(dict(base, gender=gender, equation=equation))
+    cases.append(dict(base, conversion='brozek'))
+    cases.append(dict(base, equation='bogus'))
+    cases.append(dict(base, conversion='bogus'))
+    # Solo pliegues específicos por sexo, o ninguno
+    cases.append({k: v for k, v in base.items() if not k.endswith('_fold')})
+    cases.append(dict({k: v for k, v in base.items() if not k.endswith('_fold')},
+                      chest_fold=10, abdomen_fold=20, thigh_fold=15))
+    cases.append(dict({k: v for k, v in base.items() if not k.endswith('_fold')},
+                      gender='F', triceps_fold=18, suprailiac_fold=15, thigh_fold=25))
+    cases.append(dict(base, gender='X'))
+    return cases
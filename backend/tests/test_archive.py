@@ -0,0 +1,162 @@
+"""
+Archivo columnar de resultados (models/archive.py) y su mantenimiento desde
+el almacén de mediciones.
+"""
+
+import pytest
+
+from jobs import run_job
+from models.anthropometric import MeasurementStore
+from models.archive import ResultArchive
+from models.jobs import JobQueue
+from tests.synthetic import synthetic_cohort
+from utils.cohort import CohortAccumulator
+
+np = pytest.importorskip('numpy')
+
+SPORTS = ('rowing', 'judo', None)
+
+
+def fill(store, size):
+    for index, record in enumerate(synthetic_cohort(size)):
+        record = dict(record, sport=SPORTS[index % 3]) if SPORTS[index % 3] else record
+        store.create(f"athlete-{index % 5}", f"{2019 + index % 5}-{index % 12 + 1:02d}-15", record)
+
+
+def expected(store, metric, gender=None, sport=None, year=None):
+    values = []
+    for item in (store.get(index) for index in range(1, 1000)):
+        if item is None or item['results'].get(metric) is None:
+            continue
+        if gender and item['measurements']['gender'] != gender:
+            continue
+        if sport and item['measurements'].get('sport') != sport:
+            continue
+        if year and not item['session_date'].startswith(year):
+            continue
+        values.append(item['results'][metric])
+    return np.array(values)
+
+
+def test_store_writes_through(tmp_path):
+    archive = ResultArchive(str(tmp_path / 'archive'), max_small_segments=8)
+    store = MeasurementStore(str(tmp_path / 'measurements.db'), archive=archive)
+    fill(store, 30)
+    updated = store.update(2, dict(store.get(2)['measurements'], weight=90.0))
+    store.update(3, session_date='2030-01-01')
+    store.delete(4)
+
+    # Las escrituras sueltas se archivan juntas antes de la primera lectura
+    assert archive.stats()['segments'] <= 8
+    assert archive.live_rows() == store.fingerprint()[0] == 29
+    ids = archive.column('id')
+    assert sorted(ids.tolist()) == [index for index in range(1, 31) if index != 4]
+    bmi = dict(zip(ids.tolist(), archive.column('bmi').tolist()))
+    assert bmi[2] == updated['results']['bmi']
+    assert archive.column('session_date', date_from='2030-01-01').astype(str).tolist() == ['2030-01-01']
+
+    before = {name: np.sort(archive.column(name)) for name in ('id', 'fat_free_mass_index', 'sum_of_skinfolds')}
+    archive.compact(full=True)
+    stats = archive.stats()
+    assert stats['segments'] == 1 and stats['rows'] == stats['live_rows'] == 29
+    dates = archive.column('session_date')
+    assert (np.diff(dates.astype('int64')) >= 0).all()
+    for name, values in before.items():
+        np.testing.assert_array_equal(np.sort(archive.column(name)), values)
+
+
+def test_single_writes_are_buffered(tmp_path):
+    archive = ResultArchive(str(tmp_path / 'archive'), buffer_rows=4, flush_interval=60)
+    store = MeasurementStore(str(tmp_path / 'measurements.db'), archive=archive)
+    # Otro proceso solo ve las escrituras ya publicadas
+    reader = ResultArchive(str(tmp_path / 'archive'))
+    fill(store, 3)
+    store.delete(2)
+    assert reader.stats()['segments'] == 0
+    # La cuarta medición pendiente escribe todas en un segmento
+    store.create('athlete-0', '2024-01-01', synthetic_cohort(1)[0])
+    assert reader.stats()['segments'] == 1 and reader.live_rows() == 3
+
+    store.update(1, session_date='2024-02-01')
+    assert archive.live_rows() == 3 and archive.stats()['segments'] == 2
+
+
+def test_archive_failures_do_not_fail_writes(tmp_path, monkeypatch, caplog):
+    archive = ResultArchive(str(tmp_path / 'archive'), buffer_rows=1)
+    store = MeasurementStore(str(tmp_path / 'measurements.db'), archive=archive)
+
+    def broken(latest):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(archive, '_write', broken)
+    fill(store, 2)
+    assert store.fingerprint()[0] == 2
+    assert 'No se pudo archivar' in caplog.text
+
+
+def test_filters_and_summary(tmp_path):
+    archive = ResultArchive(str(tmp_path / 'archive'))
+    store = MeasurementStore(str(tmp_path / 'measurements.db'), archive=archive)
+    fill(store, 40)
+    # Un segmento ordenado y otros sin ordenar
+    archive.compact(full=True)
+    fill(store, 10)
+
+    values = expected(store, 'fat_free_mass_index', gender='F', sport='rowing')
+    rows = archive.column('fat_free_mass_index', gender='F', sport='rowing')
+    np.testing.assert_array_equal(np.sort(rows[~np.isnan(rows)]), np.sort(values))
+    assert archive.column('bmi', sport='curling').size == 0
+
+    groups = archive.summarize('fat_free_mass_index', 'year', gender='F', date_from='2020-01-01', date_to='2022-12-31')
+    assert [group['period'] for group in groups] == ['2020', '2021', '2022']
+    for group in groups:
+        values = expected(store, 'fat_free_mass_index', gender='F', year=group['period'])
+        assert group['count'] == len(values)
+        assert group['mean'] == round(float(values.mean()), 2)
+        assert group['percentiles']['p50'] == round(float(np.percentile(values, 50)), 2)
+
+
+def test_cohort_and_rebuild(tmp_path):
+    archive = ResultArchive(str(tmp_path / 'archive'))
+    store = MeasurementStore(str(tmp_path / 'measurements.db'), archive=archive)
+    fill(store, 25)
+
+    reference = CohortAccumulator()
+    for records, results in store.iter_chunks():
+        reference.add_records(records, results)
+    columnar = CohortAccumulator()
+    genders, sports = archive.dictionary('gender'), archive.dictionary('sport')
+    for part in archive.scan(('sport', 'gender', 'age', 'bmi', 'body_fat_percentage', 'fat_free_mass_index',
+                              'waist_hip_ratio', 'sum_of_skinfolds')):
+        columnar.add_columns(sports[part['sport']], genders[part['gender']], part['age'], part)
+    assert columnar.summary(sport='rowing') == reference.summary(sport='rowing')
+    assert columnar.summary(gender='M') == reference.summary(gender='M')
+
+    archive.reset()
+    assert archive.live_rows() == 0
+    queue = JobQueue(str(tmp_path / 'jobs.db'))
+    queue.submit('archive', {'rebuild': True})
+    job = queue.claim('w')
+    assert run_job(queue, store, job, 'w', 10) == 'succeeded'
+    result = queue.get(job['id'])['result']
+    assert result['archived'] == 25 and result['segments'] == 1 and result['live_rows'] == 25
+
+
+def test_archive_routes(client):
+    from app import app
+
+    store = app.extensions['measurement_store']
+    fill(store, 12)
+    stats = client.get('/api/archive').get_json()
+    assert stats['up_to_date'] and stats['archive']['live_rows'] == store.fingerprint()[0]
+
+    response = client.get('/api/archive/query?metric=bmi&group_by=month&gender=M&from=2019-01-01')
+    data = response.get_json()
+    assert response.status_code == 200 and data['groups'][0]['period'].startswith('2019-')
+    assert sum(group['count'] for group in data['groups']) == len(expected(store, 'bmi', gender='M'))
+    assert client.get('/api/cohort/stats?gender=M').get_json()['metrics']['bmi']['count'] > 0
+
+    assert client.get('/api/archive/query?metric=weight2').status_code == 400
+    assert client.get('/api/archive/query?metric=bmi&group_by=week').status_code == 400
+    assert client.get('/api/archive/query?metric=bmi&from=2020-13-01').status_code == 400
+    assert client.post('/api/jobs', json={'type': 'archive', 'params': {'rebuild': 'yes'}}).status_code == 400
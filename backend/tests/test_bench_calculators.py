@@ -0,0 +1,115 @@
+"""
+Benchmarks de las funciones de cálculo, de process_anthropometric_data y del
+motor por lotes sobre cohortes sintéticas de 1, 1000, 100000 y 1000000 registros.
+"""
+
+import pytest
+
+from utils.batch_calculators import process_anthropometric_batch, records_to_columns
+from utils.calculators import (
+    calculate_bmi,
+    calculate_body_fat_jackson_pollock,
+    calculate_body_roundness_index,
+    calculate_fat_free_mass,
+    calculate_fat_free_mass_index,
+    calculate_waist_height_ratio,
+    calculate_waist_hip_ratio,
+    determine_goal,
+    process_anthropometric_data,
+)
+from tests.synthetic import COHORT_SIZES, synthetic_cohort
+
+pytest.importorskip('pytest_benchmark')
+
+
+def _rounds(cohort):
+    """Menos repeticiones para las cohortes grandes, que tardan segundos por ronda."""
+    return 1 if len(cohort) >= 100000 else 5
+
+
+@pytest.fixture(scope='module')
+def athletes():
+    """Cohorte de 1000 registros con los datos derivados que necesita cada función."""
+    rows = []
+    for record in synthetic_cohort(1000):
+        folds = {
+            'triceps': record.get('triceps_fold', 0),
+            'subscapular': record.get('subscapular_fold', 0),
+            'suprailiac': record.get('suprailiac_fold', 0),
+            'chest': record.get('chest_fold', 0),
+            'abdomen': record.get('abdomen_fold', 0),
+            'thigh': record.get('thigh_fold', 0),
+        }
+        body_fat = calculate_body_fat_jackson_pollock(record['gender'], record['age'], folds)
+        fat_free_mass = calculate_fat_free_mass(record['weight'], body_fat)
+        rows.append(dict(
+            record,
+            folds=folds,
+            body_fat=body_fat,
+            fat_free_mass=fat_free_mass,
+            ffmi=calculate_fat_free_mass_index(fat_free_mass, record['height']),
+            whr=calculate_waist_hip_ratio(record['waist'], record['hip']),
+        ))
+    return rows
+
+
+@pytest.mark.benchmark(group='calculators-1k')
+def test_calculate_bmi(benchmark, athletes):
+    benchmark(lambda: [calculate_bmi(row['weight'], row['height']) for row in athletes])
+
+
+@pytest.mark.benchmark(group='calculators-1k')
+def test_calculate_waist_hip_ratio(benchmark, athletes):
+    benchmark(lambda: [calculate_waist_hip_ratio(row['waist'], row['hip']) for row in athletes])
+
+
+@pytest.mark.benchmark(group='calculators-1k')
+def test_calculate_waist_height_ratio(benchmark, athletes):
+    benchmark(lambda: [calculate_waist_height_ratio(row['waist'], row['height']) for row in athletes])
+
+
+@pytest.mark.benchmark(group='calculators-1k')
+def test_calculate_body_roundness_index(benchmark, athletes):
+    benchmark(lambda: [calculate_body_roundness_index(row['waist'], row['height']) for row in athletes])
+
+
+@pytest.mark.benchmark(group='calculators-1k')
+def test_calculate_body_fat_jackson_pollock(benchmark, athletes):
+    benchmark(lambda: [
+        calculate_body_fat_jackson_pollock(row['gender'], row['age'], row['folds']) for row in athletes
+    ])
+
+
+@pytest.mark.benchmark(group='calculators-1k')
+def test_calculate_fat_free_mass(benchmark, athletes):
+    benchmark(lambda: [calculate_fat_free_mass(row['weight'], row['body_fat']) for row in athletes])
+
+
+@pytest.mark.benchmark(group='calculators-1k')
+def test_calculate_fat_free_mass_index(benchmark, athletes):
+    benchmark(lambda: [calculate_fat_free_mass_index(row['fat_free_mass'], row['height']) for row in athletes])
+
+
+@pytest.mark.benchmark(group='calculators-1k')
+def test_determine_goal(benchmark, athletes):
+    benchmark(lambda: [
+        determine_goal(row['gender'], row['whr'], row['ffmi'], row['body_fat'], row['age']) for row in athletes
+    ])
+
+
+@pytest.mark.benchmark(group='process-scalar')
+@pytest.mark.parametrize('cohort', COHORT_SIZES, indirect=True)
+def test_process_anthropometric_data(benchmark, cohort):
+    benchmark.pedantic(
+        lambda: [process_anthropometric_data(record) for record in cohort],
+        rounds=_rounds(cohort), warmup_rounds=1 if len(cohort) < 100000 else 0
+    )
+
+
+@pytest.mark.benchmark(group='process-batch')
+@pytest.mark.parametrize('cohort', COHORT_SIZES, indirect=True)
+def test_process_anthropometric_batch(benchmark, cohort):
+    benchmark.pedantic(
+        lambda: process_anthropometric_batch(records_to_columns(cohort)),
+        rounds=_rounds(cohort), warmup_rounds=1
+    )
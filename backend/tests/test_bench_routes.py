@@ -0,0 +1,74 @@
+"""
+Benchmarks de los endpoints de Flask con el cliente de pruebas (incluye el
+enrutado, la deserialización y la serialización JSON).
+"""
+
+import json
+
+import pytest
+
+from tests.synthetic import synthetic_cohort
+
+pytest.importorskip('pytest_benchmark')
+
+
+@pytest.fixture(scope='module')
+def result_cache(client):
+    from app import result_cache
+
+    return result_cache
+
+
+def _post_all(client, records):
+    for record in records:
+        response = client.post('/api/calculate', json=record)
+        assert response.status_code == 200
+
+
+@pytest.mark.benchmark(group='route-calculate')
+@pytest.mark.parametrize('size', [1, 1000])
+def test_calculate_uncached(benchmark, client, result_cache, size):
+    records = synthetic_cohort(size)
+    benchmark.pedantic(_post_all, args=(client, records), setup=result_cache.clear, rounds=5)
+
+
+@pytest.mark.benchmark(group='route-calculate')
+@pytest.mark.parametrize('size', [1, 1000])
+def test_calculate_cached(benchmark, client, size):
+    records = synthetic_cohort(size)
+    _post_all(client, records)
+    benchmark.pedantic(_post_all, args=(client, records), rounds=5)
+
+
+@pytest.mark.benchmark(group='route-batch')
+@pytest.mark.parametrize('cohort', [1000, 100000], indirect=True)
+def test_calculate_batch_ndjson(benchmark, client, cohort):
+    body = '\n'.join(json.dumps(record) for record in cohort)
+
+    def post():
+        response = client.post(
+            '/api/calculate/batch?chunk_size=5000', data=body, content_type='application/x-ndjson'
+        )
+        return response.get_data()
+
+    output = benchmark.pedantic(post, rounds=1 if len(cohort) >= 100000 else 5)
+    assert output.count(b'\n') == len(cohort)
+
+
+@pytest.mark.benchmark(group='route-other')
+def test_recommendations(benchmark, client):
+    payload = {'goal': {'primary_goal': 'Hipertrofia'}}
+    response = benchmark(client.post, '/api/recommendations', json=payload)
+    assert response.status_code == 200
+
+
+@pytest.mark.benchmark(group='route-other')
+def test_thresholds(benchmark, client):
+    response = benchmark(client.get, '/api/thresholds')
+    assert response.status_code == 200
+
+
+@pytest.mark.benchmark(group='route-other')
+def test_health(benchmark, client):
+    response = benchmark(client.get, '/api/health')
+    assert response.status_code == 200
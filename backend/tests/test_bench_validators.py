@@ -0,0 +1,48 @@
+"""
+Benchmarks de los validadores: validate_anthropometric_input (utils/validators.py),
+validate_measurements (utils/calculators.py) y el esquema compilado, escalar y por columnas.
+"""
+
+import pytest
+
+from tests.synthetic import COHORT_SIZES, synthetic_cohort
+from utils.batch_calculators import records_to_columns
+from utils.calculators import validate_measurements
+from utils.schema import validate_columns, validate_record
+from utils.validators import validate_anthropometric_input, validate_cv_measurements
+
+pytest.importorskip('pytest_benchmark')
+
+
+@pytest.fixture(scope='module')
+def records():
+    """Mezcla de registros válidos y con errores de validación."""
+    return synthetic_cohort(1000, seed=7, wide=True)
+
+
+@pytest.mark.benchmark(group='validators-1k')
+def test_validate_anthropometric_input(benchmark, records):
+    benchmark(lambda: [validate_anthropometric_input(record) for record in records])
+
+
+@pytest.mark.benchmark(group='validators-1k')
+def test_validate_measurements(benchmark, records):
+    benchmark(lambda: [validate_measurements(record) for record in records])
+
+
+@pytest.mark.benchmark(group='validators-1k')
+def test_validate_record(benchmark, records):
+    benchmark(lambda: [validate_record(record) for record in records])
+
+
+@pytest.mark.benchmark(group='validators-1k')
+def test_validate_cv_measurements(benchmark, records):
+    repeats = [[record['waist'], record['waist'] + 0.3, record['waist'] - 0.2] for record in records]
+    benchmark(lambda: [validate_cv_measurements(values) for values in repeats])
+
+
+@pytest.mark.benchmark(group='validators-columns')
+@pytest.mark.parametrize('cohort', COHORT_SIZES, indirect=True)
+def test_validate_columns(benchmark, cohort):
+    columns = records_to_columns(cohort)
+    benchmark.pedantic(lambda: validate_columns(columns), rounds=1 if len(cohort) >= 100000 else 5)
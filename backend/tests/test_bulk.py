@@ -0,0 +1,101 @@
+"""
+Procesamiento masivo de ficheros (bulk.py): los resultados de un fichero
+CSV o Parquet son los de process_anthropometric_data, fila a fila y en el
+orden de entrada.
+"""
+
+import csv
+import os
+import subprocess
+import sys
+
+import pytest
+
+from bulk import RESULT_COLUMNS, flatten_result, run_bulk
+from tests.synthetic import synthetic_cohort
+from utils.calculators import process_anthropometric_data
+from utils.schema import FIELD_SCHEMA
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COLUMNS = ['athlete'] + [field['name'] for field in FIELD_SCHEMA if field['name'] not in ('equation', 'conversion')]
+
+
+def season(size):
+    """Filas de prueba: cohorte sintética con una fila no numérica y otra incompleta."""
+    records = [dict(record, athlete=f"a{index}") for index, record in enumerate(synthetic_cohort(size))]
+    records[3] = dict(records[3], weight='n/a')
+    records[5] = {key: value for key, value in records[5].items() if key != 'height'}
+    return records
+
+
+def write_csv(path, records):
+    with open(path, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(COLUMNS)
+        writer.writerows([record.get(name, '') for name in COLUMNS] for record in records)
+
+
+def expected_rows(records):
+    rows = []
+    for record in records:
+        data = {key: value for key, value in record.items() if key != 'athlete'}
+        rows.append(flatten_result(process_anthropometric_data(data)))
+    return rows
+
+
+def as_text(value):
+    return '' if value is None else str(value)
+
+
+def read_csv(path):
+    with open(path, newline='') as handle:
+        return list(csv.DictReader(handle))
+
+
+@pytest.mark.parametrize('workers, chunk_size', [(1, 7), (2, 4)])
+def test_csv_round_trip(tmp_path, workers, chunk_size):
+    records = season(30)
+    write_csv(tmp_path / 'in.csv', records)
+
+    summary = run_bulk(str(tmp_path / 'in.csv'), str(tmp_path / 'out.csv'), workers=workers, chunk_size=chunk_size)
+    assert summary['rows'] == 30 and summary['failed'] == 2
+
+    rows = read_csv(tmp_path / 'out.csv')
+    assert list(rows[0]) == COLUMNS + list(RESULT_COLUMNS)
+    assert [row['athlete'] for row in rows] == [record['athlete'] for record in records]
+    for row, expected in zip(rows, expected_rows(records)):
+        assert {name: row[name] for name in RESULT_COLUMNS} == {
+            name: as_text(value) for name, value in expected.items()
+        }
+    assert rows[3]['error_codes'] == 'weight:invalid_type'
+    assert rows[5]['error_codes'] == 'height:required'
+
+
+def test_cli(tmp_path):
+    write_csv(tmp_path / 'in.csv', season(10))
+    completed = subprocess.run(
+        [sys.executable, 'bulk.py', str(tmp_path / 'in.csv'), str(tmp_path / 'out.csv'), '--workers', '1', '--quiet'],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    assert completed.stderr.startswith('10 filas (2 con error)')
+    assert len(read_csv(tmp_path / 'out.csv')) == 10
+
+
+def test_parquet_round_trip(tmp_path):
+    pyarrow = pytest.importorskip('pyarrow')
+    parquet = pytest.importorskip('pyarrow.parquet')
+    records = season(20)
+    table = pyarrow.Table.from_pydict({
+        name: [None if record.get(name) in (None, 'n/a') else record[name] for record in records]
+        for name in COLUMNS
+    })
+    parquet.write_table(table, str(tmp_path / 'in.parquet'))
+
+    summary = run_bulk(str(tmp_path / 'in.parquet'), str(tmp_path / 'out.parquet'), workers=1, chunk_size=6)
+    assert summary['rows'] == 20
+
+    output = parquet.read_table(str(tmp_path / 'out.parquet')).to_pylist()
+    records[3] = {key: value for key, value in records[3].items() if key != 'weight'}
+    for row, expected in zip(output, expected_rows(records)):
+        assert {name: row[name] for name in RESULT_COLUMNS} == expected
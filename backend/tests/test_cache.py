@@ -0,0 +1,80 @@
+"""
+Caché de resultados (utils/cache.py): desalojo LRU, caducidad, versión de
+las fórmulas y almacén SQLite compartido.
+"""
+
+import utils.cache
+from utils.cache import ResultCache, SqliteResultStore, canonical_key
+
+RECORD = {'gender': 'F', 'age': 28, 'weight': 60, 'height': 165, 'waist': 70, 'hip': 95}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResultCache(max_size=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(utils.cache.time, 'monotonic', clock)
+    monkeypatch.setattr(utils.cache.time, 'time', clock)
+    cache = ResultCache(max_size=8, ttl=10)
+    cache.set('a', 1)
+    clock.now += 9
+    assert cache.get('a') == 1
+    clock.now += 2
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_key_changes_with_calculation_version(monkeypatch):
+    key = canonical_key(RECORD)
+    assert canonical_key(dict(RECORD, weight=60.0, notes='x')) == key
+    monkeypatch.setattr(utils.cache, 'CALCULATION_VERSION', 'next')
+    assert canonical_key(RECORD) != key
+
+    calls = []
+    cache = ResultCache(max_size=8, ttl=60)
+    cache.get_or_compute(RECORD, lambda data: calls.append(data) or {'success': True})
+    cache.get_or_compute(RECORD, lambda data: calls.append(data) or {'success': True})
+    assert len(calls) == 1
+
+
+def test_shared_store_is_seen_by_other_workers(tmp_path):
+    path = str(tmp_path / 'results.db')
+    first = ResultCache(max_size=8, ttl=60, store=SqliteResultStore(path, 60))
+    second = ResultCache(max_size=8, ttl=60, store=SqliteResultStore(path, 60))
+    first.set('a', {'success': True})
+    assert second.get('a') == {'success': True}
+    assert second.stats()['shared_hits'] == 1
+
+
+def test_shared_store_is_purged_and_capped(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(utils.cache.time, 'time', clock)
+    store = SqliteResultStore(str(tmp_path / 'results.db'), ttl=10, max_entries=5, purge_every=4)
+    for index in range(3):
+        store.set(f'old-{index}', index)
+    clock.now += 20
+    assert store.get('old-0') is None and store.count() == 3
+
+    for index in range(9):
+        clock.now += 1
+        store.set(f'new-{index}', index)
+    # La duodécima escritura limpia: se borran las caducadas y se conservan las 5 más recientes
+    assert store.count() == 5
+    assert store.get('new-8') == 8 and store.get('new-3') is None
@@ -0,0 +1,60 @@
+"""
+Estadísticas de cohorte (utils/cohort.py) y ranking de atletas (routes/cohort_routes.py).
+"""
+
+import json
+
+import pytest
+
+from utils.cohort import CohortAccumulator
+
+ATHLETE = {
+    'gender': 'M', 'age': 24, 'weight': 78, 'height': 181, 'waist': 82, 'hip': 97,
+    'triceps_fold': 9, 'subscapular_fold': 11, 'suprailiac_fold': 12, 'sport': 'rowing-cache',
+}
+
+
+def test_rank_reuses_percentile_tables_until_a_write(client, monkeypatch):
+    calls = []
+    original = CohortAccumulator.percentile_tables
+
+    def counting(self, **filters):
+        calls.append(filters)
+        return original(self, **filters)
+
+    monkeypatch.setattr(CohortAccumulator, 'percentile_tables', counting)
+    for day in (1, 2):
+        body = dict(ATHLETE, weight=76 + day, session_date=f'2024-04-0{day}')
+        assert client.post('/api/athletes/cohort-cache/measurements', json=body).status_code == 201
+
+    first = client.post('/api/cohort/rank', json={'measurements': ATHLETE}).get_json()
+    second = client.post('/api/cohort/rank', json={'measurements': ATHLETE}).get_json()
+    assert first == second and first['cohort_size'] == 2
+    assert len(calls) == 1
+
+    client.post('/api/athletes/cohort-cache/measurements', json=dict(ATHLETE, session_date='2024-04-03'))
+    third = client.post('/api/cohort/rank', json={'measurements': ATHLETE}).get_json()
+    assert third['cohort_size'] == 3 and len(calls) == 2
+
+
+@pytest.mark.parametrize('body', ['x', 5, [ATHLETE]])
+def test_rank_rejects_non_object_bodies(client, body):
+    assert client.post('/api/cohort/rank', json=body).status_code == 400
+
+
+def test_rank_ignores_non_string_filters(client):
+    response = client.post('/api/cohort/rank', json={'measurements': ATHLETE, 'cohort': {'sport': ['a']}})
+    assert response.status_code == 200
+    assert response.get_json()['filters']['sport'] is None
+
+
+def test_stats_applies_batch_limits(client, monkeypatch):
+    monkeypatch.setitem(client.application.config, 'BATCH_MAX_RECORDS', 3)
+    assert client.post('/api/cohort/stats', json=[ATHLETE] * 3).get_json()['records'] == 3
+    assert client.post('/api/cohort/stats', json=[ATHLETE] * 4).status_code == 400
+    ndjson = '\n'.join(json.dumps(ATHLETE) for _ in range(4))
+    response = client.post('/api/cohort/stats', data=ndjson, content_type='application/x-ndjson')
+    assert response.status_code == 400 and '3 registros' in response.get_json()['error']
+
+    monkeypatch.setitem(client.application.config, 'BATCH_MAX_CONTENT_LENGTH', len(ndjson) - 1)
+    assert client.post('/api/cohort/stats', data=ndjson, content_type='application/x-ndjson').status_code == 413
@@ -0,0 +1,91 @@
+"""
+Negociación del formato de respuesta, compresión y disposición en columnas
+de /api/calculate/batch.
+"""
+
+import gzip
+import json
+
+import pytest
+
+from tests.synthetic import synthetic_cohort
+from utils.batch_io import columnar_batch_results, process_record_chunk
+from utils.thresholds import STATUS_NAMES
+
+
+def cohort(size):
+    records = [dict(record) for record in synthetic_cohort(size)]
+    if size > 2:
+        records[1]['weight'] = -3
+        records[2]['age'] = 14
+    return records
+
+
+def test_columns_match_records():
+    records = [(record, None) for record in cohort(40)] + [(None, "Línea JSON inválida")]
+    expected = process_record_chunk(records)
+    payload = columnar_batch_results(records, 7, 100)
+    columns = payload['columns']
+    assert payload['count'] == len(records)
+    assert all(len(values) == len(records) for values in columns.values() if isinstance(values, list))
+    assert [error['index'] for error in payload['errors']] == [1, 40]
+
+    for index, result in enumerate(expected):
+        assert columns['success'][index] is result['success']
+        if not result['success']:
+            continue
+        assert columns['bmi'][index] == result['bmi']
+        assert columns['body_fat_percentage'][index] == result.get('body_fat_percentage')
+        status = {
+            metric: STATUS_NAMES[codes[index]] for metric, codes in columns['status'].items()
+            if codes[index] is not None
+        }
+        assert status == result['status']
+        if 'goal' in result:
+            goal = payload['goal_profiles'][columns['goal_code'][index]]
+            assert goal['primary_goal'] == result['goal']['primary_goal']
+        if 'growth' in result:
+            assert columns['age_months'][index] == result['growth']['age_months']
+            assert columns['growth']['bmi']['z'][index] == result['growth']['bmi']['z']
+
+    with pytest.raises(ValueError):
+        columnar_batch_results(records, 7, 10)
+
+
+def test_json_is_default(client):
+    record = cohort(1)[0]
+    response = client.post('/api/calculate', json=record, headers={'Accept': '*/*'})
+    assert response.mimetype == 'application/json'
+    assert 'Accept' in response.headers['Vary']
+
+
+def test_msgpack_negotiation(client):
+    msgpack = pytest.importorskip('msgpack')
+    record = cohort(1)[0]
+    expected = client.post('/api/calculate', json=record).get_json()
+    response = client.post('/api/calculate', json=record, headers={'Accept': 'application/msgpack'})
+    assert response.mimetype == 'application/msgpack'
+    assert msgpack.unpackb(response.data) == expected
+
+    recommendations = client.post(
+        '/api/recommendations', json={'goal': expected['goal']}, headers={'Accept': 'application/x-msgpack'}
+    )
+    assert msgpack.unpackb(recommendations.data)['success'] is True
+
+
+def test_compression(client):
+    records = cohort(300)
+    response = client.post('/api/calculate/batch?layout=columns', json=records, headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(response.data))['count'] == 300
+
+    streamed = client.post('/api/calculate/batch', json=records, headers={'Accept-Encoding': 'gzip'})
+    assert streamed.headers['Content-Encoding'] == 'gzip'
+    lines = gzip.decompress(streamed.data).decode('utf-8').splitlines()
+    assert [json.loads(line)['index'] for line in lines] == list(range(300))
+
+    small = client.post('/api/calculate', json=records[0], headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+    plain = client.post('/api/calculate/batch?layout=columns', json=records)
+    assert 'Content-Encoding' not in plain.headers
+    assert client.post('/api/calculate/batch?layout=rows', json=records).status_code == 400
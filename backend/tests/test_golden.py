@@ -0,0 +1,107 @@
+"""
+Equivalencia bit a bit de todas las rutas de cálculo con los resultados de
+referencia de la ruta escalar.
+
+Los resultados se comparan serializados (json.dumps con las claves ordenadas),
+por lo que cualquier diferencia en un float, incluido el signo de un cero,
+hace fallar la prueba.
+"""
+
+import json
+import os
+
+import pytest
+
+from bulk import flatten_result, process_rows
+from tests.generate_golden import golden_inputs, load_golden
+from tests.synthetic import synthetic_cohort
+from utils.batch_calculators import batch_to_records, process_anthropometric_batch, records_to_columns
+from utils.batch_io import process_record_chunk
+from utils.calculators import CALCULATION_VERSION, process_anthropometric_data
+from utils.engine_spec import ENGINE_SPEC_PATH, engine_spec
+
+
+def canonical(result):
+    return json.dumps(result, sort_keys=True)
+
+
+def assert_identical(inputs, expected, actual):
+    assert len(actual) == len(expected)
+    mismatches = [
+        index for index, (left, right) in enumerate(zip(expected, actual))
+        if canonical(left) != canonical(right)
+    ]
+    if mismatches:
+        index = mismatches[0]
+        pytest.fail(
+            f"{len(mismatches)} resultados distintos; primero en el registro {index}:\n"
+            f"entrada:  {inputs[index]}\nesperado: {canonical(expected[index])}\n"
+            f"obtenido: {canonical(actual[index])}"
+        )
+
+
+@pytest.fixture(scope='module')
+def golden():
+    header, cases = load_golden()
+    inputs = [case[0] for case in cases]
+    outputs = [case[1] for case in cases]
+    return header, inputs, outputs
+
+
+def test_golden_version(golden):
+    header, _, _ = golden
+    assert header['calculation_version'] == CALCULATION_VERSION, (
+        "CALCULATION_VERSION ha cambiado: si el cambio de fórmulas es intencionado, "
+        "regenera el conjunto con python -m tests.generate_golden"
+    )
+
+
+def test_scalar_matches_golden(golden):
+    _, inputs, outputs = golden
+    assert_identical(inputs, outputs, [process_anthropometric_data(record) for record in inputs])
+
+
+def test_batch_matches_golden(golden):
+    _, inputs, outputs = golden
+    batch = process_anthropometric_batch(records_to_columns(inputs))
+    assert_identical(inputs, outputs, batch_to_records(batch))
+
+
+def test_record_chunk_matches_golden(golden):
+    _, inputs, outputs = golden
+    assert_identical(inputs, outputs, process_record_chunk([(record, None) for record in inputs]))
+
+
+def test_bulk_rows_match_golden(golden):
+    _, inputs, outputs = golden
+    columns = sorted({name for record in inputs for name in record})
+    rows = [[record.get(name) for name in columns] for record in inputs]
+    block, failed = process_rows(columns, rows, 'parquet')
+    expected = [flatten_result(output) for output in outputs]
+    actual = [{name: block[name][index] for name in expected[0]} for index in range(len(inputs))]
+    assert failed == sum(1 for output in outputs if not output['success'])
+    assert_identical(inputs, expected, actual)
+
+
+@pytest.mark.parametrize('cohort', [1000, 100000, 1000000], indirect=True)
+def test_batch_matches_scalar(cohort):
+    """Equivalencia sobre cohortes sintéticas más grandes que el conjunto golden."""
+    expected = [process_anthropometric_data(record) for record in cohort]
+    actual = batch_to_records(process_anthropometric_batch(records_to_columns(cohort)))
+    assert_identical(cohort, expected, actual)
+
+
+def test_golden_inputs_are_reproducible(golden):
+    """El generador sintético reproduce exactamente las entradas guardadas."""
+    _, inputs, _ = golden
+    synthetic_cohort.cache_clear()
+    assert canonical(golden_inputs()) == canonical(inputs)
+
+
+@pytest.mark.skipif(not os.path.exists(ENGINE_SPEC_PATH), reason="Sin el directorio del frontend")
+def test_frontend_engine_spec_is_current():
+    """El motor sin conexión del frontend usa las mismas constantes que el backend."""
+    with open(ENGINE_SPEC_PATH, encoding='utf-8') as handle:
+        assert json.load(handle) == engine_spec(), (
+            "Las constantes del motor han cambiado: regenera la especificación con python -m tests.generate_golden"
+        )
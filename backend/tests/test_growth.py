@@ -0,0 +1,72 @@
+"""
+Curvas de referencia LMS para menores de 18 años (utils/growth.py) y su
+integración en el cálculo.
+"""
+
+import pytest
+
+from tests.synthetic import synthetic_cohort
+from utils.calculators import GOAL_PROFILES, GOAL_YOUTH, process_anthropometric_data
+from utils.growth import (
+    age_in_months,
+    growth_scores,
+    lms_parameters,
+    lms_z_score,
+    load_references,
+    z_percentile,
+    z_status,
+)
+
+
+def test_bundled_tables_are_labelled_approximate():
+    tables, metadata = load_references()
+    assert metadata['approximate'] is True
+    assert metadata['references']['bmi'] == 'who2007'
+    table = tables[('bmi', 'M')]
+    assert (table.start, table.end) == (120, 228)
+    assert len(table.m) == 109
+
+
+def test_monthly_interpolation():
+    tables, _ = load_references()
+    table = tables[('bmi', 'F')]
+    assert lms_parameters(table, 120) == pytest.approx((-1.20, 16.6, 0.150))
+    assert lms_parameters(table, 126)[1] == pytest.approx(16.9)
+    assert lms_parameters(table, 126.5)[1] == pytest.approx(16.925)
+    assert lms_parameters(table, 60) == lms_parameters(table, 120)
+
+
+def test_lms_formula():
+    assert lms_z_score(16.4, -1.46, 16.4, 0.137) == 0
+    assert lms_z_score(20.0, 0, 16.0, 0.1) == pytest.approx(2.2314, abs=1e-4)
+    assert z_percentile(0) == 50
+    assert z_percentile(1.96) == pytest.approx(97.5, abs=0.01)
+    assert [z_status(z) for z in (-2.5, -2, 0.5, 1.5, 2.5)] == ['alert', 'alert', 'optimal', 'warning', 'alert']
+    assert age_in_months(12) == 150 and age_in_months(12.25) == 147
+
+
+def test_custom_reference_file(tmp_path):
+    path = tmp_path / 'official.csv'
+    path.write_text(
+        "# approximate: false\nreference,measure,sex,age_months,L,M,S\n"
+        "who2007,bmi,M,120,-1.0,16.0,0.1\nwho2007,bmi,M,122,-1.0,17.0,0.1\n"
+    )
+    tables, metadata = load_references(str(path))
+    assert metadata['approximate'] is False
+    assert list(tables[('bmi', 'M')].m) == [16.0, 16.5, 17.0]
+
+
+def test_youth_routing():
+    record = dict(synthetic_cohort(1)[0], age=13)
+    result = process_anthropometric_data(record)
+    assert result['goal']['primary_goal'] == GOAL_PROFILES[GOAL_YOUTH]['primary_goal']
+    assert result['growth']['age_months'] == 162
+    assert result['status']['bmi'] == result['growth']['bmi']['status']
+    assert set(result['status']) == {'bmi', 'waist_height_ratio'}
+    assert result['growth'] == growth_scores('F', 13, {
+        'bmi': result['bmi'], 'waist': record['waist'],
+        'triceps_fold': record['triceps_fold'], 'subscapular_fold': record['subscapular_fold'],
+    })
+
+    adult = process_anthropometric_data(dict(record, age=18))
+    assert 'growth' not in adult and 'fat_free_mass_index' in adult['status']
@@ -0,0 +1,119 @@
+"""
+Cola de trabajos en segundo plano (models/jobs.py), su ejecución por bloques
+(jobs.py) y las rutas /api/jobs.
+"""
+
+import csv
+import io
+import os
+
+from jobs import JOB_HANDLERS, run_job
+from models.anthropometric import MeasurementStore
+from models.jobs import JobQueue
+from tests.synthetic import synthetic_cohort
+
+FIELDS = (
+    'athlete_id', 'session_date', 'gender', 'age', 'weight', 'height', 'waist', 'hip',
+    'triceps_fold', 'subscapular_fold', 'suprailiac_fold',
+)
+
+
+def season_csv(rows, invalid=(3, 11)):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELDS)
+    for index, record in enumerate(synthetic_cohort(rows)):
+        record = dict(record, athlete_id=f"athlete-{index % 4}", session_date=f"2024-01-{index % 28 + 1:02d}")
+        if index in invalid:
+            record['weight'] = 'n/a'
+        writer.writerow([record.get(name, '') for name in FIELDS])
+    return buffer.getvalue()
+
+
+def stores(tmp_path, lease_seconds=60):
+    return JobQueue(str(tmp_path / 'jobs.db'), lease_seconds), MeasurementStore(str(tmp_path / 'measurements.db'))
+
+
+def test_import_resumes_after_crash(tmp_path):
+    queue, store = stores(tmp_path, lease_seconds=0)
+    path = tmp_path / 'season.csv'
+    path.write_text(season_csv(25))
+    queue.submit('import', {'path': str(path), 'format': 'csv', 'source': 'import:test'})
+
+    # Primer proceso: completa un bloque, guarda el punto de control y guarda
+    # otro bloque sin llegar a registrarlo antes de morir
+    job = queue.claim('a')
+    handler, _ = JOB_HANDLERS['import']
+    steps = handler(store, job['params'], None, None, 10)
+    checkpoint, done, total, result = next(steps)
+    assert (done, total) == (10, 25)
+    assert queue.checkpoint(job['id'], 'a', checkpoint, done, total, result)
+    next(steps)
+
+    # El segundo proceso lo retoma (la concesión ha caducado) sin duplicar filas
+    job = queue.claim('b')
+    assert job['checkpoint']['rows'] == 10 and job['attempts'] == 2
+    assert run_job(queue, store, job, 'b', 10) == 'succeeded'
+    finished = queue.get(job['id'])
+    assert finished['result']['imported'] == 23 and finished['result']['failed'] == 2
+    assert [error['row'] for error in finished['result']['errors']] == [3, 11]
+    assert finished['progress'] == {'done': 25, 'total': 25, 'percent': 100.0}
+    assert store.fingerprint()[0] == 23
+    assert not path.exists()
+    assert not queue.checkpoint(job['id'], 'a', checkpoint, done)
+
+
+def test_recalculate_and_cancel(tmp_path):
+    queue, store = stores(tmp_path)
+    for index, record in enumerate(synthetic_cohort(7)):
+        store.create(f"athlete-{index % 2}", '2024-02-01', dict(record))
+    store._connection().execute("UPDATE measurements SET calculation_version = 0, results = '{}'")
+
+    queue.submit('recalculate', {'athlete_ids': ['athlete-0'], 'force': False})
+    job = queue.claim('w')
+    assert run_job(queue, store, job, 'w', 2) == 'succeeded'
+    assert queue.get(job['id'])['result'] == {'recomputed': 4}
+    assert store.count_recompute() == 3
+    assert store.get(1)['results']['success'] is True
+
+    pending = queue.submit('recalculate', {'athlete_ids': None, 'force': True})
+    assert queue.cancel(pending['id'])['status'] == 'cancelled'
+    assert queue.claim('w') is None
+
+    running = queue.submit('recalculate', {'athlete_ids': None, 'force': True})
+    job = queue.claim('w')
+    queue.cancel(running['id'])
+    assert run_job(queue, store, job, 'w', 2) == 'cancelled'
+
+
+def test_job_routes(client):
+    from app import app
+
+    queue = app.extensions['job_queue']
+    store = app.extensions['measurement_store']
+    response = client.post('/api/jobs/import', data=season_csv(12), content_type='text/csv')
+    assert response.status_code == 202
+    job = response.get_json()['job']
+    assert 'path' not in job['params']
+    assert client.get(response.headers['Location']).get_json()['job']['status'] == 'queued'
+    assert client.get(job['result_url']).status_code == 409
+
+    claimed = queue.claim('test')
+    assert claimed['id'] == job['id']
+    assert run_job(queue, store, claimed, 'test', 5) == 'succeeded'
+    result = client.get(job['result_url']).get_json()
+    assert result['success'] and result['result']['imported'] == 10
+    assert not os.listdir(app.config['JOB_DATA_DIR'])
+
+    recalculation = client.post('/api/jobs', json={'type': 'recalculate', 'params': {'force': True}})
+    assert recalculation.status_code == 202
+    job_id = recalculation.get_json()['job']['id']
+    assert client.post(f'/api/jobs/{job_id}/cancel').get_json()['job']['status'] == 'cancelled'
+    assert client.get(f'/api/jobs/{job_id}/result').get_json()['status'] == 'cancelled'
+
+    assert client.post('/api/jobs', json={'type': 'import'}).status_code == 400
+    assert client.post('/api/jobs', json={'type': ['archive']}).status_code == 400
+    assert client.post('/api/jobs', json={'type': {'a': 1}}).status_code == 400
+    assert client.post('/api/jobs', json={'type': 'recalculate', 'params': {'force': 1}}).status_code == 400
+    assert client.get('/api/jobs/999999').status_code == 404
+    assert [item['id'] for item in client.get('/api/jobs?status=cancelled').get_json()['jobs']] == [job_id]
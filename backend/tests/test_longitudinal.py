@@ -0,0 +1,144 @@
+"""
+Cambio longitudinal y tendencias (utils/longitudinal.py y los agregados del
+almacén de mediciones).
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from models.anthropometric import MeasurementStore
+from tests.synthetic import synthetic_cohort
+from utils.calculators import process_anthropometric_data
+from utils.longitudinal import MetricTrend, TrendAccumulator, default_error_options, session_day, session_errors
+from utils.uncertainty import estimate_uncertainty, parse_uncertainty_options
+
+np = pytest.importorskip('numpy')
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def season(athlete, sessions, start_month=1):
+    base = synthetic_cohort(athlete + 1)[athlete]
+    return [
+        dict(
+            base,
+            weight=round(base['weight'] - 0.4 * i, 1),
+            thigh_fold=round(base['thigh_fold'] * (1 - 0.03 * i), 1),
+            session_date=f"2024-{start_month + i:02d}-{1 + 3 * i:02d}",
+        )
+        for i in range(sessions)
+    ]
+
+
+def test_rolling_slope_matches_polyfit():
+    rng = np.random.default_rng(1)
+    days = np.cumsum(rng.integers(3, 20, 30))
+    values = rng.normal(20, 2, 30)
+    trend = MetricTrend(window=5)
+    for day, value in zip(days.tolist(), values.tolist()):
+        trend.append(day, value, 0.5)
+    summary = trend.summary()
+    assert summary['rolling_slope_per_week'] == pytest.approx(round(np.polyfit(days[-5:], values[-5:], 1)[0] * 7, 4))
+    assert summary['slope_per_week'] == pytest.approx(round(np.polyfit(days, values, 1)[0] * 7, 4))
+    assert summary['sd'] == pytest.approx(round(values.std(ddof=1), 3))
+
+
+def test_state_round_trip():
+    accumulator = TrendAccumulator(window=3)
+    for day, value in enumerate((20.0, 19.5, 19.8, 19.1)):
+        accumulator.append(f"2024-03-{day + 1:02d}", {'bmi': value}, {'bmi': 0.1})
+    restored = TrendAccumulator.from_dict(accumulator.to_dict())
+    assert restored.summary() == accumulator.summary()
+    row = restored.append('2024-03-20', {'bmi': 18.0}, {'bmi': 0.1})['bmi']
+    assert row['delta'] == pytest.approx(-1.1) and row['days'] == 16 and row['reliable']
+    with pytest.raises(ValueError):
+        restored.append('2024-03-01', {'bmi': 18.0}, {})
+    assert session_day('2024-03-20') - session_day('2024-03-04') == 16
+
+
+@pytest.mark.parametrize('equation', [None, 'jackson_pollock_7', 'durnin_womersley', 'yuhasz'])
+def test_session_errors_match_monte_carlo(equation):
+    options = default_error_options()
+    monte_carlo = parse_uncertainty_options({'samples': 20000}, 20000)
+    for record in synthetic_cohort(12):
+        record = dict(record, equation=equation) if equation else record
+        result = process_anthropometric_data(record)
+        if not result['success']:
+            continue
+        errors = session_errors(record, result, options)
+        for metric, interval in estimate_uncertainty(record, result, monte_carlo)['intervals'].items():
+            # Las métricas redondeadas a 0,01 añaden a la DE simulada el error de cuantización
+            assert errors[metric] == pytest.approx(interval['sd'], rel=0.1, abs=0.005), metric
+
+
+def test_saving_a_session_does_not_import_numpy(tmp_path):
+    records = season(4, 2)
+    script = (
+        "import sys\n"
+        "from models.anthropometric import MeasurementStore\n"
+        f"store = MeasurementStore({str(tmp_path / 'measurements.db')!r})\n"
+        f"for record in {records!r}:\n"
+        "    store.create('a', record.pop('session_date'), record)\n"
+        "assert store.trends('a')[1].sessions == 2\n"
+        "assert 'numpy' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, '-c', script], cwd=BACKEND_DIR, check=True)
+
+
+def test_incremental_matches_rebuild(tmp_path):
+    store = MeasurementStore(str(tmp_path / 'measurements.db'))
+    for record in season(0, 8):
+        store.create('a', record['session_date'], {k: v for k, v in record.items() if k != 'session_date'})
+    rows, accumulator = store.trends('a')
+    rebuilt_rows, rebuilt = store._rebuild_trend('a')
+    assert rows == rebuilt_rows
+    assert accumulator.to_dict() == rebuilt.to_dict()
+    assert accumulator.summary()['sum_of_skinfolds']['slope_per_week'] < 0
+
+
+def test_out_of_order_and_delete_rebuild(tmp_path):
+    store = MeasurementStore(str(tmp_path / 'measurements.db'))
+    records = season(1, 5)
+    ids = []
+    for record in records[1:] + records[:1]:
+        ids.append(store.create('b', record['session_date'], {k: v for k, v in record.items() if k != 'session_date'})['id'])
+    rows, accumulator = store.trends('b')
+    assert [row['session_date'] for row in rows] == [record['session_date'] for record in records]
+    assert accumulator.sessions == 5
+
+    store.delete(ids[0])
+    rows, accumulator = store.trends('b')
+    assert accumulator.sessions == 4 and len(rows) == 4
+    assert store.trends('missing') == ([], None)
+
+
+def test_series_route(client):
+    sessions = season(2, 6)
+    response = client.post('/api/trends', json={'sessions': sessions[::-1], 'window': 3, 'swc': {'bmi': 0.1}})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [row['session_date'] for row in data['sessions']] == [record['session_date'] for record in sessions]
+    assert data['sessions'][0]['deltas']['bmi']['delta'] is None
+    assert data['summary']['bmi']['beyond_swc'] is True
+    assert client.post('/api/trends', json={'sessions': sessions, 'window': 1}).status_code == 400
+    assert client.post('/api/trends', json={'sessions': [dict(sessions[0], session_date='x')]}).status_code == 400
+
+    for weight in ('abc', [1, 2], {'a': 1}):
+        response = client.post('/api/trends', json={'sessions': [sessions[0], dict(sessions[1], weight=weight)]})
+        assert response.status_code == 400
+        body = response.get_json()
+        assert body['index'] == 1 and body['error_codes'] == [{'field': 'weight', 'code': 'invalid_type'}]
+    numeric_text = [dict(record, weight=str(record['weight'])) for record in sessions]
+    assert client.post('/api/trends', json={'sessions': numeric_text}).status_code == 200
+
+
+def test_athlete_route(client):
+    for record in season(3, 3):
+        body = dict(record)
+        assert client.post('/api/athletes/trend-route/measurements', json=body).status_code == 201
+    data = client.get('/api/athletes/trend-route/trends').get_json()
+    assert data['success'] and len(data['sessions']) == 3
+    assert client.get('/api/athletes/nobody/trends').status_code == 404
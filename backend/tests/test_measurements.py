@@ -0,0 +1,29 @@
+"""
+Rutas del historial de mediciones (routes/measurement_routes.py).
+"""
+
+import pytest
+
+MEASUREMENTS = {'gender': 'F', 'age': 27, 'weight': 61, 'height': 168, 'waist': 70, 'hip': 96}
+
+
+def test_measurement_crud(client):
+    response = client.post('/api/athletes/crud/measurements', json=dict(MEASUREMENTS, session_date='2024-02-01'))
+    assert response.status_code == 201
+    measurement = response.get_json()['measurement']
+
+    updated = client.put(f"/api/measurements/{measurement['id']}", json=dict(MEASUREMENTS, weight=62))
+    assert updated.status_code == 200
+    assert updated.get_json()['measurement']['results']['bmi'] != measurement['results']['bmi']
+
+    assert client.delete(f"/api/measurements/{measurement['id']}").status_code == 200
+    assert client.get(f"/api/measurements/{measurement['id']}").status_code == 404
+
+
+@pytest.mark.parametrize('body', [5, 'x', [1]])
+def test_malformed_bodies_are_rejected(client, body):
+    created = client.post('/api/athletes/malformed/measurements', json=dict(MEASUREMENTS, session_date='2024-02-01'))
+    measurement_id = created.get_json()['measurement']['id']
+
+    assert client.post('/api/athletes/malformed/measurements', json=body).status_code == 400
+    assert client.put(f'/api/measurements/{measurement_id}', json=body).status_code == 400
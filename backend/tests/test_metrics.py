@@ -0,0 +1,97 @@
+"""
+Métricas de la API (utils/metrics.py) en el formato de texto de Prometheus.
+"""
+
+import re
+
+from utils.metrics import COUNTER, GAUGE, HISTOGRAM, merge_snapshots, render_prometheus
+
+VALID = {'gender': 'M', 'age': 30, 'weight': 75, 'height': 180, 'waist': 82, 'hip': 98}
+
+# Línea de muestra: nombre{etiquetas} valor
+SAMPLE = re.compile(r'^(anthrocalc_[a-z_]+)(\{[a-z_]+="(?:[^"\\]|\\.)*"(?:,[a-z_]+="(?:[^"\\]|\\.)*")*\})? (\S+)$')
+
+
+def parse_exposition(text):
+    """Comprueba la estructura del texto y devuelve {(nombre, etiquetas): valor} y los tipos."""
+    assert text.endswith('\n')
+    samples, types, helped = {}, {}, set()
+    for line in text.splitlines():
+        if line.startswith('# HELP '):
+            helped.add(line.split(' ')[2])
+            continue
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split(' ')
+            assert name in helped and name not in types
+            types[name] = kind
+            continue
+        match = SAMPLE.match(line)
+        assert match, line
+        name, labels, value = match.groups()
+        family = re.sub(r'_(bucket|sum|count)$', '', name) if name not in types else name
+        assert family in types, line
+        samples[(name, labels or '')] = float(value)
+    return samples, types
+
+
+def test_metrics_endpoint_exposition(client):
+    # Las peticiones se registran al cerrar la respuesta
+    client.post('/api/calculate', json=VALID).close()
+    client.post('/api/calculate', json={'gender': 'M'}).close()
+    response = client.get('/api/metrics')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain' and response.mimetype_params['version'] == '0.0.4'
+    samples, types = parse_exposition(response.get_data(as_text=True))
+    assert types['anthrocalc_http_requests_total'] == 'counter'
+    assert types['anthrocalc_http_request_duration_seconds'] == 'histogram'
+    assert samples[(
+        'anthrocalc_http_requests_total', '{route="/api/calculate",method="POST",status="200"}'
+    )] >= 1
+    assert samples[('anthrocalc_validation_failures_total', '{field="age",code="required"}')] >= 1
+
+    # Los buckets son acumulativos y el de +Inf coincide con _count
+    labels = 'route="/api/calculate",method="POST"'
+    buckets = [
+        value for (name, sample_labels), value in samples.items()
+        if name == 'anthrocalc_http_request_duration_seconds_bucket' and sample_labels.startswith('{' + labels)
+    ]
+    assert buckets == sorted(buckets)
+    assert samples[('anthrocalc_http_request_duration_seconds_bucket', '{' + labels + ',le="+Inf"}')] == samples[
+        ('anthrocalc_http_request_duration_seconds_count', '{' + labels + '}')
+    ]
+
+
+def test_render_merges_processes_and_escapes_labels():
+    definitions = {
+        'hits_total': (COUNTER, "Aciertos", None),
+        'open_files': (GAUGE, "Ficheros abiertos", None),
+        'latency_seconds': (HISTOGRAM, "Latencia", (0.1, 1.0)),
+    }
+    snapshot = {
+        "counters": [['hits_total', [['path', 'a"b\\c\nd']], 2]],
+        "gauges": [['open_files', [], 3]],
+        "histograms": [['latency_seconds', [], [1, 2, 0], 1.5, 3]],
+    }
+    merged = merge_snapshots([(snapshot, True), (snapshot, False)])
+    text = render_prometheus(merged, dict(definitions, worker_processes=(GAUGE, "Procesos", None)))
+
+    assert text.splitlines() == [
+        '# HELP anthrocalc_hits_total Aciertos',
+        '# TYPE anthrocalc_hits_total counter',
+        'anthrocalc_hits_total{path="a\\"b\\\\c\\nd"} 4',
+        # Los indicadores de los procesos terminados no se suman
+        '# HELP anthrocalc_open_files Ficheros abiertos',
+        '# TYPE anthrocalc_open_files gauge',
+        'anthrocalc_open_files 3',
+        '# HELP anthrocalc_latency_seconds Latencia',
+        '# TYPE anthrocalc_latency_seconds histogram',
+        'anthrocalc_latency_seconds_bucket{le="0.1"} 2',
+        'anthrocalc_latency_seconds_bucket{le="1.0"} 6',
+        'anthrocalc_latency_seconds_bucket{le="+Inf"} 6',
+        'anthrocalc_latency_seconds_sum 3.0',
+        'anthrocalc_latency_seconds_count 6',
+        '# HELP anthrocalc_worker_processes Procesos',
+        '# TYPE anthrocalc_worker_processes gauge',
+        'anthrocalc_worker_processes 1',
+    ]
@@ -0,0 +1,111 @@
+"""
+Simulador de proyección de la composición corporal (utils/projection.py).
+"""
+
+import pytest
+
+from tests.synthetic import synthetic_cohort
+from utils.calculators import process_anthropometric_data
+from utils.metrics import registry as metrics
+from utils.projection import (
+    PROJECTION_METRICS,
+    maintenance_energy,
+    parse_projection_options,
+    prescribed_balance,
+    project_athletes,
+    simulate,
+    simulate_batch,
+)
+
+np = pytest.importorskip('numpy')
+
+
+def adults(size):
+    return [dict(record, age=max(record['age'], 18)) for record in synthetic_cohort(size)]
+
+
+def test_batch_matches_scalar():
+    rng = np.random.default_rng(3)
+    weight = rng.uniform(50, 110, 20)
+    fat_mass = weight * rng.uniform(0.06, 0.35, 20)
+    height = rng.uniform(155, 200, 20)
+    balance = rng.uniform(-1000, 800, (20, 4))
+    batch = simulate_batch(weight, fat_mass, height, balance, 12)
+    for a in range(20):
+        for s in range(4):
+            reference = simulate(weight[a], fat_mass[a], height[a], balance[a, s], 12)
+            for name in PROJECTION_METRICS:
+                assert batch[name][:, a, s].tolist() == reference[name]
+
+
+def test_energy_partitioning():
+    steady = simulate(80.0, 16.0, 180, 0, 8)
+    assert steady['weight'] == [80.0] * 9
+
+    lean = simulate(80.0, 8.0, 180, -500, 8)
+    fat = simulate(80.0, 24.0, 180, -500, 8)
+    # Forbes: cuanta menos grasa, mayor parte del peso perdido es masa libre de grasa
+    lean_share = (lean['fat_free_mass'][0] - lean['fat_free_mass'][-1]) / (lean['weight'][0] - lean['weight'][-1])
+    fat_share = (fat['fat_free_mass'][0] - fat['fat_free_mass'][-1]) / (fat['weight'][0] - fat['weight'][-1])
+    assert lean_share > fat_share
+    # La adaptación del gasto reduce la pérdida semanal
+    losses = np.diff(fat['weight'])
+    assert all(losses < 0) and losses[-1] > losses[0]
+
+    gain = simulate(70.0, 10.0, 175, 400, 8)
+    assert gain['weight'][-1] > 70 and gain['fat_free_mass'][-1] > gain['fat_free_mass'][0]
+
+
+def test_prescribed_balance():
+    maintenance = maintenance_energy(60, 1.5)
+    assert maintenance == pytest.approx((370 + 21.6 * 60) * 1.5)
+    assert prescribed_balance({'caloric_deficit': 15}, maintenance) == pytest.approx(-0.15 * maintenance)
+    assert prescribed_balance({'caloric_surplus': 350}, maintenance) == 350
+    assert prescribed_balance({'caloric_strategy': '...'}, maintenance) == 0
+
+
+def test_project_athletes():
+    records = adults(6) + [dict(synthetic_cohort(1)[0], age=14), {'gender': 'M'}]
+    options = parse_projection_options({'balances': [-500, 0], 'balance_percent': [-10], 'horizons': [4, 8]})
+    outputs = project_athletes(records, options)
+    assert [output['success'] for output in outputs] == [True] * 6 + [False, False]
+
+    output = outputs[0]
+    result = process_anthropometric_data(records[0])
+    assert output['goal'] == result['goal']['primary_goal']
+    assert [scenario['scenario'] for scenario in output['scenarios']] == ['prescribed', '-500 kcal', '+0 kcal', '-10 %']
+    scenario = output['scenarios'][1]
+    assert scenario['weeks'] == list(range(9)) and scenario['balance_kcal'] == -500
+    assert scenario['weight'][0] == records[0]['weight'] and scenario['fat_mass'][0] == result['fat_mass']
+    horizon = scenario['horizons'][-1]
+    assert horizon['week'] == 8 and horizon['weight'] == scenario['weight'][8]
+    assert horizon['change']['weight'] == round(scenario['weight'][8] - scenario['weight'][0], 2)
+    assert output['scenarios'][3]['balance_kcal'] == round(-0.1 * output['maintenance_kcal'])
+
+    # La proyección no cuenta como lote de /api/calculate/batch
+    before = [item for item in metrics.snapshot()['counters'] if item[0] == 'batch_records_total']
+    project_athletes([dict(records[0], age='30')], options)
+    assert [item for item in metrics.snapshot()['counters'] if item[0] == 'batch_records_total'] == before
+
+    with pytest.raises(ValueError):
+        parse_projection_options({'horizons': [0]})
+    with pytest.raises(ValueError):
+        parse_projection_options({'prescribed': False})
+
+
+def test_projection_route(client):
+    record = adults(1)[0]
+    single = client.post('/api/projection', json=dict(record, balances=[-300]))
+    assert single.status_code == 200
+    assert [horizon['week'] for horizon in single.get_json()['scenarios'][0]['horizons']] == [8, 12, 16]
+
+    squad = client.post('/api/projection', json={'athletes': adults(5), 'balance_percent': [-20, -10], 'horizons': [12]})
+    data = squad.get_json()
+    assert data['success'] and len(data['athletes']) == 5 and data['horizons'] == [12]
+
+    assert client.post('/api/projection', json=dict(record, age=15)).status_code == 400
+    lean = dict(record, gender='M', age=20, weight=50, chest_fold=3, abdomen_fold=3, thigh_fold=3)
+    response = client.post('/api/projection', json=lean)
+    assert response.status_code == 400 and 'mínimo del modelo' in response.get_json()['error']
+    assert client.post('/api/projection', json=dict(record, balances=[5000])).status_code == 400
+    assert client.post('/api/projection', json={'athletes': []}).status_code == 400
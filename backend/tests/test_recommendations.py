@@ -0,0 +1,141 @@
+"""
+Recomendaciones personalizadas a partir del fichero de reglas (utils/recommendations.py).
+"""
+
+import copy
+import json
+import random
+
+import pytest
+
+from tests.synthetic import synthetic_cohort
+from utils.batch_calculators import process_anthropometric_batch, records_to_columns
+from utils.batch_io import columnar_batch_results, process_record_chunk
+from utils.calculators import GOAL_HYPERTROPHY, GOAL_PROFILES, process_anthropometric_data
+from utils.recommendations import RULES_PATH, RuleSet, load_rules
+
+np = pytest.importorskip('numpy')
+
+SPORTS = ('Rowing', 'judo', 'natación', 'tennis', '', None)
+HOURS = (None, 0, 3.5, 4, 8, 10, 14.9, 15, 40)
+
+
+def athletes(size):
+    rng = random.Random(11)
+    records = []
+    for record in synthetic_cohort(size):
+        record = dict(record, sport=rng.choice(SPORTS))
+        hours = rng.choice(HOURS)
+        if hours is not None:
+            record['training_hours'] = hours
+        records.append(record)
+    return records
+
+
+def source():
+    with open(RULES_PATH, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def test_batch_matches_scalar():
+    rules = load_rules()
+    records = athletes(1500)
+    columns = records_to_columns(records)
+    batch = rules.recommend_batch(records, columns, process_anthropometric_batch(columns))
+    recommended = 0
+    for index, record in enumerate(records):
+        results = process_anthropometric_data(record)
+        if results.get('fat_free_mass') is None:
+            assert batch['rules'][index] is None and batch['errors'][index]
+            continue
+        reference = rules.recommend(record, results)
+        assert batch['rules'][index] == reference['rules']
+        assert {name: values[index] for name, values in batch['targets'].items()} == reference['targets']
+        recommended += 1
+    assert recommended > 1000
+
+
+def test_rules_apply_in_order():
+    rules = load_rules()
+    record = next(
+        record for record in synthetic_cohort(200)
+        if process_anthropometric_data(record).get('goal', {}).get('primary_goal')
+        == GOAL_PROFILES[GOAL_HYPERTROPHY]['primary_goal']
+    )
+    record = dict(record, gender='M', sport='Remo', training_hours=16)
+    result = rules.recommend(record, process_anthropometric_data(record))
+    assert result['rules'] == ['base', 'goal-hypertrophy', 'volume-high', 'volume-very-high', 'sport-endurance']
+    targets = result['targets']
+    # Las reglas posteriores prevalecen en 'set' y se acumulan en 'add': 5 + 1 + 1 + 1 g/kg
+    assert targets['activity_factor'] == 2.0
+    assert targets['carbohydrate_g'] == round(8 * record['weight'])
+    assert targets['meals_per_day'] == 5 and targets['hydration_ml_per_training_hour'] == 800
+    assert targets['energy_kcal'] == targets['maintenance_kcal'] + targets['energy_balance_kcal']
+    assert targets['energy_balance_kcal'] >= 300
+    assert any('800 ml' in text for text in result['recommendations']['nutrition'])
+
+
+def test_youth_and_validation():
+    rules = load_rules()
+    record = dict(next(record for record in synthetic_cohort(500) if record['age'] < 18), sport='Judo')
+    result = rules.recommend(record, process_anthropometric_data(record))
+    assert 'goal-youth' in result['rules'] and 'youth-weight-class' in result['rules']
+    assert result['targets']['energy_balance_kcal'] == 0
+    assert len(result['recommendations']['notes']) == 3
+
+    with pytest.raises(ValueError):
+        rules.recommend(dict(record, training_hours=41), process_anthropometric_data(record))
+    with pytest.raises(ValueError):
+        rules.recommend(dict(record, training_hours=True), process_anthropometric_data(record))
+    without_folds = {name: record[name] for name in ('weight', 'height', 'age', 'gender', 'waist', 'hip')}
+    with pytest.raises(ValueError):
+        rules.recommend(without_folds, process_anthropometric_data(without_folds))
+
+
+@pytest.mark.parametrize('change, message', [
+    (lambda rules: rules[1]['when'].update(goal=['bulking']), 'objetivos desconocidos'),
+    (lambda rules: rules[1]['when'].update(shoe_size={'min': 40}), 'condición desconocida'),
+    (lambda rules: rules[1]['set'].update(creatine_g=5), 'parámetros desconocidos'),
+    (lambda rules: rules[0]['advice']['nutrition'].append('{energy}'), 'cantidades desconocidas'),
+    (lambda rules: rules[0]['advice']['nutrition'].append('{fat_g:.1q}'), 'texto no válido'),
+])
+def test_invalid_rules(change, message):
+    invalid = copy.deepcopy(source())
+    change(invalid['rules'])
+    with pytest.raises(ValueError, match=message):
+        RuleSet(invalid)
+
+
+def test_batch_io_with_rules():
+    rules = load_rules()
+    records = athletes(40)
+    records[3] = dict(records[3], training_hours='mucho')
+    results = process_record_chunk([(record, None) for record in records], rules)
+    assert 'error' in results[3]['recommendations']
+    reference = rules.recommend(records[0], process_anthropometric_data(records[0]))
+    assert results[0]['recommendations'] == {'targets': reference['targets'], 'rules': reference['rules']}
+
+    columnar = columnar_batch_results([(record, None) for record in records], 16, 100, rules)
+    assert columnar['rules_version'] == rules.version
+    assert columnar['columns']['targets']['energy_kcal'][0] == reference['targets']['energy_kcal']
+    assert columnar['columns']['recommendation_rules'][3] is None
+
+
+def test_recommendation_routes(client):
+    record = dict(athletes(1)[0], sport='rowing', training_hours=12)
+    response = client.post('/api/recommendations', json={'measurements': record})
+    data = response.get_json()
+    assert response.status_code == 200 and data['rules_version'] == load_rules().version
+    assert 'volume-high' in data['rules'] and data['targets']['training_hours'] == 12.0
+
+    legacy = client.post('/api/recommendations', json={'goal': data['goal']}).get_json()
+    assert legacy['success'] and 'nutrition' in legacy['recommendations']
+
+    invalid = client.post('/api/recommendations', json={'measurements': dict(record, training_hours=-1)})
+    assert invalid.status_code == 400
+    assert client.post('/api/recommendations', json={'measurements': {'weight': 70}}).status_code == 400
+    for body in (5, 'goal', [record], {'goal': 'muscle_gain'}, {'goal': ['muscle_gain']}):
+        assert client.post('/api/recommendations', json=body).status_code == 400
+
+    lines = client.post('/api/calculate/batch?recommendations=1', json=[record]).data.decode().splitlines()
+    assert json.loads(lines[0])['recommendations']['targets'] == data['targets']
@@ -0,0 +1,56 @@
+"""
+Mediciones repetidas según el protocolo ISAK (utils/repeated_measures.py).
+"""
+
+import math
+
+import pytest
+
+from utils.repeated_measures import process_repeated_session
+
+np = pytest.importorskip('numpy')
+
+# Pliegue tricipital (mm) de cuatro atletas medido dos veces
+TRICEPS = [[10.0, 10.4], [12.2, 12.0], [8.6, 8.6], [15.0, 15.6]]
+
+
+def test_tem_and_cv_match_hand_computed_example():
+    athletes = [{'id': index, 'triceps_fold': repeats} for index, repeats in enumerate(TRICEPS)]
+    session = process_repeated_session(athletes, calculate=False)
+
+    # ETM = sqrt(Σd² / 2n) = sqrt((0,4² + 0,2² + 0² + 0,6²) / 8) = sqrt(0,07)
+    tem = math.sqrt(0.07)
+    # Media de las 8 mediciones: 92,4 / 8 = 11,55 mm
+    summary = session['sites']['triceps_fold']
+    assert summary['tem'] == round(tem, 3) == 0.265
+    assert summary['tem_percent'] == round(tem / 11.55 * 100, 2) == 2.29
+    assert summary['athletes'] == summary['repeated_athletes'] == 4
+    assert summary['tolerance_percent'] == 5.0 and summary['third_needed'] == 0
+
+    # Con dos repeticiones, DE = |d| / √2: 0,4 / √2 / 10,2 = 2,77 %
+    first = session['athletes'][0]['sites']['triceps_fold']
+    assert first['selected'] == 10.2 and first['method'] == 'mean'
+    assert first['cv'] == round(0.4 / math.sqrt(2) / 10.2 * 100, 2) == 2.77
+    assert first['difference_percent'] == round(0.4 / 10.2 * 100, 2) == 3.92
+    assert session['athletes'][2]['sites']['triceps_fold']['cv'] == 0.0
+    # CV medio: (2,77 + 1,17 + 0 + 2,77) / 4 sin redondear
+    cvs = [abs(a - b) / math.sqrt(2) / ((a + b) / 2) * 100 for a, b in TRICEPS]
+    assert summary['mean_cv'] == round(sum(cvs) / 4, 2)
+
+
+def test_third_measure_and_median():
+    athletes = [
+        # 10 y 11 difieren un 9,5 % (> 5 %): hace falta una tercera
+        {'id': 'a', 'triceps_fold': [10.0, 11.0], 'weight': [70.0, 70.2]},
+        # Con tres repeticiones se toma la mediana
+        {'id': 'b', 'triceps_fold': [10.0, 11.0, 10.4], 'weight': [80.0]},
+    ]
+    session = process_repeated_session(athletes, calculate=False)
+    a, b = session['athletes']
+    assert a['third_measure_needed'] == ['triceps_fold']
+    # El peso tiene una tolerancia del 1 %: 0,2 / 70,1 = 0,29 %
+    assert not a['sites']['weight']['third_measure_needed'] and a['sites']['weight']['selected'] == 70.1
+    assert b['sites']['triceps_fold']['selected'] == 10.4 and b['sites']['triceps_fold']['method'] == 'median'
+    assert b['sites']['weight']['method'] == 'single' and b['sites']['weight']['cv'] is None
+    assert session['sites']['triceps_fold']['third_needed'] == 1
+    assert session['sites']['weight']['repeated_athletes'] == 1
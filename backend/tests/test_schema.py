@@ -0,0 +1,69 @@
+"""
+Esquema de validación (utils/schema.py): la ruta por registro y la
+vectorizada dan los mismos errores.
+"""
+
+import pytest
+
+from utils.batch_calculators import records_to_columns
+from utils.batch_io import process_record_chunk
+from utils.schema import decode_errors, validate_columns, validate_record
+from utils.validators import is_valid_circumference
+
+BASE = {'gender': 'M', 'age': 30, 'weight': 70, 'height': 175, 'waist': 80, 'hip': 95, 'triceps_fold': 10}
+
+
+def error_codes(error_bits):
+    return [(error['field'], error['code']) for error in decode_errors(error_bits)]
+
+
+@pytest.mark.parametrize('selection', [
+    {'equation': ['jackson_pollock_3']},
+    {'equation': 5},
+    {'conversion': {'name': 'siri'}},
+    {'equation': 'durnin_womersley', 'conversion': ['siri']},
+])
+def test_non_string_equation_is_rejected(selection):
+    record = dict(BASE, **selection)
+    _, error_bits = validate_record(record)
+    assert error_codes(error_bits) == [('equation_type', 'invalid_equation')]
+    assert int(validate_columns(records_to_columns([record]))[0]) == error_bits
+
+
+def test_unknown_equation_is_an_invalid_choice():
+    _, error_bits = validate_record(dict(BASE, equation='unknown'))
+    assert error_codes(error_bits) == [('equation', 'invalid_choice')]
+
+
+def test_calculate_rejects_non_string_equation(client):
+    response = client.post('/api/calculate', json=dict(BASE, equation=['jackson_pollock_3']))
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body['error_codes'] == [{'field': 'equation_type', 'code': 'invalid_equation'}]
+
+
+@pytest.mark.parametrize('body', [5, 'x', [BASE], True])
+def test_calculate_rejects_non_object_body(client, body):
+    response = client.post('/api/calculate', json=body)
+    assert response.status_code == 400 and response.get_json()['success'] is False
+
+
+def test_batch_validates_like_calculate(client):
+    numeric_text = {name: str(value) for name, value in BASE.items()}
+    records = [numeric_text, dict(BASE, weight='n/a'), dict(BASE, equation=['siri'])]
+    results = process_record_chunk([(record, None) for record in records])
+
+    for record, result in zip(records, results):
+        expected = client.post('/api/calculate', json=record).get_json()
+        assert result == expected
+    assert results[0]['success']
+    assert results[1]['error_codes'] == [{'field': 'weight', 'code': 'invalid_type'}]
+
+
+@pytest.mark.parametrize('field', ['waist', 'hip'])
+@pytest.mark.parametrize('value', [30, 49.9, 50, 120, 200, 200.1])
+def test_circumference_validator_uses_schema_range(field, value):
+    record = dict(BASE, waist=60, hip=100)
+    record[field] = value
+    _, error_bits = validate_record(record)
+    assert is_valid_circumference(value, field) == ((field, 'out_of_range') not in error_codes(error_bits))
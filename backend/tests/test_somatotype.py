@@ -0,0 +1,109 @@
+"""
+Somatotipo de Heath-Carter y fraccionamiento de Kerr: equivalencia de las
+versiones escalar y vectorizada, y matriz SAD frente a la distancia escalar.
+"""
+
+import random
+
+import pytest
+
+from tests.test_golden import assert_identical
+from utils.somatotype import (
+    KERR_FIELDS,
+    process_somatotype,
+    process_somatotype_batch,
+    sad_matrix,
+    somatotype_attitudinal_distance,
+    somatotype_attitudinal_mean,
+)
+
+np = pytest.importorskip('numpy')
+
+REFERENCE = {
+    'gender': 'M', 'age': 25, 'weight': 75, 'height': 178, 'waist': 80, 'hip': 95,
+    'triceps_fold': 8, 'subscapular_fold': 10, 'supraspinale_fold': 7,
+    'abdomen_fold': 14, 'thigh_fold': 11, 'calf_fold': 6,
+    'arm_relaxed_girth': 31, 'arm_flexed_girth': 34, 'forearm_girth': 27.5, 'chest_girth': 98,
+    'thigh_girth': 56, 'calf_girth': 37.5, 'head_girth': 57,
+    'humerus_breadth': 7.0, 'femur_breadth': 9.8, 'biacromial_breadth': 41, 'biiliocristal_breadth': 28,
+    'chest_breadth': 29, 'chest_depth': 20, 'sitting_height': 92,
+}
+
+
+def squad(size, seed=11):
+    """Equipo sintético con medidas ausentes, fuera de rango y no numéricas."""
+    rng = random.Random(seed)
+    athletes = []
+    for _ in range(size):
+        athlete = {
+            name: round(value * rng.uniform(0.8, 1.2), 1) if isinstance(value, (int, float)) else value
+            for name, value in REFERENCE.items()
+        }
+        athlete['gender'] = rng.choice('MF')
+        athlete['age'] = rng.randint(8, 60)
+        if rng.random() < 0.1:
+            athlete.pop(rng.choice(KERR_FIELDS))
+        if rng.random() < 0.03:
+            athlete['femur_breadth'] = 50
+        if rng.random() < 0.02:
+            athlete['calf_girth'] = 'x'
+        athletes.append(athlete)
+    return athletes
+
+
+def test_reference_somatotype():
+    result = process_somatotype(REFERENCE)
+    assert result['somatotype'] == {
+        'endomorphy': 2.38, 'mesomorphy': 5.26, 'ectomorphy': 2.32, 'x': -0.06, 'y': 5.82
+    }
+    kerr = result['kerr']
+    assert sum(kerr['masses'].values()) == pytest.approx(kerr['predicted_mass'], abs=0.05)
+    assert sum(kerr['percentages'].values()) == pytest.approx(100, abs=0.05)
+
+
+def test_missing_measurements():
+    record = {name: value for name, value in REFERENCE.items() if name != 'sitting_height'}
+    result = process_somatotype(record)
+    assert result['success'] and result['somatotype'] is not None
+    assert result['kerr'] is None
+    assert result['missing_fields'] == {'kerr': ['sitting_height']}
+
+
+def test_batch_matches_scalar():
+    athletes = squad(3000)
+    assert_identical(athletes, [process_somatotype(athlete) for athlete in athletes], process_somatotype_batch(athletes))
+
+
+def test_sad_matrix_matches_scalar():
+    ratings = np.random.default_rng(3).uniform(0.1, 8, (700, 3))
+    matrix = sad_matrix(ratings, block_rows=64)
+    assert matrix.shape == (700, 700)
+    assert np.allclose(matrix, matrix.T) and not matrix.diagonal().any()
+    for i, j in ((0, 1), (5, 699), (350, 64)):
+        assert matrix[i, j] == pytest.approx(somatotype_attitudinal_distance(ratings[i], ratings[j]), abs=1e-12)
+
+
+def test_attitudinal_mean_ignores_missing():
+    ratings = [(2.0, 5.0, 2.0), (4.0, 3.0, 2.0), (float('nan'),) * 3]
+    mean, sam, distances = somatotype_attitudinal_mean(ratings)
+    assert mean == (3.0, 4.0, 2.0)
+    assert sam == pytest.approx(2 ** 0.5)
+    assert np.isnan(distances[2])
+
+
+def test_squad_route(client):
+    response = client.post('/api/somatotype/squad', json={'athletes': squad(20)})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert len(data['sad_matrix']) == 20 and data['sam'] is not None
+    assert client.post('/api/somatotype/squad', json={'athletes': 'x'}).status_code == 400
+
+
+def test_single_route(client):
+    response = client.post('/api/somatotype', json=REFERENCE)
+    assert response.status_code == 200 and response.get_json()['somatotype']['mesomorphy'] == 5.26
+    response = client.post('/api/somatotype', json=dict(REFERENCE, femur_breadth=50))
+    assert response.status_code == 400
+    body = response.get_json()
+    assert not body['success'] and body['error_codes'] == [{'field': 'femur_breadth', 'code': 'out_of_range'}]
+    assert client.post('/api/somatotype', json=[REFERENCE]).status_code == 400
@@ -0,0 +1,54 @@
+"""
+Sincronización de las mediciones guardadas sin conexión en el frontend
+(POST /api/measurements/sync).
+"""
+
+from tests.synthetic import synthetic_cohort
+from utils.calculators import CALCULATION_VERSION, process_anthropometric_data
+
+
+def offline_measurements(count, athlete_id='sync-athlete'):
+    return [
+        dict(record, athlete_id=athlete_id, session_date=f"2024-03-{index + 1:02d}")
+        for index, record in enumerate(synthetic_cohort(count))
+    ]
+
+
+def test_sync_is_idempotent(client):
+    measurements = offline_measurements(6)
+    measurements[2] = dict(measurements[2], weight='n/a')
+    body = {'client_id': 'device-1', 'start': 0, 'measurements': measurements}
+
+    first = client.post('/api/measurements/sync', json=body).get_json()
+    assert first['success'] and first['calculation_version'] == CALCULATION_VERSION
+    assert first['synced'] == 5
+    assert [item['seq'] for item in first['rejected']] == [2]
+    assert first['rejected'][0]['errors'] == ['Valor no numérico en el campo: weight']
+    assert first['rejected'][0]['error_codes'] == [{'field': 'weight', 'code': 'invalid_type'}]
+
+    # Reenviar el bloque (p. ej. tras perder la respuesta) y seguir con el siguiente
+    assert client.post('/api/measurements/sync', json=body).get_json() == first
+    following = {'client_id': 'device-1', 'start': 6, 'measurements': offline_measurements(2)[1:]}
+    assert client.post('/api/measurements/sync', json=following).get_json()['synced'] == 1
+
+    history = client.get('/api/athletes/sync-athlete/measurements').get_json()['measurements']
+    assert len(history) == 6
+    # Los resultados guardados son los del servidor
+    stored = next(item for item in history if item['session_date'] == '2024-03-01')
+    expected = {key: value for key, value in measurements[0].items() if key not in ('athlete_id', 'session_date')}
+    assert stored['results'] == process_anthropometric_data(expected)
+
+
+def test_sync_rejects_invalid_requests(client):
+    measurements = offline_measurements(1)
+    assert client.post('/api/measurements/sync', json={'start': 0, 'measurements': measurements}).status_code == 400
+    assert client.post('/api/measurements/sync', json={
+        'client_id': 'device-2', 'start': -1, 'measurements': measurements
+    }).status_code == 400
+    assert client.post('/api/measurements/sync', json={
+        'client_id': 'device-2', 'start': 0, 'measurements': [1]
+    }).status_code == 400
+    too_many = [measurements[0]] * (client.application.config['SYNC_MAX_MEASUREMENTS'] + 1)
+    assert client.post('/api/measurements/sync', json={
+        'client_id': 'device-2', 'start': 0, 'measurements': too_many
+    }).status_code == 413
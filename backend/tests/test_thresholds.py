@@ -0,0 +1,69 @@
+"""
+Umbrales de clasificación (utils/thresholds.py): los valores en los puntos
+de corte caen en el tramo que indica el lado cerrado de cada métrica, igual
+en la ruta escalar y en la vectorizada.
+"""
+
+import pytest
+
+from utils.thresholds import STATUS_NAMES, classify, classify_batch, optimal_range
+
+np = pytest.importorskip('numpy')
+
+# (métrica, valor, género, edad, estado esperado)
+BOUNDARIES = [
+    # IMC: intervalos [a, b)
+    ('bmi', 18.49, 'M', 30, 'alert'),
+    ('bmi', 18.5, 'M', 30, 'optimal'),
+    ('bmi', 24.99, 'F', 30, 'optimal'),
+    ('bmi', 25.0, 'F', 30, 'warning'),
+    ('bmi', 30.0, 'M', 30, 'alert'),
+    # Índice cintura-cadera: intervalos (a, b]
+    ('waist_hip_ratio', 0.90, 'M', 30, 'optimal'),
+    ('waist_hip_ratio', 0.9001, 'M', 30, 'warning'),
+    ('waist_hip_ratio', 1.0, 'M', 30, 'warning'),
+    ('waist_hip_ratio', 0.85, 'F', 30, 'optimal'),
+    ('waist_hip_ratio', 0.95, 'F', 30, 'warning'),
+    ('waist_hip_ratio', 0.9501, 'F', 30, 'alert'),
+    ('waist_height_ratio', 0.5, 'F', 30, 'optimal'),
+    ('waist_height_ratio', 0.6, 'F', 30, 'warning'),
+    # % de grasa: [a, b) y franjas de edad que empiezan a los 40 y a los 60
+    ('body_fat_percentage', 8.0, 'M', 25, 'optimal'),
+    ('body_fat_percentage', 20.0, 'M', 39.9, 'warning'),
+    ('body_fat_percentage', 20.0, 'M', 40, 'optimal'),
+    ('body_fat_percentage', 10.9, 'M', 40, 'alert'),
+    ('body_fat_percentage', 24.9, 'M', 60, 'optimal'),
+    ('body_fat_percentage', 25.0, 'M', 60, 'warning'),
+    ('body_fat_percentage', 33.0, 'F', 59, 'alert'),
+    ('body_fat_percentage', 33.0, 'F', 60, 'warning'),
+    # FFMI: por debajo del tramo óptimo primero hay precaución y luego alerta
+    ('fat_free_mass_index', 16.99, 'M', 30, 'alert'),
+    ('fat_free_mass_index', 17.0, 'M', 30, 'warning'),
+    ('fat_free_mass_index', 15.0, 'F', 30, 'optimal'),
+    ('fat_free_mass_index', 22.0, 'F', 30, 'warning'),
+]
+
+
+@pytest.mark.parametrize('metric, value, gender, age, expected', BOUNDARIES)
+def test_boundary_classification(metric, value, gender, age, expected):
+    assert classify(metric, value, gender, age) == expected
+
+
+def test_batch_classifies_boundaries_like_scalar():
+    for metric in {row[0] for row in BOUNDARIES}:
+        rows = [row for row in BOUNDARIES if row[0] == metric]
+        codes = classify_batch(
+            metric,
+            np.array([row[1] for row in rows] + [np.nan]),
+            np.array([row[2] for row in rows] + ['M'], dtype=object),
+            np.array([row[3] for row in rows] + [30], dtype=float),
+        )
+        assert [STATUS_NAMES[code] for code in codes[:-1]] == [row[4] for row in rows]
+        assert codes[-1] == -1
+
+
+def test_optimal_range_follows_age_band():
+    assert optimal_range('body_fat_percentage', 'M') == (8.0, 20.0)
+    assert optimal_range('body_fat_percentage', 'M', 40) == (11.0, 22.0)
+    assert optimal_range('body_fat_percentage', 'F', 65) == (18.0, 29.0)
+    assert optimal_range('waist_hip_ratio', 'F') == (None, 0.85)
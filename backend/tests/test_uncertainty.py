@@ -0,0 +1,68 @@
+"""
+Propagación de la incertidumbre de medida por Monte Carlo (utils/uncertainty.py).
+"""
+
+import pytest
+
+from tests.synthetic import synthetic_cohort
+from utils.calculators import process_anthropometric_data
+from utils.equations import FOLD_SITES
+from utils.uncertainty import UNCERTAINTY_METRICS, estimate_uncertainty, parse_uncertainty_options
+
+pytest.importorskip('numpy')
+
+
+@pytest.fixture(scope='module')
+def athlete():
+    record = synthetic_cohort(1)[0]
+    return record, process_anthropometric_data(record)
+
+
+def test_zero_error_collapses_to_point_estimate(athlete):
+    record, result = athlete
+    zero = {name: 0 for name in ('weight', 'height', 'waist', 'hip') + FOLD_SITES}
+    options = parse_uncertainty_options({'samples': 50, 'tem_percent': zero}, 5000)
+    uncertainty = estimate_uncertainty(record, result, options)
+    assert uncertainty['valid_samples'] == 50
+    assert uncertainty['goal']['flip_probability'] == 0
+    for metric in UNCERTAINTY_METRICS:
+        interval = uncertainty['intervals'][metric]
+        assert interval['low'] == interval['high'] == result[metric]
+        assert interval['sd'] == 0
+
+
+def test_reproducible_and_wider_with_larger_error(athlete):
+    record, result = athlete
+    options = parse_uncertainty_options({'samples': 2000, 'seed': 4}, 5000)
+    first = estimate_uncertainty(record, result, options)
+    assert first == estimate_uncertainty(record, result, options)
+
+    noisy = parse_uncertainty_options({'samples': 2000, 'seed': 4, 'tem': {'thigh_fold': 3.0}}, 5000)
+    second = estimate_uncertainty(record, result, noisy)
+    assert second['intervals']['body_fat_percentage']['sd'] > first['intervals']['body_fat_percentage']['sd']
+    interval = first['intervals']['body_fat_percentage']
+    assert interval['low'] <= result['body_fat_percentage'] <= interval['high']
+    assert sum(second['goal']['distribution'].values()) == pytest.approx(1, abs=1e-3)
+
+
+@pytest.mark.parametrize('options', [
+    'yes', {'samples': 1}, {'samples': 10.5}, {'confidence': 1}, {'seed': -1},
+    {'tem': {'unknown_fold': 1}}, {'tem_percent': {'weight': -1}},
+])
+def test_invalid_options(options):
+    with pytest.raises(ValueError):
+        parse_uncertainty_options(options, 5000)
+
+
+def test_samples_are_bounded():
+    assert parse_uncertainty_options({'samples': 10 ** 7}, 5000)['samples'] == 5000
+
+
+def test_calculate_route(client):
+    record = synthetic_cohort(1)[0]
+    response = client.post('/api/calculate', json=dict(record, uncertainty={'samples': 200}))
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['uncertainty']['samples'] == 200
+    assert 'uncertainty' not in client.post('/api/calculate', json=record).get_json()
+    assert client.post('/api/calculate', json=dict(record, uncertainty={'samples': 0})).status_code == 400
@@ -0,0 +1,486 @@
+"""
+Motor vectorizado para el procesamiento por lotes de datos antropométricos.
+
+Replica exactamente (incluido el redondeo) los resultados de
+process_anthropometric_data en utils/calculators.py, que sigue siendo la
+implementación de referencia, pero opera sobre columnas NumPy con máscaras
+en lugar de ramas if/else por registro.
+"""
+
+import math
+
+from utils.calculators import (
+    ADULT_ONLY_STATUS,
+    GOAL_STANDARD,
+    GOAL_TABLE,
+    build_goal,
+    calculate_bmi,
+    calculate_body_fat_jackson_pollock,
+    calculate_body_roundness_index,
+    calculate_fat_free_mass_index,
+)
+from utils.equations import DEFAULT_CONVERSION, DEFAULT_EQUATION, FOLD_SITES, evaluate_equations_batch
+from utils.growth import GROWTH_MEASURES, growth_scores_batch, load_references
+from utils.lazy_imports import lazy_import
+from utils.rounding import round_exact
+from utils.schema import NUMERIC_FIELDS, decode_errors, validate_columns
+from utils.thresholds import (
+    METRIC_CLOSED_SIDE,
+    NO_STATUS,
+    STATUS_NAMES,
+    classify_batch,
+    optimal_range_batch,
+)
+
+np = lazy_import('numpy')
+
+# Pliegues de la ruta Jackson-Pollock por defecto (sin ecuación seleccionada)
+FOLD_FIELDS = (
+    'triceps_fold',
+    'subscapular_fold',
+    'suprailiac_fold',
+    'chest_fold',
+    'abdomen_fold',
+    'thigh_fold',
+)
+
+# Campos de selección de ecuación, opcionales por registro
+SELECTION_FIELDS = ('equation', 'conversion')
+
+# Código de objetivo para los registros sin datos de composición corporal
+NO_GOAL = -1
+
+
+def _column(data, name):
+    """Obtiene una columna de un dict, array estructurado o DataFrame, o None si no existe."""
+    try:
+        return data[name]
+    except (KeyError, ValueError, IndexError):
+        return None
+
+
+def _numeric_column(data, name, size):
+    """Convierte una columna a float64; las columnas ausentes se rellenan con NaN."""
+    values = _column(data, name)
+    if values is None:
+        return np.full(size, np.nan)
+    return np.asarray(values, dtype=float).reshape(size)
+
+
+def _is_set(column):
+    """Máscara de valores distintos de None en una columna de objetos."""
+    return np.array([value is not None for value in column], dtype=bool)
+
+
+def _batch_size(data):
+    """Determina el número de registros a partir de la columna de género."""
+    gender = _column(data, 'gender')
+    if gender is None:
+        raise ValueError("El lote debe incluir la columna 'gender'")
+    return len(gender)
+
+
+def records_to_columns(records):
+    """
+    Convierte una lista de registros (dicts) en columnas para el motor vectorizado.
+
+    Los campos ausentes se representan como NaN, igual que en la versión escalar
+    se trata la ausencia de una clave.
+
+    Args:
+        records (list): Lista de diccionarios con mediciones antropométricas
+
+    Returns:
+        dict: Columnas NumPy indexadas por nombre de campo
+    """
+    size = len(records)
+    columns = {}
+    for name in ('gender',) + SELECTION_FIELDS:
+        # Se rellena elemento a elemento: con np.array, un valor que sea una
+        # lista añadiría una dimensión a la columna
+        column = np.empty(size, dtype=object)
+        for i, record in enumerate(records):
+            column[i] = record.get(name)
+        columns[name] = column
+    for name in NUMERIC_FIELDS:
+        column = np.full(size, np.nan)
+        for i, record in enumerate(records):
+            value = record.get(name)
+            if value is not None:
+                column[i] = value
+        columns[name] = column
+    return columns
+
+
+def validate_measurements_batch(columns):
+    """
+    Versión vectorizada de validate_measurements basada en el esquema compilado.
+
+    Args:
+        columns (dict): Columnas numéricas y de género del lote
+
+    Returns:
+        tuple: (ndarray, ndarray) - (máscara de registros válidos, bits de error)
+    """
+    error_bits = validate_columns(columns)
+    return error_bits == 0, error_bits
+
+
+def _goal_operand_batch(operand, values, gender, age, thresholds):
+    if operand[0] == 'constant':
+        return operand[1]
+    if operand[0] == 'metric':
+        return values[operand[1]]
+    key = operand[1:]
+    if key not in thresholds:
+        thresholds[key] = optimal_range_batch(operand[1], gender, age)[operand[2]]
+    return thresholds[key]
+
+
+def determine_goal_batch(is_male, waist_hip_ratio, fat_free_mass_index, body_fat_percentage, age=None):
+    """
+    Versión vectorizada de determine_goal: evalúa GOAL_TABLE regla a regla
+    sobre los registros que aún no tienen objetivo.
+
+    Args:
+        is_male (ndarray): Máscara de registros masculinos
+        waist_hip_ratio (ndarray): Índice Cintura-Cadera redondeado
+        fat_free_mass_index (ndarray): IMLG redondeado
+        body_fat_percentage (ndarray): Porcentaje de grasa redondeado
+        age (ndarray): Edad de cada registro (opcional)
+
+    Returns:
+        tuple: (ndarray, ndarray) - (código de objetivo, déficit/superávit calórico)
+    """
+    size = len(is_male)
+    gender = np.where(is_male, 'M', 'F')
+    values = {
+        'waist_hip_ratio': waist_hip_ratio,
+        'fat_free_mass_index': fat_free_mass_index,
+        'body_fat_percentage': body_fat_percentage,
+        # Sin edad no se aplica ninguna condición sobre ella (NaN no cumple ninguna)
+        'age': np.full(size, np.nan) if age is None else age,
+    }
+    if age is None:
+        age = np.zeros(size)
+    thresholds = {}
+
+    goal_code = np.full(size, GOAL_STANDARD, dtype=np.int8)
+    amount = np.zeros(size, dtype=np.int64)
+    pending = np.ones(size, dtype=bool)
+    with np.errstate(invalid='ignore'):
+        for code, conditions, spec in GOAL_TABLE:
+            matched = pending.copy()
+            for left, compare, right in conditions:
+                matched &= compare(
+                    _goal_operand_batch(left, values, gender, age, thresholds),
+                    _goal_operand_batch(right, values, gender, age, thresholds),
+                )
+            goal_code[matched] = code
+            if spec is not None and matched.any():
+                first, second = (
+                    _goal_operand_batch(item, values, gender, age, thresholds) for item in spec['difference']
+                )
+                value = spec['offset'] + np.trunc((first - second) * spec['scale'])
+                if 'min' in spec or 'max' in spec:
+                    value = np.clip(value, spec.get('min'), spec.get('max'))
+                amount[matched] = value[matched]
+            pending &= ~matched
+
+    return goal_code, amount
+
+
+def process_anthropometric_batch(data):
+    """
+    Procesa un lote de datos antropométricos en formato columnar.
+
+    Args:
+        data: dict de arrays, array estructurado de NumPy o DataFrame con las
+              columnas 'gender', 'age', 'weight', 'height', 'waist', 'hip' y,
+              opcionalmente, los pliegues cutáneos (*_fold) y la selección de
+              ecuación ('equation', 'conversion'). Los valores ausentes se
+              indican con NaN (o None en las columnas de selección).
+
+    Returns:
+        dict: Columnas de resultados. 'valid' y 'has_composition' son máscaras;
+              las métricas de composición valen NaN donde no se calcularon y
+              'goal_code' vale NO_GOAL. 'error_bits' contiene los bits de
+              error del esquema de validación (0 en los registros válidos).
+              'youth', 'age_months' y 'growth' (medida -> z, percentil y
+              código de estado) recogen las curvas de referencia de los
+              menores de 18 años.
+    """
+    size = _batch_size(data)
+    gender = np.asarray(_column(data, 'gender'), dtype=object).reshape(size)
+    columns = {'gender': gender}
+    for name in SELECTION_FIELDS:
+        column = _column(data, name)
+        if column is not None:
+            columns[name] = np.asarray(column, dtype=object).reshape(size)
+    for name in NUMERIC_FIELDS:
+        columns[name] = _numeric_column(data, name, size)
+
+    valid, error_bits = validate_measurements_batch(columns)
+
+    age = columns['age']
+    weight = columns['weight']
+    height = columns['height']
+    waist = columns['waist']
+    hip = columns['hip']
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Cálculos básicos
+        height_m = height / 100
+        bmi = round_exact(
+            weight / (height_m ** 2), 2,
+            lambda i: calculate_bmi(float(weight[i]), float(height[i]))
+        )
+        waist_hip_ratio = round_exact(waist / hip, 2)
+        waist_height_ratio = round_exact(waist / height, 2)
+
+        waist_m = waist / 100
+        bri_raw = 364.2 - 365.5 * np.sqrt(1 - ((waist_m / (2 * math.pi)) ** 2) / ((0.5 * height_m) ** 2))
+        body_roundness_index = round_exact(
+            bri_raw, 2,
+            lambda i: calculate_body_roundness_index(float(waist[i]), float(height[i]))
+        )
+
+        # Composición corporal
+        triceps, subscapular, suprailiac, chest, abdomen, thigh = (
+            np.nan_to_num(columns[name], nan=0.0) for name in FOLD_FIELDS
+        )
+        is_male = gender == 'M'
+        is_female = gender == 'F'
+
+        basic_folds_provided = (triceps > 0) & (subscapular > 0) & (suprailiac > 0)
+        male_specific_folds = is_male & (chest > 0) & (abdomen > 0) & (thigh > 0)
+        female_specific_folds = is_female & (triceps > 0) & (suprailiac > 0) & (thigh > 0)
+        legacy_composition = basic_folds_provided | male_specific_folds | female_specific_folds
+
+        # process_anthropometric_data siempre pasa los seis pliegues, por lo que
+        # se aplica la ecuación específica de cada sexo
+        sum_folds = np.where(is_male, chest + abdomen + thigh, triceps + suprailiac + thigh)
+        density = np.where(
+            is_male,
+            1.1093800 - 0.0008267 * sum_folds + 0.0000016 * (sum_folds ** 2) - 0.0002574 * age,
+            1.0994921 - 0.0009929 * sum_folds + 0.0000023 * (sum_folds ** 2) - 0.0001392 * age
+        )
+
+        def body_fat_reference(i):
+            folds = {
+                'triceps': float(triceps[i]),
+                'subscapular': float(subscapular[i]),
+                'suprailiac': float(suprailiac[i]),
+                'chest': float(chest[i]),
+                'abdomen': float(abdomen[i]),
+                'thigh': float(thigh[i]),
+            }
+            return calculate_body_fat_jackson_pollock(gender[i], float(age[i]), folds)
+
+        body_fat_percentage = round_exact((495 / density) - 450, 1, body_fat_reference)
+
+        # Registros con ecuación o conversión seleccionada: una pasada por ecuación
+        equation = columns.get('equation', np.full(size, None, dtype=object)).copy()
+        conversion = columns.get('conversion', np.full(size, None, dtype=object)).copy()
+        equation_set = _is_set(equation)
+        conversion_set = _is_set(conversion)
+        selected = valid & (equation_set | conversion_set)
+        equation[selected & ~equation_set] = DEFAULT_EQUATION
+        conversion[selected & ~conversion_set] = DEFAULT_CONVERSION
+        equation[~selected] = None
+        conversion[~selected] = None
+        if selected.any():
+            fold_columns = {name: columns[name] for name in FOLD_SITES}
+            for name in set(equation[selected]):
+                rows = equation == name
+                body_fat_percentage[rows] = evaluate_equations_batch(
+                    gender, age, fold_columns, names=(name,), conversion=conversion, selected=rows
+                )[name][rows]
+
+        has_composition = valid & (selected | legacy_composition)
+        fat_free_mass = round_exact(weight * (1 - (body_fat_percentage / 100)), 2)
+        fat_free_mass_index = round_exact(
+            fat_free_mass / (height_m ** 2), 2,
+            lambda i: calculate_fat_free_mass_index(float(fat_free_mass[i]), float(height[i]))
+        )
+        fat_mass = round_exact(weight - fat_free_mass, 2)
+
+    goal_code, goal_amount = determine_goal_batch(
+        is_male, waist_hip_ratio, fat_free_mass_index, body_fat_percentage, age
+    )
+    goal_code[~has_composition] = NO_GOAL
+    goal_amount[~has_composition] = 0
+
+    for values in (body_fat_percentage, fat_free_mass, fat_free_mass_index, fat_mass):
+        values[~has_composition] = np.nan
+
+    metrics = {
+        'bmi': bmi,
+        'waist_hip_ratio': waist_hip_ratio,
+        'waist_height_ratio': waist_height_ratio,
+        'body_fat_percentage': body_fat_percentage,
+        'fat_free_mass_index': fat_free_mass_index,
+    }
+    status = {}
+    for metric in METRIC_CLOSED_SIDE:
+        status[metric] = classify_batch(metric, metrics[metric], gender, age)
+        status[metric][~valid] = NO_STATUS
+
+    # Menores de 18 años: curvas de referencia para la edad
+    youth, age_months, growth = growth_scores_batch(gender, age, {
+        'bmi': bmi,
+        'waist': waist,
+        'triceps_fold': columns['triceps_fold'],
+        'subscapular_fold': columns['subscapular_fold'],
+    })
+    youth &= valid
+    for metric in ADULT_ONLY_STATUS:
+        status[metric][youth] = NO_STATUS
+    status['bmi'][youth] = growth['bmi'][2][youth]
+
+    return {
+        'valid': valid,
+        'error_bits': error_bits,
+        'has_composition': has_composition,
+        'gender': gender,
+        'bmi': bmi,
+        'waist_hip_ratio': waist_hip_ratio,
+        'waist_height_ratio': waist_height_ratio,
+        'body_roundness_index': body_roundness_index,
+        'body_fat_equation': equation,
+        'density_conversion': conversion,
+        'body_fat_percentage': body_fat_percentage,
+        'fat_free_mass': fat_free_mass,
+        'fat_free_mass_index': fat_free_mass_index,
+        'fat_mass': fat_mass,
+        'goal_code': goal_code,
+        'goal_amount': goal_amount,
+        'status': status,
+        'youth': youth,
+        'age_months': round_exact(age_months, 1),
+        'growth': growth,
+    }
+
+
+def batch_to_records(results):
+    """
+    Convierte los resultados columnares en diccionarios por registro con el
+    mismo formato que devuelve process_anthropometric_data.
+
+    Args:
+        results (dict): Resultado de process_anthropometric_batch
+
+    Returns:
+        list: Lista de diccionarios de resultados
+    """
+    records = []
+    basic_metrics = ('bmi', 'waist_hip_ratio', 'waist_height_ratio', 'body_roundness_index')
+    composition_metrics = ('body_fat_percentage', 'fat_free_mass', 'fat_free_mass_index', 'fat_mass')
+    columns = {name: results[name].tolist() for name in basic_metrics + composition_metrics}
+    goal_code = results['goal_code'].tolist()
+    goal_amount = results['goal_amount'].tolist()
+    status = {metric: codes.tolist() for metric, codes in results['status'].items()}
+    has_composition = results['has_composition'].tolist()
+    youth = results['youth'].tolist()
+    age_months = results['age_months'].tolist()
+    approximate = load_references()[1]['approximate']
+    growth = {name: tuple(column.tolist() for column in scores) for name, scores in results['growth'].items()}
+
+    error_bits = results['error_bits']
+    equation = results['body_fat_equation']
+    conversion = results['density_conversion']
+
+    for i, is_valid in enumerate(results['valid'].tolist()):
+        if not is_valid:
+            errors = decode_errors(error_bits[i])
+            records.append({
+                "success": False,
+                "errors": [error['message'] for error in errors],
+                "error_codes": [{"field": error['field'], "code": error['code']} for error in errors],
+            })
+            continue
+
+        record = {name: columns[name][i] for name in basic_metrics}
+        if equation[i] is not None:
+            record['body_fat_equation'] = equation[i]
+            record['density_conversion'] = conversion[i]
+        if has_composition[i]:
+            for name in composition_metrics:
+                record[name] = columns[name][i]
+            record['goal'] = build_goal(goal_code[i], goal_amount[i])
+        record['status'] = {
+            metric: STATUS_NAMES[codes[i]] for metric, codes in status.items() if codes[i] != NO_STATUS
+        }
+        if youth[i]:
+            scores = {"age_months": age_months[i], "approximate": approximate}
+            for name in GROWTH_MEASURES:
+                z, percentile, code = (column[i] for column in growth[name])
+                if code != NO_STATUS:
+                    scores[name] = {"z": z, "percentile": percentile, "status": STATUS_NAMES[code]}
+            record['growth'] = scores
+        record['success'] = True
+        records.append(record)
+
+    return records
+
+
+def _nullable(values, present):
+    """Lista de Python con None donde el valor no está presente."""
+    column = values.astype(object)
+    column[~present] = None
+    return column.tolist()
+
+
+def batch_to_columns(results):
+    """
+    Convierte los resultados en una lista por métrica, lista para serializar.
+
+    Es el formato compacto de las respuestas por lotes: los nombres de campo no
+    se repiten por registro y los estados y objetivos se codifican como índices
+    de STATUS_NAMES y GOAL_PROFILES. Los valores ausentes son None.
+
+    Args:
+        results (dict): Resultado de process_anthropometric_batch
+
+    Returns:
+        dict: 'success', las métricas, 'body_fat_equation', 'density_conversion',
+              'goal_code', 'goal_amount', 'status' (métrica -> códigos),
+              'age_months', 'growth' (medida -> 'z', 'percentile', 'status') y
+              'errors' (lista de {'index', 'errors', 'error_codes'} de los
+              registros no válidos)
+    """
+    valid = results['valid']
+    has_composition = results['has_composition']
+    youth = results['youth']
+    columns = {'success': valid.tolist()}
+    for name in ('bmi', 'waist_hip_ratio', 'waist_height_ratio', 'body_roundness_index'):
+        columns[name] = _nullable(results[name], valid)
+    columns['body_fat_equation'] = results['body_fat_equation'].tolist()
+    columns['density_conversion'] = results['density_conversion'].tolist()
+    for name in ('body_fat_percentage', 'fat_free_mass', 'fat_free_mass_index', 'fat_mass'):
+        columns[name] = _nullable(results[name], has_composition)
+    columns['goal_code'] = _nullable(results['goal_code'], has_composition)
+    columns['goal_amount'] = _nullable(results['goal_amount'], has_composition)
+    columns['status'] = {
+        metric: _nullable(codes, codes != NO_STATUS) for metric, codes in results['status'].items()
+    }
+    columns['age_months'] = _nullable(results['age_months'], youth)
+    columns['growth'] = {}
+    for name, (z, percentile, code) in results['growth'].items():
+        present = youth & (code != NO_STATUS)
+        columns['growth'][name] = {
+            'z': _nullable(z, present),
+            'percentile': _nullable(percentile, present),
+            'status': _nullable(code, present),
+        }
+
+    columns['errors'] = []
+    error_bits = results['error_bits']
+    for index in np.flatnonzero(~valid).tolist():
+        errors = decode_errors(error_bits[index])
+        columns['errors'].append({
+            "index": index,
+            "errors": [error['message'] for error in errors],
+            "error_codes": [{"field": error['field'], "code": error['code']} for error in errors],
+        })
+    return columns
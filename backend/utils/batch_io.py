@@ -0,0 +1,290 @@
+"""
+Entrada y salida por lotes para el endpoint /api/calculate/batch.
+
+Lee registros desde un array JSON o desde JSON delimitado por líneas (NDJSON),
+los agrupa en bloques, los procesa con el motor vectorizado y genera una línea
+NDJSON de resultado por registro.
+"""
+
+import json
+from itertools import islice
+from time import perf_counter
+
+from utils.batch_calculators import (
+    batch_to_columns,
+    batch_to_records,
+    process_anthropometric_batch,
+    records_to_columns,
+)
+from utils.calculators import GOAL_PROFILES
+from utils.metrics import count_validation_failures, registry as metrics
+from utils.schema import decode_errors, validate_record
+from utils.thresholds import STATUS_NAMES
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+# Error de parseo con el que termina iter_ndjson_records al superar max_bytes
+BODY_TOO_LARGE = "El cuerpo de la petición supera el tamaño máximo permitido"
+
+
+def iter_ndjson_records(lines, max_bytes=None):
+    """
+    Genera registros a partir de líneas NDJSON, ignorando las líneas vacías.
+
+    Args:
+        lines (iterable): Líneas en bytes o str
+        max_bytes (int): Tamaño máximo acumulado de la entrada (opcional)
+
+    Yields:
+        tuple: (dict|None, str|None) - (registro, error de parseo)
+    """
+    total_bytes = 0
+    for line in lines:
+        total_bytes += len(line)
+        if max_bytes is not None and total_bytes > max_bytes:
+            yield None, BODY_TOO_LARGE
+            return
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line), None
+        except ValueError:
+            yield None, "Línea JSON inválida"
+
+
+def load_json_array_records(body):
+    """
+    Decodifica un cuerpo con un array JSON de registros.
+
+    Args:
+        body (bytes): Cuerpo de la petición
+
+    Returns:
+        generator: Tuplas (registro, None) en el formato de iter_ndjson_records
+
+    Raises:
+        ValueError: Si el cuerpo no es un array JSON válido
+    """
+    records = json.loads(body)
+    if not isinstance(records, list):
+        raise ValueError("Se esperaba un array JSON de registros")
+    return ((record, None) for record in records)
+
+
+def check_record(record):
+    """
+    Valida un registro antes de enviarlo al motor vectorizado.
+
+    Usa la misma validación que /api/calculate (validate_record), de modo que
+    los valores numéricos escritos como texto se aceptan igual que en la ruta
+    escalar y los errores tienen la misma forma ('errors' y 'error_codes').
+
+    Args:
+        record: Registro decodificado
+
+    Returns:
+        dict|None: Resultado fallido del registro, o None si es procesable
+    """
+    if not isinstance(record, dict) or not record:
+        return {"success": False, "error": "No se proporcionaron datos"}
+
+    _, error_bits = validate_record(record)
+    if not error_bits:
+        return None
+    errors = decode_errors(error_bits)
+    return {
+        "success": False,
+        "errors": [error['message'] for error in errors],
+        "error_codes": [{"field": error['field'], "code": error['code']} for error in errors],
+    }
+
+
+def _split_chunk(records):
+    """
+    Separa los registros procesables de los que fallan antes del motor vectorizado.
+
+    Returns:
+        tuple: (list, list, list) - (resultados con los errores ya rellenos y
+            None en el resto, registros procesables, sus posiciones)
+    """
+    results = [None] * len(records)
+    processable = []
+    positions = []
+    for position, (record, parse_error) in enumerate(records):
+        failure = {"success": False, "error": parse_error} if parse_error else check_record(record)
+        if failure:
+            results[position] = failure
+        else:
+            processable.append(record)
+            positions.append(position)
+    return results, processable, positions
+
+
+def _record_chunk_metrics(started, size, failures):
+    """Registra la duración del bloque y los registros correctos y fallidos."""
+    for failure in failures:
+        count_validation_failures(failure)
+    metrics.observe('batch_chunk_duration_seconds', perf_counter() - started)
+    metrics.inc('batch_records_total', (('outcome', 'success'),), size - len(failures))
+    metrics.inc('batch_records_total', (('outcome', 'failed'),), len(failures))
+
+
+def _record_recommendations(recommended, index):
+    """Recomendación personalizada de un registro del bloque (cantidades y reglas aplicadas)."""
+    if recommended['rules'][index] is None:
+        return {"error": recommended['errors'][index]}
+    return {
+        "targets": {name: values[index] for name, values in recommended['targets'].items()},
+        "rules": recommended['rules'][index],
+    }
+
+
+def process_record_chunk(records, rules=None):
+    """
+    Procesa un bloque de registros ya decodificados.
+
+    Args:
+        records (list): Lista de tuplas (registro, error de parseo)
+        rules (RuleSet): Reglas de recomendación (opcional); si se indican, cada
+            resultado correcto incluye 'recommendations'
+
+    Returns:
+        list: Resultados por registro, en el mismo orden de entrada
+    """
+    started = perf_counter()
+    results, processable, positions = _split_chunk(records)
+
+    if processable:
+        columns = records_to_columns(processable)
+        batch = process_anthropometric_batch(columns)
+        recommended = rules.recommend_batch(processable, columns, batch) if rules is not None else None
+        for index, (position, result) in enumerate(zip(positions, batch_to_records(batch))):
+            if recommended is not None and result['success']:
+                result['recommendations'] = _record_recommendations(recommended, index)
+            results[position] = result
+
+    failures = [result for result in results if not result['success']]
+    _record_chunk_metrics(started, len(results), failures)
+
+    return results
+
+
+def stream_batch_results(records, chunk_size, max_records, rules=None):
+    """
+    Procesa los registros por bloques y genera una línea NDJSON por resultado.
+
+    La memoria usada depende del tamaño de bloque y no del tamaño del lote.
+
+    Args:
+        records (iterable): Tuplas (registro, error de parseo)
+        chunk_size (int): Número de registros por bloque
+        max_records (int): Número máximo de registros aceptados
+        rules (RuleSet): Reglas de recomendación (opcional)
+
+    Yields:
+        str: Líneas NDJSON con el índice del registro y su resultado
+    """
+    records = iter(records)
+    index = 0
+    while True:
+        remaining = max_records - index
+        chunk = list(islice(records, min(chunk_size, remaining)))
+        if not chunk:
+            if remaining == 0 and next(records, None) is not None:
+                yield json.dumps({
+                    "index": index,
+                    "success": False,
+                    "error": f"El lote supera el máximo de {max_records} registros"
+                }) + '\n'
+            break
+
+        for result in process_record_chunk(chunk, rules):
+            yield json.dumps({"index": index, **result}) + '\n'
+            index += 1
+
+
+def _extend_columns(target, columns, positions, size, fill=None):
+    """
+    Añade al resultado las columnas de un bloque, con 'fill' en las posiciones
+    de los registros que no llegaron al motor vectorizado.
+    """
+    for name, values in columns.items():
+        if isinstance(values, dict):
+            _extend_columns(target.setdefault(name, {}), values, positions, size)
+            continue
+        spread = [False if name == 'success' else fill] * size
+        for position, value in zip(positions, values):
+            spread[position] = value
+        target.setdefault(name, []).extend(spread)
+
+
+def columnar_batch_results(records, chunk_size, max_records, rules=None):
+    """
+    Procesa los registros por bloques y devuelve el resultado en columnas.
+
+    Alternativa a stream_batch_results para clientes que prefieren una sola
+    respuesta compacta (?layout=columns): una lista por métrica en lugar de un
+    objeto por registro, con los estados y objetivos codificados como índices
+    de 'status_names' y 'goal_profiles'. Con reglas de recomendación se añaden
+    las columnas 'targets' (una lista por cantidad) y 'recommendation_rules'.
+
+    Args:
+        records (iterable): Tuplas (registro, error de parseo)
+        chunk_size (int): Número de registros por bloque
+        max_records (int): Número máximo de registros aceptados
+        rules (RuleSet): Reglas de recomendación (opcional)
+
+    Returns:
+        dict: Respuesta con 'count', 'columns', 'errors', 'status_names' y 'goal_profiles'
+
+    Raises:
+        ValueError: Si el lote supera max_records
+    """
+    records = iter(records)
+    columns = {}
+    errors = []
+    offset = 0
+    while True:
+        chunk = list(islice(records, min(chunk_size, max_records - offset)))
+        if not chunk:
+            if offset == max_records and next(records, None) is not None:
+                raise ValueError(f"El lote supera el máximo de {max_records} registros")
+            break
+
+        started = perf_counter()
+        results, processable, positions = _split_chunk(chunk)
+        failures = [
+            {"index": offset + position, **{key: value for key, value in result.items() if key != 'success'}}
+            for position, result in enumerate(results) if result is not None
+        ]
+        chunk_inputs = records_to_columns(processable)
+        batch = process_anthropometric_batch(chunk_inputs)
+        chunk_columns = batch_to_columns(batch)
+        if rules is not None:
+            recommended = rules.recommend_batch(processable, chunk_inputs, batch)
+            chunk_columns['targets'] = recommended['targets']
+            chunk_columns['recommendation_rules'] = recommended['rules']
+        failures.extend(
+            dict(error, index=offset + positions[error['index']]) for error in chunk_columns.pop('errors')
+        )
+        _extend_columns(columns, chunk_columns, positions, len(chunk))
+        _record_chunk_metrics(started, len(chunk), failures)
+        errors.extend(failures)
+        offset += len(chunk)
+
+    errors.sort(key=lambda error: error['index'])
+    response = {
+        "success": True,
+        "layout": "columns",
+        "count": offset,
+        "columns": columns,
+        "errors": errors,
+        "status_names": list(STATUS_NAMES),
+        "goal_profiles": list(GOAL_PROFILES),
+    }
+    if rules is not None:
+        response['rules_version'] = rules.version
+    return response
@@ -0,0 +1,237 @@
+"""
+Caché de resultados para process_anthropometric_data.
+
+Las peticiones se identifican por una clave canónica (campos del esquema de
+validación normalizados a float y serializados en orden fijo) de modo que
+payloads equivalentes comparten entrada. La caché en memoria es LRU con
+caducidad (TTL) y, opcionalmente, se apoya en un almacén SQLite compartido
+por todos los workers de gunicorn.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from utils.calculators import CALCULATION_VERSION
+from utils.schema import FIELD_SCHEMA
+
+_KEY_FIELDS = tuple(field['name'] for field in FIELD_SCHEMA)
+
+
+def canonical_key(data):
+    """
+    Calcula la clave canónica de un payload de mediciones.
+
+    Solo intervienen los campos del esquema y la versión de las fórmulas; los
+    números se normalizan a float para que 75 y 75.0 produzcan la misma clave.
+
+    Args:
+        data (dict): Diccionario con mediciones antropométricas
+
+    Returns:
+        str: Hash hexadecimal de la entrada normalizada
+    """
+    normalized = [CALCULATION_VERSION]
+    for name in _KEY_FIELDS:
+        value = data.get(name)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = float(value)
+        normalized.append(value)
+    payload = json.dumps(normalized, default=str, separators=(',', ':'))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class SqliteResultStore:
+    """
+    Almacén de resultados en un fichero SQLite compartido entre procesos.
+
+    Cada proceso abre su propia conexión (por hilo); la caducidad se guarda
+    con cada entrada y las entradas caducadas se ignoran al leer. Cada
+    'purge_every' escrituras de un proceso se borran las entradas caducadas y,
+    si quedan más de 'max_entries', las que caducan antes.
+
+    Args:
+        path (str): Fichero SQLite
+        ttl (float): Segundos de validez de cada entrada
+        max_entries (int): Número máximo de entradas guardadas
+        purge_every (int): Escrituras entre dos limpiezas
+    """
+
+    def __init__(self, path, ttl, max_entries=100000, purge_every=1000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        # Conexión temporal para no heredar conexiones abiertas tras el fork de gunicorn
+        connection = self._open()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS results_expires_at ON results (expires_at)")
+        connection.close()
+
+    def _open(self):
+        connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self._open()
+        return connection
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT value FROM results WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time() + self.ttl)
+        )
+        with self._writes_lock:
+            self._writes += 1
+            purge = self._writes >= self.purge_every
+            if purge:
+                self._writes = 0
+        if purge:
+            self.purge()
+
+    def purge_expired(self):
+        self._connection().execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+
+    def purge(self):
+        """Borra las entradas caducadas y las que superan 'max_entries' (las que caducan antes)."""
+        self.purge_expired()
+        self._connection().execute(
+            "DELETE FROM results WHERE key IN ("
+            "SELECT key FROM results ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def count(self):
+        return self._connection().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def clear(self):
+        self._connection().execute("DELETE FROM results")
+
+
+class ResultCache:
+    """
+    Caché LRU con caducidad para resultados de cálculo.
+
+    Args:
+        max_size (int): Número máximo de entradas en memoria
+        ttl (float): Segundos de validez de cada entrada
+        store (SqliteResultStore): Almacén compartido opcional
+    """
+
+    def __init__(self, max_size=1024, ttl=3600, store=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.store = store
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'shared_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+        }
+
+    def get(self, key):
+        """Devuelve el valor cacheado para la clave, o None si no existe o ha caducado."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return value
+                del self._entries[key]
+                self._stats['expirations'] += 1
+
+        if self.store is not None:
+            value = self.store.get(key)
+            if value is not None:
+                with self._lock:
+                    self._stats['shared_hits'] += 1
+                self._put(key, value)
+                return value
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def set(self, key, value):
+        """Guarda un valor en memoria y, si existe, en el almacén compartido."""
+        self._put(key, value)
+        if self.store is not None:
+            self.store.set(key, value)
+
+    def _put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def get_or_compute(self, data, compute):
+        """
+        Devuelve el resultado cacheado para el payload o lo calcula y lo guarda.
+
+        Los resultados devueltos se comparten entre peticiones y no deben modificarse.
+
+        Args:
+            data (dict): Payload de mediciones
+            compute (callable): Función que calcula el resultado a partir del payload
+
+        Returns:
+            dict: Resultado del cálculo
+        """
+        key = canonical_key(data)
+        result = self.get(key)
+        if result is None:
+            result = compute(data)
+            self.set(key, result)
+        return result
+
+    def clear(self):
+        """Vacía la caché en memoria y el almacén compartido."""
+        with self._lock:
+            self._entries.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def stats(self):
+        """
+        Devuelve los contadores de la caché de este proceso.
+
+        Returns:
+            dict: Aciertos, fallos, desalojos, caducidades, tamaño y ratio de aciertos
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['shared_hits'] + stats['misses']
+        stats['max_size'] = self.max_size
+        stats['ttl'] = self.ttl
+        stats['shared_store'] = self.store.path if self.store is not None else None
+        stats['hit_ratio'] = round((stats['hits'] + stats['shared_hits']) / lookups, 4) if lookups else 0.0
+        return stats
@@ -4,7 +4,20 @@ Implementación basada en protocolos ISAK y ecuaciones validadas.
 """
 
 import math
-import numpy as np
+import operator
+from time import perf_counter
+
+from utils.equations import DEFAULT_CONVERSION, DEFAULT_EQUATION, evaluate_equation
+from utils.growth import ADULT_AGE, growth_scores, is_youth
+from utils.schema import decode_errors, validate_record
+from utils.metrics import registry as metrics
+from utils.thresholds import RECOMPOSITION_BODY_FAT, classify_results, optimal_range
+
+# Versión de las fórmulas de cálculo. Debe incrementarse cuando cambie alguna
+# ecuación o regla de redondeo para que los resultados persistidos se recalculen.
+CALCULATION_VERSION = 3
+
+_STAGE_LABELS = tuple((('stage', stage),) for stage in ('validate', 'basic', 'composition', 'goal'))
 
 
 def validate_measurements(data):
@@ -17,28 +30,8 @@ def validate_measurements(data):
     Returns:
         tuple: (bool, list) - (es_valido, lista_de_errores)
     """
-    errors = []
-    
-    # Validar rangos fisiológicos básicos
-    if data.get('weight', 0) < 30 or data.get('weight', 0) > 300:
-        errors.append("El peso debe estar entre 30 y 300 kg")
-    
-    if data.get('height', 0) < 100 or data.get('height', 0) > 250:
-        errors.append("La estatura debe estar entre 100 y 250 cm")
-    
-    if data.get('waist', 0) < 50 or data.get('waist', 0) > 200:
-        errors.append("La circunferencia de cintura debe estar entre 50 y 200 cm")
-    
-    # Validar coherencia entre cintura y cadera
-    if data.get('waist', 0) > data.get('hip', 0):
-        errors.append("La circunferencia de cadera debe ser mayor que la de cintura")
-    
-    # Validar pliegues cutáneos
-    for fold_name in ['triceps_fold', 'subscapular_fold', 'suprailiac_fold']:
-        if fold_name in data:
-            if data[fold_name] < 3 or data[fold_name] > 70:
-                errors.append(f"El pliegue {fold_name} debe estar entre 3 y 70 mm")
-    
+    _, error_bits = validate_record(data)
+    errors = [error['message'] for error in decode_errors(error_bits)]
     return len(errors) == 0, errors
 
 
@@ -175,52 +168,197 @@ def calculate_fat_free_mass_index(fat_free_mass, height):
     return round(fat_free_mass / (height_m ** 2), 2)
 
 
-def determine_goal(gender, waist_hip_ratio, fat_free_mass_index, body_fat_percentage):
+# Perfiles de objetivo compartidos por la implementación escalar y la vectorizada.
+# El índice de cada perfil es el código de objetivo; el valor numérico
+# (déficit o superávit calórico) se rellena en build_goal.
+GOAL_VISCERAL_REDUCTION = 0
+GOAL_HYPERTROPHY = 1
+GOAL_RECOMPOSITION = 2
+GOAL_STANDARD = 3
+GOAL_YOUTH = 4
+
+# Clave de cada objetivo (por código) con la que lo citan las reglas de recomendación
+GOAL_KEYS = ('visceral_reduction', 'hypertrophy', 'recomposition', 'standard', 'youth')
+
+# Métricas cuyos puntos de corte de adultos no se aplican a menores de 18
+# años (el IMC se clasifica con su puntuación z para la edad)
+ADULT_ONLY_STATUS = ('waist_hip_ratio', 'body_fat_percentage', 'fat_free_mass_index')
+
+GOAL_PROFILES = (
+    {
+        "primary_goal": "Reducción visceral",
+        "description": "Priorizar reducción de grasa abdominal",
+        "caloric_deficit": None,
+        "training_focus": "Entrenamiento de alta intensidad y ejercicio aeróbico",
+    },
+    {
+        "primary_goal": "Hipertrofia",
+        "description": "Priorizar ganancia de masa muscular",
+        "caloric_surplus": None,
+        "training_focus": "Entrenamiento de fuerza e hipertrofia",
+    },
+    {
+        "primary_goal": "Recomposición avanzada",
+        "description": "Equilibrio óptimo entre ganancia muscular y pérdida grasa",
+        "caloric_strategy": "Ciclado nutricional: ±5% calorías días entrenamiento/descanso",
+        "training_focus": "Entrenamiento mixto fuerza-metabólico",
+    },
+    {
+        "primary_goal": "Plan estándar",
+        "description": "Plan equilibrado de composición corporal",
+        "caloric_strategy": "Equilibrio calórico o déficit moderado",
+        "training_focus": "Entrenamiento combinado fuerza-resistencia",
+    },
+    {
+        "primary_goal": "Desarrollo juvenil",
+        "description": "Seguimiento del crecimiento con curvas de referencia para la edad",
+        "caloric_strategy": "Sin déficit calórico: cubrir las necesidades del crecimiento",
+        "training_focus": "Desarrollo técnico y de la fuerza adaptado a la edad",
+    },
+)
+
+
+def build_goal(goal_code, amount=None):
+    """
+    Construye el diccionario de objetivo a partir de su código.
+    
+    Args:
+        goal_code (int): Índice del perfil en GOAL_PROFILES
+        amount (int): Déficit o superávit calórico (solo para los objetivos que lo usan)
+        
+    Returns:
+        dict: Objetivo recomendado con detalles
+    """
+    goal = dict(GOAL_PROFILES[goal_code])
+    for key in ('caloric_deficit', 'caloric_surplus'):
+        if key in goal:
+            goal[key] = amount
+    return goal
+
+
+# Tabla de decisión del objetivo: se aplica la primera regla cuyas condiciones
+# se cumplen todas. Cada condición es (operando, operador, operando); un
+# operando es un número, una métrica o el límite del tramo óptimo de una
+# métrica en utils/thresholds.py para el género y la edad
+# ('metrica.optimal_min' / 'metrica.optimal_max'). 'amount' es el déficit o
+# superávit: offset + trunc((a - b) · scale), acotado a [min, max] si se indican.
+GOAL_RULES = (
+    {"goal": GOAL_YOUTH, "when": (("age", "<", ADULT_AGE),)},
+    {
+        "goal": GOAL_VISCERAL_REDUCTION,
+        "when": (("waist_hip_ratio", ">", "waist_hip_ratio.optimal_max"),),
+        "amount": {
+            "difference": ("waist_hip_ratio", "waist_hip_ratio.optimal_max"),
+            "scale": 100, "offset": 0, "min": 10, "max": 20,
+        },
+    },
+    {
+        "goal": GOAL_HYPERTROPHY,
+        "when": (("fat_free_mass_index", "<", "fat_free_mass_index.optimal_min"),),
+        "amount": {"difference": ("fat_free_mass_index.optimal_min", "fat_free_mass_index"), "scale": 50, "offset": 300},
+    },
+    {
+        "goal": GOAL_RECOMPOSITION,
+        "when": (
+            ("body_fat_percentage", ">=", RECOMPOSITION_BODY_FAT[0]),
+            ("body_fat_percentage", "<=", RECOMPOSITION_BODY_FAT[1]),
+        ),
+    },
+    {"goal": GOAL_STANDARD, "when": ()},
+)
+
+GOAL_OPERATORS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+_OPTIMAL_BOUNDS = {'optimal_min': 0, 'optimal_max': 1}
+
+
+def _compile_operand(operand):
+    """Operando de una regla: ('constant', valor), ('metric', nombre) o ('optimal', métrica, índice)."""
+    if isinstance(operand, (int, float)):
+        return ('constant', operand)
+    metric, _, bound = operand.partition('.')
+    if bound:
+        return ('optimal', metric, _OPTIMAL_BOUNDS[bound])
+    return ('metric', metric)
+
+
+def compile_goal_rules(rules):
+    """
+    Compila la tabla de objetivos (operadores y operandos resueltos) una sola
+    vez para las versiones escalar y vectorizada.
+
+    Returns:
+        tuple: (código de objetivo, condiciones, importe o None) por regla
+    """
+    compiled = []
+    for rule in rules:
+        conditions = tuple(
+            (_compile_operand(left), GOAL_OPERATORS[op], _compile_operand(right))
+            for left, op, right in rule['when']
+        )
+        amount = rule.get('amount')
+        if amount is not None:
+            amount = dict(amount, difference=tuple(_compile_operand(item) for item in amount['difference']))
+        compiled.append((rule['goal'], conditions, amount))
+    return tuple(compiled)
+
+
+GOAL_TABLE = compile_goal_rules(GOAL_RULES)
+
+
+def _goal_operand(operand, values, gender, age):
+    if operand[0] == 'constant':
+        return operand[1]
+    if operand[0] == 'metric':
+        return values[operand[1]]
+    return optimal_range(operand[1], gender, age)[operand[2]]
+
+
+def determine_goal(gender, waist_hip_ratio, fat_free_mass_index, body_fat_percentage, age=None):
     """
     Determina el objetivo recomendado basado en los parámetros antropométricos.
     
+    Evalúa GOAL_TABLE: los límites de ICC y de IMLG son los del tramo óptimo
+    de las tablas de utils/thresholds.py. A los menores de 18 años no se les
+    aplican: reciben el objetivo de desarrollo juvenil.
+    
     Args:
         gender (str): Género ('M' para masculino, 'F' para femenino)
         waist_hip_ratio (float): Índice Cintura-Cadera
         fat_free_mass_index (float): Índice de Masa Libre de Grasa
         body_fat_percentage (float): Porcentaje de grasa corporal
+        age (float): Edad en años (opcional)
         
     Returns:
         dict: Objetivo recomendado con detalles
     """
-    whc_threshold = 0.90 if gender == 'M' else 0.85
-    ffmi_threshold = 19 if gender == 'M' else 15
-    
-    if waist_hip_ratio > whc_threshold:
-        goal = {
-            "primary_goal": "Reducción visceral",
-            "description": "Priorizar reducción de grasa abdominal",
-            "caloric_deficit": max(10, min(20, int((waist_hip_ratio - whc_threshold) * 100))),
-            "training_focus": "Entrenamiento de alta intensidad y ejercicio aeróbico",
-        }
-    elif fat_free_mass_index < ffmi_threshold:
-        goal = {
-            "primary_goal": "Hipertrofia",
-            "description": "Priorizar ganancia de masa muscular",
-            "caloric_surplus": 300 + int((ffmi_threshold - fat_free_mass_index) * 50),
-            "training_focus": "Entrenamiento de fuerza e hipertrofia",
-        }
-    elif 15 <= body_fat_percentage <= 25:
-        goal = {
-            "primary_goal": "Recomposición avanzada",
-            "description": "Equilibrio óptimo entre ganancia muscular y pérdida grasa",
-            "caloric_strategy": "Ciclado nutricional: ±5% calorías días entrenamiento/descanso",
-            "training_focus": "Entrenamiento mixto fuerza-metabólico",
-        }
-    else:
-        goal = {
-            "primary_goal": "Plan estándar",
-            "description": "Plan equilibrado de composición corporal",
-            "caloric_strategy": "Equilibrio calórico o déficit moderado",
-            "training_focus": "Entrenamiento combinado fuerza-resistencia",
-        }
-    
-    return goal
+    values = {
+        'waist_hip_ratio': waist_hip_ratio,
+        'fat_free_mass_index': fat_free_mass_index,
+        'body_fat_percentage': body_fat_percentage,
+        'age': age,
+    }
+    for goal_code, conditions, amount in GOAL_TABLE:
+        matched = True
+        for left, compare, right in conditions:
+            left = _goal_operand(left, values, gender, age)
+            right = _goal_operand(right, values, gender, age)
+            # Sin edad no se aplica ninguna condición sobre ella
+            if left is None or right is None or not compare(left, right):
+                matched = False
+                break
+        if not matched:
+            continue
+        if amount is None:
+            return build_goal(goal_code)
+        first, second = (_goal_operand(item, values, gender, age) for item in amount['difference'])
+        value = amount['offset'] + int((first - second) * amount['scale'])
+        if 'max' in amount:
+            value = min(amount['max'], value)
+        if 'min' in amount:
+            value = max(amount['min'], value)
+        return build_goal(goal_code, value)
+    return build_goal(GOAL_STANDARD)
 
 
 def process_anthropometric_data(data):
@@ -235,54 +373,103 @@ def process_anthropometric_data(data):
     """
     results = {}
     
-    # Validar datos
-    is_valid, errors = validate_measurements(data)
-    if not is_valid:
-        return {"success": False, "errors": errors}
+    # Validar datos (cada campo se lee y se convierte a float una sola vez)
+    started = perf_counter()
+    values, error_bits = validate_record(data)
+    validated = perf_counter()
+    if error_bits:
+        metrics.observe('calculation_stage_duration_seconds', validated - started, _STAGE_LABELS[0])
+        errors = decode_errors(error_bits)
+        return {
+            "success": False,
+            "errors": [error['message'] for error in errors],
+            "error_codes": [{"field": error['field'], "code": error['code']} for error in errors],
+        }
     
     # Datos básicos
-    gender = data.get('gender')
-    age = data.get('age')
-    weight = data.get('weight')
-    height = data.get('height')
-    waist = data.get('waist')
-    hip = data.get('hip')
+    gender = values['gender']
+    age = values['age']
+    weight = values['weight']
+    height = values['height']
+    waist = values['waist']
+    hip = values['hip']
     
     # Cálculos básicos
     results['bmi'] = calculate_bmi(weight, height)
     results['waist_hip_ratio'] = calculate_waist_hip_ratio(waist, hip)
     results['waist_height_ratio'] = calculate_waist_height_ratio(waist, height)
     results['body_roundness_index'] = calculate_body_roundness_index(waist, height)
+    basic_done = perf_counter()
     
     # Cálculo de composición corporal
-    # Recopilamos todos los pliegues disponibles
-    folds = {
-        'triceps': data.get('triceps_fold', 0),
-        'subscapular': data.get('subscapular_fold', 0),
-        'suprailiac': data.get('suprailiac_fold', 0),
-        'chest': data.get('chest_fold', 0),
-        'abdomen': data.get('abdomen_fold', 0),
-        'thigh': data.get('thigh_fold', 0)
-    }
-    
-    # Solo calcular composición si se proporcionaron datos de pliegues suficientes
-    basic_folds_provided = folds['triceps'] > 0 and folds['subscapular'] > 0 and folds['suprailiac'] > 0
-    male_specific_folds = gender == 'M' and folds['chest'] > 0 and folds['abdomen'] > 0 and folds['thigh'] > 0
-    female_specific_folds = gender == 'F' and folds['triceps'] > 0 and folds['suprailiac'] > 0 and folds['thigh'] > 0
+    equation = values.get('equation')
+    conversion = values.get('conversion')
+    if equation or conversion:
+        # Ecuación seleccionada en la petición (el esquema ya verificó sus pliegues)
+        equation = equation or DEFAULT_EQUATION
+        conversion = conversion or DEFAULT_CONVERSION
+        body_fat_percentage = evaluate_equation(equation, gender, age, values, conversion)
+        results['body_fat_equation'] = equation
+        results['density_conversion'] = conversion
+        composition_available = body_fat_percentage is not None
+    else:
+        # Recopilamos todos los pliegues disponibles
+        folds = {
+            'triceps': values.get('triceps_fold', 0),
+            'subscapular': values.get('subscapular_fold', 0),
+            'suprailiac': values.get('suprailiac_fold', 0),
+            'chest': values.get('chest_fold', 0),
+            'abdomen': values.get('abdomen_fold', 0),
+            'thigh': values.get('thigh_fold', 0)
+        }
+        
+        # Solo calcular composición si se proporcionaron datos de pliegues suficientes
+        basic_folds_provided = folds['triceps'] > 0 and folds['subscapular'] > 0 and folds['suprailiac'] > 0
+        male_specific_folds = gender == 'M' and folds['chest'] > 0 and folds['abdomen'] > 0 and folds['thigh'] > 0
+        female_specific_folds = gender == 'F' and folds['triceps'] > 0 and folds['suprailiac'] > 0 and folds['thigh'] > 0
+        
+        composition_available = basic_folds_provided or male_specific_folds or female_specific_folds
+        if composition_available:
+            body_fat_percentage = calculate_body_fat_jackson_pollock(gender, age, folds)
     
-    if basic_folds_provided or male_specific_folds or female_specific_folds:
-        results['body_fat_percentage'] = calculate_body_fat_jackson_pollock(gender, age, folds)
+    if composition_available:
+        results['body_fat_percentage'] = body_fat_percentage
         results['fat_free_mass'] = calculate_fat_free_mass(weight, results['body_fat_percentage'])
         results['fat_free_mass_index'] = calculate_fat_free_mass_index(results['fat_free_mass'], height)
         results['fat_mass'] = round(weight - results['fat_free_mass'], 2)
-        
+    composition_done = perf_counter()
+    
+    if composition_available:
         # Determinar objetivo recomendado
         results['goal'] = determine_goal(
             gender,
             results['waist_hip_ratio'],
             results['fat_free_mass_index'],
-            results['body_fat_percentage']
+            results['body_fat_percentage'],
+            age
         )
     
+    # Estado (óptimo / precaución / alerta) de cada métrica calculada; los
+    # menores de 18 años se valoran con las curvas de referencia para la edad
+    results['status'] = classify_results(results, gender, age)
+    if is_youth(age):
+        results['growth'] = growth_scores(gender, age, {
+            'bmi': results['bmi'],
+            'waist': waist,
+            'triceps_fold': values.get('triceps_fold'),
+            'subscapular_fold': values.get('subscapular_fold'),
+        })
+        for metric in ADULT_ONLY_STATUS:
+            results['status'].pop(metric, None)
+        results['status']['bmi'] = results['growth']['bmi']['status']
+    finished = perf_counter()
+    
+    metrics.observe_many('calculation_stage_duration_seconds', zip(_STAGE_LABELS, (
+        validated - started,
+        basic_done - validated,
+        composition_done - basic_done,
+        finished - composition_done,
+    )))
+    
     results['success'] = True
     return results
\ No newline at end of file
@@ -0,0 +1,439 @@
+"""
+Estadísticas de cohorte y percentiles para normas de equipo y población.
+
+Las métricas se acumulan en streaming por grupo (deporte, género, franja de
+edad): media y desviación típica con el algoritmo de Welford (en su versión
+por bloques de Chan et al.) y cuantiles con un histograma de resolución fija,
+fusionable y de memoria constante. A partir del histograma se construye una
+tabla de percentiles ordenada que permite ranquear a un atleta en O(log n).
+"""
+
+import math
+
+from utils.batch_calculators import process_anthropometric_batch, records_to_columns
+from utils.batch_io import check_record
+from utils.equations import FOLD_SITES
+from utils.lazy_imports import lazy_import
+from utils.rounding import round_exact
+
+np = lazy_import('numpy')
+
+# Métricas analizadas: (límite inferior, límite superior, resolución del histograma)
+METRIC_SPECS = {
+    'bmi': (10.0, 70.0, 0.01),
+    'body_fat_percentage': (-20.0, 70.0, 0.1),
+    'fat_free_mass_index': (5.0, 40.0, 0.01),
+    'waist_hip_ratio': (0.4, 1.6, 0.01),
+    'sum_of_skinfolds': (0.0, 700.0, 0.5),
+}
+
+# Franjas de edad: límite superior (incluido) y etiqueta
+AGE_BANDS = (
+    (13, '10-13'),
+    (17, '14-17'),
+    (24, '18-24'),
+    (34, '25-34'),
+    (44, '35-44'),
+    (54, '45-54'),
+    (math.inf, '55+'),
+)
+
+SUMMARY_PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+GROUP_FIELDS = ('sport', 'gender', 'age_band')
+
+
+def age_band(age):
+    """Devuelve la etiqueta de la franja de edad correspondiente."""
+    for max_age, label in AGE_BANDS:
+        if age <= max_age:
+            return label
+    return AGE_BANDS[-1][1]
+
+
+def age_band_batch(age):
+    """Versión vectorizada de age_band."""
+    bounds = np.array([max_age for max_age, _ in AGE_BANDS[:-1]], dtype=float)
+    labels = np.array([label for _, label in AGE_BANDS], dtype=object)
+    return labels[np.searchsorted(bounds, np.asarray(age, dtype=float), side='left')]
+
+
+def sum_of_skinfolds(values):
+    """
+    Suma de los pliegues cutáneos medidos en un registro.
+
+    Returns:
+        float: Suma en mm, o None si no hay ningún pliegue
+    """
+    folds = [float(values[name]) for name in FOLD_SITES if values.get(name)]
+    return round(sum(folds), 1) if folds else None
+
+
+def sum_of_skinfolds_batch(columns):
+    """Versión vectorizada de sum_of_skinfolds (NaN si no hay pliegues)."""
+    size = len(columns['gender'])
+    total = np.zeros(size)
+    measured = np.zeros(size, dtype=bool)
+    for name in FOLD_SITES:
+        column = columns.get(name)
+        if column is None:
+            continue
+        column = np.asarray(column, dtype=float)
+        present = np.nan_to_num(column, nan=0.0) > 0
+        total[present] += column[present]
+        measured |= present
+    total = round_exact(total, 1)
+    total[~measured] = np.nan
+    return total
+
+
+class RunningStats:
+    """
+    Media, varianza, mínimo y máximo en streaming (Welford/Chan).
+
+    Memoria constante; dos instancias pueden fusionarse con merge().
+    """
+
+    __slots__ = ('count', 'mean', 'm2', 'minimum', 'maximum')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def update(self, values):
+        """Incorpora un array de valores (se ignoran los NaN)."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        self._combine(values.size, batch_mean, batch_m2, float(values.min()), float(values.max()))
+
+    def merge(self, other):
+        """Fusiona las estadísticas de otra instancia."""
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.minimum, other.maximum)
+
+    def _combine(self, count, mean, m2, minimum, maximum):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.minimum = min(self.minimum, minimum)
+        self.maximum = max(self.maximum, maximum)
+
+    @property
+    def variance(self):
+        """Varianza muestral (ddof=1)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class HistogramSketch:
+    """
+    Esquema de cuantiles basado en un histograma de resolución fija.
+
+    El error de cada cuantil está acotado por la resolución del histograma;
+    los valores fuera de rango se acumulan en los extremos.
+
+    Args:
+        low (float): Límite inferior
+        high (float): Límite superior
+        resolution (float): Anchura de cada intervalo
+    """
+
+    def __init__(self, low, high, resolution):
+        self.low = low
+        self.resolution = resolution
+        self.counts = np.zeros(int(round((high - low) / resolution)) + 1, dtype=np.int64)
+
+    def update(self, values):
+        """Incorpora un array de valores (se ignoran los NaN)."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        bins = np.clip(np.rint((values - self.low) / self.resolution), 0, len(self.counts) - 1).astype(np.int64)
+        self.counts += np.bincount(bins, minlength=len(self.counts))
+
+    def merge(self, other):
+        self.counts += other.counts
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def quantiles(self, probabilities):
+        """
+        Devuelve los cuantiles aproximados para las probabilidades dadas (0-1).
+
+        Returns:
+            ndarray: Valores de los cuantiles (NaN si no hay datos)
+        """
+        probabilities = np.asarray(probabilities, dtype=float)
+        total = self.count
+        if total == 0:
+            return np.full(probabilities.shape, np.nan)
+        cumulative = np.cumsum(self.counts)
+        ranks = np.clip(np.ceil(probabilities * total), 1, total)
+        bins = np.searchsorted(cumulative, ranks, side='left')
+        return self.low + bins * self.resolution
+
+
+class PercentileTable:
+    """
+    Tabla ordenada de percentiles de una métrica para ranquear en O(log n).
+
+    Args:
+        breakpoints (ndarray): Valor de la métrica en cada percentil 0..100
+        mean (float): Media de la cohorte
+        std (float): Desviación típica de la cohorte
+        count (int): Tamaño de la cohorte
+    """
+
+    def __init__(self, breakpoints, mean, std, count):
+        self.breakpoints = np.asarray(breakpoints, dtype=float)
+        self.mean = mean
+        self.std = std
+        self.count = count
+
+    def rank(self, value):
+        """
+        Sitúa un valor respecto a la cohorte.
+
+        Returns:
+            dict: Percentil (0-100) y z-score del valor
+        """
+        if self.count == 0 or value is None:
+            return {"percentile": None, "z_score": None}
+        left = np.searchsorted(self.breakpoints, value, side='left')
+        right = np.searchsorted(self.breakpoints, value, side='right')
+        percentile = min(100.0, (left + right) / 2)
+        z_score = (value - self.mean) / self.std if self.std > 0 else 0.0
+        return {"percentile": round(float(percentile), 1), "z_score": round(z_score, 2)}
+
+    def rank_batch(self, values):
+        """Versión vectorizada de rank: devuelve (percentiles, z-scores)."""
+        values = np.asarray(values, dtype=float)
+        left = np.searchsorted(self.breakpoints, values, side='left')
+        right = np.searchsorted(self.breakpoints, values, side='right')
+        percentiles = np.minimum(100.0, (left + right) / 2)
+        z_scores = (values - self.mean) / self.std if self.std > 0 else np.zeros(values.shape)
+        percentiles[np.isnan(values)] = np.nan
+        return percentiles, z_scores
+
+
+class CohortAccumulator:
+    """
+    Acumula estadísticas por grupo (deporte, género, franja de edad) en streaming.
+
+    Solo se conservan los contadores de cada grupo, no los registros, por lo
+    que la memoria no depende del tamaño de la cohorte.
+    """
+
+    def __init__(self):
+        self.groups = {}
+
+    def _group(self, key):
+        group = self.groups.get(key)
+        if group is None:
+            group = {
+                metric: (RunningStats(), HistogramSketch(*spec))
+                for metric, spec in METRIC_SPECS.items()
+            }
+            self.groups[key] = group
+        return group
+
+    def add_columns(self, sport, gender, age, metrics):
+        """
+        Incorpora un bloque de registros en formato columnar.
+
+        Args:
+            sport (ndarray): Deporte de cada registro (None si no consta)
+            gender (ndarray): Género de cada registro
+            age (ndarray): Edad de cada registro
+            metrics (dict): Columnas de cada métrica de METRIC_SPECS (NaN si falta)
+        """
+        sport = np.array([str(value) if value is not None else '' for value in sport], dtype=object)
+        keys = np.array(
+            ['\x1f'.join(parts) for parts in zip(sport, np.asarray(gender, dtype=object).astype(str), age_band_batch(age))],
+            dtype=object
+        )
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        for index, key in enumerate(unique_keys):
+            rows = inverse == index
+            group = self._group(tuple(key.split('\x1f')))
+            for metric, (stats, sketch) in group.items():
+                values = np.asarray(metrics[metric], dtype=float)[rows]
+                stats.update(values)
+                sketch.update(values)
+
+    def add_batch(self, columns, batch):
+        """
+        Incorpora un bloque procesado con el motor vectorizado.
+
+        Args:
+            columns (dict): Columnas de entrada (records_to_columns), con 'sport' opcional
+            batch (dict): Resultado de process_anthropometric_batch
+        """
+        valid = batch['valid']
+        if not valid.any():
+            return
+        metrics = {
+            metric: batch[metric][valid]
+            for metric in METRIC_SPECS if metric != 'sum_of_skinfolds'
+        }
+        metrics['sum_of_skinfolds'] = sum_of_skinfolds_batch(columns)[valid]
+        sport = columns.get('sport')
+        self.add_columns(
+            sport[valid] if sport is not None else np.full(int(valid.sum()), None, dtype=object),
+            columns['gender'][valid],
+            columns['age'][valid],
+            metrics,
+        )
+
+    def add_records(self, records, results):
+        """
+        Incorpora registros y sus resultados de process_anthropometric_data.
+
+        Args:
+            records (list): Mediciones originales (con 'sport' opcional)
+            results (list): Resultados correspondientes
+        """
+        pairs = [(record, result) for record, result in zip(records, results) if result.get('success')]
+        if not pairs:
+            return
+        metrics = {
+            metric: np.array([result.get(metric, np.nan) for _, result in pairs], dtype=float)
+            for metric in METRIC_SPECS if metric != 'sum_of_skinfolds'
+        }
+        metrics['sum_of_skinfolds'] = np.array(
+            [np.nan if (total := sum_of_skinfolds(record)) is None else total for record, _ in pairs],
+            dtype=float
+        )
+        self.add_columns(
+            [record.get('sport') for record, _ in pairs],
+            [record.get('gender') for record, _ in pairs],
+            np.array([float(record.get('age')) for record, _ in pairs]),
+            metrics,
+        )
+
+    def merged(self, sport=None, gender=None, age_band=None):
+        """
+        Fusiona los grupos que cumplen el filtro (None = cualquier valor).
+
+        Returns:
+            dict: Métrica -> (RunningStats, HistogramSketch) de la cohorte filtrada
+        """
+        merged = {metric: (RunningStats(), HistogramSketch(*spec)) for metric, spec in METRIC_SPECS.items()}
+        filters = dict(zip(GROUP_FIELDS, (sport, gender, age_band)))
+        for key, group in self.groups.items():
+            if any(value is not None and key[i] != value for i, value in enumerate(filters.values())):
+                continue
+            for metric, (stats, sketch) in group.items():
+                merged[metric][0].merge(stats)
+                merged[metric][1].merge(sketch)
+        return merged
+
+    def summary(self, **filters):
+        """
+        Resume la cohorte filtrada: n, media, DE, mínimo, máximo y percentiles.
+
+        Returns:
+            dict: Resumen por métrica
+        """
+        summary = {}
+        for metric, (stats, sketch) in self.merged(**filters).items():
+            if stats.count == 0:
+                summary[metric] = {"count": 0}
+                continue
+            quantiles = sketch.quantiles([p / 100 for p in SUMMARY_PERCENTILES])
+            summary[metric] = {
+                "count": stats.count,
+                "mean": round(stats.mean, 2),
+                "std": round(stats.std, 2),
+                "min": round(stats.minimum, 2),
+                "max": round(stats.maximum, 2),
+                "percentiles": {
+                    f"p{p}": round(float(value), 2) for p, value in zip(SUMMARY_PERCENTILES, quantiles)
+                },
+            }
+        return summary
+
+    def percentile_tables(self, **filters):
+        """
+        Construye las tablas de percentiles (0..100) de la cohorte filtrada.
+
+        Returns:
+            dict: Métrica -> PercentileTable
+        """
+        tables = {}
+        probabilities = np.linspace(0, 1, 101)
+        for metric, (stats, sketch) in self.merged(**filters).items():
+            breakpoints = sketch.quantiles(probabilities) if stats.count else np.array([])
+            tables[metric] = PercentileTable(breakpoints, stats.mean, stats.std, stats.count)
+        return tables
+
+
+def accumulate_records(accumulator, records, chunk_size=1000):
+    """
+    Procesa registros en streaming con el motor vectorizado y los acumula.
+
+    Args:
+        accumulator (CohortAccumulator): Acumulador de destino
+        records (iterable): Tuplas (registro, error de parseo) de batch_io
+        chunk_size (int): Registros procesados por bloque
+
+    Returns:
+        tuple: (int, int) - (registros incorporados, registros descartados)
+    """
+    accepted = rejected = 0
+    chunk = []
+
+    def flush():
+        columns = records_to_columns(chunk)
+        columns['sport'] = np.array([record.get('sport') for record in chunk], dtype=object)
+        batch = process_anthropometric_batch(columns)
+        accumulator.add_batch(columns, batch)
+        valid = int(batch['valid'].sum())
+        return valid, len(chunk) - valid
+
+    for record, parse_error in records:
+        if parse_error or check_record(record):
+            rejected += 1
+            continue
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            valid, invalid = flush()
+            accepted, rejected, chunk = accepted + valid, rejected + invalid, []
+    if chunk:
+        valid, invalid = flush()
+        accepted, rejected = accepted + valid, rejected + invalid
+    return accepted, rejected
+
+
+def rank_athlete(tables, record, results):
+    """
+    Sitúa las métricas de un atleta respecto a las tablas de percentiles.
+
+    Args:
+        tables (dict): Resultado de CohortAccumulator.percentile_tables
+        record (dict): Mediciones del atleta
+        results (dict): Resultados de process_anthropometric_data
+
+    Returns:
+        dict: Valor, percentil y z-score por métrica
+    """
+    ranking = {}
+    for metric, table in tables.items():
+        value = sum_of_skinfolds(record) if metric == 'sum_of_skinfolds' else results.get(metric)
+        ranking[metric] = {"value": value, **table.rank(value)}
+    return ranking
@@ -0,0 +1,218 @@
+"""
+Negociación del formato de las respuestas de la API y compresión.
+
+Los clientes que envían 'Accept: application/msgpack' reciben MessagePack en
+lugar de JSON; el resto (incluido 'Accept: */*') sigue recibiendo JSON. Las
+respuestas que superan un tamaño mínimo se comprimen con brotli o gzip según
+'Accept-Encoding'. msgpack y brotli son dependencias opcionales: si no están
+instaladas se responde en JSON y se comprime solo con gzip.
+"""
+
+import gzip
+import importlib
+import zlib
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, 'application/x-msgpack', 'application/vnd.msgpack')
+
+FORMAT_JSON = 'json'
+FORMAT_MSGPACK = 'msgpack'
+
+# Codificaciones de contenido por orden de preferencia del servidor
+ENCODING_BROTLI = 'br'
+ENCODING_GZIP = 'gzip'
+
+# Niveles de compresión para respuestas dinámicas (velocidad frente a tamaño)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+_optional_modules = {}
+
+
+def optional_module(name):
+    """
+    Importa un módulo opcional la primera vez que se necesita.
+
+    Returns:
+        module|None: El módulo, o None si no está instalado
+    """
+    if name not in _optional_modules:
+        try:
+            _optional_modules[name] = importlib.import_module(name)
+        except ImportError:
+            _optional_modules[name] = None
+    return _optional_modules[name]
+
+
+def available_formats():
+    """Formatos de respuesta disponibles, con JSON primero (preferido ante empates)."""
+    if optional_module('msgpack') is None:
+        return (FORMAT_JSON,)
+    return (FORMAT_JSON, FORMAT_MSGPACK)
+
+
+def negotiate_format(accept):
+    """
+    Elige el formato de respuesta según la cabecera Accept.
+
+    Args:
+        accept (MIMEAccept): request.accept_mimetypes
+
+    Returns:
+        str: FORMAT_JSON o FORMAT_MSGPACK
+    """
+    candidates = [JSON_MIMETYPE]
+    if FORMAT_MSGPACK in available_formats():
+        candidates.extend(MSGPACK_MIMETYPES)
+    best = accept.best_match(candidates, default=JSON_MIMETYPE)
+    return FORMAT_MSGPACK if best in MSGPACK_MIMETYPES else FORMAT_JSON
+
+
+def negotiate_encoding(accept_encodings):
+    """
+    Elige la codificación de contenido según la cabecera Accept-Encoding.
+
+    Args:
+        accept_encodings (Accept): request.accept_encodings
+
+    Returns:
+        str|None: ENCODING_BROTLI, ENCODING_GZIP o None (sin comprimir)
+    """
+    candidates = [ENCODING_GZIP]
+    if optional_module('brotli') is not None:
+        candidates.insert(0, ENCODING_BROTLI)
+    return accept_encodings.best_match(candidates)
+
+
+def encode_msgpack(payload, default=None):
+    """Serializa a MessagePack (requiere el paquete msgpack)."""
+    return optional_module('msgpack').packb(payload, default=default, use_bin_type=True)
+
+
+def compress(body, encoding):
+    """
+    Comprime un cuerpo completo.
+
+    Args:
+        body (bytes): Cuerpo sin comprimir
+        encoding (str): ENCODING_BROTLI o ENCODING_GZIP
+
+    Returns:
+        bytes: Cuerpo comprimido
+    """
+    if encoding == ENCODING_BROTLI:
+        return optional_module('brotli').compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_stream(chunks, encoding):
+    """
+    Comprime un cuerpo en streaming sin acumularlo en memoria.
+
+    Solo se emiten bloques cuando el compresor tiene salida, de modo que las
+    líneas cortas del streaming NDJSON se agrupan en bloques comprimidos.
+
+    Args:
+        chunks (iterable): Fragmentos del cuerpo (str o bytes)
+        encoding (str): ENCODING_BROTLI o ENCODING_GZIP
+
+    Yields:
+        bytes: Fragmentos comprimidos
+    """
+    if encoding == ENCODING_BROTLI:
+        compressor = optional_module('brotli').Compressor(quality=BROTLI_QUALITY)
+        process, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        process, finish = compressor.compress, compressor.flush
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        block = process(chunk)
+        if block:
+            yield block
+    yield finish()
+
+
+def add_vary(response, header):
+    """Añade una cabecera a Vary sin duplicarla."""
+    if header not in response.vary:
+        response.vary.add(header)
+
+
+def compress_response(response, min_size):
+    """
+    Comprime una respuesta si el cliente lo admite y supera el tamaño mínimo.
+
+    Las respuestas en streaming se comprimen siempre (su tamaño no se conoce
+    de antemano); las que ya tienen Content-Encoding no se modifican.
+
+    Args:
+        response (Response): Respuesta de Flask
+        min_size (int): Tamaño mínimo en bytes (0 desactiva la compresión)
+
+    Returns:
+        Response: La misma respuesta, comprimida si procede
+    """
+    if (
+        min_size <= 0
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or 'Content-Encoding' in response.headers
+        or response.direct_passthrough
+    ):
+        return response
+
+    add_vary(response, 'Accept-Encoding')
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < min_size:
+            return response
+        response.set_data(compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+class NegotiatingJSONProvider(DefaultJSONProvider):
+    """
+    Proveedor JSON de Flask que responde en MessagePack si el cliente lo pide.
+
+    jsonify() (y el retorno de dicts en las vistas) pasa por response(), por lo
+    que todas las rutas de la API negocian el formato sin cambios en cada vista.
+    """
+
+    def response(self, *args, **kwargs):
+        if not request:
+            return super().response(*args, **kwargs)
+        fmt = negotiate_format(request.accept_mimetypes)
+        if fmt == FORMAT_JSON:
+            response = super().response(*args, **kwargs)
+        else:
+            payload = self._prepare_response_obj(args, kwargs)
+            response = self._app.response_class(
+                encode_msgpack(payload, default=self.default), mimetype=MSGPACK_MIMETYPE
+            )
+        add_vary(response, 'Accept')
+        return response
+
+    def encode(self, payload, fmt):
+        """
+        Serializa un objeto en el formato indicado, para cuerpos cacheados.
+
+        Returns:
+            tuple: (bytes, str) - (cuerpo, mimetype)
+        """
+        if fmt == FORMAT_MSGPACK:
+            return encode_msgpack(payload, default=self.default), MSGPACK_MIMETYPE
+        return (self.dumps(payload) + '\n').encode('utf-8'), self.mimetype
@@ -0,0 +1,103 @@
+"""
+Especificación del motor de cálculo para el modo sin conexión del frontend.
+
+El frontend repite en el navegador la ruta escalar de process_anthropometric_data
+(frontend/src/engine). Las constantes que necesita (esquema de validación,
+ecuaciones, umbrales, tabla de objetivos y curvas de referencia) no se copian a
+mano: se exportan desde los módulos de utils a un único JSON versionado con
+CALCULATION_VERSION. Así solo el código de las fórmulas está duplicado, y el
+conjunto golden (tests/golden) comprueba que las dos implementaciones dan
+exactamente los mismos resultados.
+
+Se regenera junto con el conjunto golden (python -m tests.generate_golden).
+"""
+
+import json
+import math
+import os
+
+from utils.calculators import ADULT_ONLY_STATUS, CALCULATION_VERSION, GOAL_KEYS, GOAL_PROFILES, GOAL_RULES
+from utils.equations import DEFAULT_CONVERSION, DEFAULT_EQUATION, DENSITY_CONVERSIONS, EQUATIONS, FOLD_SITES
+from utils.growth import ADULT_AGE, GROWTH_MEASURES, Z_BOUNDS, Z_STATUS, read_reference_rows
+from utils.schema import CROSS_FIELD_RULES, ERROR_TABLE, FIELD_SCHEMA
+from utils.thresholds import STATUS_NAMES, threshold_tables
+
+ENGINE_SPEC_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'frontend', 'src', 'engine', 'engineSpec.json'
+)
+
+
+def _finite(value):
+    """JSON no admite infinitos: el último tramo de edad sin límite se exporta como null."""
+    return None if isinstance(value, float) and math.isinf(value) else value
+
+
+def _equation_spec(equation):
+    coefficients = equation['coefficients']
+    if equation['model'] == 'log_density':
+        coefficients = {
+            sex: [[_finite(max_age), c, m] for max_age, c, m in rows] for sex, rows in coefficients.items()
+        }
+    return {
+        "label": equation['label'],
+        "model": equation['model'],
+        "folds": equation['folds'],
+        "coefficients": coefficients,
+    }
+
+
+def engine_spec():
+    """
+    Constantes del motor de cálculo en formato JSON.
+
+    Returns:
+        dict: 'calculation_version', 'schema', 'equations', 'thresholds', 'goals' y 'growth'
+    """
+    rows, metadata = read_reference_rows()
+    references = {}
+    for (measure, sex), entries in rows.items():
+        references.setdefault(measure, {})[sex] = entries
+
+    spec = {
+        "calculation_version": CALCULATION_VERSION,
+        "schema": {
+            "fields": FIELD_SCHEMA,
+            "cross_field_rules": CROSS_FIELD_RULES,
+            "errors": ERROR_TABLE,
+        },
+        "equations": {
+            "fold_sites": FOLD_SITES,
+            "conversions": DENSITY_CONVERSIONS,
+            "default_conversion": DEFAULT_CONVERSION,
+            "default_equation": DEFAULT_EQUATION,
+            "registry": {name: _equation_spec(equation) for name, equation in EQUATIONS.items()},
+        },
+        "thresholds": {
+            "status_names": STATUS_NAMES,
+            "tables": threshold_tables(),
+        },
+        "goals": {
+            "keys": GOAL_KEYS,
+            "profiles": GOAL_PROFILES,
+            "rules": GOAL_RULES,
+            "adult_only_status": ADULT_ONLY_STATUS,
+        },
+        "growth": {
+            "adult_age": ADULT_AGE,
+            "measures": GROWTH_MEASURES,
+            "z_bounds": Z_BOUNDS,
+            "z_status": Z_STATUS,
+            "approximate": metadata['approximate'],
+            "references": references,
+        },
+    }
+    # Tuplas -> listas, igual que al leer el fichero
+    return json.loads(json.dumps(spec))
+
+
+def write_engine_spec(path=ENGINE_SPEC_PATH):
+    """Escribe la especificación en el directorio del motor del frontend."""
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(engine_spec(), handle, ensure_ascii=False, indent=2)
+        handle.write('\n')
@@ -0,0 +1,411 @@
+"""
+Registro de ecuaciones de composición corporal basadas en pliegues cutáneos.
+
+Cada ecuación se registra una sola vez con los pliegues que necesita por sexo
+y su tabla de coeficientes, y dispone de una implementación escalar y otra
+vectorizada. La selección de ecuaciones aplicables se resuelve con una tabla
+precalculada indexada por (sexo, máscara de pliegues presentes).
+"""
+
+import math
+
+from utils.lazy_imports import lazy_import
+from utils.rounding import round_exact
+
+np = lazy_import('numpy')
+
+# Pliegues reconocidos; el índice de cada uno es su bit en la máscara de presencia
+FOLD_SITES = (
+    'triceps_fold',
+    'subscapular_fold',
+    'suprailiac_fold',
+    'chest_fold',
+    'abdomen_fold',
+    'thigh_fold',
+    'biceps_fold',
+    'midaxillary_fold',
+    'supraspinale_fold',
+    'calf_fold',
+)
+_FOLD_BITS = {name: 1 << i for i, name in enumerate(FOLD_SITES)}
+
+# Conversión de densidad corporal (g/cm³) a porcentaje de grasa: (a, b) en a / D - b
+DENSITY_CONVERSIONS = {
+    'siri': (495, 450),
+    'brozek': (457, 414.2),
+}
+DEFAULT_CONVERSION = 'siri'
+
+# Ecuación aplicada cuando la petición solo indica la conversión de densidad
+DEFAULT_EQUATION = 'jackson_pollock_3'
+
+EQUATIONS = {}
+
+
+def register_equation(name, label, model, folds, coefficients):
+    """
+    Registra una ecuación de composición corporal.
+
+    Args:
+        name (str): Identificador de la ecuación
+        label (str): Nombre descriptivo
+        model (str): Modelo de cálculo ('quadratic_density', 'log_density'
+                     o 'linear_percentage')
+        folds (dict): Pliegues requeridos por sexo ('M', 'F')
+        coefficients (dict): Coeficientes por sexo; para 'log_density', lista
+                             de (edad_máxima, c, m) por franja de edad
+    """
+    mask = {gender: sum(_FOLD_BITS[fold] for fold in fold_names) for gender, fold_names in folds.items()}
+    EQUATIONS[name] = {
+        "name": name,
+        "label": label,
+        "model": model,
+        "folds": folds,
+        "mask": mask,
+        "coefficients": coefficients,
+    }
+
+
+register_equation(
+    'jackson_pollock_3', "Jackson-Pollock 3 pliegues", 'quadratic_density',
+    folds={
+        'M': ('chest_fold', 'abdomen_fold', 'thigh_fold'),
+        'F': ('triceps_fold', 'suprailiac_fold', 'thigh_fold'),
+    },
+    coefficients={
+        'M': (1.1093800, 0.0008267, 0.0000016, 0.0002574),
+        'F': (1.0994921, 0.0009929, 0.0000023, 0.0001392),
+    },
+)
+
+register_equation(
+    'jackson_pollock_7', "Jackson-Pollock 7 pliegues", 'quadratic_density',
+    folds={
+        gender: (
+            'chest_fold', 'midaxillary_fold', 'triceps_fold', 'subscapular_fold',
+            'abdomen_fold', 'suprailiac_fold', 'thigh_fold',
+        )
+        for gender in ('M', 'F')
+    },
+    coefficients={
+        'M': (1.112, 0.00043499, 0.00000055, 0.00028826),
+        'F': (1.097, 0.00046971, 0.00000056, 0.00012828),
+    },
+)
+
+register_equation(
+    'durnin_womersley', "Durnin-Womersley 4 pliegues", 'log_density',
+    folds={
+        gender: ('biceps_fold', 'triceps_fold', 'subscapular_fold', 'suprailiac_fold')
+        for gender in ('M', 'F')
+    },
+    coefficients={
+        'M': ((19, 1.1620, 0.0630), (29, 1.1631, 0.0632), (39, 1.1422, 0.0544),
+              (49, 1.1620, 0.0700), (math.inf, 1.1715, 0.0779)),
+        'F': ((19, 1.1549, 0.0678), (29, 1.1599, 0.0717), (39, 1.1423, 0.0632),
+              (49, 1.1333, 0.0612), (math.inf, 1.1339, 0.0645)),
+    },
+)
+
+register_equation(
+    'yuhasz', "Yuhasz 6 pliegues", 'linear_percentage',
+    folds={
+        gender: ('triceps_fold', 'subscapular_fold', 'suprailiac_fold',
+                 'abdomen_fold', 'thigh_fold', 'calf_fold')
+        for gender in ('M', 'F')
+    },
+    coefficients={
+        'M': (0.097, 3.64),
+        'F': (0.1429, 4.56),
+    },
+)
+
+register_equation(
+    'faulkner', "Faulkner 4 pliegues", 'linear_percentage',
+    folds={
+        gender: ('triceps_fold', 'subscapular_fold', 'suprailiac_fold', 'abdomen_fold')
+        for gender in ('M', 'F')
+    },
+    coefficients={
+        'M': (0.153, 5.783),
+        'F': (0.153, 5.783),
+    },
+)
+
+register_equation(
+    'carter', "Carter (ISAK) 6 pliegues", 'linear_percentage',
+    folds={
+        gender: ('triceps_fold', 'subscapular_fold', 'supraspinale_fold',
+                 'abdomen_fold', 'thigh_fold', 'calf_fold')
+        for gender in ('M', 'F')
+    },
+    coefficients={
+        'M': (0.1051, 2.585),
+        'F': (0.1548, 3.580),
+    },
+)
+
+
+def _sex_key(gender):
+    """Las ecuaciones femeninas se aplican a todo lo que no sea 'M', como en calculators."""
+    return 'M' if gender == 'M' else 'F'
+
+
+def fold_mask(values):
+    """
+    Calcula la máscara de pliegues presentes (valor mayor que cero) en un registro.
+
+    Args:
+        values (dict): Mediciones del registro
+
+    Returns:
+        int: Máscara de bits según FOLD_SITES
+    """
+    mask = 0
+    for name, bit in _FOLD_BITS.items():
+        value = values.get(name)
+        if value is not None and value > 0:
+            mask |= bit
+    return mask
+
+
+def _build_dispatch_table():
+    """Precalcula las ecuaciones aplicables para cada sexo y combinación de pliegues."""
+    table = {}
+    for gender in ('M', 'F'):
+        for mask in range(1 << len(FOLD_SITES)):
+            table[gender, mask] = tuple(
+                name for name, equation in EQUATIONS.items()
+                if equation['mask'][gender] & mask == equation['mask'][gender]
+            )
+    return table
+
+
+_DISPATCH_TABLE = _build_dispatch_table()
+
+
+def applicable_equations(gender, values):
+    """
+    Devuelve las ecuaciones que pueden evaluarse con los pliegues disponibles.
+
+    Args:
+        gender (str): Género ('M' o 'F')
+        values (dict): Mediciones del registro
+
+    Returns:
+        tuple: Nombres de las ecuaciones aplicables
+    """
+    return _DISPATCH_TABLE[_sex_key(gender), fold_mask(values)]
+
+
+def is_applicable(name, gender, values):
+    """Indica si la ecuación dispone de todos sus pliegues en el registro."""
+    required = EQUATIONS[name]['mask'][_sex_key(gender)]
+    return fold_mask(values) & required == required
+
+
+def _log_density_coefficients(table, age):
+    """Selecciona (c, m) de la franja de edad correspondiente."""
+    for max_age, c, m in table:
+        if age <= max_age:
+            return c, m
+    return table[-1][1], table[-1][2]
+
+
+def _raw_body_fat(equation, gender, age, values, conversion):
+    """Porcentaje de grasa sin redondear de una ecuación registrada."""
+    sex = _sex_key(gender)
+    coefficients = equation['coefficients'][sex]
+    sum_folds = 0.0
+    for fold in equation['folds'][sex]:
+        sum_folds += values[fold]
+
+    if equation['model'] == 'linear_percentage':
+        slope, intercept = coefficients
+        return slope * sum_folds + intercept
+
+    if equation['model'] == 'quadratic_density':
+        a, b, c, d = coefficients
+        density = a - b * sum_folds + c * (sum_folds * sum_folds) - d * age
+    else:
+        c, m = _log_density_coefficients(coefficients, age)
+        density = c - m * math.log10(sum_folds)
+
+    numerator, offset = DENSITY_CONVERSIONS[conversion]
+    return numerator / density - offset
+
+
+def body_fat_slope(name, gender, age, values, conversion=DEFAULT_CONVERSION):
+    """
+    Derivada del porcentaje de grasa respecto a la suma de pliegues de una
+    ecuación, para propagar analíticamente el error de medida de los pliegues.
+
+    Args:
+        name (str): Identificador de la ecuación
+        gender (str): Género ('M' o 'F')
+        age (float): Edad en años
+        values (dict): Mediciones del registro (pliegues en mm; los ausentes cuentan como 0)
+        conversion (str): Conversión de densidad ('siri' o 'brozek')
+
+    Returns:
+        tuple: (tuple, float) - (pliegues de la ecuación, d%grasa/dΣpliegues)
+    """
+    equation = EQUATIONS[name]
+    sex = _sex_key(gender)
+    folds = equation['folds'][sex]
+    coefficients = equation['coefficients'][sex]
+    sum_folds = sum(float(values.get(fold) or 0) for fold in folds)
+
+    if equation['model'] == 'linear_percentage':
+        return folds, coefficients[0]
+
+    if equation['model'] == 'quadratic_density':
+        a, b, c, d = coefficients
+        density = a - b * sum_folds + c * (sum_folds * sum_folds) - d * age
+        density_slope = -b + 2 * c * sum_folds
+    else:
+        c, m = _log_density_coefficients(coefficients, age)
+        density = c - m * math.log10(sum_folds)
+        density_slope = -m / (sum_folds * math.log(10))
+
+    numerator, _ = DENSITY_CONVERSIONS[conversion]
+    return folds, -numerator / (density * density) * density_slope
+
+
+def evaluate_equation(name, gender, age, values, conversion=DEFAULT_CONVERSION):
+    """
+    Evalúa una ecuación registrada para un registro.
+
+    Args:
+        name (str): Identificador de la ecuación
+        gender (str): Género ('M' o 'F')
+        age (float): Edad en años
+        values (dict): Mediciones del registro (pliegues en mm)
+        conversion (str): Conversión de densidad ('siri' o 'brozek')
+
+    Returns:
+        float: Porcentaje de grasa corporal, o None si faltan pliegues
+    """
+    if not is_applicable(name, gender, values):
+        return None
+    return round(_raw_body_fat(EQUATIONS[name], gender, age, values, conversion), 1)
+
+
+def evaluate_applicable_equations(gender, age, values, conversion=DEFAULT_CONVERSION):
+    """
+    Evalúa todas las ecuaciones aplicables a un registro.
+
+    Returns:
+        dict: Porcentaje de grasa por nombre de ecuación
+    """
+    return {
+        name: round(_raw_body_fat(EQUATIONS[name], gender, age, values, conversion), 1)
+        for name in applicable_equations(gender, values)
+    }
+
+
+def _raw_body_fat_batch(equation, is_male, age, folds, conversion):
+    """Versión vectorizada de _raw_body_fat para todas las filas del lote."""
+    sums = {}
+    for sex in ('M', 'F'):
+        total = np.zeros(len(is_male))
+        for fold in equation['folds'][sex]:
+            total = total + folds[fold]
+        sums[sex] = total
+    sum_folds = np.where(is_male, sums['M'], sums['F'])
+
+    def by_sex(index):
+        return np.where(is_male, equation['coefficients']['M'][index], equation['coefficients']['F'][index])
+
+    if equation['model'] == 'linear_percentage':
+        return by_sex(0) * sum_folds + by_sex(1)
+
+    if equation['model'] == 'quadratic_density':
+        density = by_sex(0) - by_sex(1) * sum_folds + by_sex(2) * (sum_folds * sum_folds) - by_sex(3) * age
+    else:
+        c = np.empty(len(is_male))
+        m = np.empty(len(is_male))
+        for sex, selector in (('M', is_male), ('F', ~is_male)):
+            table = equation['coefficients'][sex]
+            bounds = np.array([row[0] for row in table[:-1]])
+            band = np.searchsorted(bounds, age[selector], side='left')
+            c[selector] = np.array([row[1] for row in table])[band]
+            m[selector] = np.array([row[2] for row in table])[band]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            density = c - m * np.log10(sum_folds)
+
+    numerator, offset = DENSITY_CONVERSIONS[conversion]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return numerator / density - offset
+
+
+def fold_presence_batch(folds):
+    """
+    Calcula la máscara de pliegues presentes de cada fila.
+
+    Args:
+        folds (dict): Columnas de pliegues (NaN o 0 si no se midieron)
+
+    Returns:
+        ndarray: Máscaras de bits por fila
+    """
+    size = len(next(iter(folds.values())))
+    mask = np.zeros(size, dtype=np.int64)
+    for name, bit in _FOLD_BITS.items():
+        column = folds.get(name)
+        if column is not None:
+            with np.errstate(invalid='ignore'):
+                mask[column > 0] |= bit
+    return mask
+
+
+def evaluate_equations_batch(gender, age, folds, names=None, conversion=DEFAULT_CONVERSION, selected=None):
+    """
+    Evalúa ecuaciones registradas sobre un lote en una sola pasada por ecuación.
+
+    Args:
+        gender (ndarray): Columna de género
+        age (ndarray): Columna de edad
+        folds (dict): Columnas de pliegues en mm (NaN si no se midieron)
+        names (iterable): Ecuaciones a evaluar (todas por defecto)
+        conversion (str|ndarray): Conversión de densidad, global o por fila
+        selected (ndarray): Máscara opcional de filas a evaluar
+
+    Returns:
+        dict: Porcentaje de grasa redondeado por ecuación (NaN donde no aplica)
+    """
+    gender = np.asarray(gender, dtype=object)
+    age = np.asarray(age, dtype=float)
+    is_male = gender == 'M'
+    presence = fold_presence_batch(folds)
+    filled = {name: np.nan_to_num(np.asarray(folds.get(name, np.full(len(gender), np.nan)), dtype=float), nan=0.0)
+              for name in FOLD_SITES}
+    if isinstance(conversion, str):
+        conversion = np.full(len(gender), conversion, dtype=object)
+
+    results = {}
+    for name in (names or EQUATIONS):
+        equation = EQUATIONS[name]
+        required = np.where(is_male, equation['mask']['M'], equation['mask']['F'])
+        applicable = presence & required == required
+        if selected is not None:
+            applicable &= selected
+
+        body_fat = np.full(len(gender), np.nan)
+        for method in DENSITY_CONVERSIONS:
+            rows = applicable & (conversion == method)
+            if not rows.any():
+                continue
+            raw = _raw_body_fat_batch(equation, is_male[rows], age[rows],
+                                      {fold: column[rows] for fold, column in filled.items()}, method)
+            indices = np.flatnonzero(rows)
+
+            def reference(i, indices=indices, method=method):
+                row = indices[i]
+                values = {fold: float(column[row]) for fold, column in filled.items()}
+                return round(_raw_body_fat(equation, gender[row], float(age[row]), values, method), 1)
+
+            body_fat[rows] = round_exact(raw, 1, reference)
+        results[name] = body_fat
+
+    return results
@@ -0,0 +1,269 @@
+"""
+Puntuaciones z y percentiles para la edad de deportistas menores de 18 años.
+
+Las curvas de referencia LMS (data/growth_references.csv) se cargan una sola
+vez en arrays compactos (array('d'), sin NumPy) con una fila por mes de edad,
+interpolando linealmente entre los anclajes del fichero. La ruta escalar
+interpola entre los dos meses vecinos; la vectorizada hace lo mismo sobre
+columnas completas con vistas NumPy de los mismos arrays, con resultados
+idénticos.
+
+    z = ((X / M) ** L - 1) / (L · S)      (L ≠ 0)
+    z = ln(X / M) / S                      (L = 0)
+"""
+
+import csv
+import math
+import os
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+
+from utils.lazy_imports import lazy_import
+from utils.rounding import round_exact
+from utils.thresholds import STATUS_ALERT, STATUS_NAMES, STATUS_OPTIMAL, STATUS_WARNING
+
+np = lazy_import('numpy')
+
+REFERENCE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'growth_references.csv')
+
+# Edad (años) a partir de la cual se aplican los puntos de corte de adultos
+ADULT_AGE = 18
+
+# Medidas con curva de referencia: nombre en el resultado -> campo de entrada
+GROWTH_MEASURES = {
+    'bmi': 'bmi',
+    'waist': 'waist',
+    'triceps_fold': 'triceps_fold',
+    'subscapular_fold': 'subscapular_fold',
+}
+
+# Estado según la puntuación z, intervalos (a, b]: delgadez por debajo de -2,
+# sobrepeso por encima de +1 y obesidad por encima de +2 (criterios OMS)
+Z_BOUNDS = (-2.0, 1.0, 2.0)
+Z_STATUS = (STATUS_ALERT, STATUS_OPTIMAL, STATUS_WARNING, STATUS_ALERT)
+_Z_CODES = tuple(STATUS_NAMES.index(status) for status in Z_STATUS)
+
+_SQRT2 = math.sqrt(2)
+
+
+class LmsTable:
+    """
+    Curva LMS de una medida y un sexo en una rejilla mensual.
+
+    Args:
+        start (int): Primer mes de la rejilla
+        l, m, s (array): Parámetros L, M y S de cada mes
+    """
+
+    __slots__ = ('start', 'l', 'm', 's')
+
+    def __init__(self, start, l, m, s):
+        self.start = start
+        self.l = l
+        self.m = m
+        self.s = s
+
+    @property
+    def end(self):
+        return self.start + len(self.m) - 1
+
+
+def _monthly(anchors, values):
+    """Expande los valores de los anclajes (meses ordenados) a una fila por mes."""
+    grid = array('d')
+    for month in range(anchors[0], anchors[-1] + 1):
+        index = bisect_left(anchors, month)
+        if anchors[index] == month:
+            grid.append(values[index])
+        else:
+            fraction = (month - anchors[index - 1]) / (anchors[index] - anchors[index - 1])
+            grid.append(values[index - 1] + (values[index] - values[index - 1]) * fraction)
+    return grid
+
+
+def read_reference_rows(path=REFERENCE_PATH):
+    """
+    Lee los anclajes del fichero de referencias.
+
+    Returns:
+        tuple: (dict, dict) - ((medida, sexo) -> lista ordenada de (mes, L, M, S),
+            metadatos de la cabecera con 'approximate' y la referencia de cada medida)
+    """
+    metadata = {'approximate': False, 'references': {}}
+    rows = {}
+    with open(path, newline='', encoding='utf-8') as handle:
+        lines = []
+        for line in handle:
+            if line.startswith('#'):
+                key, _, value = line[1:].partition(':')
+                if key.strip() == 'approximate':
+                    metadata['approximate'] = value.strip().lower() == 'true'
+                continue
+            lines.append(line)
+    for row in csv.DictReader(lines):
+        key = (row['measure'], row['sex'])
+        metadata['references'][row['measure']] = row['reference']
+        rows.setdefault(key, []).append(
+            (int(row['age_months']), float(row['L']), float(row['M']), float(row['S']))
+        )
+    for entries in rows.values():
+        entries.sort()
+    return rows, metadata
+
+
+@lru_cache(maxsize=None)
+def load_references(path=REFERENCE_PATH):
+    """
+    Carga las curvas LMS del fichero de referencias.
+
+    Returns:
+        tuple: (dict, dict) - ((medida, sexo) -> LmsTable, metadatos de la
+            cabecera con 'approximate' y la referencia de cada medida)
+    """
+    rows, metadata = read_reference_rows(path)
+    tables = {}
+    for key, entries in rows.items():
+        anchors = [entry[0] for entry in entries]
+        tables[key] = LmsTable(
+            anchors[0], *(_monthly(anchors, [entry[i] for entry in entries]) for i in (1, 2, 3))
+        )
+    return tables, metadata
+
+
+def is_youth(age):
+    """Indica si se aplican las curvas de referencia en lugar de los cortes de adultos."""
+    return age < ADULT_AGE
+
+
+def age_in_months(age):
+    """
+    Edad en meses para la búsqueda en las curvas.
+
+    Una edad entera se interpreta como años cumplidos y se sitúa en la mitad
+    del año (12 años -> 150 meses); una edad con decimales se usa tal cual.
+    """
+    months = age * 12
+    return months + 6 if age == int(age) else months
+
+
+def lms_parameters(table, months):
+    """
+    Parámetros L, M y S interpolados para una edad en meses (recortada a la tabla).
+
+    Returns:
+        tuple: (float, float, float)
+    """
+    position = min(max(months, table.start), table.end) - table.start
+    index = min(int(position), len(table.m) - 2)
+    fraction = position - index
+    return tuple(
+        values[index] + (values[index + 1] - values[index]) * fraction
+        for values in (table.l, table.m, table.s)
+    )
+
+
+def lms_z_score(value, l, m, s):
+    """Puntuación z de un valor con los parámetros LMS de su edad."""
+    if l == 0:
+        return math.log(value / m) / s
+    return ((value / m) ** l - 1) / (l * s)
+
+
+def z_percentile(z):
+    """Percentil (0-100) de una puntuación z en la distribución normal."""
+    return 50 * (1 + math.erf(z / _SQRT2))
+
+
+def z_status(z):
+    """Estado ('optimal', 'warning' o 'alert') según la puntuación z."""
+    return Z_STATUS[bisect_left(Z_BOUNDS, z)]
+
+
+def growth_scores(gender, age, values):
+    """
+    Puntuaciones z y percentiles de un deportista joven.
+
+    Args:
+        gender (str): 'M' o 'F'
+        age (float): Edad en años
+        values (dict): Medidas (incluido 'bmi' ya calculado); se omiten las ausentes
+
+    Returns:
+        dict: 'age_months', 'approximate' y, por medida, 'z', 'percentile' y 'status'
+    """
+    tables, metadata = load_references()
+    months = age_in_months(age)
+    scores = {"age_months": round(months, 1), "approximate": metadata['approximate']}
+    for name, field in GROWTH_MEASURES.items():
+        value = values.get(field)
+        table = tables.get((name, gender))
+        if not value or table is None:
+            continue
+        z = round(lms_z_score(value, *lms_parameters(table, months)), 2)
+        scores[name] = {"z": z, "percentile": round(z_percentile(z), 1), "status": z_status(z)}
+    return scores
+
+
+# --- Versión vectorizada ------------------------------------------------------
+
+
+def _table_arrays(table):
+    return tuple(np.frombuffer(values, dtype=np.float64) for values in (table.l, table.m, table.s))
+
+
+def age_in_months_batch(age):
+    """Versión vectorizada de age_in_months."""
+    months = age * 12
+    return np.where(age == np.trunc(age), months + 6, months)
+
+
+def lms_z_score_batch(values, l, m, s):
+    """Versión vectorizada de lms_z_score."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(l == 0, np.log(values / m) / s, ((values / m) ** l - 1) / (l * s))
+
+
+def growth_scores_batch(gender, age, columns):
+    """
+    Versión vectorizada de growth_scores para las filas de jóvenes.
+
+    Args:
+        gender (ndarray): Género de cada fila
+        age (ndarray): Edad de cada fila
+        columns (dict): Columnas de cada campo de GROWTH_MEASURES (NaN si falta)
+
+    Returns:
+        tuple: (ndarray, ndarray, dict) - (máscara de jóvenes, edad en meses,
+            medida -> (z, percentil, código de estado; NaN/-1 donde no aplica))
+    """
+    tables, _ = load_references()
+    youth = ~np.isnan(age) & (age < ADULT_AGE)
+    months = age_in_months_batch(age)
+    scores = {}
+    for name, field in GROWTH_MEASURES.items():
+        values = np.asarray(columns[field], dtype=float)
+        z = np.full(len(values), np.nan)
+        for gender_name in ('M', 'F'):
+            table = tables.get((name, gender_name))
+            rows = youth & (gender == gender_name) & (np.nan_to_num(values, nan=0.0) != 0)
+            if table is None or not rows.any():
+                continue
+            l, m, s = _table_arrays(table)
+            position = np.clip(months[rows], table.start, table.end) - table.start
+            index = np.minimum(position.astype(np.int64), len(m) - 2)
+            fraction = position - index
+            parameters = [
+                grid[index] + (grid[index + 1] - grid[index]) * fraction for grid in (l, m, s)
+            ]
+            z[rows] = lms_z_score_batch(values[rows], *parameters)
+        z = round_exact(z, 2)
+        present = ~np.isnan(z)
+        percentile = np.full(len(z), np.nan)
+        percentile[present] = round_exact(
+            np.array([50 * (1 + math.erf(value / _SQRT2)) for value in z[present].tolist()]), 1
+        )
+        status = np.full(len(z), -1, dtype=np.int8)
+        status[present] = np.array(_Z_CODES, dtype=np.int8)[np.searchsorted(Z_BOUNDS, z[present], side='left')]
+        scores[name] = (z, percentile, status)
+    return youth, months, scores
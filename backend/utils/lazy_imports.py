@@ -0,0 +1,58 @@
+"""
+Importación diferida de dependencias pesadas (NumPy).
+
+La ruta de cálculo de un único registro solo usa math; NumPy se carga la
+primera vez que una función por lotes o de estadística accede a un atributo
+del módulo, de modo que el arranque del servidor no paga su importación.
+"""
+
+import importlib
+
+
+class LazyModule:
+    """
+    Sustituto de un módulo que lo importa en el primer acceso a un atributo.
+
+    importlib.import_module es seguro entre hilos, por lo que varios hilos
+    pueden resolver el mismo módulo a la vez sin duplicar la importación.
+    """
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            module = importlib.import_module(self.__dict__['_name'])
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'cargado' if self.__dict__['_module'] is not None else 'diferido'
+        return f"<módulo {self.__dict__['_name']} ({state})>"
+
+
+_lazy_modules = {}
+
+
+def lazy_import(name):
+    """
+    Devuelve un sustituto diferido del módulo indicado.
+
+    Args:
+        name (str): Nombre del módulo (p. ej. 'numpy')
+
+    Returns:
+        LazyModule: Objeto que reenvía los atributos al módulo real
+    """
+    module = _lazy_modules.get(name)
+    if module is None:
+        module = _lazy_modules[name] = LazyModule(name)
+    return module
@@ -0,0 +1,401 @@
+"""
+Cambio longitudinal y tendencias de un atleta a lo largo de la temporada.
+
+Para cada métrica derivada se mantienen agregados incrementales de coste
+constante por sesión añadida: último valor y su error, media y varianza
+(Welford) y las sumas de la regresión lineal de toda la serie y de una
+ventana móvil de sesiones. Añadir una sesión no recalcula el historial.
+
+Cada diferencia entre sesiones se marca como cambio fiable cuando supera
+1,96·√(SEM₁² + SEM₂²), con el SEM de cada sesión propagado desde el TEM de
+las medidas con la aproximación de primer orden (método delta) de las mismas
+fórmulas que utils/calculators.py, y como cambio relevante cuando supera el
+menor cambio importante (SWC). La propagación es analítica para que guardar
+una sesión no importe NumPy ni simule muestras; el modo de incertidumbre
+(utils/uncertainty.py) sigue usando Monte Carlo.
+"""
+
+import math
+from collections import deque
+from datetime import date
+
+from utils.cohort import sum_of_skinfolds
+from utils.equations import DEFAULT_CONVERSION, DEFAULT_EQUATION, FOLD_SITES, body_fat_slope
+from utils.uncertainty import DEFAULT_SAMPLES, UNCERTAINTY_METRICS, parse_uncertainty_options
+
+TREND_METRICS = UNCERTAINTY_METRICS + ('sum_of_skinfolds',)
+
+# Sesiones de la ventana móvil de la pendiente
+DEFAULT_WINDOW = 4
+MAX_WINDOW = 52
+
+# Umbral del cambio fiable (Jacobson-Truax, 95 %) y fracción de la DE entre
+# atletas que define el menor cambio importante (Hopkins)
+RELIABLE_CHANGE_Z = 1.96
+SWC_FACTOR = 0.2
+
+
+def session_day(session_date):
+    """Número de día (ordinal) de una fecha de sesión AAAA-MM-DD."""
+    return date.fromisoformat(session_date).toordinal()
+
+
+def session_values(record, result):
+    """
+    Valores de las métricas de tendencia de una sesión.
+
+    Returns:
+        dict: Métrica -> valor (solo las calculadas en la sesión)
+    """
+    values = {metric: result[metric] for metric in UNCERTAINTY_METRICS if result.get(metric) is not None}
+    total = sum_of_skinfolds(record)
+    if total is not None:
+        values['sum_of_skinfolds'] = total
+    return values
+
+
+def _measurement_error(record, name, options):
+    """TEM absoluto de una medida de la sesión (0 si no se midió)."""
+    value = record.get(name)
+    if not value:
+        return 0.0
+    return options['tem'].get(name, abs(float(value)) * options['tem_percent'].get(name, 0.0) / 100)
+
+
+def session_errors(record, result, options):
+    """
+    Error estándar de medida de cada métrica de una sesión.
+
+    Se propaga el TEM de cada medida con las derivadas parciales de cada
+    fórmula, suponiendo errores independientes; la suma de pliegues combina
+    directamente el TEM de cada punto.
+
+    Args:
+        record (dict): Mediciones de la sesión
+        result (dict): Resultado válido de process_anthropometric_data
+        options (dict): Resultado de parse_uncertainty_options
+
+    Returns:
+        dict: Métrica -> SEM
+    """
+    weight, height, waist, hip = (float(record[name]) for name in ('weight', 'height', 'waist', 'hip'))
+    weight_error, height_error, waist_error, hip_error = (
+        _measurement_error(record, name, options) for name in ('weight', 'height', 'waist', 'hip')
+    )
+    relative_height = height_error / height
+    relative_waist = waist_error / waist
+    errors = {
+        'bmi': result['bmi'] * math.hypot(weight_error / weight, 2 * relative_height),
+        'waist_hip_ratio': result['waist_hip_ratio'] * math.hypot(relative_waist, hip_error / hip),
+        'waist_height_ratio': result['waist_height_ratio'] * math.hypot(relative_waist, relative_height),
+    }
+    # BRI = 364,2 - 365,5·√(1 - r), con r = (cintura/2π)² / (estatura/2)²
+    ratio = (waist / (2 * math.pi)) ** 2 / (0.5 * height) ** 2
+    errors['body_roundness_index'] = (
+        365.5 * ratio / math.sqrt(1 - ratio) * math.hypot(relative_waist, relative_height)
+    )
+
+    body_fat = result.get('body_fat_percentage')
+    if body_fat is not None:
+        folds, slope = body_fat_slope(
+            result.get('body_fat_equation', DEFAULT_EQUATION), record['gender'], float(record['age']), record,
+            result.get('density_conversion', DEFAULT_CONVERSION),
+        )
+        body_fat_error = abs(slope) * math.sqrt(sum(_measurement_error(record, name, options) ** 2 for name in folds))
+        fat_fraction = body_fat / 100
+        fat_mass_error = math.hypot(fat_fraction * weight_error, weight * body_fat_error / 100)
+        fat_free_mass_error = math.hypot((1 - fat_fraction) * weight_error, weight * body_fat_error / 100)
+        errors['body_fat_percentage'] = body_fat_error
+        errors['fat_mass'] = fat_mass_error
+        errors['fat_free_mass'] = fat_free_mass_error
+        errors['fat_free_mass_index'] = math.hypot(
+            fat_free_mass_error / (height / 100) ** 2, 2 * result['fat_free_mass_index'] * relative_height
+        )
+    errors = {metric: round(error, 3) for metric, error in errors.items()}
+
+    errors['sum_of_skinfolds'] = math.sqrt(sum(_measurement_error(record, name, options) ** 2 for name in FOLD_SITES))
+    return errors
+
+
+def default_error_options(options=None):
+    """Opciones de TEM ('tem' y 'tem_percent') para el SEM de las sesiones."""
+    return parse_uncertainty_options(dict(options or {}), DEFAULT_SAMPLES)
+
+
+class RegressionSums:
+    """Sumas de una regresión lineal y = a + b·t que admiten altas y bajas en O(1)."""
+
+    __slots__ = ('count', 'sum_t', 'sum_y', 'sum_tt', 'sum_ty')
+
+    def __init__(self, state=None):
+        self.count, self.sum_t, self.sum_y, self.sum_tt, self.sum_ty = state or (0, 0.0, 0.0, 0.0, 0.0)
+
+    def add(self, t, y, sign=1):
+        self.count += sign
+        self.sum_t += sign * t
+        self.sum_y += sign * y
+        self.sum_tt += sign * t * t
+        self.sum_ty += sign * t * y
+
+    def slope(self):
+        """Pendiente por día, o None con menos de dos fechas distintas."""
+        if self.count < 2:
+            return None
+        denominator = self.count * self.sum_tt - self.sum_t * self.sum_t
+        if abs(denominator) < 1e-9:
+            return None
+        return (self.count * self.sum_ty - self.sum_t * self.sum_y) / denominator
+
+    def state(self):
+        return [self.count, self.sum_t, self.sum_y, self.sum_tt, self.sum_ty]
+
+
+class MetricTrend:
+    """
+    Agregados incrementales de una métrica.
+
+    Args:
+        window (int): Sesiones de la ventana móvil
+        state (dict): Estado serializado con to_dict() (opcional)
+    """
+
+    def __init__(self, window, state=None):
+        state = state or {}
+        self.window = window
+        self.count = state.get('count', 0)
+        self.baseline = state.get('baseline')
+        self.last = state.get('last')
+        self.mean = state.get('mean', 0.0)
+        self.m2 = state.get('m2', 0.0)
+        self.season = RegressionSums(state.get('season'))
+        self.rolling = RegressionSums(state.get('rolling'))
+        self.points = deque((tuple(point) for point in state.get('points', ())), maxlen=window)
+
+    def append(self, t, value, error):
+        """
+        Añade el valor de una sesión (t en días desde la primera sesión).
+
+        Returns:
+            dict: Valor, diferencia con la sesión anterior, días transcurridos,
+                umbral de cambio fiable y si la diferencia es fiable
+        """
+        row = {"value": value, "delta": None, "days": None, "reliable_threshold": None, "reliable": None}
+        if self.last is not None:
+            last_t, last_value, last_error = self.last
+            delta = value - last_value
+            row['delta'] = round(delta, 3)
+            row['days'] = t - last_t
+            if error is not None and last_error is not None:
+                threshold = RELIABLE_CHANGE_Z * math.sqrt(error * error + last_error * last_error)
+                row['reliable_threshold'] = round(threshold, 3)
+                row['reliable'] = abs(delta) > threshold
+
+        self.count += 1
+        if self.baseline is None:
+            self.baseline = value
+        self.last = (t, value, error)
+        difference = value - self.mean
+        self.mean += difference / self.count
+        self.m2 += difference * (value - self.mean)
+
+        self.season.add(t, value)
+        if len(self.points) == self.window:
+            self.rolling.add(*self.points[0], sign=-1)
+        self.points.append((t, value))
+        self.rolling.add(t, value)
+        return row
+
+    def summary(self, swc=None):
+        """Resumen de la métrica; las pendientes se expresan por semana."""
+        if self.count == 0:
+            return None
+        season_slope = self.season.slope()
+        rolling_slope = self.rolling.slope()
+        change = self.last[1] - self.baseline
+        return {
+            "sessions": self.count,
+            "baseline": self.baseline,
+            "latest": self.last[1],
+            "change_from_baseline": round(change, 3),
+            "mean": round(self.mean, 3),
+            "sd": round(math.sqrt(self.m2 / (self.count - 1)), 3) if self.count > 1 else None,
+            "slope_per_week": round(season_slope * 7, 4) if season_slope is not None else None,
+            "rolling_slope_per_week": round(rolling_slope * 7, 4) if rolling_slope is not None else None,
+            "swc": swc,
+            "beyond_swc": abs(change) > swc if swc is not None else None,
+        }
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "baseline": self.baseline,
+            "last": list(self.last) if self.last is not None else None,
+            "mean": self.mean,
+            "m2": self.m2,
+            "season": self.season.state(),
+            "rolling": self.rolling.state(),
+            "points": [list(point) for point in self.points],
+        }
+
+
+class TrendAccumulator:
+    """
+    Agregados longitudinales de un atleta, actualizables sesión a sesión.
+
+    El estado es serializable (to_dict/from_dict) para guardarlo junto al
+    historial y continuar la serie sin releerla.
+
+    Args:
+        window (int): Sesiones de la ventana móvil de la pendiente
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self.origin = None
+        self.last_date = None
+        self.sessions = 0
+        self.metrics = {metric: MetricTrend(window) for metric in TREND_METRICS}
+
+    def append(self, session_date, values, errors):
+        """
+        Añade una sesión posterior (o igual) a la última.
+
+        Args:
+            session_date (str): Fecha de la sesión (AAAA-MM-DD)
+            values (dict): Resultado de session_values
+            errors (dict): Resultado de session_errors
+
+        Returns:
+            dict: Fila de diferencias por métrica (solo las medidas en la sesión)
+
+        Raises:
+            ValueError: Si la sesión es anterior a la última añadida
+        """
+        if self.last_date is not None and session_date < self.last_date:
+            raise ValueError("Las sesiones deben añadirse en orden cronológico")
+        day = session_day(session_date)
+        if self.origin is None:
+            self.origin = day
+        self.last_date = session_date
+        self.sessions += 1
+        return {
+            metric: self.metrics[metric].append(day - self.origin, value, errors.get(metric))
+            for metric, value in values.items()
+        }
+
+    def summary(self, swc=None):
+        """
+        Resumen por métrica de toda la serie.
+
+        Args:
+            swc (dict): Menor cambio importante por métrica (opcional)
+
+        Returns:
+            dict: Métrica -> resumen de MetricTrend (solo las medidas alguna vez)
+        """
+        swc = swc or {}
+        summaries = {metric: trend.summary(swc.get(metric)) for metric, trend in self.metrics.items()}
+        return {metric: summary for metric, summary in summaries.items() if summary is not None}
+
+    def to_dict(self):
+        return {
+            "window": self.window,
+            "origin": self.origin,
+            "last_date": self.last_date,
+            "sessions": self.sessions,
+            "metrics": {metric: trend.to_dict() for metric, trend in self.metrics.items() if trend.count},
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        accumulator = cls(state['window'])
+        accumulator.origin = state['origin']
+        accumulator.last_date = state['last_date']
+        accumulator.sessions = state['sessions']
+        for metric, metric_state in state['metrics'].items():
+            accumulator.metrics[metric] = MetricTrend(accumulator.window, metric_state)
+        return accumulator
+
+
+def flag_changes(rows, swc):
+    """
+    Añade a cada diferencia si supera el menor cambio importante.
+
+    Args:
+        rows (list): Filas de diferencias por sesión ({'deltas': {métrica: fila}})
+        swc (dict): Menor cambio importante por métrica
+
+    Returns:
+        list: Filas con 'swc' y 'beyond_swc' en cada métrica
+    """
+    swc = swc or {}
+    flagged = []
+    for row in rows:
+        deltas = {}
+        for metric, delta in row['deltas'].items():
+            threshold = swc.get(metric)
+            deltas[metric] = dict(
+                delta,
+                swc=threshold,
+                beyond_swc=abs(delta['delta']) > threshold
+                if threshold is not None and delta['delta'] is not None else None,
+            )
+        flagged.append(dict(row, deltas=deltas))
+    return flagged
+
+
+def swc_from_cohort(summary):
+    """
+    Menor cambio importante (0,2 × DE entre atletas) a partir del resumen de
+    una cohorte (CohortAccumulator.summary).
+
+    Returns:
+        dict: Métrica -> SWC (solo las métricas con al menos dos atletas)
+    """
+    return {
+        metric: round(SWC_FACTOR * stats['std'], 3)
+        for metric, stats in summary.items() if stats.get('count', 0) > 1
+    }
+
+
+def parse_swc(value):
+    """
+    Valida el SWC enviado en una petición.
+
+    Raises:
+        ValueError: Si no es un objeto con valores no negativos de métricas conocidas
+    """
+    if value is None:
+        return None
+    if not isinstance(value, dict):
+        raise ValueError("'swc' debe ser un objeto con un valor por métrica")
+    for metric, threshold in value.items():
+        if metric not in TREND_METRICS:
+            raise ValueError(f"Métrica desconocida en 'swc': {metric}")
+        if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or not threshold >= 0:
+            raise ValueError(f"El SWC de {metric} debe ser un número no negativo")
+    return {metric: float(threshold) for metric, threshold in value.items()}
+
+
+def analyze_series(sessions, results, window=DEFAULT_WINDOW, options=None):
+    """
+    Diferencias y agregados de una serie completa de sesiones ordenadas.
+
+    Args:
+        sessions (list): Registros con 'session_date' y las mediciones, en orden cronológico
+        results (list): Resultados válidos de cada sesión
+        window (int): Sesiones de la ventana móvil
+        options (dict): Opciones de TEM (default_error_options)
+
+    Returns:
+        tuple: (list, TrendAccumulator) - (filas de diferencias por sesión, agregados)
+    """
+    options = options or default_error_options()
+    accumulator = TrendAccumulator(window)
+    rows = []
+    for record, result in zip(sessions, results):
+        deltas = accumulator.append(
+            record['session_date'], session_values(record, result), session_errors(record, result, options)
+        )
+        rows.append({"session_date": record['session_date'], "deltas": deltas})
+    return rows, accumulator
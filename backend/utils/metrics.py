@@ -0,0 +1,338 @@
+"""
+Métricas de la API en formato de texto de Prometheus.
+
+Cada proceso acumula contadores e histogramas en memoria (un candado y unas
+pocas operaciones por observación). Para sumar los workers de gunicorn, cada
+proceso vuelca periódicamente una instantánea de sus métricas a un fichero
+SQLite compartido (METRICS_DB_PATH) y /api/metrics agrega las instantáneas de
+todos los procesos. Los contadores de procesos que ya terminaron se conservan;
+los indicadores (gauges) solo se suman para los procesos vivos.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+
+PREFIX = 'anthrocalc_'
+
+COUNTER = 'counter'
+GAUGE = 'gauge'
+HISTOGRAM = 'histogram'
+
+# Límites de los histogramas en segundos
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (0.000002, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005)
+
+# Nombre -> (tipo, descripción, límites del histograma)
+METRICS = {
+    'http_requests_total': (COUNTER, "Peticiones atendidas por ruta, método y código de estado", None),
+    'http_request_duration_seconds': (HISTOGRAM, "Duración de las peticiones por ruta y método", LATENCY_BUCKETS),
+    'calculation_stage_duration_seconds': (
+        HISTOGRAM, "Duración de cada etapa de process_anthropometric_data", STAGE_BUCKETS
+    ),
+    'validation_failures_total': (COUNTER, "Errores de validación por campo y código", None),
+    'result_cache_lookups_total': (COUNTER, "Consultas a la caché de resultados por resultado", None),
+    'result_cache_evictions_total': (COUNTER, "Entradas desalojadas de la caché de resultados", None),
+    'result_cache_expirations_total': (COUNTER, "Entradas caducadas de la caché de resultados", None),
+    'result_cache_entries': (GAUGE, "Entradas en la caché de resultados", None),
+    'recommendations_cache_lookups_total': (COUNTER, "Consultas a la caché de recomendaciones", None),
+    'batch_records_total': (COUNTER, "Registros procesados por lotes por resultado", None),
+    'batch_chunk_duration_seconds': (HISTOGRAM, "Duración del cálculo de cada bloque de un lote", LATENCY_BUCKETS),
+    'worker_processes': (GAUGE, "Procesos vivos con métricas registradas", None),
+}
+
+
+class MetricsRegistry:
+    """
+    Contadores e histogramas de un proceso.
+
+    Las etiquetas se pasan como tuplas de pares (nombre, valor). Tras un fork
+    el registro del proceso hijo se vacía para no contar dos veces lo que el
+    proceso maestro acumuló antes (por ejemplo, al precalentar).
+    """
+
+    def __init__(self, definitions=METRICS):
+        self.definitions = definitions
+        self._collectors = []
+        self.reset()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self.reset)
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def inc(self, name, labels=(), amount=1):
+        """Incrementa un contador."""
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, labels=()):
+        """Registra una observación en un histograma."""
+        self.observe_many(name, ((labels, value),))
+
+    def observe_many(self, name, observations):
+        """
+        Registra varias observaciones de un histograma con una sola adquisición del candado.
+
+        Args:
+            name (str): Nombre del histograma
+            observations (iterable): Pares (etiquetas, valor)
+        """
+        buckets = self.definitions[name][2]
+        with self._lock:
+            for labels, value in observations:
+                key = (name, labels)
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+                histogram[0][bisect_left(buckets, value)] += 1
+                histogram[1] += value
+                histogram[2] += 1
+
+    def register_collector(self, collector):
+        """
+        Registra una función que devuelve métricas calculadas al tomar la instantánea.
+
+        Args:
+            collector (callable): Devuelve una lista de (nombre, etiquetas, valor)
+                con los totales acumulados de este proceso
+        """
+        self._collectors.append(collector)
+
+    def snapshot(self):
+        """
+        Devuelve una copia serializable de las métricas del proceso.
+
+        Returns:
+            dict: Listas 'counters', 'gauges' y 'histograms'
+        """
+        with self._lock:
+            counters = [[name, labels, value] for (name, labels), value in self._counters.items()]
+            histograms = [
+                [name, labels, list(buckets), total, count]
+                for (name, labels), (buckets, total, count) in self._histograms.items()
+            ]
+        gauges = []
+        for collector in self._collectors:
+            for name, labels, value in collector():
+                target = gauges if self.definitions[name][0] == GAUGE else counters
+                target.append([name, labels, value])
+        return {"counters": counters, "gauges": gauges, "histograms": histograms}
+
+
+def _label_key(labels):
+    return tuple(tuple(pair) for pair in labels)
+
+
+def merge_snapshots(snapshots):
+    """
+    Suma las instantáneas de varios procesos.
+
+    Args:
+        snapshots (list): Pares (instantánea, proceso vivo)
+
+    Returns:
+        dict: (nombre, etiquetas) -> valor, por tipo ('counters', 'gauges', 'histograms')
+    """
+    merged = {"counters": {}, "gauges": {}, "histograms": {}}
+    live = 0
+    for snapshot, alive in snapshots:
+        live += alive
+        for name, labels, value in snapshot['counters']:
+            key = (name, _label_key(labels))
+            merged['counters'][key] = merged['counters'].get(key, 0) + value
+        if alive:
+            for name, labels, value in snapshot['gauges']:
+                key = (name, _label_key(labels))
+                merged['gauges'][key] = merged['gauges'].get(key, 0) + value
+        for name, labels, buckets, total, count in snapshot['histograms']:
+            key = (name, _label_key(labels))
+            current = merged['histograms'].get(key)
+            if current is None:
+                merged['histograms'][key] = [list(buckets), total, count]
+            else:
+                current[0] = [left + right for left, right in zip(current[0], buckets)]
+                current[1] += total
+                current[2] += count
+    merged['gauges'][('worker_processes', ())] = live
+    return merged
+
+
+def _format_labels(labels, extra=None):
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(merged, definitions=METRICS):
+    """
+    Genera el formato de texto de Prometheus (versión 0.0.4).
+
+    Args:
+        merged (dict): Resultado de merge_snapshots
+
+    Returns:
+        str: Texto de exposición
+    """
+    by_name = {}
+    for kind in ('counters', 'gauges', 'histograms'):
+        for (name, labels), value in merged[kind].items():
+            by_name.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name, (kind, description, buckets) in definitions.items():
+        samples = by_name.get(name)
+        if not samples:
+            continue
+        full_name = PREFIX + name
+        lines.append(f"# HELP {full_name} {description}")
+        lines.append(f"# TYPE {full_name} {kind}")
+        for labels, value in sorted(samples, key=lambda sample: sample[0]):
+            if kind != HISTOGRAM:
+                lines.append(f"{full_name}{_format_labels(labels)} {_format_value(value)}")
+                continue
+            counts, total, count = value
+            cumulative = 0
+            for bound, bucket_count in zip(buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{full_name}_bucket{_format_labels(labels, ('le', le))} {cumulative}")
+            lines.append(f"{full_name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{full_name}_count{_format_labels(labels)} {count}")
+    return '\n'.join(lines) + '\n'
+
+
+def _is_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SqliteMetricsStore:
+    """
+    Instantáneas de métricas por proceso en un fichero SQLite compartido.
+
+    Un hilo en segundo plano de cada proceso sobrescribe su propia fila cada
+    flush_interval segundos, de modo que las peticiones no escriben en disco y
+    las instantáneas de los workers inactivos no se quedan atrasadas.
+    """
+
+    def __init__(self, path, flush_interval=1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._flusher_pid = None
+        self._flusher_lock = threading.Lock()
+        # Conexión temporal para no heredar conexiones abiertas tras el fork de gunicorn
+        connection = self._open()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            "pid INTEGER PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        connection.close()
+
+    def _open(self):
+        connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or getattr(self._local, 'pid', None) != os.getpid():
+            connection = self._local.connection = self._open()
+            self._local.pid = os.getpid()
+        return connection
+
+    def flush(self, registry):
+        """Guarda la instantánea actual de este proceso."""
+        self._write(json.dumps(registry.snapshot()))
+
+    def _write(self, data):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO snapshots (pid, data, updated_at) VALUES (?, ?, ?)",
+            (os.getpid(), data, time.time())
+        )
+
+    def ensure_flushing(self, registry):
+        """
+        Arranca (una vez por proceso) el hilo que guarda las instantáneas.
+
+        Se llama desde las peticiones y no al crear el almacén porque los hilos
+        no sobreviven al fork de los workers.
+        """
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        with self._flusher_lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+            threading.Thread(target=self._flush_loop, args=(registry,), name='metrics-flush', daemon=True).start()
+
+    def _flush_loop(self, registry):
+        previous = None
+        while True:
+            time.sleep(self.flush_interval)
+            snapshot = json.dumps(registry.snapshot())
+            if snapshot == previous:
+                continue
+            try:
+                self._write(snapshot)
+                previous = snapshot
+            except sqlite3.Error:
+                pass
+
+    def snapshots(self):
+        """
+        Devuelve las instantáneas de todos los procesos.
+
+        Returns:
+            list: Pares (instantánea, proceso vivo)
+        """
+        rows = self._connection().execute("SELECT pid, data FROM snapshots").fetchall()
+        return [(json.loads(data), _is_alive(pid)) for pid, data in rows]
+
+
+def collect_metrics(registry, store=None):
+    """
+    Agrega las métricas de todos los procesos (o solo las de este, sin almacén).
+
+    Returns:
+        str: Texto de exposición de Prometheus
+    """
+    if store is None:
+        return render_prometheus(merge_snapshots([(registry.snapshot(), True)]))
+    store.flush(registry)
+    return render_prometheus(merge_snapshots(store.snapshots()))
+
+
+def count_validation_failures(result):
+    """Cuenta los errores de validación de un resultado fallido por campo y código."""
+    for error in result.get('error_codes', ()):
+        registry.inc('validation_failures_total', (('field', error['field']), ('code', error['code'])))
+
+
+# Registro del proceso actual
+registry = MetricsRegistry()
@@ -0,0 +1,82 @@
+"""
+Perfilado por muestreo de peticiones para depurar en producción.
+
+Desactivado por defecto. Con PROFILE_SAMPLE_EVERY=N se perfila con cProfile
+una de cada N peticiones de cada worker y el perfil se guarda en PROFILE_DIR
+(se analiza con `python -m pstats fichero.prof` o snakeviz). Solo hay un
+perfil activo a la vez por proceso; las peticiones muestreadas mientras otra
+se está perfilando se omiten.
+"""
+
+import cProfile
+import os
+import threading
+import time
+
+
+class SamplingProfiler:
+    """
+    Perfila una de cada `every` peticiones y guarda los perfiles en disco.
+
+    Args:
+        every (int): Frecuencia de muestreo (0 = desactivado)
+        directory (str): Carpeta de los ficheros .prof
+        max_files (int): Número máximo de perfiles conservados (se borran los más antiguos)
+    """
+
+    def __init__(self, every=0, directory='profiles', max_files=100):
+        self.every = every
+        self.directory = directory
+        self.max_files = max_files
+        self._count = 0
+        self._count_lock = threading.Lock()
+        self._active = threading.Lock()
+
+    def start(self):
+        """
+        Empieza a perfilar la petición actual si le toca por muestreo.
+
+        Returns:
+            cProfile.Profile: Perfil activo, o None si la petición no se perfila
+        """
+        if not self.every:
+            return None
+        with self._count_lock:
+            self._count += 1
+            sampled = self._count % self.every == 0
+        if not sampled or not self._active.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Otro perfilador ya está activo en el intérprete
+            self._active.release()
+            return None
+        return profile
+
+    def stop(self, profile, label):
+        """
+        Detiene el perfil y lo guarda como <fecha>-<pid>-<etiqueta>.prof.
+
+        Args:
+            profile (cProfile.Profile): Perfil devuelto por start
+            label (str): Etiqueta del fichero (normalmente el endpoint)
+        """
+        try:
+            profile.disable()
+        finally:
+            self._active.release()
+        os.makedirs(self.directory, exist_ok=True)
+        timestamp = time.strftime('%Y%m%d-%H%M%S')
+        filename = f"{timestamp}-{time.time_ns() % 1000000:06d}-{os.getpid()}-{label}.prof"
+        profile.dump_stats(os.path.join(self.directory, filename))
+        self._prune()
+
+    def _prune(self):
+        files = sorted(name for name in os.listdir(self.directory) if name.endswith('.prof'))
+        for name in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
@@ -0,0 +1,326 @@
+"""
+Proyección semana a semana de la composición corporal según el balance
+energético prescrito.
+
+Modelo de reparto de energía (Forbes, con las densidades energéticas de Hall):
+cada día el balance energético se convierte en cambio de peso, y la fracción
+de ese cambio que corresponde a masa libre de grasa depende de la masa grasa
+actual:
+
+    p = 10,4 / (10,4 + MG)                      (fracción de MLG del cambio)
+    ΔPeso = balance / (p · 1816 + (1 - p) · 9440)   (kcal/kg de MLG y de grasa)
+
+El gasto se adapta al cambio de peso (22 kcal/día por kg), de modo que el
+balance efectivo disminuye a medida que el atleta se aleja del peso inicial.
+El balance prescrito por defecto es el de determine_goal: el déficit (en % del
+gasto de mantenimiento, estimado con Katch-McArdle) o el superávit (kcal/día).
+
+La simulación vectorizada avanza a la vez todos los atletas y escenarios de
+una petición (una matriz atletas × escenarios) y coincide exactamente con la
+versión escalar de referencia.
+"""
+
+from utils.batch_calculators import batch_to_records, process_anthropometric_batch, records_to_columns
+from utils.batch_io import check_record
+from utils.growth import is_youth
+from utils.lazy_imports import lazy_import
+from utils.rounding import round_exact
+
+np = lazy_import('numpy')
+
+# Densidad energética del cambio de tejido (kcal/kg)
+FAT_ENERGY = 9440
+LEAN_ENERGY = 1816
+
+# Constante de Forbes (kg de masa grasa)
+FORBES_CONSTANT = 10.4
+
+# Adaptación del gasto al cambio de peso (kcal/día por kg)
+ADAPTATION_PER_KG = 22
+
+# Masa grasa mínima de la simulación (grasa esencial, kg)
+MIN_FAT_MASS = 1.0
+
+# Gasto de mantenimiento: Katch-McArdle (370 + 21,6 · MLG) por el factor de actividad
+DEFAULT_ACTIVITY_FACTOR = 1.7
+ACTIVITY_FACTOR_RANGE = (1.2, 2.5)
+
+DEFAULT_HORIZONS = (8, 12, 16)
+MAX_HORIZON_WEEKS = 52
+
+# Balance máximo de un escenario (kcal/día y % del mantenimiento)
+MAX_BALANCE = 1500
+MAX_BALANCE_PERCENT = 40
+
+PROJECTION_METRICS = ('weight', 'fat_mass', 'fat_free_mass', 'fat_free_mass_index', 'body_fat_percentage')
+
+_DECIMALS = {
+    'weight': 2,
+    'fat_mass': 2,
+    'fat_free_mass': 2,
+    'fat_free_mass_index': 2,
+    'body_fat_percentage': 1,
+}
+
+
+def maintenance_energy(fat_free_mass, activity_factor=DEFAULT_ACTIVITY_FACTOR):
+    """Gasto de mantenimiento (kcal/día) a partir de la masa libre de grasa."""
+    return (370 + 21.6 * fat_free_mass) * activity_factor
+
+
+def prescribed_balance(goal, maintenance):
+    """
+    Balance energético (kcal/día) del objetivo de determine_goal.
+
+    El déficit de 'Reducción visceral' se expresa en % del mantenimiento y el
+    superávit de 'Hipertrofia' en kcal/día; el resto de objetivos mantiene el peso.
+    """
+    if goal.get('caloric_deficit'):
+        return -maintenance * goal['caloric_deficit'] / 100
+    if goal.get('caloric_surplus'):
+        return float(goal['caloric_surplus'])
+    return 0.0
+
+
+def _number_list(options, name, bound):
+    values = options.get(name, [])
+    if not isinstance(values, list) or not all(
+        not isinstance(value, bool) and isinstance(value, (int, float)) and abs(value) <= bound
+        for value in values
+    ):
+        raise ValueError(f"'{name}' debe ser una lista de números entre -{bound} y {bound}")
+    return [float(value) for value in values]
+
+
+def parse_projection_options(options, max_weeks=MAX_HORIZON_WEEKS):
+    """
+    Valida las opciones de una proyección.
+
+    Args:
+        options (dict): 'balances' (kcal/día), 'balance_percent' (% del
+            mantenimiento), 'horizons' (semanas), 'activity_factor' y
+            'prescribed' (incluir el balance del objetivo, por defecto true)
+        max_weeks (int): Horizonte máximo
+
+    Returns:
+        dict: Opciones normalizadas
+
+    Raises:
+        ValueError: Si alguna opción no es válida
+    """
+    horizons = options.get('horizons', list(DEFAULT_HORIZONS))
+    if not isinstance(horizons, list) or not horizons or not all(
+        not isinstance(week, bool) and isinstance(week, int) and 1 <= week <= max_weeks for week in horizons
+    ):
+        raise ValueError(f"'horizons' debe ser una lista de semanas entre 1 y {max_weeks}")
+    activity_factor = options.get('activity_factor', DEFAULT_ACTIVITY_FACTOR)
+    low, high = ACTIVITY_FACTOR_RANGE
+    if isinstance(activity_factor, bool) or not isinstance(activity_factor, (int, float)) \
+            or not low <= activity_factor <= high:
+        raise ValueError(f"'activity_factor' debe estar entre {low} y {high}")
+    prescribed = options.get('prescribed', True)
+    if not isinstance(prescribed, bool):
+        raise ValueError("'prescribed' debe ser true o false")
+
+    parsed = {
+        'balances': _number_list(options, 'balances', MAX_BALANCE),
+        'balance_percent': _number_list(options, 'balance_percent', MAX_BALANCE_PERCENT),
+        'horizons': sorted(set(horizons)),
+        'activity_factor': float(activity_factor),
+        'prescribed': prescribed,
+    }
+    if not parsed['prescribed'] and not parsed['balances'] and not parsed['balance_percent']:
+        raise ValueError("Se necesita al menos un escenario ('balances', 'balance_percent' o 'prescribed')")
+    return parsed
+
+
+def _step(weight, fat_mass, initial_weight, balance):
+    """Avanza un día: devuelve (peso, masa grasa)."""
+    effective = balance + ADAPTATION_PER_KG * (initial_weight - weight)
+    lean_fraction = FORBES_CONSTANT / (FORBES_CONSTANT + fat_mass)
+    change = effective / (lean_fraction * LEAN_ENERGY + (1 - lean_fraction) * FAT_ENERGY)
+    return weight + change, fat_mass + (1 - lean_fraction) * change
+
+
+def simulate(weight, fat_mass, height, balance, weeks):
+    """
+    Simulación de referencia (escalar) de un atleta y un escenario.
+
+    Args:
+        weight (float): Peso inicial (kg)
+        fat_mass (float): Masa grasa inicial (kg)
+        height (float): Estatura (cm)
+        balance (float): Balance energético prescrito (kcal/día)
+        weeks (int): Semanas simuladas
+
+    Returns:
+        dict: Métrica de PROJECTION_METRICS -> valores (sin redondear) de las semanas 0..weeks
+    """
+    height_m2 = (height / 100) ** 2
+    trajectory = {name: [] for name in PROJECTION_METRICS}
+    current_weight, current_fat = weight, fat_mass
+    for day in range(weeks * 7 + 1):
+        if day % 7 == 0:
+            fat_free_mass = current_weight - current_fat
+            trajectory['weight'].append(current_weight)
+            trajectory['fat_mass'].append(current_fat)
+            trajectory['fat_free_mass'].append(fat_free_mass)
+            trajectory['fat_free_mass_index'].append(fat_free_mass / height_m2)
+            trajectory['body_fat_percentage'].append(current_fat / current_weight * 100)
+        current_weight, current_fat = _step(current_weight, current_fat, weight, balance)
+        current_fat = max(current_fat, MIN_FAT_MASS)
+    return trajectory
+
+
+def simulate_batch(weight, fat_mass, height, balance, weeks):
+    """
+    Versión vectorizada de simulate para una matriz de atletas × escenarios.
+
+    Args:
+        weight, fat_mass, height (ndarray): Valores iniciales por atleta (forma (A,))
+        balance (ndarray): Balance por atleta y escenario (forma (A, S))
+        weeks (int): Semanas simuladas
+
+    Returns:
+        dict: Métrica -> array (semanas + 1, A, S) sin redondear
+    """
+    balance = np.asarray(balance, dtype=float)
+    initial_weight = np.broadcast_to(np.asarray(weight, dtype=float)[:, None], balance.shape)
+    height_m2 = ((np.asarray(height, dtype=float) / 100) ** 2)[:, None]
+    current_weight = initial_weight.copy()
+    current_fat = np.broadcast_to(np.asarray(fat_mass, dtype=float)[:, None], balance.shape).copy()
+
+    weekly_weight = np.empty((weeks + 1,) + balance.shape)
+    weekly_fat = np.empty_like(weekly_weight)
+    for day in range(weeks * 7 + 1):
+        if day % 7 == 0:
+            weekly_weight[day // 7] = current_weight
+            weekly_fat[day // 7] = current_fat
+        current_weight, current_fat = _step(current_weight, current_fat, initial_weight, balance)
+        np.maximum(current_fat, MIN_FAT_MASS, out=current_fat)
+
+    fat_free_mass = weekly_weight - weekly_fat
+    return {
+        'weight': weekly_weight,
+        'fat_mass': weekly_fat,
+        'fat_free_mass': fat_free_mass,
+        'fat_free_mass_index': fat_free_mass / height_m2,
+        'body_fat_percentage': weekly_fat / weekly_weight * 100,
+    }
+
+
+def _scenario_labels(options):
+    labels = ['prescribed'] if options['prescribed'] else []
+    labels += [f"{value:+g} kcal" for value in options['balances']]
+    labels += [f"{value:+g} %" for value in options['balance_percent']]
+    return labels
+
+
+def project_athletes(records, options):
+    """
+    Proyecta la composición corporal de varios atletas en todos los escenarios.
+
+    Args:
+        records (list): Mediciones de cada atleta (formato de /api/calculate)
+        options (dict): Resultado de parse_projection_options
+
+    Returns:
+        list: Por atleta, 'maintenance_kcal', el objetivo y, por escenario, el
+            balance, las trayectorias semanales de PROJECTION_METRICS y el
+            estado (con el cambio respecto a la semana 0) en cada horizonte;
+            o 'success' False y el error si no se puede proyectar
+    """
+    # Motor vectorizado directamente: no es un lote de /api/calculate/batch y no
+    # debe contar en sus métricas
+    results = [check_record(record) for record in records]
+    valid = [index for index, result in enumerate(results) if result is None]
+    if valid:
+        batch = process_anthropometric_batch(records_to_columns([records[index] for index in valid]))
+        for index, result in zip(valid, batch_to_records(batch)):
+            results[index] = result
+    outputs = [None] * len(records)
+    rows = []
+    for index, (record, result) in enumerate(zip(records, results)):
+        if not result['success']:
+            outputs[index] = result
+        elif 'fat_mass' not in result:
+            outputs[index] = {
+                "success": False,
+                "error": "La proyección necesita los pliegues cutáneos para estimar la masa grasa"
+            }
+        elif result['fat_mass'] < MIN_FAT_MASS:
+            # Por debajo del mínimo la simulación recortaría la masa grasa desde la
+            # primera semana y cambiaría la composición incluso sin balance energético
+            outputs[index] = {
+                "success": False,
+                "error": f"La masa grasa está por debajo del mínimo del modelo ({MIN_FAT_MASS} kg)"
+            }
+        elif is_youth(float(record['age'])):
+            outputs[index] = {
+                "success": False,
+                "error": "La proyección no modela el crecimiento de los menores de 18 años"
+            }
+        else:
+            rows.append(index)
+
+    labels = _scenario_labels(options)
+    weeks = options['horizons'][-1]
+    if rows:
+        weight = np.array([float(records[i]['weight']) for i in rows])
+        height = np.array([float(records[i]['height']) for i in rows])
+        fat_mass = np.array([results[i]['fat_mass'] for i in rows])
+        maintenance = maintenance_energy(weight - fat_mass, options['activity_factor'])
+        columns = []
+        if options['prescribed']:
+            columns.append(np.array([
+                prescribed_balance(results[i]['goal'], maintenance[k]) for k, i in enumerate(rows)
+            ]))
+        columns += [np.full(len(rows), value) for value in options['balances']]
+        columns += [maintenance * value / 100 for value in options['balance_percent']]
+        balance = np.column_stack(columns)
+        trajectory = {
+            name: round_exact(values, _DECIMALS[name])
+            for name, values in simulate_batch(weight, fat_mass, height, balance, weeks).items()
+        }
+        horizons = options['horizons']
+        # Listas anidadas [atleta][escenario][semana], convertidas una sola vez
+        series = {name: values.transpose(1, 2, 0).tolist() for name, values in trajectory.items()}
+        at_horizon = {name: values[horizons].transpose(1, 2, 0).tolist() for name, values in trajectory.items()}
+        change = {
+            name: round_exact(values[horizons] - values[0], _DECIMALS[name]).transpose(1, 2, 0).tolist()
+            for name, values in trajectory.items()
+        }
+        balance = round_exact(balance, 0).astype(int).tolist()
+        maintenance = round_exact(maintenance, 0).astype(int).tolist()
+
+    for k, index in enumerate(rows):
+        scenarios = []
+        for s, label in enumerate(labels):
+            scenarios.append(dict(
+                {name: series[name][k][s] for name in PROJECTION_METRICS},
+                scenario=label,
+                balance_kcal=balance[k][s],
+                weeks=list(range(weeks + 1)),
+                horizons=[
+                    dict(
+                        {name: at_horizon[name][k][s][h] for name in PROJECTION_METRICS},
+                        week=week,
+                        change={name: change[name][k][s][h] for name in PROJECTION_METRICS},
+                    )
+                    for h, week in enumerate(horizons)
+                ],
+            ))
+        outputs[index] = {
+            "success": True,
+            "goal": results[index]['goal']['primary_goal'],
+            "maintenance_kcal": maintenance[k],
+            "scenarios": scenarios,
+        }
+    return outputs
+
+
+def projection_cells(athletes, options):
+    """Tamaño de la simulación (atletas × escenarios × días) para limitar las peticiones."""
+    scenarios = len(options['balances']) + len(options['balance_percent']) + int(options['prescribed'])
+    return athletes * scenarios * options['horizons'][-1] * 7
+
@@ -0,0 +1,498 @@
+"""
+Recomendaciones por objetivo principal y recomendaciones personalizadas.
+
+La tabla general por objetivo se construye una sola vez al importar el módulo
+como estructura inmutable (MappingProxyType y tuplas) para no reconstruir el
+diccionario en cada petición.
+
+Las recomendaciones personalizadas salen de un fichero de reglas versionado
+(data/recommendation_rules.json) que se compila una sola vez en una tabla de
+decisión: cada regla cuyas condiciones (objetivo, deporte, género, edad,
+volumen de entrenamiento...) se cumplen fija o suma parámetros (g/kg de
+proteína, factor de actividad, ml/kg de agua...) y aporta consejos. Con los
+parámetros resultantes se calculan las cantidades de cada atleta (kcal,
+gramos de proteína, carbohidratos y grasa, ml de agua). La misma tabla se
+evalúa registro a registro o sobre columnas completas en los lotes, con
+resultados idénticos.
+"""
+
+import json
+import os
+import string
+from functools import lru_cache
+from types import MappingProxyType
+
+from utils.calculators import GOAL_HYPERTROPHY, GOAL_KEYS, GOAL_PROFILES, GOAL_VISCERAL_REDUCTION
+from utils.lazy_imports import lazy_import
+from utils.projection import maintenance_energy, prescribed_balance
+from utils.rounding import round_exact
+
+np = lazy_import('numpy')
+
+RULES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'recommendation_rules.json'
+)
+
+DEFAULT_RECOMMENDATION = MappingProxyType({"message": "No hay recomendaciones específicas para este objetivo"})
+
+_RECOMMENDATIONS_SOURCE = {
+    "Reducción visceral": {
+        "nutrition": [
+            "Déficit calórico moderado (15-20%)",
+            "Enfoque en alimentos con bajo índice glucémico",
+            "Priorizar proteínas (2g/kg) y grasas saludables",
+            "Considerar ayuno intermitente 16/8"
+        ],
+        "training": [
+            "3-4 sesiones semanales HIIT",
+            "2-3 sesiones semanales de fuerza",
+            "Monitorizar perímetro abdominal semanalmente"
+        ],
+        "supplements": [
+            "Omega-3 (2-4g/día)",
+            "Té verde o EGCG",
+            "Considerar L-carnitina pre-entrenamiento"
+        ]
+    },
+    "Hipertrofia": {
+        "nutrition": [
+            "Superávit calórico moderado (250-500 kcal)",
+            "Proteínas: 2.2-2.5g/kg de peso",
+            "Distribución de proteínas: 4-5 comidas",
+            "Carbohidratos peri-entrenamiento"
+        ],
+        "training": [
+            "Entrenamiento de fuerza 4-5 días/semana",
+            "Enfoque en hipertrofia (8-12 repeticiones)",
+            "Programación con sobrecarga progresiva",
+            "Descanso óptimo entre series (60-90s)"
+        ],
+        "supplements": [
+            "Creatina monohidrato (5g/día)",
+            "Proteína de suero post-entrenamiento",
+            "Considerar beta-alanina para entrenamientos intensos"
+        ]
+    },
+    "Recomposición avanzada": {
+        "nutrition": [
+            "Mantenimiento calórico con ciclado nutricional",
+            "Superávit en días de entrenamiento (+10%)",
+            "Déficit en días de descanso (-10%)",
+            "Proteínas elevadas constantes (2.2g/kg)"
+        ],
+        "training": [
+            "Entrenamiento mixto: fuerza-metabólico",
+            "Periodización ondulante",
+            "Incluir entrenamiento concurrente estratégico",
+            "Monitorizar rendimiento y recuperación"
+        ],
+        "supplements": [
+            "Creatina (5g/día)",
+            "Cafeína pre-entrenamiento",
+            "Proteína de digestión rápida y lenta"
+        ]
+    },
+    "Plan estándar": {
+        "nutrition": [
+            "Balance calórico ajustado a objetivo específico",
+            "Distribución macronutrientes balanceada",
+            "Enfoque en calidad nutricional",
+            "Hidratación óptima (35ml/kg)"
+        ],
+        "training": [
+            "Programa combinado fuerza-resistencia",
+            "3-4 sesiones semanales",
+            "Progresión gradual de intensidad",
+            "Incluir componente de movilidad y flexibilidad"
+        ],
+        "supplements": [
+            "Multivitamínico básico",
+            "Proteína de suero si es necesario",
+            "Considerar creatina según objetivos específicos"
+        ]
+    },
+    "Desarrollo juvenil": {
+        "nutrition": [
+            "Cubrir las necesidades energéticas del crecimiento (sin déficit calórico)",
+            "Proteínas: 1.2-1.6g/kg repartidas en las comidas",
+            "Calcio y vitamina D suficientes para el desarrollo óseo",
+            "Hidratación antes, durante y después del entrenamiento"
+        ],
+        "training": [
+            "Prioridad al desarrollo técnico y coordinativo",
+            "Fuerza con autocargas y técnica supervisada",
+            "Ajustar la carga en los picos de crecimiento",
+            "Seguir la evolución con las curvas de referencia para la edad"
+        ],
+        "supplements": [
+            "No se recomiendan suplementos deportivos en menores de 18 años",
+            "Consultar con el pediatra o el médico deportivo ante cualquier carencia"
+        ]
+    }
+}
+
+
+def _freeze(value):
+    """Convierte recursivamente dicts y listas en estructuras inmutables."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+RECOMMENDATIONS = _freeze(_RECOMMENDATIONS_SOURCE)
+del _RECOMMENDATIONS_SOURCE
+
+
+def _thaw(value):
+    """Convierte la estructura inmutable en dicts y listas serializables a JSON."""
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def get_recommendations_for(primary_goal):
+    """
+    Devuelve las recomendaciones de un objetivo en formato serializable.
+
+    Args:
+        primary_goal (str): Objetivo principal devuelto por determine_goal
+
+    Returns:
+        dict: Recomendaciones de nutrición, entrenamiento y suplementación
+    """
+    return _thaw(RECOMMENDATIONS.get(primary_goal, DEFAULT_RECOMMENDATION))
+
+
+# Secciones de consejos de las reglas, en el orden de la respuesta
+ADVICE_SECTIONS = ('nutrition', 'training', 'supplements', 'notes')
+
+# Condiciones de lista (el valor debe estar en la lista) y de rango [min, max)
+LIST_CONDITIONS = ('goal', 'sport', 'gender')
+RANGE_CONDITIONS = ('age', 'weight', 'training_hours', 'body_fat_percentage', 'fat_free_mass_index')
+
+# Cantidades calculadas: nombre -> decimales (0 = entero)
+TARGET_DECIMALS = {
+    'maintenance_kcal': 0,
+    'energy_balance_kcal': 0,
+    'energy_kcal': 0,
+    'training_day_kcal': 0,
+    'rest_day_kcal': 0,
+    'protein_g': 0,
+    'protein_g_per_kg': 1,
+    'protein_per_meal_g': 0,
+    'meals_per_day': 0,
+    'carbohydrate_g': 0,
+    'fat_g': 0,
+    'hydration_ml': 0,
+    'hydration_ml_per_training_hour': 0,
+    'training_hours': 1,
+    'activity_factor': 2,
+}
+
+_GOAL_CODES = {profile['primary_goal']: code for code, profile in enumerate(GOAL_PROFILES)}
+
+
+def _normalize_sport(value):
+    return str(value).strip().lower() if value not in (None, '') else None
+
+
+def _compile_conditions(rule_id, when):
+    conditions = []
+    for field, value in when.items():
+        if field in LIST_CONDITIONS:
+            if not isinstance(value, list) or not value:
+                raise ValueError(f"Regla '{rule_id}': '{field}' debe ser una lista no vacía")
+            if field == 'goal':
+                unknown = [item for item in value if item not in GOAL_KEYS]
+                if unknown:
+                    raise ValueError(f"Regla '{rule_id}': objetivos desconocidos {unknown}")
+                value = [GOAL_KEYS.index(item) for item in value]
+            elif field == 'sport':
+                value = [_normalize_sport(item) for item in value]
+            conditions.append((field, 'in', frozenset(value)))
+        elif field in RANGE_CONDITIONS:
+            if not isinstance(value, dict) or not value or set(value) - {'min', 'max'}:
+                raise ValueError(f"Regla '{rule_id}': '{field}' debe ser un rango con 'min' y/o 'max'")
+            conditions.append((field, 'range', (value.get('min'), value.get('max'))))
+        else:
+            raise ValueError(f"Regla '{rule_id}': condición desconocida '{field}'")
+    return tuple(conditions)
+
+
+def _check_advice(rule_id, advice):
+    """Comprueba que los consejos solo citan cantidades calculadas y que se pueden formatear."""
+    sample = {name: 0 if decimals == 0 else 0.0 for name, decimals in TARGET_DECIMALS.items()}
+    for section, texts in advice.items():
+        if section not in ADVICE_SECTIONS:
+            raise ValueError(f"Regla '{rule_id}': sección de consejos desconocida '{section}'")
+        for text in texts:
+            names = {name for _, name, _, _ in string.Formatter().parse(text) if name}
+            unknown = names - set(TARGET_DECIMALS)
+            if unknown:
+                raise ValueError(f"Regla '{rule_id}': cantidades desconocidas {sorted(unknown)}")
+            try:
+                text.format(**sample)
+            except (ValueError, IndexError) as exc:
+                raise ValueError(f"Regla '{rule_id}': texto no válido ({exc})")
+    return MappingProxyType({section: tuple(texts) for section, texts in advice.items()})
+
+
+class RuleSet:
+    """
+    Tabla de decisión compilada a partir de un fichero de reglas.
+
+    Args:
+        source (dict): Contenido del fichero de reglas ('version', 'inputs',
+            'defaults' y 'rules')
+
+    Raises:
+        ValueError: Si el fichero de reglas no es válido
+    """
+
+    def __init__(self, source):
+        self.version = str(source['version'])
+        self.defaults = MappingProxyType({name: float(value) for name, value in source['defaults'].items()})
+        hours = source.get('inputs', {}).get('training_hours', {})
+        self.training_hours = (float(hours.get('default', 0)), hours.get('min', 0), hours.get('max', 168))
+        rules = []
+        for rule in source['rules']:
+            rule_id = rule['id']
+            for key in ('set', 'add'):
+                unknown = set(rule.get(key, {})) - set(self.defaults)
+                if unknown:
+                    raise ValueError(f"Regla '{rule_id}': parámetros desconocidos {sorted(unknown)}")
+            rules.append((
+                rule_id,
+                _compile_conditions(rule_id, rule.get('when', {})),
+                tuple((name, float(value)) for name, value in rule.get('set', {}).items()),
+                tuple((name, float(value)) for name, value in rule.get('add', {}).items()),
+                _check_advice(rule_id, rule.get('advice', {})),
+            ))
+        self.rules = tuple(rules)
+
+    def parse_training_hours(self, value):
+        """
+        Horas de entrenamiento semanales de un registro (el valor por defecto si no constan).
+
+        Raises:
+            ValueError: Si no es un número dentro del rango admitido
+        """
+        default, low, high = self.training_hours
+        if value is None:
+            return default
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not low <= value <= high:
+            raise ValueError(f"'training_hours' debe ser un número entre {low} y {high}")
+        return float(value)
+
+    def _targets(self, params, weight, fat_free_mass, goal_balance, training_hours):
+        """
+        Cantidades sin redondear. Las mismas operaciones sirven para escalares
+        y para columnas completas.
+        """
+        maintenance = maintenance_energy(fat_free_mass, params['activity_factor'])
+        balance = goal_balance(maintenance)
+        energy = maintenance + balance
+        protein = _maximum(params['protein_g_per_kg'] * weight, params['protein_g_per_kg_ffm'] * fat_free_mass)
+        carbohydrate = params['carbohydrate_g_per_kg'] * weight
+        fat = _maximum(params['fat_min_g_per_kg'] * weight, (energy - 4 * protein - 4 * carbohydrate) / 9)
+        cycling = params['energy_cycling_percent'] / 100
+        return {
+            'maintenance_kcal': maintenance,
+            'energy_balance_kcal': balance,
+            'energy_kcal': energy,
+            'training_day_kcal': energy * (1 + cycling),
+            'rest_day_kcal': energy * (1 - cycling),
+            'protein_g': protein,
+            'protein_g_per_kg': protein / weight,
+            'protein_per_meal_g': protein / params['meals_per_day'],
+            'meals_per_day': params['meals_per_day'],
+            'carbohydrate_g': carbohydrate,
+            'fat_g': fat,
+            'hydration_ml': (
+                params['hydration_ml_per_kg'] * weight
+                + params['hydration_ml_per_training_hour'] * training_hours / 7
+            ),
+            'hydration_ml_per_training_hour': params['hydration_ml_per_training_hour'],
+            'training_hours': training_hours,
+            'activity_factor': params['activity_factor'],
+        }
+
+    def recommend(self, record, results):
+        """
+        Recomendaciones personalizadas de un atleta.
+
+        Args:
+            record (dict): Mediciones (con 'sport' y 'training_hours' opcionales)
+            results (dict): Resultado correcto de process_anthropometric_data
+
+        Returns:
+            dict: 'rules_version', 'rules' (ids aplicados), 'targets' (cantidades)
+                y 'recommendations' (consejos por sección)
+
+        Raises:
+            ValueError: Si faltan la composición corporal o 'training_hours' no es válido
+        """
+        goal = results.get('goal')
+        if goal is None or results.get('fat_free_mass') is None:
+            raise ValueError(
+                "Las recomendaciones personalizadas necesitan la composición corporal (pliegues cutáneos)"
+            )
+        inputs = {
+            'goal': _GOAL_CODES[goal['primary_goal']],
+            'sport': _normalize_sport(record.get('sport')),
+            'gender': record.get('gender'),
+            'age': float(record['age']),
+            'weight': float(record['weight']),
+            'training_hours': self.parse_training_hours(record.get('training_hours')),
+            'body_fat_percentage': results.get('body_fat_percentage'),
+            'fat_free_mass_index': results.get('fat_free_mass_index'),
+        }
+
+        params = dict(self.defaults)
+        matched = []
+        for rule in self.rules:
+            rule_id, conditions, assignments, additions, _ = rule
+            if not all(_condition(inputs[field], kind, value) for field, kind, value in conditions):
+                continue
+            for name, value in assignments:
+                params[name] = value
+            for name, value in additions:
+                params[name] += value
+            matched.append(rule)
+
+        raw = self._targets(
+            params, inputs['weight'], results['fat_free_mass'],
+            lambda maintenance: prescribed_balance(goal, maintenance), inputs['training_hours']
+        )
+        targets = {
+            name: round(raw[name]) if decimals == 0 else round(raw[name], decimals)
+            for name, decimals in TARGET_DECIMALS.items()
+        }
+        recommendations = {}
+        for _, _, _, _, advice in matched:
+            for section, texts in advice.items():
+                recommendations.setdefault(section, []).extend(text.format(**targets) for text in texts)
+        return {
+            "rules_version": self.version,
+            "rules": [rule[0] for rule in matched],
+            "targets": targets,
+            "recommendations": {
+                section: recommendations[section] for section in ADVICE_SECTIONS if section in recommendations
+            },
+        }
+
+    def recommend_batch(self, records, columns, batch):
+        """
+        Versión vectorizada de recommend (sin los textos de los consejos):
+        evalúa cada regla sobre las columnas completas del bloque.
+
+        Args:
+            records (list): Registros del bloque (para 'sport' y 'training_hours')
+            columns (dict): Columnas de entrada (records_to_columns)
+            batch (dict): Resultado de process_anthropometric_batch
+
+        Returns:
+            dict: 'targets' (cantidad -> lista, None sin recomendación), 'rules'
+                (ids aplicados o None) y 'errors' (mensaje o None) por registro
+        """
+        size = len(records)
+        errors = [None] * size
+        hours = np.full(size, np.nan)
+        for index, record in enumerate(records):
+            try:
+                hours[index] = self.parse_training_hours(record.get('training_hours'))
+            except ValueError as exc:
+                errors[index] = str(exc)
+        available = batch['valid'] & batch['has_composition'] & ~np.isnan(hours)
+        for index in np.flatnonzero(batch['valid'] & ~batch['has_composition']):
+            errors[index] = "Las recomendaciones personalizadas necesitan la composición corporal (pliegues cutáneos)"
+
+        inputs = {
+            'goal': batch['goal_code'],
+            'sport': np.array([_normalize_sport(record.get('sport')) for record in records], dtype=object),
+            'gender': columns['gender'],
+            'age': columns['age'],
+            'weight': columns['weight'],
+            'training_hours': hours,
+            'body_fat_percentage': batch['body_fat_percentage'],
+            'fat_free_mass_index': batch['fat_free_mass_index'],
+        }
+        params = {name: np.full(size, value) for name, value in self.defaults.items()}
+        matched = np.zeros((len(self.rules), size), dtype=bool)
+        with np.errstate(invalid='ignore'):
+            for position, (_, conditions, assignments, additions, _) in enumerate(self.rules):
+                mask = available.copy()
+                for field, kind, value in conditions:
+                    mask &= _condition_batch(inputs[field], kind, value)
+                for name, value in assignments:
+                    params[name][mask] = value
+                for name, value in additions:
+                    params[name][mask] += value
+                matched[position] = mask
+
+            goal_code, amount = batch['goal_code'], batch['goal_amount']
+
+            def goal_balance(maintenance):
+                return np.where(
+                    goal_code == GOAL_VISCERAL_REDUCTION, -maintenance * amount / 100,
+                    np.where(goal_code == GOAL_HYPERTROPHY, amount.astype(float), 0.0)
+                )
+
+            raw = self._targets(params, inputs['weight'], batch['fat_free_mass'], goal_balance, hours)
+
+        targets = {}
+        for name, decimals in TARGET_DECIMALS.items():
+            values = round_exact(np.where(available, raw[name], 0.0), decimals)
+            values = values.astype(np.int64).tolist() if decimals == 0 else values.tolist()
+            targets[name] = [value if ok else None for value, ok in zip(values, available.tolist())]
+        rule_ids = [rule[0] for rule in self.rules]
+        rules = [
+            [rule_ids[position] for position in np.flatnonzero(matched[:, index])] if ok else None
+            for index, ok in enumerate(available.tolist())
+        ]
+        return {"targets": targets, "rules": rules, "errors": errors}
+
+
+def _maximum(first, second):
+    """max() para escalares y np.maximum para columnas."""
+    if isinstance(first, float) and isinstance(second, float):
+        return max(first, second)
+    return np.maximum(first, second)
+
+
+def _condition(value, kind, expected):
+    if kind == 'in':
+        return value in expected
+    low, high = expected
+    return value is not None and (low is None or value >= low) and (high is None or value < high)
+
+
+def _condition_batch(values, kind, expected):
+    if kind == 'in':
+        return np.isin(values, list(expected))
+    mask = np.ones(len(values), dtype=bool)
+    if expected[0] is not None:
+        mask &= values >= expected[0]
+    if expected[1] is not None:
+        mask &= values < expected[1]
+    return mask
+
+
+@lru_cache(maxsize=None)
+def load_rules(path=RULES_PATH):
+    """
+    Carga y compila el fichero de reglas una sola vez por ruta.
+
+    Returns:
+        RuleSet: Tabla de decisión compilada
+
+    Raises:
+        ValueError: Si el fichero de reglas no es válido
+    """
+    with open(path, encoding='utf-8') as handle:
+        source = json.load(handle)
+    return RuleSet(source)
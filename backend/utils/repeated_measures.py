@@ -0,0 +1,283 @@
+"""
+Análisis de mediciones repetidas según el protocolo ISAK.
+
+Las repeticiones de una sesión se representan como una matriz
+atletas × puntos × repeticiones (NaN donde falta una repetición) y se
+procesan en una sola pasada vectorizada: error técnico de medida (ETM o TEM)
+por punto, %TEM, coeficiente de variación por atleta y punto, selección del
+valor final (media con dos repeticiones, mediana con tres) y aviso de
+tercera medición cuando las dos primeras difieren más de la tolerancia.
+"""
+
+from utils.batch_io import process_record_chunk
+from utils.equations import FOLD_SITES
+from utils.lazy_imports import lazy_import
+from utils.rounding import round_exact
+
+np = lazy_import('numpy')
+
+# Diferencia máxima entre las dos primeras repeticiones (% de su media)
+# antes de requerir una tercera: 5 % en pliegues y 1 % en el resto.
+SKINFOLD_TOLERANCE = 5.0
+DEFAULT_TOLERANCE = 1.0
+
+MAX_REPEATS = 3
+
+METHOD_MEAN = 'mean'
+METHOD_MEDIAN = 'median'
+METHOD_SINGLE = 'single'
+
+
+def site_tolerance(site):
+    """Devuelve la tolerancia ISAK (%) entre repeticiones de un punto de medida."""
+    return SKINFOLD_TOLERANCE if site in FOLD_SITES else DEFAULT_TOLERANCE
+
+
+def repeats_to_matrix(athletes, sites=None):
+    """
+    Construye la matriz de repeticiones a partir de registros por atleta.
+
+    Cada campo cuyo valor es una lista se interpreta como las repeticiones
+    de ese punto de medida; el resto de campos se conservan como datos fijos.
+
+    Args:
+        athletes (list): Registros por atleta
+        sites (list): Puntos de medida a incluir (por defecto, todos los que
+            aparecen como lista en algún registro)
+
+    Returns:
+        tuple: (list, ndarray, list) - (puntos, matriz de repeticiones, datos fijos)
+
+    Raises:
+        ValueError: Si alguna repetición no es numérica o hay demasiadas
+    """
+    if sites is None:
+        sites = []
+        for athlete in athletes:
+            for name, value in athlete.items():
+                if isinstance(value, list) and name not in sites:
+                    sites.append(name)
+
+    matrix = np.full((len(athletes), len(sites), MAX_REPEATS), np.nan)
+    fixed = []
+    for i, athlete in enumerate(athletes):
+        fixed.append({name: value for name, value in athlete.items() if not isinstance(value, list)})
+        for j, site in enumerate(sites):
+            repeats = athlete.get(site)
+            if repeats is None:
+                continue
+            if not isinstance(repeats, list):
+                repeats = [repeats]
+            if len(repeats) > MAX_REPEATS:
+                raise ValueError(f"Se admiten como máximo {MAX_REPEATS} repeticiones por punto ({site})")
+            for k, value in enumerate(repeats):
+                if value is None:
+                    continue
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    raise ValueError(f"Valor no numérico en las repeticiones de {site}")
+                matrix[i, j, k] = value
+    return list(sites), matrix, fixed
+
+
+def repeat_matrix(sites, repeats):
+    """
+    Normaliza una matriz de repeticiones enviada como listas anidadas
+    (atletas × puntos × repeticiones, null donde falta una medición).
+
+    Returns:
+        ndarray: Matriz con MAX_REPEATS repeticiones por punto
+
+    Raises:
+        ValueError: Si la matriz no tiene la forma esperada
+    """
+    try:
+        matrix = np.array(repeats, dtype=float)
+    except (TypeError, ValueError):
+        raise ValueError("La matriz de repeticiones debe ser numérica y rectangular")
+    if matrix.ndim != 3 or matrix.shape[1] != len(sites) or not 1 <= matrix.shape[2] <= MAX_REPEATS:
+        raise ValueError(
+            f"La matriz de repeticiones debe tener forma atletas × {len(sites)} puntos × 1-{MAX_REPEATS} repeticiones"
+        )
+    padding = np.full(matrix.shape[:2] + (MAX_REPEATS - matrix.shape[2],), np.nan)
+    return np.concatenate([matrix, padding], axis=2)
+
+
+def analyze_repeats(matrix, sites):
+    """
+    Analiza una matriz de repeticiones atletas × puntos × repeticiones.
+
+    Args:
+        matrix (ndarray): Repeticiones (NaN donde falta una medición)
+        sites (list): Nombre de cada punto de medida (segundo eje)
+
+    Returns:
+        dict: Arrays por atleta y punto (count, selected, method, cv,
+            difference_percent, third_needed) y resumen por punto
+            (tem, tem_percent, mean_cv, athletes, third_needed)
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    present = ~np.isnan(matrix)
+    count = present.sum(axis=2)
+    tolerance = np.array([site_tolerance(site) for site in sites], dtype=float)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        total = np.where(present, matrix, 0.0).sum(axis=2)
+        mean = total / count
+        deviations = np.where(present, matrix - mean[..., None], 0.0)
+        squares = (deviations * deviations).sum(axis=2)
+        variance = squares / (count - 1)
+        cv = np.where(count >= 2, np.sqrt(variance) / mean * 100, np.nan)
+
+        # Mediana ignorando NaN: al ordenar, los NaN quedan al final
+        ordered = np.sort(matrix, axis=2)
+        lower = np.take_along_axis(ordered, np.maximum((count - 1) // 2, 0)[..., None], axis=2)[..., 0]
+        upper = np.take_along_axis(ordered, (count // 2)[..., None], axis=2)[..., 0]
+        median = (lower + upper) / 2
+
+        first, second = matrix[..., 0], matrix[..., 1]
+        difference = np.abs(first - second) / ((first + second) / 2) * 100
+
+    selected = np.where(count >= 3, median, mean)
+    method = np.where(count >= 3, METHOD_MEDIAN, np.where(count == 2, METHOD_MEAN, METHOD_SINGLE))
+    third_needed = (count == 2) & (difference > tolerance)
+
+    # TEM agrupado: raíz de la varianza intra-sujeto media ponderada por los
+    # grados de libertad; con dos repeticiones equivale a sqrt(Σd² / 2n).
+    repeated = count >= 2
+    degrees = np.where(repeated, count - 1, 0).sum(axis=0)
+    measured = count.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        tem = np.sqrt(np.where(repeated, squares, 0.0).sum(axis=0) / degrees)
+        grand_mean = np.where(present, matrix, 0.0).sum(axis=(0, 2)) / measured
+        tem_percent = tem / grand_mean * 100
+        mean_cv = np.where(repeated, cv, 0.0).sum(axis=0) / repeated.sum(axis=0)
+
+    return {
+        "count": count,
+        "selected": selected,
+        "method": method,
+        "cv": cv,
+        "difference_percent": np.where(count >= 2, difference, np.nan),
+        "third_needed": third_needed,
+        "tolerance": tolerance,
+        "tem": tem,
+        "tem_percent": tem_percent,
+        "mean_cv": mean_cv,
+        "athletes": (count > 0).sum(axis=0),
+        "repeated_athletes": repeated.sum(axis=0),
+        "third_needed_count": third_needed.sum(axis=0),
+    }
+
+
+def _rounded(value, ndigits=2):
+    """Redondea para la respuesta JSON; NaN se devuelve como None."""
+    return None if np.isnan(value) else round(float(value), ndigits)
+
+
+def summarize_sites(analysis, sites):
+    """
+    Resume el error técnico de medida de cada punto.
+
+    Returns:
+        dict: Punto -> TEM, %TEM, CV medio, tolerancia y número de atletas
+    """
+    return {
+        site: {
+            "athletes": int(analysis['athletes'][j]),
+            "repeated_athletes": int(analysis['repeated_athletes'][j]),
+            "tem": _rounded(analysis['tem'][j], 3),
+            "tem_percent": _rounded(analysis['tem_percent'][j]),
+            "mean_cv": _rounded(analysis['mean_cv'][j]),
+            "tolerance_percent": float(analysis['tolerance'][j]),
+            "third_needed": int(analysis['third_needed_count'][j]),
+        }
+        for j, site in enumerate(sites)
+    }
+
+
+def selected_measurements(analysis, sites, fixed):
+    """
+    Combina los valores seleccionados con los datos fijos de cada atleta en
+    registros con el formato de process_anthropometric_data.
+
+    Returns:
+        list: Un registro de mediciones por atleta
+    """
+    # Mismo redondeo que round() de Python (el de _rounded en la respuesta)
+    selected = round_exact(analysis['selected'].ravel(), 2).reshape(analysis['selected'].shape)
+    records = []
+    for i, base in enumerate(fixed):
+        record = {key: value for key, value in base.items() if key != 'id'}
+        for j, site in enumerate(sites):
+            if not np.isnan(selected[i, j]):
+                record[site] = float(selected[i, j])
+        records.append(record)
+    return records
+
+
+def process_repeated_session(athletes, sites=None, calculate=True):
+    """
+    Procesa una sesión de mediciones repetidas de un grupo de atletas.
+
+    Args:
+        athletes (list): Registros por atleta; los campos con lista son repeticiones
+        sites (list): Puntos de medida a analizar (opcional)
+        calculate (bool): Calcular además las métricas con los valores seleccionados
+
+    Returns:
+        dict: Resumen por punto y, por atleta, detalle de repeticiones,
+            mediciones seleccionadas y resultados del cálculo
+
+    Raises:
+        ValueError: Si las repeticiones no tienen el formato esperado
+    """
+    sites, matrix, fixed = repeats_to_matrix(athletes, sites)
+    return process_repeat_matrix(sites, matrix, fixed, calculate)
+
+
+def process_repeat_matrix(sites, matrix, fixed, calculate=True):
+    """
+    Procesa una matriz de repeticiones ya construida.
+
+    Args:
+        sites (list): Puntos de medida (segundo eje de la matriz)
+        matrix (ndarray): Repeticiones atletas × puntos × repeticiones
+        fixed (list): Datos fijos de cada atleta (género, edad, id...)
+        calculate (bool): Calcular además las métricas con los valores seleccionados
+
+    Returns:
+        dict: Igual que process_repeated_session
+    """
+    analysis = analyze_repeats(matrix, sites)
+    measurements = selected_measurements(analysis, sites, fixed)
+    results = process_record_chunk([(record, None) for record in measurements]) if calculate else None
+
+    detail = []
+    for i, base in enumerate(fixed):
+        repeats = {}
+        for j, site in enumerate(sites):
+            count = int(analysis['count'][i, j])
+            if count == 0:
+                continue
+            repeats[site] = {
+                "repeats": [float(value) for value in matrix[i, j, :] if not np.isnan(value)],
+                "selected": _rounded(analysis['selected'][i, j]),
+                "method": str(analysis['method'][i, j]),
+                "cv": _rounded(analysis['cv'][i, j]),
+                "difference_percent": _rounded(analysis['difference_percent'][i, j]),
+                "third_measure_needed": bool(analysis['third_needed'][i, j]),
+            }
+        athlete = {
+            "id": base.get('id', i),
+            "sites": repeats,
+            "third_measure_needed": [site for site, info in repeats.items() if info['third_measure_needed']],
+            "measurements": measurements[i],
+        }
+        if results is not None:
+            athlete['results'] = results[i]
+        detail.append(athlete)
+
+    return {
+        "sites": summarize_sites(analysis, sites),
+        "athletes": detail,
+    }
@@ -0,0 +1,41 @@
+"""
+Redondeo vectorizado con los mismos resultados que round() de Python.
+"""
+
+from utils.lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+
+# Tolerancia (en unidades del último decimal conservado) para detectar valores
+# próximos a un empate de redondeo, donde se recurre a la implementación escalar
+_ROUNDING_TIE_TOLERANCE = 1e-6
+
+
+def round_exact(raw, ndigits, fallback=None):
+    """
+    Redondea como la función round() de Python.
+
+    np.round escala, redondea y desescala, lo que puede diferir del redondeo
+    decimal correcto de Python en valores muy próximos a un empate. Esos
+    elementos (extremadamente raros) se recalculan con la función escalar.
+
+    Args:
+        raw (ndarray): Valores sin redondear
+        ndigits (int): Número de decimales
+        fallback (callable): Función índice -> valor exacto calculado en escalar.
+                             Por defecto se aplica round() al valor sin redondear,
+                             válido cuando las operaciones coinciden con las escalares.
+
+    Returns:
+        ndarray: Valores redondeados
+    """
+    if fallback is None:
+        fallback = lambda i: round(float(raw[i]), ndigits)
+    rounded = np.round(raw, ndigits)
+    with np.errstate(invalid='ignore'):
+        scaled = raw * (10 ** ndigits)
+        distance_to_tie = np.abs(scaled - np.floor(scaled) - 0.5)
+        near_tie = distance_to_tie < _ROUNDING_TIE_TOLERANCE
+    for i in np.flatnonzero(near_tie):
+        rounded[i] = fallback(i)
+    return rounded
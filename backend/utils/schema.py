@@ -0,0 +1,338 @@
+"""
+Esquema declarativo de validación de datos antropométricos.
+
+Define una única tabla de campos (rangos, obligatoriedad) y de reglas cruzadas
+que se compila una vez al importar el módulo en un validador por registro y
+en un validador vectorizado para lotes. Cada error se identifica con un código
+estructurado y un bit, de modo que los lotes se validan con máscaras NumPy.
+"""
+
+from utils.equations import (
+    DEFAULT_EQUATION,
+    DENSITY_CONVERSIONS,
+    EQUATIONS,
+    FOLD_SITES,
+    fold_presence_batch,
+    is_applicable,
+)
+from utils.lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+
+# Códigos de error estructurados
+ERROR_REQUIRED = 'required'
+ERROR_INVALID_TYPE = 'invalid_type'
+ERROR_INVALID_CHOICE = 'invalid_choice'
+ERROR_OUT_OF_RANGE = 'out_of_range'
+ERROR_WAIST_EXCEEDS_HIP = 'waist_exceeds_hip'
+ERROR_BMI_INCOHERENT = 'bmi_incoherent'
+ERROR_EQUATION_FOLDS_MISSING = 'equation_folds_missing'
+ERROR_INVALID_EQUATION = 'invalid_equation'
+
+# Campos de selección de la ecuación: sus valores se usan como claves del registro
+SELECTION_FIELDS = ('equation', 'conversion')
+
+FIELD_SCHEMA = (
+    {
+        "name": "gender",
+        "choices": ("M", "F"),
+        "required": True,
+        "message": "El género debe ser 'M' o 'F'",
+    },
+    {
+        "name": "age",
+        "min": 10,
+        "max": 120,
+        "required": True,
+        "message": "La edad debe estar entre 10 y 120 años",
+    },
+    {
+        "name": "weight",
+        "min": 30,
+        "max": 300,
+        "required": True,
+        "message": "El peso debe estar entre 30 y 300 kg",
+    },
+    {
+        "name": "height",
+        "min": 100,
+        "max": 250,
+        "required": True,
+        "message": "La estatura debe estar entre 100 y 250 cm",
+    },
+    {
+        "name": "waist",
+        "min": 50,
+        "max": 200,
+        "required": True,
+        "message": "La circunferencia de cintura debe estar entre 50 y 200 cm",
+    },
+    {
+        "name": "hip",
+        "min": 50,
+        "max": 200,
+        "required": True,
+        "message": "La circunferencia de cadera debe estar entre 50 y 200 cm",
+    },
+) + tuple(
+    {
+        "name": fold_name,
+        "min": 3,
+        "max": 70,
+        "required": False,
+        "message": f"El pliegue {fold_name} debe estar entre 3 y 70 mm",
+    }
+    for fold_name in FOLD_SITES
+) + (
+    {
+        "name": "equation",
+        "choices": tuple(EQUATIONS),
+        "required": False,
+        "message": "Ecuación de composición corporal no reconocida",
+    },
+    {
+        "name": "conversion",
+        "choices": tuple(DENSITY_CONVERSIONS),
+        "required": False,
+        "message": "La conversión de densidad debe ser 'siri' o 'brozek'",
+    },
+)
+
+CROSS_FIELD_RULES = (
+    {
+        "name": "waist_hip",
+        "code": ERROR_WAIST_EXCEEDS_HIP,
+        "message": "La circunferencia de cadera debe ser mayor que la de cintura",
+    },
+    {
+        "name": "bmi_coherence",
+        "code": ERROR_BMI_INCOHERENT,
+        "min": 12,
+        "max": 60,
+        "message": "La relación peso-estatura no es fisiológicamente coherente",
+    },
+    {
+        "name": "equation_folds",
+        "code": ERROR_EQUATION_FOLDS_MISSING,
+        "message": "Faltan los pliegues requeridos por la ecuación seleccionada",
+    },
+    {
+        "name": "equation_type",
+        "code": ERROR_INVALID_EQUATION,
+        "message": "La ecuación y la conversión de densidad deben indicarse como texto",
+    },
+)
+
+
+def _compile_schema():
+    """
+    Compila el esquema en tuplas planas y asigna un bit a cada posible error.
+
+    Returns:
+        tuple: (reglas numéricas, reglas de opciones, reglas cruzadas, tabla de errores)
+    """
+    error_table = []
+
+    def register(field, code, message):
+        error_table.append({"field": field, "code": code, "message": message})
+        return 1 << (len(error_table) - 1)
+
+    numeric_rules = []
+    choice_rules = []
+    for field in FIELD_SCHEMA:
+        name = field['name']
+        required_bit = register(name, ERROR_REQUIRED, f"Campo requerido faltante: {name}") if field['required'] else 0
+        if 'choices' in field:
+            choice_rules.append((
+                name,
+                tuple(field['choices']),
+                required_bit,
+                register(name, ERROR_INVALID_CHOICE, field['message']),
+            ))
+            continue
+        numeric_rules.append((
+            name,
+            float(field['min']),
+            float(field['max']),
+            required_bit,
+            register(name, ERROR_INVALID_TYPE, f"Valor no numérico en el campo: {name}"),
+            register(name, ERROR_OUT_OF_RANGE, field['message']),
+        ))
+
+    cross_rules = {}
+    for rule in CROSS_FIELD_RULES:
+        cross_rules[rule['name']] = (
+            rule.get('min'),
+            rule.get('max'),
+            register(rule['name'], rule['code'], rule['message']),
+        )
+
+    return tuple(numeric_rules), tuple(choice_rules), cross_rules, tuple(error_table)
+
+
+_NUMERIC_RULES, _CHOICE_RULES, _CROSS_RULES, ERROR_TABLE = _compile_schema()
+
+REQUIRED_FIELDS = tuple(field['name'] for field in FIELD_SCHEMA if field['required'])
+NUMERIC_FIELDS = tuple(rule[0] for rule in _NUMERIC_RULES)
+FIELD_RANGES = {rule[0]: (rule[1], rule[2]) for rule in _NUMERIC_RULES}
+
+_WAIST_HIP_BIT = _CROSS_RULES['waist_hip'][2]
+_BMI_MIN, _BMI_MAX, _BMI_BIT = _CROSS_RULES['bmi_coherence']
+_EQUATION_FOLDS_BIT = _CROSS_RULES['equation_folds'][2]
+_INVALID_EQUATION_BIT = _CROSS_RULES['equation_type'][2]
+# Los bits de error de los lotes se guardan en enteros sin signo de 64 bits,
+# por lo que el esquema admite como máximo 64 errores distintos
+
+
+def _to_number(value):
+    """Convierte un valor a float; devuelve None si no es numérico."""
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def validate_record(data):
+    """
+    Valida un registro con el esquema compilado.
+
+    Cada campo se busca y se convierte a float una sola vez.
+
+    Args:
+        data (dict): Diccionario con mediciones antropométricas
+
+    Returns:
+        tuple: (dict, int) - (valores numéricos normalizados, bits de error)
+    """
+    error_bits = 0
+    values = {}
+
+    for name, choices, required_bit, choice_bit in _CHOICE_RULES:
+        choice = data.get(name)
+        if choice is None:
+            error_bits |= required_bit
+        elif name in SELECTION_FIELDS and not isinstance(choice, str):
+            # Una lista u objeto no puede buscarse en el registro de ecuaciones
+            error_bits |= _INVALID_EQUATION_BIT
+        elif choice not in choices:
+            error_bits |= choice_bit
+        values[name] = choice
+
+    for name, low, high, required_bit, type_bit, range_bit in _NUMERIC_RULES:
+        raw = data.get(name)
+        if raw is None:
+            error_bits |= required_bit
+            continue
+        value = _to_number(raw)
+        if value is None or value != value:
+            error_bits |= type_bit
+            continue
+        if value < low or value > high:
+            error_bits |= range_bit
+        values[name] = value
+
+    waist = values.get('waist')
+    hip = values.get('hip')
+    if waist is not None and hip is not None and waist > hip:
+        error_bits |= _WAIST_HIP_BIT
+
+    weight = values.get('weight')
+    height = values.get('height')
+    if weight is not None and height is not None and height != 0:
+        bmi = weight / ((height / 100) ** 2)
+        if bmi < _BMI_MIN or bmi > _BMI_MAX:
+            error_bits |= _BMI_BIT
+
+    if not error_bits & _INVALID_EQUATION_BIT:
+        equation = values.get('equation') or (DEFAULT_EQUATION if values.get('conversion') else None)
+        if equation in EQUATIONS and not is_applicable(equation, values['gender'], values):
+            error_bits |= _EQUATION_FOLDS_BIT
+
+    return values, error_bits
+
+
+def _is_set(column):
+    """Máscara de valores distintos de None en una columna de objetos."""
+    return np.array([value is not None for value in column], dtype=bool)
+
+
+def validate_columns(columns):
+    """
+    Versión vectorizada de validate_record para lotes en formato columnar.
+
+    Args:
+        columns (dict): 'gender' (array de objetos), opcionalmente 'equation' y
+                        'conversion', y columnas numéricas en float64 con NaN
+                        para los valores ausentes
+
+    Returns:
+        ndarray: Bits de error por registro (0 si el registro es válido)
+    """
+    size = len(columns['gender'])
+    error_bits = np.zeros(size, dtype=np.uint64)
+
+    for name, choices, required_bit, choice_bit in _CHOICE_RULES:
+        column = columns.get(name)
+        if column is None:
+            error_bits |= np.uint64(required_bit)
+            continue
+        missing = ~_is_set(column)
+        error_bits[missing] |= np.uint64(required_bit)
+        checked = ~missing
+        if name in SELECTION_FIELDS:
+            not_text = checked & np.array([not isinstance(value, str) for value in column], dtype=bool)
+            error_bits[not_text] |= np.uint64(_INVALID_EQUATION_BIT)
+            checked &= ~not_text
+        invalid = np.zeros(size, dtype=bool)
+        invalid[checked] = ~np.isin(column[checked], list(choices))
+        error_bits[invalid] |= np.uint64(choice_bit)
+
+    for name, low, high, required_bit, _, range_bit in _NUMERIC_RULES:
+        values = columns.get(name)
+        if values is None:
+            error_bits |= np.uint64(required_bit)
+            continue
+        missing = np.isnan(values)
+        error_bits[missing] |= np.uint64(required_bit)
+        error_bits[~missing & ((values < low) | (values > high))] |= np.uint64(range_bit)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        waist = columns['waist']
+        hip = columns['hip']
+        error_bits[waist > hip] |= np.uint64(_WAIST_HIP_BIT)
+
+        height = columns['height']
+        bmi = columns['weight'] / ((height / 100) ** 2)
+        error_bits[(height != 0) & ((bmi < _BMI_MIN) | (bmi > _BMI_MAX))] |= np.uint64(_BMI_BIT)
+
+    equation = columns.get('equation')
+    conversion = columns.get('conversion')
+    if equation is not None or conversion is not None:
+        equation = np.full(size, None, dtype=object) if equation is None else equation.copy()
+        if conversion is not None:
+            equation[_is_set(conversion) & ~_is_set(equation)] = DEFAULT_EQUATION
+        is_male = columns['gender'] == 'M'
+        presence = fold_presence_batch({name: columns[name] for name in FOLD_SITES if name in columns})
+        for name, definition in EQUATIONS.items():
+            required = np.where(is_male, definition['mask']['M'], definition['mask']['F'])
+            missing_folds = (equation == name) & (presence & required != required)
+            missing_folds &= (error_bits & np.uint64(_INVALID_EQUATION_BIT)) == 0
+            error_bits[missing_folds] |= np.uint64(_EQUATION_FOLDS_BIT)
+
+    return error_bits
+
+
+def decode_errors(error_bits):
+    """
+    Traduce los bits de error a su descripción estructurada.
+
+    Args:
+        error_bits (int): Bits de error de un registro
+
+    Returns:
+        list: Lista de dicts con 'field', 'code' y 'message'
+    """
+    error_bits = int(error_bits)
+    return [error for bit, error in enumerate(ERROR_TABLE) if error_bits >> bit & 1]
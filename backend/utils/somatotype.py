@@ -0,0 +1,599 @@
+"""
+Somatotipo antropométrico de Heath-Carter y fraccionamiento de la masa
+corporal en cinco componentes (Kerr, 1988).
+
+Trabaja sobre el mismo formato de registro que /api/calculate, ampliado con
+perímetros, diámetros y la talla sentada (todos en cm). Cada cálculo tiene una
+versión escalar y otra vectorizada con resultados idénticos, y la distancia
+actitudinal entre somatotipos (SAD) de un equipo completo se obtiene como una
+matriz por difusión (broadcasting) de NumPy, por bloques de filas.
+"""
+
+import math
+
+from utils.lazy_imports import lazy_import
+from utils.rounding import round_exact
+from utils.schema import (
+    ERROR_INVALID_CHOICE,
+    ERROR_INVALID_TYPE,
+    ERROR_OUT_OF_RANGE,
+    ERROR_REQUIRED,
+    FIELD_RANGES,
+)
+
+np = lazy_import('numpy')
+
+# Estatura y talla sentada del modelo de proporcionalidad Phantom (cm)
+PHANTOM_HEIGHT = 170.18
+PHANTOM_SITTING_HEIGHT = 89.92
+
+# Valor mínimo de cada componente del somatotipo (Carter, 2002)
+MIN_RATING = 0.1
+
+# Medidas adicionales en cm: nombre -> (mínimo, máximo)
+MEASUREMENT_RANGES = {
+    'arm_relaxed_girth': (15, 60),
+    'arm_flexed_girth': (15, 65),
+    'forearm_girth': (15, 50),
+    'chest_girth': (50, 180),
+    'thigh_girth': (30, 100),
+    'calf_girth': (20, 70),
+    'head_girth': (45, 65),
+    'humerus_breadth': (4, 10),
+    'femur_breadth': (6, 14),
+    'biacromial_breadth': (25, 55),
+    'biiliocristal_breadth': (18, 45),
+    'chest_breadth': (18, 45),
+    'chest_depth': (12, 40),
+    'sitting_height': (50, 120),
+}
+
+# Campos necesarios para cada cálculo
+ENDOMORPHY_FIELDS = ('triceps_fold', 'subscapular_fold', 'supraspinale_fold', 'height')
+MESOMORPHY_FIELDS = (
+    'humerus_breadth', 'femur_breadth', 'arm_flexed_girth', 'calf_girth', 'triceps_fold', 'calf_fold', 'height',
+)
+ECTOMORPHY_FIELDS = ('height', 'weight')
+SOMATOTYPE_FIELDS = tuple(dict.fromkeys(ENDOMORPHY_FIELDS + MESOMORPHY_FIELDS + ECTOMORPHY_FIELDS))
+KERR_FIELDS = (
+    'weight', 'height', 'age', 'sitting_height',
+    'triceps_fold', 'subscapular_fold', 'supraspinale_fold', 'abdomen_fold', 'thigh_fold', 'calf_fold',
+    'arm_relaxed_girth', 'forearm_girth', 'thigh_girth', 'calf_girth', 'chest_girth', 'waist', 'head_girth',
+    'biacromial_breadth', 'biiliocristal_breadth', 'humerus_breadth', 'femur_breadth',
+    'chest_breadth', 'chest_depth',
+)
+
+# Campos numéricos leídos por este módulo y sus rangos válidos
+_RANGES = dict(FIELD_RANGES, **MEASUREMENT_RANGES)
+NUMERIC_INPUTS = tuple(dict.fromkeys(SOMATOTYPE_FIELDS + KERR_FIELDS))
+
+# Grosor de la piel (mm) por sexo y constante de superficie corporal (DuBois)
+# en adultos y en menores de 12 años (Kerr, 1988)
+SKIN_THICKNESS = {'M': 2.07, 'F': 1.96}
+SURFACE_AREA_CONSTANT = 71.84
+SURFACE_AREA_CONSTANT_CHILD = 68.308
+CHILD_AGE = 12
+
+# Valores Phantom (media, desviación) de cada suma y (media, desviación) de la
+# masa del componente para la estatura Phantom
+KERR_ADIPOSE = (116.41, 34.79, 25.6, 5.85)
+KERR_MUSCLE = (207.21, 13.74, 24.5, 5.4)
+KERR_RESIDUAL = (109.35, 7.08, 6.10, 1.24)
+KERR_BODY_BONE = (98.88, 5.33, 6.70, 1.34)
+KERR_HEAD_BONE = (56.0, 1.44, 1.20, 0.18)
+
+KERR_COMPONENTS = ('skin', 'adipose', 'muscle', 'bone', 'residual')
+
+
+def validate_somatotype_input(data):
+    """
+    Valida el género y las medidas que usa este módulo.
+
+    Las medidas ausentes no son un error (el cálculo que las necesita se
+    omite); solo el género, el peso y la estatura son obligatorios.
+
+    Args:
+        data (dict): Registro de mediciones
+
+    Returns:
+        tuple: (dict, list) - (valores numéricos, errores con 'field', 'code' y 'message')
+    """
+    values = {}
+    errors = []
+    gender = data.get('gender')
+    if gender is None:
+        errors.append({"field": 'gender', "code": ERROR_REQUIRED, "message": "Campo requerido faltante: gender"})
+    elif gender not in ('M', 'F'):
+        errors.append({"field": 'gender', "code": ERROR_INVALID_CHOICE, "message": "El género debe ser 'M' o 'F'"})
+    for name in NUMERIC_INPUTS:
+        raw = data.get(name)
+        if raw is None:
+            if name in ('weight', 'height'):
+                errors.append({"field": name, "code": ERROR_REQUIRED, "message": f"Campo requerido faltante: {name}"})
+            continue
+        if isinstance(raw, bool) or not isinstance(raw, (int, float)) or raw != raw:
+            errors.append({"field": name, "code": ERROR_INVALID_TYPE, "message": f"Valor no numérico en el campo: {name}"})
+            continue
+        low, high = _RANGES[name]
+        if raw < low or raw > high:
+            errors.append({
+                "field": name, "code": ERROR_OUT_OF_RANGE,
+                "message": f"El campo {name} debe estar entre {low:g} y {high:g}",
+            })
+            continue
+        values[name] = float(raw)
+    return values, errors
+
+
+def calculate_endomorphy(triceps, subscapular, supraspinale, height):
+    """
+    Endomorfia de Heath-Carter con la suma de pliegues corregida por la estatura.
+
+    Args:
+        triceps (float): Pliegue tricipital en mm
+        subscapular (float): Pliegue subescapular en mm
+        supraspinale (float): Pliegue supraespinal en mm
+        height (float): Estatura en cm
+
+    Returns:
+        float: Endomorfia sin redondear
+    """
+    x = (triceps + subscapular + supraspinale) * (PHANTOM_HEIGHT / height)
+    return max(MIN_RATING, -0.7182 + 0.1451 * x - 0.00068 * x * x + 0.0000014 * x * x * x)
+
+
+def calculate_mesomorphy(humerus_breadth, femur_breadth, arm_flexed_girth, calf_girth, triceps, calf, height):
+    """
+    Mesomorfia de Heath-Carter.
+
+    Los perímetros de brazo flexionado y pierna se corrigen restando el
+    pliegue correspondiente (en cm).
+
+    Args:
+        humerus_breadth (float): Diámetro biepicondíleo del húmero en cm
+        femur_breadth (float): Diámetro bicondíleo del fémur en cm
+        arm_flexed_girth (float): Perímetro del brazo flexionado y contraído en cm
+        calf_girth (float): Perímetro máximo de la pierna en cm
+        triceps (float): Pliegue tricipital en mm
+        calf (float): Pliegue de la pierna en mm
+        height (float): Estatura en cm
+
+    Returns:
+        float: Mesomorfia sin redondear
+    """
+    corrected_arm = arm_flexed_girth - triceps / 10
+    corrected_calf = calf_girth - calf / 10
+    return max(MIN_RATING, (
+        0.858 * humerus_breadth + 0.601 * femur_breadth + 0.188 * corrected_arm
+        + 0.161 * corrected_calf - 0.131 * height + 4.5
+    ))
+
+
+def calculate_ectomorphy(height, weight):
+    """
+    Ectomorfia de Heath-Carter a partir del índice ponderal recíproco (HWR).
+
+    Args:
+        height (float): Estatura en cm
+        weight (float): Peso en kg
+
+    Returns:
+        float: Ectomorfia sin redondear
+    """
+    hwr = height / weight ** (1 / 3)
+    if hwr >= 40.75:
+        return max(MIN_RATING, 0.732 * hwr - 28.58)
+    if hwr > 38.25:
+        return max(MIN_RATING, 0.463 * hwr - 17.63)
+    return MIN_RATING
+
+
+def somatochart_coordinates(endomorphy, mesomorphy, ectomorphy):
+    """
+    Coordenadas del somatotipo en la somatocarta.
+
+    Returns:
+        tuple: (float, float) - X = ecto - endo, Y = 2·meso - (endo + ecto)
+    """
+    return ectomorphy - endomorphy, 2 * mesomorphy - (endomorphy + ectomorphy)
+
+
+def somatotype_attitudinal_distance(first, second):
+    """
+    Distancia actitudinal (SAD) entre dos somatotipos en el espacio tridimensional.
+
+    Args:
+        first (tuple): (endomorfia, mesomorfia, ectomorfia)
+        second (tuple): (endomorfia, mesomorfia, ectomorfia)
+
+    Returns:
+        float: Distancia en unidades de somatotipo
+    """
+    return math.sqrt(
+        (first[0] - second[0]) ** 2 + (first[1] - second[1]) ** 2 + (first[2] - second[2]) ** 2
+    )
+
+
+def calculate_somatotype(values):
+    """
+    Somatotipo completo de un registro validado.
+
+    Args:
+        values (dict): Valores numéricos de validate_somatotype_input
+
+    Returns:
+        dict|None: Componentes y coordenadas redondeados a 2 decimales, o None
+            si faltan medidas
+    """
+    if any(name not in values for name in SOMATOTYPE_FIELDS):
+        return None
+    endomorphy = round(calculate_endomorphy(
+        values['triceps_fold'], values['subscapular_fold'], values['supraspinale_fold'], values['height']
+    ), 2)
+    mesomorphy = round(calculate_mesomorphy(
+        values['humerus_breadth'], values['femur_breadth'], values['arm_flexed_girth'], values['calf_girth'],
+        values['triceps_fold'], values['calf_fold'], values['height']
+    ), 2)
+    ectomorphy = round(calculate_ectomorphy(values['height'], values['weight']), 2)
+    x, y = somatochart_coordinates(endomorphy, mesomorphy, ectomorphy)
+    return {
+        "endomorphy": endomorphy,
+        "mesomorphy": mesomorphy,
+        "ectomorphy": ectomorphy,
+        "x": round(x, 2),
+        "y": round(y, 2),
+    }
+
+
+def _phantom_mass(total, ratio, scale, constants):
+    """Masa de un componente a partir de su suma de medidas y las constantes Phantom."""
+    mean, deviation, mass_mean, mass_deviation = constants
+    z = (total * ratio - mean) / deviation
+    return (z * mass_deviation + mass_mean) / scale
+
+
+def calculate_kerr_fractionation(values, gender):
+    """
+    Fraccionamiento en cinco componentes (piel, adiposo, muscular, óseo y residual).
+
+    Args:
+        values (dict): Valores numéricos de validate_somatotype_input
+        gender (str): 'M' o 'F'
+
+    Returns:
+        dict|None: Masas en kg, porcentajes sobre la masa estimada y diferencia
+            con el peso medido (% del peso), o None si faltan medidas
+    """
+    if any(name not in values for name in KERR_FIELDS):
+        return None
+    weight = values['weight']
+    height = values['height']
+    ratio = PHANTOM_HEIGHT / height
+    scale = ratio ** 3
+
+    constant = SURFACE_AREA_CONSTANT_CHILD if values['age'] < CHILD_AGE else SURFACE_AREA_CONSTANT
+    surface_area = constant * weight ** 0.425 * height ** 0.725 / 10000
+    skin = surface_area * SKIN_THICKNESS[gender] * 1.05
+
+    skinfolds = (
+        values['triceps_fold'] + values['subscapular_fold'] + values['supraspinale_fold']
+        + values['abdomen_fold'] + values['thigh_fold'] + values['calf_fold']
+    )
+    adipose = _phantom_mass(skinfolds, ratio, scale, KERR_ADIPOSE)
+
+    corrected_girths = (
+        (values['arm_relaxed_girth'] - math.pi * values['triceps_fold'] / 10)
+        + values['forearm_girth']
+        + (values['thigh_girth'] - math.pi * values['thigh_fold'] / 10)
+        + (values['calf_girth'] - math.pi * values['calf_fold'] / 10)
+        + (values['chest_girth'] - math.pi * values['subscapular_fold'] / 10)
+    )
+    muscle = _phantom_mass(corrected_girths, ratio, scale, KERR_MUSCLE)
+
+    breadths = (
+        values['biacromial_breadth'] + values['biiliocristal_breadth']
+        + 2 * values['humerus_breadth'] + 2 * values['femur_breadth']
+    )
+    head_bone = _phantom_mass(values['head_girth'], 1.0, 1.0, KERR_HEAD_BONE)
+    bone = head_bone + _phantom_mass(breadths, ratio, scale, KERR_BODY_BONE)
+
+    sitting_ratio = PHANTOM_SITTING_HEIGHT / values['sitting_height']
+    trunk = (
+        values['chest_breadth'] + values['chest_depth']
+        + (values['waist'] - math.pi * values['abdomen_fold'] / 10)
+    )
+    residual = _phantom_mass(trunk, sitting_ratio, sitting_ratio ** 3, KERR_RESIDUAL)
+
+    masses = {'skin': skin, 'adipose': adipose, 'muscle': muscle, 'bone': bone, 'residual': residual}
+    predicted = skin + adipose + muscle + bone + residual
+    return {
+        "masses": {name: round(mass, 2) for name, mass in masses.items()},
+        "percentages": {name: round(mass / predicted * 100, 2) for name, mass in masses.items()},
+        "predicted_mass": round(predicted, 2),
+        "difference_percentage": round((predicted - weight) / weight * 100, 2),
+    }
+
+
+def _missing(values, fields):
+    return [name for name in fields if name not in values]
+
+
+def process_somatotype(data):
+    """
+    Calcula el somatotipo y el fraccionamiento de Kerr de un registro.
+
+    Args:
+        data (dict): Registro de mediciones
+
+    Returns:
+        dict: 'somatotype' y 'kerr' (None si faltan medidas, con la lista en
+            'missing_fields'), o los errores de validación
+    """
+    values, errors = validate_somatotype_input(data)
+    if errors:
+        return {
+            "success": False,
+            "errors": [error['message'] for error in errors],
+            "error_codes": [{"field": error['field'], "code": error['code']} for error in errors],
+        }
+    somatotype = calculate_somatotype(values)
+    kerr = calculate_kerr_fractionation(values, data['gender'])
+    result = {"success": True, "somatotype": somatotype, "kerr": kerr}
+    missing = {}
+    if somatotype is None:
+        missing['somatotype'] = _missing(values, SOMATOTYPE_FIELDS)
+    if kerr is None:
+        missing['kerr'] = _missing(values, KERR_FIELDS)
+    if missing:
+        result['missing_fields'] = missing
+    return result
+
+
+# --- Versiones vectorizadas ---------------------------------------------------
+
+
+def somatotype_columns(records):
+    """
+    Convierte registros en columnas float64 (NaN si falta la medida o no es válida).
+
+    Args:
+        records (list): Registros de mediciones
+
+    Returns:
+        tuple: (dict, list) - (columnas con 'gender' y los campos numéricos,
+            resultado de validate_somatotype_input de cada registro)
+    """
+    size = len(records)
+    validated = [validate_somatotype_input(record) for record in records]
+    columns = {'gender': np.array([record.get('gender') for record in records], dtype=object)}
+    for name in NUMERIC_INPUTS:
+        columns[name] = np.array([values.get(name, np.nan) for values, _ in validated], dtype=float)
+    columns['size'] = size
+    return columns, validated
+
+
+def endomorphy_batch(triceps, subscapular, supraspinale, height):
+    """Versión vectorizada de calculate_endomorphy."""
+    x = (triceps + subscapular + supraspinale) * (PHANTOM_HEIGHT / height)
+    return np.maximum(MIN_RATING, -0.7182 + 0.1451 * x - 0.00068 * x * x + 0.0000014 * x * x * x)
+
+
+def mesomorphy_batch(humerus_breadth, femur_breadth, arm_flexed_girth, calf_girth, triceps, calf, height):
+    """Versión vectorizada de calculate_mesomorphy."""
+    corrected_arm = arm_flexed_girth - triceps / 10
+    corrected_calf = calf_girth - calf / 10
+    return np.maximum(MIN_RATING, (
+        0.858 * humerus_breadth + 0.601 * femur_breadth + 0.188 * corrected_arm
+        + 0.161 * corrected_calf - 0.131 * height + 4.5
+    ))
+
+
+def ectomorphy_batch(height, weight):
+    """Versión vectorizada de calculate_ectomorphy."""
+    hwr = height / weight ** (1 / 3)
+    ectomorphy = np.select(
+        [hwr >= 40.75, hwr > 38.25],
+        [0.732 * hwr - 28.58, 0.463 * hwr - 17.63],
+        MIN_RATING,
+    )
+    return np.where(np.isnan(hwr), np.nan, np.maximum(MIN_RATING, ectomorphy))
+
+
+def somatotype_batch(columns):
+    """
+    Versión vectorizada de calculate_somatotype.
+
+    Args:
+        columns (dict): Columnas de somatotype_columns
+
+    Returns:
+        dict: Arrays 'endomorphy', 'mesomorphy', 'ectomorphy', 'x' e 'y'
+            redondeados (NaN donde faltan medidas)
+    """
+    c = columns
+    with np.errstate(invalid='ignore', divide='ignore'):
+        endomorphy = round_exact(endomorphy_batch(
+            c['triceps_fold'], c['subscapular_fold'], c['supraspinale_fold'], c['height']
+        ), 2)
+        mesomorphy = round_exact(mesomorphy_batch(
+            c['humerus_breadth'], c['femur_breadth'], c['arm_flexed_girth'], c['calf_girth'],
+            c['triceps_fold'], c['calf_fold'], c['height']
+        ), 2)
+        ectomorphy = round_exact(ectomorphy_batch(c['height'], c['weight']), 2)
+        complete = ~np.any([np.isnan(c[name]) for name in SOMATOTYPE_FIELDS], axis=0)
+        endomorphy[~complete] = mesomorphy[~complete] = ectomorphy[~complete] = np.nan
+        x, y = somatochart_coordinates(endomorphy, mesomorphy, ectomorphy)
+        return {
+            'endomorphy': endomorphy,
+            'mesomorphy': mesomorphy,
+            'ectomorphy': ectomorphy,
+            'x': round_exact(x, 2),
+            'y': round_exact(y, 2),
+        }
+
+
+def _phantom_mass_batch(total, ratio, scale, constants):
+    mean, deviation, mass_mean, mass_deviation = constants
+    z = (total * ratio - mean) / deviation
+    return (z * mass_deviation + mass_mean) / scale
+
+
+def kerr_fractionation_batch(columns):
+    """
+    Versión vectorizada de calculate_kerr_fractionation.
+
+    Args:
+        columns (dict): Columnas de somatotype_columns
+
+    Returns:
+        dict: Arrays por componente en 'masses' y 'percentages', y arrays
+            'predicted_mass' y 'difference_percentage' (NaN donde faltan medidas)
+    """
+    c = columns
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weight = c['weight']
+        height = c['height']
+        ratio = PHANTOM_HEIGHT / height
+        scale = ratio ** 3
+
+        constant = np.where(c['age'] < CHILD_AGE, SURFACE_AREA_CONSTANT_CHILD, SURFACE_AREA_CONSTANT)
+        surface_area = constant * weight ** 0.425 * height ** 0.725 / 10000
+        thickness = np.where(c['gender'] == 'M', SKIN_THICKNESS['M'], SKIN_THICKNESS['F'])
+        skin = surface_area * thickness * 1.05
+
+        skinfolds = (
+            c['triceps_fold'] + c['subscapular_fold'] + c['supraspinale_fold']
+            + c['abdomen_fold'] + c['thigh_fold'] + c['calf_fold']
+        )
+        adipose = _phantom_mass_batch(skinfolds, ratio, scale, KERR_ADIPOSE)
+
+        corrected_girths = (
+            (c['arm_relaxed_girth'] - math.pi * c['triceps_fold'] / 10)
+            + c['forearm_girth']
+            + (c['thigh_girth'] - math.pi * c['thigh_fold'] / 10)
+            + (c['calf_girth'] - math.pi * c['calf_fold'] / 10)
+            + (c['chest_girth'] - math.pi * c['subscapular_fold'] / 10)
+        )
+        muscle = _phantom_mass_batch(corrected_girths, ratio, scale, KERR_MUSCLE)
+
+        breadths = (
+            c['biacromial_breadth'] + c['biiliocristal_breadth']
+            + 2 * c['humerus_breadth'] + 2 * c['femur_breadth']
+        )
+        head_bone = _phantom_mass_batch(c['head_girth'], 1.0, 1.0, KERR_HEAD_BONE)
+        bone = head_bone + _phantom_mass_batch(breadths, ratio, scale, KERR_BODY_BONE)
+
+        sitting_ratio = PHANTOM_SITTING_HEIGHT / c['sitting_height']
+        trunk = c['chest_breadth'] + c['chest_depth'] + (c['waist'] - math.pi * c['abdomen_fold'] / 10)
+        residual = _phantom_mass_batch(trunk, sitting_ratio, sitting_ratio ** 3, KERR_RESIDUAL)
+
+        masses = {'skin': skin, 'adipose': adipose, 'muscle': muscle, 'bone': bone, 'residual': residual}
+        predicted = skin + adipose + muscle + bone + residual
+        complete = ~np.any([np.isnan(c[name]) for name in KERR_FIELDS], axis=0)
+        predicted[~complete] = np.nan
+        return {
+            'masses': {name: round_exact(mass, 2) for name, mass in masses.items()},
+            'percentages': {name: round_exact(mass / predicted * 100, 2) for name, mass in masses.items()},
+            'predicted_mass': round_exact(predicted, 2),
+            'difference_percentage': round_exact((predicted - weight) / weight * 100, 2),
+        }
+
+
+def process_somatotype_batch(records):
+    """
+    Versión vectorizada de process_somatotype para una lista de registros.
+
+    Returns:
+        list: Resultados por registro, idénticos a los de process_somatotype
+    """
+    columns, validated = somatotype_columns(records)
+    somatotypes = somatotype_batch(columns)
+    kerr = kerr_fractionation_batch(columns)
+    names = ('endomorphy', 'mesomorphy', 'ectomorphy', 'x', 'y')
+    somatotype_rows = zip(*(somatotypes[name].tolist() for name in names))
+    kerr_rows = zip(
+        zip(*(kerr['masses'][name].tolist() for name in KERR_COMPONENTS)),
+        zip(*(kerr['percentages'][name].tolist() for name in KERR_COMPONENTS)),
+        kerr['predicted_mass'].tolist(),
+        kerr['difference_percentage'].tolist(),
+    )
+
+    results = []
+    for (values, errors), somatotype, (masses, percentages, predicted, difference) in zip(
+        validated, somatotype_rows, kerr_rows
+    ):
+        if errors:
+            results.append({
+                "success": False,
+                "errors": [error['message'] for error in errors],
+                "error_codes": [{"field": error['field'], "code": error['code']} for error in errors],
+            })
+            continue
+        result = {"success": True, "somatotype": None, "kerr": None}
+        if somatotype[0] == somatotype[0]:
+            result['somatotype'] = dict(zip(names, somatotype))
+        if predicted == predicted:
+            result['kerr'] = {
+                "masses": dict(zip(KERR_COMPONENTS, masses)),
+                "percentages": dict(zip(KERR_COMPONENTS, percentages)),
+                "predicted_mass": predicted,
+                "difference_percentage": difference,
+            }
+        missing = {}
+        if result['somatotype'] is None:
+            missing['somatotype'] = _missing(values, SOMATOTYPE_FIELDS)
+        if result['kerr'] is None:
+            missing['kerr'] = _missing(values, KERR_FIELDS)
+        if missing:
+            result['missing_fields'] = missing
+        results.append(result)
+    return results
+
+
+def sad_matrix(somatotypes, block_rows=512, dtype=None):
+    """
+    Matriz de distancias actitudinales (SAD) entre todos los pares de somatotipos.
+
+    Se calcula por difusión (broadcasting) sobre bloques de filas, de modo que
+    la memoria auxiliar es block_rows × n en lugar de n × n × 3.
+
+    Args:
+        somatotypes (array-like): Matriz n × 3 (endomorfia, mesomorfia, ectomorfia)
+        block_rows (int): Filas calculadas por bloque
+        dtype: Tipo del resultado (float64 por defecto; float32 reduce la memoria a la mitad)
+
+    Returns:
+        ndarray: Matriz n × n simétrica (NaN en las filas y columnas sin somatotipo)
+    """
+    ratings = np.asarray(somatotypes, dtype=float).reshape(-1, 3)
+    size = len(ratings)
+    endomorphy, mesomorphy, ectomorphy = ratings[:, 0], ratings[:, 1], ratings[:, 2]
+    distances = np.empty((size, size), dtype=dtype or np.float64)
+    for start in range(0, size, block_rows):
+        stop = min(start + block_rows, size)
+        block = (endomorphy[start:stop, None] - endomorphy[None, :]) ** 2
+        block += (mesomorphy[start:stop, None] - mesomorphy[None, :]) ** 2
+        block += (ectomorphy[start:stop, None] - ectomorphy[None, :]) ** 2
+        distances[start:stop] = np.sqrt(block)
+    return distances
+
+
+def somatotype_attitudinal_mean(somatotypes):
+    """
+    Somatotipo medio de un grupo y media de las SAD de cada individuo a ese
+    somatotipo medio (SAM), ignorando los registros sin somatotipo.
+
+    Args:
+        somatotypes (array-like): Matriz n × 3
+
+    Returns:
+        tuple: (tuple, float, ndarray) - (somatotipo medio, SAM, SAD de cada
+            individuo al somatotipo medio)
+    """
+    ratings = np.asarray(somatotypes, dtype=float).reshape(-1, 3)
+    complete = ~np.isnan(ratings).any(axis=1)
+    if not complete.any():
+        return None, None, np.full(len(ratings), np.nan)
+    mean = ratings[complete].mean(axis=0)
+    distances = np.sqrt(((ratings - mean) ** 2).sum(axis=1))
+    return tuple(float(value) for value in mean), float(distances[complete].mean()), distances
@@ -0,0 +1,287 @@
+"""
+Tablas de umbrales para clasificar las métricas (óptimo / precaución / alerta).
+
+Una única tabla declarativa por métrica × género × franja de edad se compila
+al importar el módulo en puntos de corte ordenados. Un valor se clasifica con
+una búsqueda binaria (bisect en la ruta escalar, np.searchsorted sobre
+columnas completas en lotes), y determine_goal obtiene de las mismas tablas
+los límites de índice cintura-cadera y de FFMI.
+"""
+
+from bisect import bisect_left, bisect_right
+
+from utils.lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+
+STATUS_OPTIMAL = 'optimal'
+STATUS_WARNING = 'warning'
+STATUS_ALERT = 'alert'
+
+STATUS_NAMES = (STATUS_OPTIMAL, STATUS_WARNING, STATUS_ALERT)
+_STATUS_CODES = {name: code for code, name in enumerate(STATUS_NAMES)}
+
+# Código de estado de los valores ausentes en la versión por lotes
+NO_STATUS = -1
+
+GENDERS = ('M', 'F')
+
+# Límite inferior (incluido) de cada franja de edad de las tablas
+AGE_BAND_STARTS = (0, 40, 60)
+
+# Lado cerrado de los intervalos: 'upper' -> (a, b], 'lower' -> [a, b)
+METRIC_CLOSED_SIDE = {
+    'bmi': 'lower',
+    'waist_hip_ratio': 'upper',
+    'waist_height_ratio': 'upper',
+    'body_fat_percentage': 'lower',
+    'fat_free_mass_index': 'lower',
+}
+
+# Cada fila: métrica, género (None = ambos), edad mínima de la fila (None =
+# todas las edades) y tramos (límite inferior, estado) en orden ascendente.
+# El primer tramo no tiene límite inferior.
+THRESHOLD_TABLE = (
+    {
+        "metric": "bmi",
+        "gender": None,
+        "min_age": None,
+        "bands": ((None, STATUS_ALERT), (18.5, STATUS_OPTIMAL), (25, STATUS_WARNING), (30, STATUS_ALERT)),
+    },
+    {
+        "metric": "waist_hip_ratio",
+        "gender": "M",
+        "min_age": None,
+        "bands": ((None, STATUS_OPTIMAL), (0.90, STATUS_WARNING), (1.0, STATUS_ALERT)),
+    },
+    {
+        "metric": "waist_hip_ratio",
+        "gender": "F",
+        "min_age": None,
+        "bands": ((None, STATUS_OPTIMAL), (0.85, STATUS_WARNING), (0.95, STATUS_ALERT)),
+    },
+    {
+        "metric": "waist_height_ratio",
+        "gender": None,
+        "min_age": None,
+        "bands": ((None, STATUS_OPTIMAL), (0.5, STATUS_WARNING), (0.6, STATUS_ALERT)),
+    },
+    # % de grasa: rangos deportivos hasta los 39 años; a partir de los 40 y
+    # los 60 se desplazan como los rangos saludables de Gallagher et al. (2000)
+    {
+        "metric": "body_fat_percentage",
+        "gender": "M",
+        "min_age": 0,
+        "bands": ((None, STATUS_ALERT), (8, STATUS_OPTIMAL), (20, STATUS_WARNING), (25, STATUS_ALERT)),
+    },
+    {
+        "metric": "body_fat_percentage",
+        "gender": "M",
+        "min_age": 40,
+        "bands": ((None, STATUS_ALERT), (11, STATUS_OPTIMAL), (22, STATUS_WARNING), (28, STATUS_ALERT)),
+    },
+    {
+        "metric": "body_fat_percentage",
+        "gender": "M",
+        "min_age": 60,
+        "bands": ((None, STATUS_ALERT), (13, STATUS_OPTIMAL), (25, STATUS_WARNING), (30, STATUS_ALERT)),
+    },
+    {
+        "metric": "body_fat_percentage",
+        "gender": "F",
+        "min_age": 0,
+        "bands": ((None, STATUS_ALERT), (15, STATUS_OPTIMAL), (26, STATUS_WARNING), (32, STATUS_ALERT)),
+    },
+    {
+        "metric": "body_fat_percentage",
+        "gender": "F",
+        "min_age": 40,
+        "bands": ((None, STATUS_ALERT), (17, STATUS_OPTIMAL), (27, STATUS_WARNING), (33, STATUS_ALERT)),
+    },
+    {
+        "metric": "body_fat_percentage",
+        "gender": "F",
+        "min_age": 60,
+        "bands": ((None, STATUS_ALERT), (18, STATUS_OPTIMAL), (29, STATUS_WARNING), (35, STATUS_ALERT)),
+    },
+    {
+        "metric": "fat_free_mass_index",
+        "gender": "M",
+        "min_age": None,
+        "bands": ((None, STATUS_ALERT), (17, STATUS_WARNING), (19, STATUS_OPTIMAL), (25, STATUS_WARNING)),
+    },
+    {
+        "metric": "fat_free_mass_index",
+        "gender": "F",
+        "min_age": None,
+        "bands": ((None, STATUS_ALERT), (13, STATUS_WARNING), (15, STATUS_OPTIMAL), (22, STATUS_WARNING)),
+    },
+)
+
+# Rango de % de grasa en el que se recomienda recomposición corporal
+RECOMPOSITION_BODY_FAT = (15, 25)
+
+
+def _compile_table():
+    """
+    Compila la tabla en puntos de corte por (métrica, género, franja de edad).
+
+    Returns:
+        dict: (métrica, género, índice de franja) -> (puntos de corte, códigos de estado)
+    """
+    compiled = {}
+    for metric in METRIC_CLOSED_SIDE:
+        for gender in GENDERS:
+            for band, start in enumerate(AGE_BAND_STARTS):
+                rows = [
+                    row for row in THRESHOLD_TABLE
+                    if row['metric'] == metric
+                    and row['gender'] in (None, gender)
+                    and (row['min_age'] is None or row['min_age'] <= start)
+                ]
+                if not rows:
+                    raise ValueError(f"Sin umbrales para {metric} ({gender}, {start}+ años)")
+                row = max(rows, key=lambda candidate: candidate['min_age'] or 0)
+                bounds = tuple(float(bound) for bound, _ in row['bands'][1:])
+                if list(bounds) != sorted(bounds):
+                    raise ValueError(f"Umbrales no ordenados para {metric}")
+                codes = tuple(_STATUS_CODES[status] for _, status in row['bands'])
+                compiled[(metric, gender, band)] = (bounds, codes)
+    return compiled
+
+
+_COMPILED = _compile_table()
+
+
+def age_band_index(age):
+    """Índice de la franja de edad de las tablas de umbrales."""
+    return bisect_right(AGE_BAND_STARTS, age) - 1
+
+
+def _age_bands_batch(age):
+    """Versión vectorizada de age_band_index (las edades ausentes van a la primera franja)."""
+    age = np.nan_to_num(np.asarray(age, dtype=float), nan=0.0)
+    return np.searchsorted(np.array(AGE_BAND_STARTS, dtype=float), age, side='right') - 1
+
+
+def classify(metric, value, gender, age):
+    """
+    Clasifica el valor de una métrica.
+
+    Args:
+        metric (str): Métrica de METRIC_CLOSED_SIDE
+        value (float): Valor de la métrica
+        gender (str): 'M' o 'F'
+        age (float): Edad en años
+
+    Returns:
+        str: 'optimal', 'warning' o 'alert'
+    """
+    bounds, codes = _COMPILED[(metric, gender, age_band_index(age))]
+    search = bisect_left if METRIC_CLOSED_SIDE[metric] == 'upper' else bisect_right
+    return STATUS_NAMES[codes[search(bounds, value)]]
+
+
+def classify_results(results, gender, age):
+    """
+    Clasifica todas las métricas presentes en un resultado de cálculo.
+
+    Returns:
+        dict: Métrica -> estado
+    """
+    return {
+        metric: classify(metric, results[metric], gender, age)
+        for metric in METRIC_CLOSED_SIDE if metric in results
+    }
+
+
+def classify_batch(metric, values, gender, age):
+    """
+    Versión vectorizada de classify para columnas completas.
+
+    Args:
+        metric (str): Métrica de METRIC_CLOSED_SIDE
+        values (ndarray): Valores (NaN si no se calcularon)
+        gender (ndarray): Género de cada fila
+        age (ndarray): Edad de cada fila
+
+    Returns:
+        ndarray: Códigos de estado (índices de STATUS_NAMES; NO_STATUS si falta el valor)
+    """
+    values = np.asarray(values, dtype=float)
+    bands = _age_bands_batch(age)
+    side = 'left' if METRIC_CLOSED_SIDE[metric] == 'upper' else 'right'
+    status = np.full(values.shape, NO_STATUS, dtype=np.int8)
+    present = ~np.isnan(values)
+    for gender_name in GENDERS:
+        is_gender = present & (gender == gender_name)
+        for band in range(len(AGE_BAND_STARTS)):
+            rows = is_gender & (bands == band)
+            if not rows.any():
+                continue
+            bounds, codes = _COMPILED[(metric, gender_name, band)]
+            positions = np.searchsorted(np.array(bounds), values[rows], side=side)
+            status[rows] = np.array(codes, dtype=np.int8)[positions]
+    return status
+
+
+def optimal_range(metric, gender, age=None):
+    """
+    Devuelve los límites del tramo óptimo de una métrica.
+
+    Args:
+        metric (str): Métrica de METRIC_CLOSED_SIDE
+        gender (str): 'M' o 'F'
+        age (float): Edad en años (por defecto, la primera franja)
+
+    Returns:
+        tuple: (float|None, float|None) - límites inferior y superior
+    """
+    band = age_band_index(age) if age is not None else 0
+    bounds, codes = _COMPILED[(metric, gender, band)]
+    index = codes.index(_STATUS_CODES[STATUS_OPTIMAL])
+    lower = bounds[index - 1] if index > 0 else None
+    upper = bounds[index] if index < len(bounds) else None
+    return lower, upper
+
+
+def optimal_range_batch(metric, gender, age):
+    """
+    Versión vectorizada de optimal_range.
+
+    Returns:
+        tuple: (ndarray, ndarray) - límites inferior y superior (NaN si no hay límite)
+    """
+    bands = _age_bands_batch(age)
+    lower = np.full(len(bands), np.nan)
+    upper = np.full(len(bands), np.nan)
+    for gender_name in GENDERS:
+        is_gender = gender == gender_name
+        for band, start in enumerate(AGE_BAND_STARTS):
+            rows = is_gender & (bands == band)
+            low, high = optimal_range(metric, gender_name, start)
+            lower[rows] = np.nan if low is None else low
+            upper[rows] = np.nan if high is None else high
+    return lower, upper
+
+
+def threshold_tables():
+    """
+    Devuelve las tablas compiladas en formato JSON (para clientes e informes).
+
+    Returns:
+        dict: Métrica -> género -> lista de franjas con sus tramos
+    """
+    tables = {}
+    for (metric, gender, band), (bounds, codes) in _COMPILED.items():
+        lowers = (None,) + bounds
+        uppers = bounds + (None,)
+        tables.setdefault(metric, {}).setdefault(gender, []).append({
+            "min_age": AGE_BAND_STARTS[band],
+            "closed": METRIC_CLOSED_SIDE[metric],
+            "bands": [
+                {"min": lower, "max": upper, "status": STATUS_NAMES[code]}
+                for lower, upper, code in zip(lowers, uppers, codes)
+            ],
+        })
+    return tables
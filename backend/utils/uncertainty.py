@@ -0,0 +1,220 @@
+"""
+Propagación de la incertidumbre de medida por Monte Carlo.
+
+Cada medida se perturba con un error normal de desviación igual a su error
+técnico de medida (TEM absoluto o %TEM, por ejemplo los que devuelve
+/api/repeated-measurements) y las muestras de un atleta se procesan como un
+único lote con el motor vectorizado, de modo que las métricas derivadas (IMC,
+BRI, Jackson-Pollock/Siri o la ecuación seleccionada, MLG e IMLG) y el
+objetivo de determine_goal se obtienen exactamente igual que en el cálculo
+puntual.
+"""
+
+from utils.batch_calculators import NO_GOAL, process_anthropometric_batch
+from utils.calculators import GOAL_PROFILES
+from utils.equations import FOLD_SITES
+from utils.lazy_imports import lazy_import
+from utils.schema import FIELD_RANGES, NUMERIC_FIELDS
+
+np = lazy_import('numpy')
+
+DEFAULT_SAMPLES = 1000
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_SEED = 0
+
+# %TEM por defecto: objetivos ISAK de un antropometrista experimentado
+# (5 % en pliegues, 1 % en perímetros) y error de báscula y tallímetro
+DEFAULT_TEM_PERCENT = dict(
+    {name: 5.0 for name in FOLD_SITES},
+    weight=0.2,
+    height=0.2,
+    waist=1.0,
+    hip=1.0,
+)
+
+# Medidas que se perturban (la edad no tiene error de medida)
+PERTURBED_FIELDS = tuple(name for name in NUMERIC_FIELDS if name != 'age')
+
+UNCERTAINTY_METRICS = (
+    'bmi',
+    'waist_hip_ratio',
+    'waist_height_ratio',
+    'body_roundness_index',
+    'body_fat_percentage',
+    'fat_free_mass',
+    'fat_free_mass_index',
+    'fat_mass',
+)
+
+
+def _error_table(name, table):
+    """Valida un dict campo -> error no negativo."""
+    if table is None:
+        return {}
+    if not isinstance(table, dict):
+        raise ValueError(f"'{name}' debe ser un objeto con un error por campo")
+    errors = {}
+    for field, value in table.items():
+        if field not in PERTURBED_FIELDS:
+            raise ValueError(f"Campo desconocido en '{name}': {field}")
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not value >= 0:
+            raise ValueError(f"El error de {field} en '{name}' debe ser un número no negativo")
+        errors[field] = float(value)
+    return errors
+
+
+def parse_uncertainty_options(options, max_samples):
+    """
+    Normaliza las opciones del modo de incertidumbre.
+
+    Args:
+        options: True o dict con 'samples', 'confidence', 'seed', 'tem'
+            (error absoluto por campo, en las unidades de la medida) y
+            'tem_percent' (%TEM por campo; 'tem' tiene prioridad)
+        max_samples (int): Número máximo de muestras por atleta
+
+    Returns:
+        dict: Opciones con 'samples', 'confidence', 'seed', 'tem' y 'tem_percent'
+
+    Raises:
+        ValueError: Si alguna opción no es válida
+    """
+    if options is True:
+        options = {}
+    if not isinstance(options, dict):
+        raise ValueError("'uncertainty' debe ser true o un objeto con las opciones")
+
+    samples = options.get('samples', DEFAULT_SAMPLES)
+    if isinstance(samples, bool) or not isinstance(samples, int) or samples < 2:
+        raise ValueError("'samples' debe ser un entero mayor que 1")
+    confidence = options.get('confidence', DEFAULT_CONFIDENCE)
+    if isinstance(confidence, bool) or not isinstance(confidence, (int, float)) or not 0 < confidence < 1:
+        raise ValueError("'confidence' debe estar entre 0 y 1")
+    seed = options.get('seed', DEFAULT_SEED)
+    if isinstance(seed, bool) or not isinstance(seed, int) or seed < 0:
+        raise ValueError("'seed' debe ser un entero no negativo")
+
+    return {
+        'samples': min(samples, max_samples),
+        'confidence': float(confidence),
+        'seed': seed,
+        'tem': _error_table('tem', options.get('tem')),
+        'tem_percent': dict(DEFAULT_TEM_PERCENT, **_error_table('tem_percent', options.get('tem_percent'))),
+    }
+
+
+def perturbed_columns(values, gender, options, rng):
+    """
+    Genera las muestras perturbadas de un atleta en formato columnar.
+
+    Los valores perturbados se recortan al rango válido de cada campo, de modo
+    que una medida próxima a un límite no invalida la muestra.
+
+    Args:
+        values (dict): Valores numéricos del registro (campo -> float)
+        gender (str): Género del atleta
+        options (dict): Resultado de parse_uncertainty_options
+        rng (numpy.random.Generator): Generador de números aleatorios
+
+    Returns:
+        dict: Columnas para process_anthropometric_batch con options['samples'] filas
+    """
+    samples = options['samples']
+    present = [name for name in PERTURBED_FIELDS if name in values]
+    centers = np.array([values[name] for name in present])
+    deviations = np.array([
+        options['tem'][name] if name in options['tem']
+        else abs(values[name]) * options['tem_percent'].get(name, 0.0) / 100
+        for name in present
+    ])
+    draws = centers + rng.standard_normal((samples, len(present))) * deviations
+    low = np.array([FIELD_RANGES[name][0] for name in present])
+    high = np.array([FIELD_RANGES[name][1] for name in present])
+    np.clip(draws, low, high, out=draws)
+
+    columns = {name: draws[:, index] for index, name in enumerate(present)}
+    columns['gender'] = np.full(samples, gender, dtype=object)
+    columns['age'] = np.full(samples, values.get('age', np.nan))
+    for name in ('equation', 'conversion'):
+        columns[name] = np.full(samples, values.get(name), dtype=object)
+    return columns
+
+
+def summarize_samples(batch, point_goal_code, confidence):
+    """
+    Intervalos de confianza y estabilidad del objetivo a partir de las muestras.
+
+    Args:
+        batch (dict): Resultado de process_anthropometric_batch sobre las muestras
+        point_goal_code (int): Código del objetivo de la estimación puntual (NO_GOAL si no hay)
+        confidence (float): Nivel de confianza de los intervalos
+
+    Returns:
+        dict: 'valid_samples', 'intervals' (media, desviación típica y límites
+            por métrica) y 'goal' (probabilidad de cambio y distribución)
+    """
+    valid = batch['valid']
+    valid_samples = int(valid.sum())
+    summary = {"valid_samples": valid_samples, "intervals": {}, "goal": None}
+    if valid_samples == 0:
+        return summary
+
+    tail = (1 - confidence) / 2 * 100
+    for metric in UNCERTAINTY_METRICS:
+        values = batch[metric][valid]
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            continue
+        low, high = np.percentile(values, (tail, 100 - tail))
+        summary['intervals'][metric] = {
+            "mean": round(float(values.mean()), 3),
+            "sd": round(float(values.std(ddof=1)), 3) if len(values) > 1 else 0.0,
+            "low": round(float(low), 2),
+            "high": round(float(high), 2),
+        }
+
+    if point_goal_code != NO_GOAL:
+        codes = batch['goal_code'][valid]
+        counts = np.bincount(codes[codes != NO_GOAL], minlength=len(GOAL_PROFILES))
+        summary['goal'] = {
+            "flip_probability": round(float((codes != point_goal_code).mean()), 4),
+            "distribution": {
+                profile['primary_goal']: round(count / valid_samples, 4)
+                for profile, count in zip(GOAL_PROFILES, counts.tolist()) if count
+            },
+        }
+    return summary
+
+
+def goal_code_of(result):
+    """Código del objetivo de un resultado de process_anthropometric_data (NO_GOAL si no hay)."""
+    goal = result.get('goal')
+    if goal is None:
+        return NO_GOAL
+    return next(code for code, profile in enumerate(GOAL_PROFILES) if profile['primary_goal'] == goal['primary_goal'])
+
+
+def estimate_uncertainty(data, result, options):
+    """
+    Estima la incertidumbre de las métricas de un registro por Monte Carlo.
+
+    Args:
+        data (dict): Registro de mediciones
+        result (dict): Resultado puntual (válido) de process_anthropometric_data
+        options (dict): Resultado de parse_uncertainty_options
+
+    Returns:
+        dict: Parámetros de la simulación y resumen de summarize_samples
+    """
+    values = {name: float(data[name]) for name in NUMERIC_FIELDS if data.get(name) is not None}
+    values['equation'] = data.get('equation')
+    values['conversion'] = data.get('conversion')
+    rng = np.random.default_rng(options['seed'])
+    batch = process_anthropometric_batch(perturbed_columns(values, data['gender'], options, rng))
+
+    return {
+        "samples": options['samples'],
+        "confidence": options['confidence'],
+        "seed": options['seed'],
+        **summarize_samples(batch, goal_code_of(result), options['confidence']),
+    }
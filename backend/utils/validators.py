@@ -3,7 +3,11 @@ Funciones para validar datos de entrada en la aplicación de antropometría.
 """
 
 import re
-import numpy as np
+
+from utils.lazy_imports import lazy_import
+from utils.schema import FIELD_RANGES, decode_errors, validate_record
+
+np = lazy_import('numpy')
 
 def is_valid_number(value, min_value=None, max_value=None):
     """
@@ -52,7 +56,7 @@ def is_valid_age(age):
     Returns:
         bool: True si es válida, False en caso contrario
     """
-    return is_valid_number(age, 10, 120)
+    return is_valid_number(age, *FIELD_RANGES['age'])
 
 def is_valid_weight(weight):
     """
@@ -64,7 +68,7 @@ def is_valid_weight(weight):
     Returns:
         bool: True si es válido, False en caso contrario
     """
-    return is_valid_number(weight, 30, 300)
+    return is_valid_number(weight, *FIELD_RANGES['weight'])
 
 def is_valid_height(height):
     """
@@ -76,19 +80,20 @@ def is_valid_height(height):
     Returns:
         bool: True si es válida, False en caso contrario
     """
-    return is_valid_number(height, 100, 250)
+    return is_valid_number(height, *FIELD_RANGES['height'])
 
-def is_valid_circumference(circumference):
+def is_valid_circumference(circumference, field='waist'):
     """
     Verifica si una circunferencia es válida.
     
     Args:
         circumference: Circunferencia en cm a validar
+        field (str): Campo del esquema cuyo rango se aplica ('waist' o 'hip')
         
     Returns:
         bool: True si es válida, False en caso contrario
     """
-    return is_valid_number(circumference, 20, 200)
+    return is_valid_number(circumference, *FIELD_RANGES[field])
 
 def is_valid_skinfold(skinfold):
     """
@@ -100,7 +105,7 @@ def is_valid_skinfold(skinfold):
     Returns:
         bool: True si es válido, False en caso contrario
     """
-    return is_valid_number(skinfold, 3, 70)
+    return is_valid_number(skinfold, *FIELD_RANGES['triceps_fold'])
 
 def validate_anthropometric_input(data):
     """
@@ -112,45 +117,8 @@ def validate_anthropometric_input(data):
     Returns:
         tuple: (bool, dict) - (es_valido, errores)
     """
-    errors = {}
-    
-    # Validar datos básicos requeridos
-    if 'gender' not in data or not is_valid_gender(data['gender']):
-        errors['gender'] = "El género debe ser 'M' o 'F'"
-    
-    if 'age' not in data or not is_valid_age(data['age']):
-        errors['age'] = "La edad debe estar entre 10 y 120 años"
-    
-    if 'weight' not in data or not is_valid_weight(data['weight']):
-        errors['weight'] = "El peso debe estar entre 30 y 300 kg"
-    
-    if 'height' not in data or not is_valid_height(data['height']):
-        errors['height'] = "La estatura debe estar entre 100 y 250 cm"
-    
-    if 'waist' not in data or not is_valid_circumference(data['waist']):
-        errors['waist'] = "La circunferencia de cintura debe estar entre 20 y 200 cm"
-    
-    if 'hip' not in data or not is_valid_circumference(data['hip']):
-        errors['hip'] = "La circunferencia de cadera debe estar entre 20 y 200 cm"
-    
-    # Validar pliegues cutáneos (opcionales)
-    for fold_name in ['triceps_fold', 'subscapular_fold', 'suprailiac_fold']:
-        if fold_name in data and not is_valid_skinfold(data[fold_name]):
-            errors[fold_name] = f"El pliegue debe estar entre 3 y 70 mm"
-    
-    # Validaciones cruzadas
-    if 'waist' in data and 'hip' in data:
-        if data['waist'] > data['hip']:
-            errors['waist_hip'] = "La circunferencia de cadera debe ser mayor que la de cintura"
-    
-    # Validar coherencia del IMC con peso y estatura
-    if 'weight' in data and 'height' in data:
-        weight = float(data['weight'])
-        height = float(data['height']) / 100  # Convertir a metros
-        imc = weight / (height ** 2)
-        
-        if imc < 12 or imc > 60:
-            errors['bmi_coherence'] = "La relación peso-estatura no es fisiológicamente coherente"
+    _, error_bits = validate_record(data)
+    errors = {error['field']: error['message'] for error in decode_errors(error_bits)}
     
     return len(errors) == 0, errors
 
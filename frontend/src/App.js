@@ -5,6 +5,7 @@ import InputForm from './components/InputForm';
 import Results from './components/Results';
 import Header from './components/Header';
 import Footer from './components/Footer';
+import SyncStatus from './components/SyncStatus';
 
 // Definición del tema personalizado
 const theme = createTheme({
@@ -32,29 +33,20 @@ const theme = createTheme({
 
 function App() {
   const [results, setResults] = useState(null);
-  const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   
   // Función para manejar el envío del formulario
   const handleFormSubmit = (calculatedResults) => {
     setResults(calculatedResults);
-    setLoading(false);
     setError(null);
   };
   
   // Función para manejar errores en el formulario
   const handleFormError = (errorMsg) => {
     setError(errorMsg);
-    setLoading(false);
     setResults(null);
   };
   
-  // Función para manejar el inicio del procesamiento
-  const handleFormProcessing = () => {
-    setLoading(true);
-    setError(null);
-  };
-  
   return (
     <ThemeProvider theme={theme}>
       <CssBaseline />
@@ -77,19 +69,19 @@ function App() {
           </Typography>
           
           <Box sx={{ mt: 4 }}>
+            <SyncStatus />
+            
             <Paper elevation={3} sx={{ p: 3, mb: 4 }}>
               <InputForm 
                 onSubmit={handleFormSubmit}
                 onError={handleFormError}
-                onProcessing={handleFormProcessing}
               />
             </Paper>
             
-            {(loading || results || error) && (
+            {(results || error) && (
               <Paper elevation={3} sx={{ p: 3 }}>
                 <Results 
                   results={results}
-                  loading={loading}
                   error={error}
                 />
               </Paper>
@@ -5,7 +5,7 @@ import {
 } from '@mui/material';
 import { styled } from '@mui/material/styles';
 import HelpOutlineIcon from '@mui/icons-material/HelpOutline';
-import { getStatusFromValue } from '../utils/AnthropometryUtils';
+import { NO_ADULT_REFERENCE, getGrowthBand, getMetricStatus } from '../utils/AnthropometryUtils';
 
 // Componente estilizado para métricas
 const MetricCard = styled(Card)(({ theme, status }) => ({
@@ -18,6 +18,23 @@ const MetricCard = styled(Card)(({ theme, status }) => ({
 
 const BasicMetricsPanel = ({ results, thresholds }) => {
   const gender = results.gender || 'M';
+  const whrOptimal = (gender === 'M' && results.waist_hip_ratio <= 0.90) ||
+    (gender === 'F' && results.waist_hip_ratio <= 0.85);
+
+  // Menores de 18 años: franjas de las curvas para la edad en lugar de los puntos de corte de adultos
+  const bmiChip = results.growth
+    ? getGrowthBand(results, 'bmi') || NO_ADULT_REFERENCE
+    : {
+      label: results.bmi < 18.5 ? 'Bajo peso' :
+        results.bmi < 25 ? 'Normopeso' :
+        results.bmi < 30 ? 'Sobrepeso' : 'Obesidad',
+      color: results.bmi < 18.5 ? 'warning' :
+        results.bmi < 25 ? 'success' :
+        results.bmi < 30 ? 'warning' : 'error',
+    };
+  const whrChip = results.growth
+    ? getGrowthBand(results, 'waist') || NO_ADULT_REFERENCE
+    : { label: whrOptimal ? 'Óptimo' : 'Riesgo incrementado', color: whrOptimal ? 'success' : 'warning' };
 
   return (
     <Box>
@@ -25,7 +42,7 @@ const BasicMetricsPanel = ({ results, thresholds }) => {
         {/* IMC */}
         <Grid item xs={12} sm={6} md={4}>
           <MetricCard 
-            status={getStatusFromValue(results.bmi, thresholds.bmi)}
+            status={getMetricStatus(results, 'bmi', thresholds.bmi)}
             elevation={3}
           >
             <CardHeader
@@ -50,16 +67,8 @@ const BasicMetricsPanel = ({ results, thresholds }) => {
               </Typography>
               <Box sx={{ mt: 1, textAlign: 'center' }}>
                 <Chip 
-                  label={
-                    results.bmi < 18.5 ? 'Bajo peso' :
-                    results.bmi < 25 ? 'Normopeso' :
-                    results.bmi < 30 ? 'Sobrepeso' : 'Obesidad'
-                  }
-                  color={
-                    results.bmi < 18.5 ? 'warning' :
-                    results.bmi < 25 ? 'success' :
-                    results.bmi < 30 ? 'warning' : 'error'
-                  }
+                  label={bmiChip.label}
+                  color={bmiChip.color}
                   size="small"
                 />
               </Box>
@@ -70,8 +79,9 @@ const BasicMetricsPanel = ({ results, thresholds }) => {
         {/* ICC */}
         <Grid item xs={12} sm={6} md={4}>
           <MetricCard 
-            status={getStatusFromValue(
-              results.waist_hip_ratio, 
+            status={getMetricStatus(
+              results,
+              'waist_hip_ratio',
               thresholds.waist_hip_ratio[gender]
             )}
             elevation={3}
@@ -95,16 +105,8 @@ const BasicMetricsPanel = ({ results, thresholds }) => {
               </Typography>
               <Box sx={{ mt: 1, textAlign: 'center' }}>
                 <Chip 
-                  label={
-                    (gender === 'M' && results.waist_hip_ratio <= 0.90) || 
-                    (gender === 'F' && results.waist_hip_ratio <= 0.85) 
-                      ? 'Óptimo' : 'Riesgo incrementado'
-                  }
-                  color={
-                    (gender === 'M' && results.waist_hip_ratio <= 0.90) || 
-                    (gender === 'F' && results.waist_hip_ratio <= 0.85) 
-                      ? 'success' : 'warning'
-                  }
+                  label={whrChip.label}
+                  color={whrChip.color}
                   size="small"
                 />
               </Box>
@@ -115,7 +117,7 @@ const BasicMetricsPanel = ({ results, thresholds }) => {
         {/* ICE */}
         <Grid item xs={12} sm={6} md={4}>
           <MetricCard 
-            status={getStatusFromValue(results.waist_height_ratio, thresholds.waist_height_ratio)}
+            status={getMetricStatus(results, 'waist_height_ratio', thresholds.waist_height_ratio)}
             elevation={3}
           >
             <CardHeader
@@ -5,7 +5,7 @@ import {
 } from '@mui/material';
 import { styled } from '@mui/material/styles';
 import HelpOutlineIcon from '@mui/icons-material/HelpOutline';
-import { getStatusFromValue } from '../utils/AnthropometryUtils';
+import { NO_ADULT_REFERENCE, getGrowthBand, getMetricStatus } from '../utils/AnthropometryUtils';
 
 import {
   Chart as ChartJS,
@@ -33,6 +33,30 @@ const MetricCard = styled(Card)(({ theme, status }) => ({
 
 const BodyCompositionPanel = ({ results, thresholds }) => {
   const gender = results.gender || 'M';
+  const bodyFat = results.body_fat_percentage;
+  const ffmi = results.fat_free_mass_index;
+
+  // Menores de 18 años: franjas de los pliegues para la edad; el IMLG no tiene referencia
+  const bodyFatChip = results.growth
+    ? getGrowthBand(results, 'triceps_fold', 'subscapular_fold') || NO_ADULT_REFERENCE
+    : {
+      label: gender === 'M' ?
+        (bodyFat < 8 ? 'Muy bajo' : bodyFat <= 19 ? 'Óptimo' : bodyFat <= 24 ? 'Moderado' : 'Elevado') :
+        (bodyFat < 15 ? 'Muy bajo' : bodyFat <= 25 ? 'Óptimo' : bodyFat <= 31 ? 'Moderado' : 'Elevado'),
+      color: gender === 'M' ?
+        (bodyFat < 8 ? 'warning' : bodyFat <= 19 ? 'success' : bodyFat <= 24 ? 'warning' : 'error') :
+        (bodyFat < 15 ? 'warning' : bodyFat <= 25 ? 'success' : bodyFat <= 31 ? 'warning' : 'error'),
+    };
+  const ffmiChip = results.growth
+    ? NO_ADULT_REFERENCE
+    : {
+      label: gender === 'M' ?
+        (ffmi < 17 ? 'Bajo' : ffmi < 19 ? 'Moderado' : ffmi <= 25 ? 'Óptimo' : 'Elevado') :
+        (ffmi < 13 ? 'Bajo' : ffmi < 15 ? 'Moderado' : ffmi <= 22 ? 'Óptimo' : 'Elevado'),
+      color: gender === 'M' ?
+        (ffmi < 17 ? 'error' : ffmi < 19 ? 'warning' : ffmi <= 25 ? 'success' : 'warning') :
+        (ffmi < 13 ? 'error' : ffmi < 15 ? 'warning' : ffmi <= 22 ? 'success' : 'warning'),
+    };
 
   // Datos para el gráfico circular de composición corporal
   const pieData = {
@@ -81,8 +105,9 @@ const BodyCompositionPanel = ({ results, thresholds }) => {
             {/* Porcentaje de Grasa */}
             <Grid item xs={12}>
               <MetricCard 
-                status={getStatusFromValue(
-                  results.body_fat_percentage, 
+                status={getMetricStatus(
+                  results,
+                  'body_fat_percentage',
                   thresholds.body_fat_percentage[gender]
                 )}
                 elevation={3}
@@ -106,24 +131,8 @@ const BodyCompositionPanel = ({ results, thresholds }) => {
                   </Typography>
                   <Box sx={{ mt: 1, textAlign: 'center' }}>
                     <Chip 
-                      label={
-                        gender === 'M' ? 
-                          (results.body_fat_percentage < 8 ? 'Muy bajo' :
-                           results.body_fat_percentage <= 19 ? 'Óptimo' :
-                           results.body_fat_percentage <= 24 ? 'Moderado' : 'Elevado') :
-                          (results.body_fat_percentage < 15 ? 'Muy bajo' :
-                           results.body_fat_percentage <= 25 ? 'Óptimo' :
-                           results.body_fat_percentage <= 31 ? 'Moderado' : 'Elevado')
-                      }
-                      color={
-                        gender === 'M' ? 
-                          (results.body_fat_percentage < 8 ? 'warning' :
-                           results.body_fat_percentage <= 19 ? 'success' :
-                           results.body_fat_percentage <= 24 ? 'warning' : 'error') :
-                          (results.body_fat_percentage < 15 ? 'warning' :
-                           results.body_fat_percentage <= 25 ? 'success' :
-                           results.body_fat_percentage <= 31 ? 'warning' : 'error')
-                      }
+                      label={bodyFatChip.label}
+                      color={bodyFatChip.color}
                       size="small"
                     />
                   </Box>
@@ -134,8 +143,9 @@ const BodyCompositionPanel = ({ results, thresholds }) => {
             {/* Índice de Masa Libre de Grasa */}
             <Grid item xs={12}>
               <MetricCard 
-                status={getStatusFromValue(
-                  results.fat_free_mass_index, 
+                status={getMetricStatus(
+                  results,
+                  'fat_free_mass_index',
                   thresholds.fat_free_mass_index[gender]
                 )}
                 elevation={3}
@@ -162,24 +172,8 @@ const BodyCompositionPanel = ({ results, thresholds }) => {
                   </Typography>
                   <Box sx={{ mt: 1, textAlign: 'center' }}>
                     <Chip 
-                      label={
-                        gender === 'M' ? 
-                          (results.fat_free_mass_index < 17 ? 'Bajo' :
-                           results.fat_free_mass_index < 19 ? 'Moderado' :
-                           results.fat_free_mass_index <= 25 ? 'Óptimo' : 'Elevado') :
-                          (results.fat_free_mass_index < 13 ? 'Bajo' :
-                           results.fat_free_mass_index < 15 ? 'Moderado' :
-                           results.fat_free_mass_index <= 22 ? 'Óptimo' : 'Elevado')
-                      }
-                      color={
-                        gender === 'M' ? 
-                          (results.fat_free_mass_index < 17 ? 'error' :
-                           results.fat_free_mass_index < 19 ? 'warning' :
-                           results.fat_free_mass_index <= 25 ? 'success' : 'warning') :
-                          (results.fat_free_mass_index < 13 ? 'error' :
-                           results.fat_free_mass_index < 15 ? 'warning' :
-                           results.fat_free_mass_index <= 22 ? 'success' : 'warning')
-                      }
+                      label={ffmiChip.label}
+                      color={ffmiChip.color}
                       size="small"
                     />
                   </Box>
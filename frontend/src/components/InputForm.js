@@ -1,5 +1,5 @@
-import React, { useState } from 'react';
-import { Formik, Form, Field } from 'formik';
+import React, { useEffect, useRef, useState } from 'react';
+import { Formik, Form, Field, useFormikContext } from 'formik';
 import * as Yup from 'yup';
 import { 
   Grid, Typography, Button, Box, 
@@ -13,6 +13,8 @@ import ExpandMoreIcon from '@mui/icons-material/ExpandMore';
 import HelpOutlineIcon from '@mui/icons-material/HelpOutline';
 import InfoIcon from '@mui/icons-material/Info';
 import { anthropometryService } from '../services/api';
+import { enqueue } from '../services/syncQueue';
+import { processAnthropometricData } from '../engine/calculators';
 
 // Esquema de validación con Yup
 const validationSchema = Yup.object({
@@ -64,8 +66,25 @@ const validationSchema = Yup.object({
     .transform((value) => (isNaN(value) ? null : value))
     .min(3, 'El pliegue debe ser mayor a 3 mm')
     .max(70, 'El pliegue debe ser menor a 70 mm'),
+  athlete_id: Yup.string()
+    .max(100, 'El identificador debe tener como máximo 100 caracteres'),
+  session_date: Yup.string()
+    .when('athlete_id', {
+      is: (athleteId) => Boolean(athleteId),
+      then: (schema) => schema.required('La fecha de la sesión es requerida para guardar la medición'),
+    }),
 });
 
+// Fecha local de hoy (AAAA-MM-DD)
+const today = () => {
+  const now = new Date();
+  return [
+    now.getFullYear(),
+    String(now.getMonth() + 1).padStart(2, '0'),
+    String(now.getDate()).padStart(2, '0'),
+  ].join('-');
+};
+
 // Valores iniciales del formulario
 const initialValues = {
   gender: 'M',
@@ -80,25 +99,74 @@ const initialValues = {
   thigh_fold: '',
   chest_fold: '',
   abdomen_fold: '',
+  athlete_id: '',
+  session_date: today(),
+};
+
+// Mediciones del formulario sin los campos vacíos ni los datos del registro
+const toMeasurements = (values) => Object.fromEntries(
+  Object.entries(values).filter(
+    ([name, value]) => value !== '' && name !== 'athlete_id' && name !== 'session_date'
+  )
+);
+
+// Recalcula en el dispositivo con cada cambio, una vez calculado el primer resultado
+const LiveResults = ({ enabled, onResults, latestValues }) => {
+  const { values } = useFormikContext();
+  const callback = useRef(onResults);
+  callback.current = onResults;
+
+  useEffect(() => {
+    latestValues.current = values;
+    if (!enabled) {
+      return;
+    }
+    const result = processAnthropometricData(toMeasurements(values));
+    if (result.success) {
+      callback.current(result);
+    }
+  }, [enabled, values, latestValues]);
+
+  return null;
 };
 
-const InputForm = ({ onSubmit, onError, onProcessing }) => {
+const InputForm = ({ onSubmit, onError }) => {
   const [expanded, setExpanded] = useState(false);
+  const [calculated, setCalculated] = useState(false);
+  const latestValues = useRef(initialValues);
   
-  const handleSubmit = async (values, { setSubmitting, resetForm }) => {
+  const handleSubmit = async (values, { setSubmitting }) => {
+    const measurements = toMeasurements(values);
+
+    // Resultado inmediato con el motor local (mismas fórmulas que el backend)
+    const local = processAnthropometricData(measurements);
+    if (!local.success) {
+      onError(local.errors);
+      setSubmitting(false);
+      return;
+    }
+    onSubmit(local);
+    setCalculated(true);
+
+    // Con atleta, la medición se guarda en el servidor (ahora o al recuperar la conexión)
+    if (values.athlete_id) {
+      enqueue({ athlete_id: values.athlete_id, session_date: values.session_date, ...measurements });
+    }
+
+    if (!navigator.onLine) {
+      setSubmitting(false);
+      return;
+    }
     try {
-      onProcessing();
-      
-      // Llamada a la API usando el servicio
-      const result = await anthropometryService.calculateAnthropometry(values);
-      
-      if (result.success) {
+      // El servidor sigue siendo la referencia: su resultado sustituye al local
+      const result = await anthropometryService.calculateAnthropometry(measurements);
+      // Si el formulario ha cambiado mientras tanto, vale el recálculo local más reciente
+      const unchanged = JSON.stringify(toMeasurements(latestValues.current)) === JSON.stringify(measurements);
+      if (result.success && unchanged) {
         onSubmit(result);
-      } else {
-        onError(result.errors || 'Error en el procesamiento de datos');
       }
     } catch (error) {
-      onError(error.response?.data?.errors || 'Error en la conexión');
+      // Sin respuesta del servidor se mantiene el resultado calculado en el dispositivo
     } finally {
       setSubmitting(false);
     }
@@ -112,6 +180,8 @@ const InputForm = ({ onSubmit, onError, onProcessing }) => {
     >
       {({ errors, touched, isSubmitting, values }) => (
         <Form>
+          <LiveResults enabled={calculated} onResults={onSubmit} latestValues={latestValues} />
+
           <Typography variant="h5" component="h2" gutterBottom>
             Datos Básicos
           </Typography>
@@ -485,6 +555,51 @@ const InputForm = ({ onSubmit, onError, onProcessing }) => {
             </AccordionDetails>
           </Accordion>
           
+          <Divider sx={{ my: 3 }} />
+          
+          <Typography variant="h5" component="h2" gutterBottom>
+            Registro del Atleta (Opcional)
+            <Tooltip title="Con un identificador de atleta la medición se guarda en su historial. Sin conexión, se guarda en el dispositivo y se envía al recuperarla.">
+              <IconButton size="small" sx={{ ml: 1 }}>
+                <HelpOutlineIcon fontSize="small" />
+              </IconButton>
+            </Tooltip>
+          </Typography>
+          
+          <Grid container spacing={3}>
+            {/* Atleta */}
+            <Grid item xs={12} sm={6}>
+              <Field name="athlete_id">
+                {({ field }) => (
+                  <TextField
+                    {...field}
+                    fullWidth
+                    label="Identificador del Atleta"
+                    error={touched.athlete_id && Boolean(errors.athlete_id)}
+                    helperText={touched.athlete_id && errors.athlete_id}
+                  />
+                )}
+              </Field>
+            </Grid>
+            
+            {/* Fecha de la sesión */}
+            <Grid item xs={12} sm={6}>
+              <Field name="session_date">
+                {({ field }) => (
+                  <TextField
+                    {...field}
+                    fullWidth
+                    label="Fecha de la Sesión"
+                    type="date"
+                    InputLabelProps={{ shrink: true }}
+                    error={touched.session_date && Boolean(errors.session_date)}
+                    helperText={touched.session_date && errors.session_date}
+                  />
+                )}
+              </Field>
+            </Grid>
+          </Grid>
+          
           <Box sx={{ mt: 4, textAlign: 'center' }}>
             <Button
               type="submit"
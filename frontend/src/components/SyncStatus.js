@@ -0,0 +1,70 @@
+import React, { useEffect, useState } from 'react';
+import { Alert, Box, Button, CircularProgress } from '@mui/material';
+import { anthropometryService } from '../services/api';
+import { clearRejected, setServerVersion, subscribe } from '../services/syncQueue';
+
+// Estado de la conexión y de la cola de mediciones pendientes de sincronizar
+const SyncStatus = () => {
+  const [status, setStatus] = useState(null);
+
+  useEffect(() => subscribe(setStatus), []);
+
+  // Versión de las fórmulas del servidor, para avisar si el motor local es de otra
+  useEffect(() => {
+    if (!navigator.onLine) {
+      return;
+    }
+    anthropometryService.checkHealth()
+      .then((health) => {
+        if (health.calculation_version !== undefined) {
+          setServerVersion(health.calculation_version);
+        }
+      })
+      .catch(() => {});
+  }, []);
+
+  if (!status) {
+    return null;
+  }
+
+  const { online, syncing, pending, rejected, versionMismatch } = status;
+  if (online && !pending && !rejected.length && !versionMismatch) {
+    return null;
+  }
+
+  return (
+    <Box sx={{ mb: 3, display: 'flex', flexDirection: 'column', gap: 1 }}>
+      {!online && (
+        <Alert severity="info">
+          Sin conexión: los cálculos se hacen en este dispositivo y las mediciones se enviarán al recuperar la conexión.
+        </Alert>
+      )}
+
+      {pending > 0 && (
+        <Alert severity="info" icon={syncing ? <CircularProgress size={20} /> : undefined}>
+          {pending === 1 ? '1 medición pendiente' : `${pending} mediciones pendientes`} de sincronizar con el servidor.
+        </Alert>
+      )}
+
+      {versionMismatch && (
+        <Alert severity="warning">
+          El servidor usa otra versión de las fórmulas: los resultados calculados en el dispositivo pueden diferir
+          de los guardados. Recargue la aplicación para actualizarla.
+        </Alert>
+      )}
+
+      {rejected.length > 0 && (
+        <Alert
+          severity="error"
+          action={<Button color="inherit" size="small" onClick={clearRejected}>Descartar</Button>}
+        >
+          El servidor rechazó {rejected.length === 1 ? '1 medición' : `${rejected.length} mediciones`}:
+          {' '}
+          {rejected.map((item) => `${item.measurement.athlete_id} (${item.measurement.session_date}): ${(item.errors || [item.error]).join(', ')}`).join('; ')}
+        </Alert>
+      )}
+    </Box>
+  );
+};
+
+export default SyncStatus;
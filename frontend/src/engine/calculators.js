@@ -0,0 +1,247 @@
+/**
+ * Motor de cálculo sin conexión: réplica en el navegador de
+ * process_anthropometric_data (backend/utils/calculators.py).
+ *
+ * Las constantes (esquema, ecuaciones, umbrales, objetivos y curvas de
+ * referencia) salen de engineSpec.json, exportado por el backend; aquí solo
+ * se repiten las fórmulas, en el mismo orden de operaciones y con el mismo
+ * redondeo que en Python. calculators.test.js comprueba que los resultados
+ * coinciden exactamente con el conjunto golden del backend.
+ */
+
+import spec from './engineSpec.json';
+import { DEFAULT_CONVERSION, DEFAULT_EQUATION, evaluateEquation } from './equations';
+import { ADULT_AGE, growthScores, isYouth } from './growth';
+import { roundPython } from './rounding';
+import { decodeErrors, validateRecord } from './schema';
+import { classifyResults, optimalRange } from './thresholds';
+
+export const CALCULATION_VERSION = spec.calculation_version;
+
+export const GOAL_PROFILES = spec.goals.profiles;
+const ADULT_ONLY_STATUS = spec.goals.adult_only_status;
+
+export const calculateBmi = (weight, height) => {
+  const heightM = height / 100;
+  return roundPython(weight / (heightM * heightM), 2);
+};
+
+export const calculateWaistHipRatio = (waist, hip) => roundPython(waist / hip, 2);
+
+export const calculateWaistHeightRatio = (waist, height) => roundPython(waist / height, 2);
+
+export const calculateBodyRoundnessIndex = (waist, height) => {
+  const waistM = waist / 100;
+  const heightM = height / 100;
+  const ratio = waistM / (2 * Math.PI);
+  const halfHeight = 0.5 * heightM;
+  const bri = 364.2 - 365.5 * Math.sqrt(1 - (ratio * ratio) / (halfHeight * halfHeight));
+  return roundPython(bri, 2);
+};
+
+// Jackson-Pollock de 3 pliegues con la conversión de Siri (cálculo por defecto sin 'equation')
+export const calculateBodyFatJacksonPollock = (gender, age, folds) => {
+  let sumFolds;
+  let density;
+  if (gender === 'M') {
+    if (!('chest' in folds) || !('abdomen' in folds) || !('thigh' in folds)) {
+      sumFolds = (folds.triceps || 0) + (folds.subscapular || 0) + (folds.suprailiac || 0);
+      density = 1.10938 - (0.0008267 * sumFolds) + (0.0000016 * (sumFolds * sumFolds)) - (0.0002574 * age);
+    } else {
+      sumFolds = folds.chest + folds.abdomen + folds.thigh;
+      density = 1.1093800 - 0.0008267 * sumFolds + 0.0000016 * (sumFolds * sumFolds) - 0.0002574 * age;
+    }
+  } else if (!('triceps' in folds) || !('suprailiac' in folds) || !('thigh' in folds)) {
+    sumFolds = (folds.triceps || 0) + (folds.subscapular || 0) + (folds.suprailiac || 0);
+    density = 1.0994921 - (0.0009929 * sumFolds) + (0.0000023 * (sumFolds * sumFolds)) - (0.0001392 * age);
+  } else {
+    sumFolds = folds.triceps + folds.suprailiac + folds.thigh;
+    density = 1.0994921 - 0.0009929 * sumFolds + 0.0000023 * (sumFolds * sumFolds) - 0.0001392 * age;
+  }
+  return roundPython((495 / density) - 450, 1);
+};
+
+export const calculateFatFreeMass = (weight, bodyFatPercentage) => (
+  roundPython(weight * (1 - (bodyFatPercentage / 100)), 2)
+);
+
+export const calculateFatFreeMassIndex = (fatFreeMass, height) => {
+  const heightM = height / 100;
+  return roundPython(fatFreeMass / (heightM * heightM), 2);
+};
+
+// Perfil del objetivo con el déficit o superávit calórico, si lo usa
+export const buildGoal = (goalCode, amount = null) => {
+  const goal = { ...GOAL_PROFILES[goalCode] };
+  ['caloric_deficit', 'caloric_surplus'].forEach((key) => {
+    if (key in goal) {
+      goal[key] = amount;
+    }
+  });
+  return goal;
+};
+
+const GOAL_OPERATORS = {
+  '<': (a, b) => a < b,
+  '<=': (a, b) => a <= b,
+  '>': (a, b) => a > b,
+  '>=': (a, b) => a >= b,
+};
+
+const OPTIMAL_BOUNDS = { optimal_min: 0, optimal_max: 1 };
+
+// Operando de una regla: número, métrica o límite del tramo óptimo ('metrica.optimal_max')
+const compileOperand = (operand) => {
+  if (typeof operand === 'number') {
+    return { constant: operand };
+  }
+  const [metric, bound] = operand.split('.');
+  return bound ? { metric, bound: OPTIMAL_BOUNDS[bound] } : { metric };
+};
+
+// Tabla de objetivos del backend (GOAL_RULES), compilada una sola vez
+const GOAL_TABLE = spec.goals.rules.map((rule) => ({
+  goal: rule.goal,
+  conditions: rule.when.map(([left, operator, right]) => [
+    compileOperand(left), GOAL_OPERATORS[operator], compileOperand(right),
+  ]),
+  amount: rule.amount
+    ? { ...rule.amount, difference: rule.amount.difference.map(compileOperand) }
+    : null,
+}));
+
+const GOAL_STANDARD = spec.goals.keys.indexOf('standard');
+
+const goalOperand = (operand, values, gender, age) => {
+  if ('constant' in operand) {
+    return operand.constant;
+  }
+  if (operand.bound === undefined) {
+    return values[operand.metric];
+  }
+  return optimalRange(operand.metric, gender, age)[operand.bound];
+};
+
+// Objetivo recomendado: la primera regla de la tabla cuyas condiciones se cumplen
+export const determineGoal = (gender, waistHipRatio, fatFreeMassIndex, bodyFatPercentage, age = null) => {
+  const values = {
+    waist_hip_ratio: waistHipRatio,
+    fat_free_mass_index: fatFreeMassIndex,
+    body_fat_percentage: bodyFatPercentage,
+    age,
+  };
+  const rule = GOAL_TABLE.find(({ conditions }) => conditions.every(([left, compare, right]) => {
+    const a = goalOperand(left, values, gender, age);
+    const b = goalOperand(right, values, gender, age);
+    // Sin edad no se aplica ninguna condición sobre ella
+    return a !== null && a !== undefined && b !== null && b !== undefined && compare(a, b);
+  }));
+  if (!rule) {
+    return buildGoal(GOAL_STANDARD);
+  }
+  if (!rule.amount) {
+    return buildGoal(rule.goal);
+  }
+  const [first, second] = rule.amount.difference.map((operand) => goalOperand(operand, values, gender, age));
+  // + 0 convierte el -0 de Math.trunc en 0, como int() en Python
+  let value = rule.amount.offset + Math.trunc((first - second) * rule.amount.scale) + 0;
+  if ('max' in rule.amount) {
+    value = Math.min(rule.amount.max, value);
+  }
+  if ('min' in rule.amount) {
+    value = Math.max(rule.amount.min, value);
+  }
+  return buildGoal(rule.goal, value);
+};
+
+/**
+ * Procesa los datos antropométricos completos, con la misma respuesta que
+ * /api/calculate (sin pasar por el servidor).
+ */
+export const processAnthropometricData = (data) => {
+  const results = {};
+
+  const { values, errors } = validateRecord(data);
+  if (errors.length) {
+    const decoded = decodeErrors(errors);
+    return {
+      success: false,
+      errors: decoded.map((error) => error.message),
+      error_codes: decoded.map((error) => ({ field: error.field, code: error.code })),
+    };
+  }
+
+  const { gender, age, weight, height, waist, hip } = values;
+
+  results.bmi = calculateBmi(weight, height);
+  results.waist_hip_ratio = calculateWaistHipRatio(waist, hip);
+  results.waist_height_ratio = calculateWaistHeightRatio(waist, height);
+  results.body_roundness_index = calculateBodyRoundnessIndex(waist, height);
+
+  let { equation, conversion } = values;
+  let bodyFatPercentage;
+  let compositionAvailable;
+  if (equation || conversion) {
+    // Ecuación seleccionada (el esquema ya verificó sus pliegues)
+    equation = equation || DEFAULT_EQUATION;
+    conversion = conversion || DEFAULT_CONVERSION;
+    bodyFatPercentage = evaluateEquation(equation, gender, age, values, conversion);
+    results.body_fat_equation = equation;
+    results.density_conversion = conversion;
+    compositionAvailable = bodyFatPercentage !== null;
+  } else {
+    const fold = (name) => (values[name] !== undefined ? values[name] : 0);
+    const folds = {
+      triceps: fold('triceps_fold'),
+      subscapular: fold('subscapular_fold'),
+      suprailiac: fold('suprailiac_fold'),
+      chest: fold('chest_fold'),
+      abdomen: fold('abdomen_fold'),
+      thigh: fold('thigh_fold'),
+    };
+
+    // Solo hay composición con los tres pliegues estándar o los específicos del sexo
+    const basicFoldsProvided = folds.triceps > 0 && folds.subscapular > 0 && folds.suprailiac > 0;
+    const maleSpecificFolds = gender === 'M' && folds.chest > 0 && folds.abdomen > 0 && folds.thigh > 0;
+    const femaleSpecificFolds = gender === 'F' && folds.triceps > 0 && folds.suprailiac > 0 && folds.thigh > 0;
+
+    compositionAvailable = basicFoldsProvided || maleSpecificFolds || femaleSpecificFolds;
+    if (compositionAvailable) {
+      bodyFatPercentage = calculateBodyFatJacksonPollock(gender, age, folds);
+    }
+  }
+
+  if (compositionAvailable) {
+    results.body_fat_percentage = bodyFatPercentage;
+    results.fat_free_mass = calculateFatFreeMass(weight, bodyFatPercentage);
+    results.fat_free_mass_index = calculateFatFreeMassIndex(results.fat_free_mass, height);
+    results.fat_mass = roundPython(weight - results.fat_free_mass, 2);
+    results.goal = determineGoal(
+      gender,
+      results.waist_hip_ratio,
+      results.fat_free_mass_index,
+      results.body_fat_percentage,
+      age
+    );
+  }
+
+  // Los menores de 18 años se valoran con las curvas de referencia para la edad
+  results.status = classifyResults(results, gender, age);
+  if (isYouth(age)) {
+    results.growth = growthScores(gender, age, {
+      bmi: results.bmi,
+      waist,
+      triceps_fold: values.triceps_fold,
+      subscapular_fold: values.subscapular_fold,
+    });
+    ADULT_ONLY_STATUS.forEach((metric) => {
+      delete results.status[metric];
+    });
+    results.status.bmi = results.growth.bmi.status;
+  }
+
+  results.success = true;
+  return results;
+};
+
+export { ADULT_AGE };
@@ -0,0 +1,40 @@
+/**
+ * El motor sin conexión debe dar exactamente los mismos resultados que el
+ * backend: se comprueba con el conjunto golden que genera
+ * backend/tests/generate_golden.py (el mismo que usa backend/tests/test_golden.py).
+ */
+
+import fs from 'fs';
+import path from 'path';
+import zlib from 'zlib';
+
+import { CALCULATION_VERSION, processAnthropometricData } from './calculators';
+
+const GOLDEN_PATH = path.resolve(__dirname, '../../../backend/tests/golden/golden.jsonl.gz');
+
+const loadGolden = () => {
+  const lines = zlib.gunzipSync(fs.readFileSync(GOLDEN_PATH)).toString('utf-8').split('\n').filter(Boolean);
+  const [header, ...cases] = lines.map((line) => JSON.parse(line));
+  return { header, cases };
+};
+
+const { header, cases } = loadGolden();
+
+describe('motor de cálculo sin conexión', () => {
+  test('usa la misma versión de cálculo que el conjunto golden', () => {
+    expect(CALCULATION_VERSION).toBe(header.calculation_version);
+    expect(cases).toHaveLength(header.records);
+  });
+
+  test('reproduce todos los resultados del backend', () => {
+    const mismatches = cases.filter(({ input, output }) => {
+      try {
+        expect(processAnthropometricData(input)).toEqual(output);
+        return false;
+      } catch (error) {
+        return true;
+      }
+    });
+    expect(mismatches.slice(0, 5)).toEqual([]);
+  });
+});
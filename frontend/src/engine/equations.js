@@ -0,0 +1,80 @@
+/**
+ * Ecuaciones de composición corporal basadas en pliegues (utils/equations.py).
+ *
+ * Los coeficientes y los pliegues de cada ecuación salen de engineSpec.json;
+ * las operaciones se hacen en el mismo orden que en Python para obtener
+ * exactamente los mismos resultados.
+ */
+
+import spec from './engineSpec.json';
+import { roundPython } from './rounding';
+
+export const FOLD_SITES = spec.equations.fold_sites;
+export const DENSITY_CONVERSIONS = spec.equations.conversions;
+export const DEFAULT_CONVERSION = spec.equations.default_conversion;
+export const DEFAULT_EQUATION = spec.equations.default_equation;
+export const EQUATIONS = spec.equations.registry;
+
+const FOLD_BITS = Object.fromEntries(FOLD_SITES.map((name, index) => [name, 1 << index]));
+
+const MASKS = Object.fromEntries(Object.entries(EQUATIONS).map(([name, equation]) => [
+  name,
+  Object.fromEntries(Object.entries(equation.folds).map(([sex, folds]) => [
+    sex, folds.reduce((mask, fold) => mask | FOLD_BITS[fold], 0),
+  ])),
+]));
+
+// Las ecuaciones femeninas se aplican a todo lo que no sea 'M', como en el backend
+const sexKey = (gender) => (gender === 'M' ? 'M' : 'F');
+
+// Máscara de pliegues presentes (valor mayor que cero) en un registro
+export const foldMask = (values) => FOLD_SITES.reduce((mask, name) => {
+  const value = values[name];
+  return value !== null && value !== undefined && value > 0 ? mask | FOLD_BITS[name] : mask;
+}, 0);
+
+// Indica si la ecuación dispone de todos sus pliegues en el registro
+export const isApplicable = (name, gender, values) => {
+  const required = MASKS[name][sexKey(gender)];
+  return (foldMask(values) & required) === required;
+};
+
+// Selecciona (c, m) de la franja de edad (la última no tiene límite)
+const logDensityCoefficients = (table, age) => {
+  const row = table.find(([maxAge]) => maxAge === null || age <= maxAge);
+  return [row[1], row[2]];
+};
+
+const rawBodyFat = (equation, gender, age, values, conversion) => {
+  const sex = sexKey(gender);
+  const coefficients = equation.coefficients[sex];
+  let sumFolds = 0.0;
+  equation.folds[sex].forEach((fold) => {
+    sumFolds += values[fold];
+  });
+
+  if (equation.model === 'linear_percentage') {
+    const [slope, intercept] = coefficients;
+    return slope * sumFolds + intercept;
+  }
+
+  let density;
+  if (equation.model === 'quadratic_density') {
+    const [a, b, c, d] = coefficients;
+    density = a - b * sumFolds + c * (sumFolds * sumFolds) - d * age;
+  } else {
+    const [c, m] = logDensityCoefficients(coefficients, age);
+    density = c - m * Math.log10(sumFolds);
+  }
+
+  const [numerator, offset] = DENSITY_CONVERSIONS[conversion];
+  return numerator / density - offset;
+};
+
+// Porcentaje de grasa de una ecuación registrada, o null si faltan pliegues
+export const evaluateEquation = (name, gender, age, values, conversion = DEFAULT_CONVERSION) => {
+  if (!isApplicable(name, gender, values)) {
+    return null;
+  }
+  return roundPython(rawBodyFat(EQUATIONS[name], gender, age, values, conversion), 1);
+};
@@ -0,0 +1,152 @@
+/**
+ * Puntuaciones z y percentiles para la edad de deportistas menores de 18 años
+ * (utils/growth.py), con las curvas LMS exportadas en engineSpec.json.
+ *
+ *     z = ((X / M) ** L - 1) / (L · S)      (L ≠ 0)
+ *     z = ln(X / M) / S                      (L = 0)
+ */
+
+import spec from './engineSpec.json';
+import { roundPython } from './rounding';
+import { bisectLeft } from './thresholds';
+
+export const ADULT_AGE = spec.growth.adult_age;
+const { measures: GROWTH_MEASURES, z_bounds: Z_BOUNDS, z_status: Z_STATUS, approximate: APPROXIMATE } = spec.growth;
+
+// Expande los anclajes (meses ordenados) a una fila por mes, interpolando
+const monthly = (anchors, values) => {
+  const grid = [];
+  for (let month = anchors[0]; month <= anchors[anchors.length - 1]; month += 1) {
+    const index = bisectLeft(anchors, month);
+    if (anchors[index] === month) {
+      grid.push(values[index]);
+    } else {
+      const fraction = (month - anchors[index - 1]) / (anchors[index] - anchors[index - 1]);
+      grid.push(values[index - 1] + (values[index] - values[index - 1]) * fraction);
+    }
+  }
+  return grid;
+};
+
+// (medida, sexo) -> curva LMS mensual
+const TABLES = Object.fromEntries(Object.entries(spec.growth.references).map(([measure, bySex]) => [
+  measure,
+  Object.fromEntries(Object.entries(bySex).map(([sex, rows]) => {
+    const anchors = rows.map((row) => row[0]);
+    const [l, m, s] = [1, 2, 3].map((column) => monthly(anchors, rows.map((row) => row[column])));
+    return [sex, { start: anchors[0], end: anchors[0] + m.length - 1, l, m, s }];
+  })),
+]));
+
+export const isYouth = (age) => age < ADULT_AGE;
+
+// Una edad entera son años cumplidos: se sitúa en la mitad del año
+export const ageInMonths = (age) => {
+  const months = age * 12;
+  return Number.isInteger(age) ? months + 6 : months;
+};
+
+const lmsParameters = (table, months) => {
+  const position = Math.min(Math.max(months, table.start), table.end) - table.start;
+  const index = Math.min(Math.trunc(position), table.m.length - 2);
+  const fraction = position - index;
+  return [table.l, table.m, table.s].map(
+    (values) => values[index] + (values[index + 1] - values[index]) * fraction
+  );
+};
+
+const lmsZScore = (value, l, m, s) => (
+  l === 0 ? Math.log(value / m) / s : ((value / m) ** l - 1) / (l * s)
+);
+
+// --- Función de error (erf de fdlibm, la misma familia que la de la libm de C) ---
+
+const ERF = {
+  erx: 8.45062911510467529297e-01,
+  efx: 1.28379167095512586316e-01,
+  efx8: 1.02703333676410069053e+00,
+  pp: [1.28379167095512558561e-01, -3.25042107247001499370e-01, -2.84817495755985104766e-02,
+    -5.77027029648944159157e-03, -2.37630166566501626084e-05],
+  qq: [1, 3.97917223959155352819e-01, 6.50222499887672944485e-02, 5.08130628187576562776e-03,
+    1.32494738004321644526e-04, -3.96022827877536812320e-06],
+  pa: [-2.36211856075265944077e-03, 4.14856118683748331666e-01, -3.72207876035701323847e-01,
+    3.18346619901161753674e-01, -1.10894694282396677476e-01, 3.54783043256182359371e-02,
+    -2.16637559486879084300e-03],
+  qa: [1, 1.06420880400844228286e-01, 5.40397917702171048937e-01, 7.18286544141962662868e-02,
+    1.26171219808761642112e-01, 1.36370839120290507362e-02, 1.19844998467991074170e-02],
+  ra: [-9.86494403484714822705e-03, -6.93858572707181764372e-01, -1.05586262253232909814e+01,
+    -6.23753324503260060396e+01, -1.62396669462573470355e+02, -1.84605092906711035994e+02,
+    -8.12874355063065934246e+01, -9.81432934416914548592e+00],
+  sa: [1, 1.96512716674392571292e+01, 1.37657754143519042600e+02, 4.34565877475229228821e+02,
+    6.45387271733267880336e+02, 4.29008140027567833386e+02, 1.08635005541779435134e+02,
+    6.57024977031928170135e+00, -6.04244152148580987438e-02],
+  rb: [-9.86494292470009928597e-03, -7.99283237680523006574e-01, -1.77579549177547519889e+01,
+    -1.60636384855821916062e+02, -6.37566443368389627722e+02, -1.02509513161107724954e+03,
+    -4.83519191608651397019e+02],
+  sb: [1, 3.03380607434824582924e+01, 3.25792512996573918826e+02, 1.53672958608443695994e+03,
+    3.19985821950859553908e+03, 2.55305040643316442583e+03, 4.74528541206955367215e+02,
+    -2.24409524465858183362e+01],
+};
+
+// Polinomio por el método de Horner: c0 + x·(c1 + x·(c2 + ...))
+const horner = (coefficients, x) => coefficients.reduceRight((total, coefficient) => coefficient + x * total);
+
+const words = new DataView(new ArrayBuffer(8));
+
+export const erf = (x) => {
+  if (Number.isNaN(x)) {
+    return x;
+  }
+  if (!Number.isFinite(x)) {
+    return x > 0 ? 1 : -1;
+  }
+  const ax = Math.abs(x);
+  if (ax < 0.84375) {
+    if (ax < 2 ** -28) {
+      return ax < 2.2250738585072014e-308 ? 0.125 * (8.0 * x + ERF.efx8 * x) : x + ERF.efx * x;
+    }
+    const z = x * x;
+    return x + x * (horner(ERF.pp, z) / horner(ERF.qq, z));
+  }
+  if (ax < 1.25) {
+    const s = ax - 1;
+    const quotient = horner(ERF.pa, s) / horner(ERF.qa, s);
+    return x >= 0 ? ERF.erx + quotient : -ERF.erx - quotient;
+  }
+  if (ax >= 6) {
+    return x >= 0 ? 1 - 1e-300 : 1e-300 - 1;
+  }
+  const s = 1 / (ax * ax);
+  // El corte en 1/0.35 se compara, como en fdlibm, con los 32 bits altos de |x|
+  words.setFloat64(0, ax);
+  const [R, S] = words.getUint32(0) < 0x4006DB6E
+    ? [horner(ERF.ra, s), horner(ERF.sa, s)]
+    : [horner(ERF.rb, s), horner(ERF.sb, s)];
+  // z: |x| con los 32 bits bajos a cero
+  words.setUint32(4, 0);
+  const z = words.getFloat64(0);
+  const r = Math.exp(-z * z - 0.5625) * Math.exp((z - ax) * (z + ax) + R / S);
+  return x >= 0 ? 1 - r / ax : r / ax - 1;
+};
+
+const SQRT2 = Math.sqrt(2);
+
+export const zPercentile = (z) => 50 * (1 + erf(z / SQRT2));
+
+export const zStatus = (z) => Z_STATUS[bisectLeft(Z_BOUNDS, z)];
+
+// Puntuaciones z y percentiles de un deportista joven (se omiten las medidas ausentes)
+export const growthScores = (gender, age, values) => {
+  const months = ageInMonths(age);
+  const scores = { age_months: roundPython(months, 1), approximate: APPROXIMATE };
+  Object.entries(GROWTH_MEASURES).forEach(([name, field]) => {
+    const value = values[field];
+    const table = TABLES[name] && TABLES[name][gender];
+    if (!value || !table) {
+      return;
+    }
+    const z = roundPython(lmsZScore(value, ...lmsParameters(table, months)), 2);
+    scores[name] = { z, percentile: roundPython(zPercentile(z), 1), status: zStatus(z) };
+  });
+  return scores;
+};
@@ -0,0 +1,32 @@
+/**
+ * Redondeo con los mismos resultados que round(x, ndigits) de Python.
+ *
+ * Python redondea el valor binario exacto del número (no su representación
+ * decimal corta) y resuelve los empates exactos hacia el dígito par, mientras
+ * que Math.round y toFixed(ndigits) los resuelven hacia arriba. toFixed(100)
+ * devuelve el valor exacto en decimal (los valores del motor tienen muchos
+ * menos de 100 decimales), sobre el que se aplica la misma regla.
+ */
+
+export const roundPython = (value, ndigits = 0) => {
+  if (!Number.isFinite(value)) {
+    return value;
+  }
+  const negative = value < 0 || Object.is(value, -0);
+  const exact = Math.abs(value).toFixed(100);
+  const point = exact.indexOf('.');
+  const kept = exact.slice(0, point + 1 + ndigits).replace('.', '');
+  const rest = exact.slice(point + 1 + ndigits);
+
+  let roundUp = rest[0] > '5';
+  if (rest[0] === '5') {
+    // Empate exacto solo si todos los dígitos siguientes son cero
+    roundUp = /[1-9]/.test(rest.slice(1)) || Number(kept[kept.length - 1]) % 2 === 1;
+  }
+  const scaled = Number(kept) + (roundUp ? 1 : 0);
+  // Conversión decimal -> binario correctamente redondeada, como en Python
+  const rounded = Number(`${scaled}e-${ndigits}`);
+  return negative ? -rounded : rounded;
+};
+
+export default roundPython;
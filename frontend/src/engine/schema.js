@@ -0,0 +1,138 @@
+/**
+ * Validación de mediciones con el esquema del backend (utils/schema.py).
+ *
+ * Los campos, rangos, mensajes y el orden de los errores salen de
+ * engineSpec.json, de modo que los errores son los mismos que devuelve
+ * /api/calculate.
+ */
+
+import spec from './engineSpec.json';
+import { EQUATIONS, DEFAULT_EQUATION, isApplicable } from './equations';
+
+export const ERROR_TABLE = spec.schema.errors;
+
+const errorIndex = (field, code) => ERROR_TABLE.findIndex(
+  (error) => error.field === field && error.code === code
+);
+
+// Reglas compiladas una sola vez, con el índice de cada error en ERROR_TABLE
+const CHOICE_RULES = [];
+const NUMERIC_RULES = [];
+spec.schema.fields.forEach((field) => {
+  const required = field.required ? errorIndex(field.name, 'required') : -1;
+  if (field.choices) {
+    CHOICE_RULES.push({
+      name: field.name,
+      choices: field.choices,
+      required,
+      invalid: errorIndex(field.name, 'invalid_choice'),
+    });
+  } else {
+    NUMERIC_RULES.push({
+      name: field.name,
+      min: field.min,
+      max: field.max,
+      required,
+      invalidType: errorIndex(field.name, 'invalid_type'),
+      outOfRange: errorIndex(field.name, 'out_of_range'),
+    });
+  }
+});
+
+const crossRule = (name) => {
+  const rule = spec.schema.cross_field_rules.find((candidate) => candidate.name === name);
+  return { ...rule, error: errorIndex(name, rule.code) };
+};
+
+const WAIST_HIP = crossRule('waist_hip');
+const BMI_COHERENCE = crossRule('bmi_coherence');
+const EQUATION_FOLDS = crossRule('equation_folds');
+const EQUATION_TYPE = crossRule('equation_type');
+
+// Campos de selección de la ecuación: sus valores se usan como claves del registro
+const SELECTION_FIELDS = ['equation', 'conversion'];
+
+export const REQUIRED_FIELDS = spec.schema.fields.filter((field) => field.required).map((field) => field.name);
+export const NUMERIC_FIELDS = NUMERIC_RULES.map((rule) => rule.name);
+
+const NUMBER_PATTERN = /^[+-]?(\d+(_\d+)*(\.(\d+(_\d+)*)?)?|\.\d+(_\d+)*)([eE][+-]?\d+(_\d+)*)?$/;
+
+// Convierte un valor a número como float() de Python; null si no es numérico
+const toNumber = (value) => {
+  if (typeof value === 'number') {
+    return value;
+  }
+  if (typeof value !== 'string') {
+    return null;
+  }
+  const text = value.trim();
+  if (/^[+-]?(inf|infinity)$/i.test(text)) {
+    return text.startsWith('-') ? -Infinity : Infinity;
+  }
+  if (/^[+-]?nan$/i.test(text)) {
+    return NaN;
+  }
+  return NUMBER_PATTERN.test(text) ? Number(text.replace(/_/g, '')) : null;
+};
+
+const isSet = (value) => value !== null && value !== undefined;
+
+// Valida un registro; devuelve los valores normalizados y los índices de error
+export const validateRecord = (data) => {
+  const errors = new Set();
+  const values = {};
+
+  CHOICE_RULES.forEach(({ name, choices, required, invalid }) => {
+    const choice = data[name];
+    if (!isSet(choice)) {
+      if (required >= 0) errors.add(required);
+    } else if (SELECTION_FIELDS.includes(name) && typeof choice !== 'string') {
+      errors.add(EQUATION_TYPE.error);
+    } else if (!choices.includes(choice)) {
+      errors.add(invalid);
+    }
+    values[name] = isSet(choice) ? choice : null;
+  });
+
+  NUMERIC_RULES.forEach(({ name, min, max, required, invalidType, outOfRange }) => {
+    const raw = data[name];
+    if (!isSet(raw)) {
+      if (required >= 0) errors.add(required);
+      return;
+    }
+    const value = toNumber(raw);
+    if (value === null || Number.isNaN(value)) {
+      errors.add(invalidType);
+      return;
+    }
+    if (value < min || value > max) {
+      errors.add(outOfRange);
+    }
+    values[name] = value;
+  });
+
+  const { waist, hip, weight, height } = values;
+  if (waist !== undefined && hip !== undefined && waist > hip) {
+    errors.add(WAIST_HIP.error);
+  }
+
+  if (weight !== undefined && height !== undefined && height !== 0) {
+    const heightM = height / 100;
+    const bmi = weight / (heightM * heightM);
+    if (bmi < BMI_COHERENCE.min || bmi > BMI_COHERENCE.max) {
+      errors.add(BMI_COHERENCE.error);
+    }
+  }
+
+  if (!errors.has(EQUATION_TYPE.error)) {
+    const equation = values.equation || (values.conversion ? DEFAULT_EQUATION : null);
+    if (Object.prototype.hasOwnProperty.call(EQUATIONS, equation) && !isApplicable(equation, values.gender, values)) {
+      errors.add(EQUATION_FOLDS.error);
+    }
+  }
+
+  return { values, errors: [...errors].sort((a, b) => a - b) };
+};
+
+// Descripción estructurada de los errores, en el orden del backend
+export const decodeErrors = (errors) => errors.map((index) => ERROR_TABLE[index]);
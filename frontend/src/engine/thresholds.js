@@ -0,0 +1,66 @@
+/**
+ * Clasificación de métricas (óptimo / precaución / alerta) con las tablas de
+ * umbrales del backend (utils/thresholds.py), exportadas en engineSpec.json.
+ */
+
+import spec from './engineSpec.json';
+
+const TABLES = spec.thresholds.tables;
+export const METRICS = Object.keys(TABLES);
+
+// Límite inferior (incluido) de cada franja de edad
+const AGE_BAND_STARTS = TABLES[METRICS[0]].M.map((band) => band.min_age);
+
+// (métrica, género, franja) -> puntos de corte ordenados y estado de cada tramo
+const COMPILED = Object.fromEntries(METRICS.map((metric) => [
+  metric,
+  Object.fromEntries(Object.entries(TABLES[metric]).map(([gender, bands]) => [
+    gender,
+    bands.map((band) => ({
+      closed: band.closed,
+      bounds: band.bands.slice(1).map((item) => item.min),
+      statuses: band.bands.map((item) => item.status),
+    })),
+  ])),
+]));
+
+// Número de puntos de corte menores que el valor (o menores o iguales)
+const bisect = (bounds, value, right) => {
+  let low = 0;
+  let high = bounds.length;
+  while (low < high) {
+    const middle = (low + high) >> 1;
+    if (right ? value < bounds[middle] : !(bounds[middle] < value)) {
+      high = middle;
+    } else {
+      low = middle + 1;
+    }
+  }
+  return low;
+};
+
+export const bisectLeft = (bounds, value) => bisect(bounds, value, false);
+export const bisectRight = (bounds, value) => bisect(bounds, value, true);
+
+export const ageBandIndex = (age) => bisectRight(AGE_BAND_STARTS, age) - 1;
+
+// Estado de una métrica para el género y la edad
+export const classify = (metric, value, gender, age) => {
+  const { closed, bounds, statuses } = COMPILED[metric][gender][ageBandIndex(age)];
+  const position = closed === 'upper' ? bisectLeft(bounds, value) : bisectRight(bounds, value);
+  return statuses[position];
+};
+
+// Clasifica todas las métricas presentes en un resultado
+export const classifyResults = (results, gender, age) => Object.fromEntries(
+  METRICS.filter((metric) => metric in results)
+    .map((metric) => [metric, classify(metric, results[metric], gender, age)])
+);
+
+// Límites [inferior, superior] del tramo óptimo (null si no hay límite)
+export const optimalRange = (metric, gender, age = null) => {
+  const band = age !== null && age !== undefined ? ageBandIndex(age) : 0;
+  const { bounds, statuses } = COMPILED[metric][gender][band];
+  const index = statuses.indexOf('optimal');
+  return [index > 0 ? bounds[index - 1] : null, index < bounds.length ? bounds[index] : null];
+};
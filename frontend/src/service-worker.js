@@ -0,0 +1,78 @@
+/* eslint-disable no-restricted-globals */
+
+/**
+ * Service worker de la aplicación: guarda en caché los ficheros de la
+ * compilación para que la calculadora funcione sin conexión.
+ *
+ * react-scripts build sustituye self.__WB_MANIFEST por la lista de ficheros
+ * de la compilación (con su revisión). Las peticiones a la API no se guardan
+ * nunca en caché: sin conexión, las mediciones esperan en la cola de
+ * sincronización (src/services/syncQueue.js).
+ */
+
+const MANIFEST = self.__WB_MANIFEST;
+const CACHE_PREFIX = 'anthrocalc-app-';
+
+// El nombre de la caché cambia con cada compilación distinta
+const manifestHash = () => {
+  let hash = 0;
+  MANIFEST.forEach(({ url, revision }) => {
+    `${url}${revision || ''}`.split('').forEach((character) => {
+      hash = (hash * 31 + character.charCodeAt(0)) | 0;
+    });
+  });
+  return (hash >>> 0).toString(36);
+};
+
+const CACHE_NAME = `${CACHE_PREFIX}${manifestHash()}`;
+const INDEX_URL = `${process.env.PUBLIC_URL}/index.html`;
+const PRECACHED = new Set(MANIFEST.map(({ url }) => new URL(url, self.location.href).href));
+
+self.addEventListener('install', (event) => {
+  event.waitUntil(
+    caches.open(CACHE_NAME).then((cache) => cache.addAll([...PRECACHED]))
+  );
+});
+
+// Elimina las cachés de compilaciones anteriores
+self.addEventListener('activate', (event) => {
+  event.waitUntil(
+    caches.keys()
+      .then((names) => Promise.all(
+        names
+          .filter((name) => name.startsWith(CACHE_PREFIX) && name !== CACHE_NAME)
+          .map((name) => caches.delete(name))
+      ))
+      .then(() => self.clients.claim())
+  );
+});
+
+self.addEventListener('fetch', (event) => {
+  const { request } = event;
+  const url = new URL(request.url);
+  if (request.method !== 'GET' || url.origin !== self.location.origin || url.pathname.includes('/api/')) {
+    return;
+  }
+
+  // Navegación: primero la red; sin conexión, la aplicación guardada
+  if (request.mode === 'navigate') {
+    event.respondWith(
+      fetch(request).catch(() => caches.match(new URL(INDEX_URL, self.location.href).href))
+    );
+    return;
+  }
+
+  // Ficheros de la compilación: primero la caché
+  if (PRECACHED.has(url.href)) {
+    event.respondWith(
+      caches.match(url.href).then((cached) => cached || fetch(request))
+    );
+  }
+});
+
+// Permite activar una versión nueva sin esperar a cerrar las pestañas
+self.addEventListener('message', (event) => {
+  if (event.data && event.data.type === 'SKIP_WAITING') {
+    self.skipWaiting();
+  }
+});
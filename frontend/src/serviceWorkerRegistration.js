@@ -0,0 +1,52 @@
+/**
+ * Registro del service worker (src/service-worker.js), solo en producción:
+ * en desarrollo la caché ocultaría los cambios del código.
+ */
+
+export const register = (config = {}) => {
+  if (process.env.NODE_ENV !== 'production' || !('serviceWorker' in navigator)) {
+    return;
+  }
+  // El service worker no funciona si PUBLIC_URL está en otro origen (p. ej. un CDN)
+  const publicUrl = new URL(process.env.PUBLIC_URL, window.location.href);
+  if (publicUrl.origin !== window.location.origin) {
+    return;
+  }
+
+  window.addEventListener('load', () => {
+    navigator.serviceWorker
+      .register(`${process.env.PUBLIC_URL}/service-worker.js`)
+      .then((registration) => {
+        registration.onupdatefound = () => {
+          const installing = registration.installing;
+          if (!installing) {
+            return;
+          }
+          installing.onstatechange = () => {
+            if (installing.state !== 'installed') {
+              return;
+            }
+            // Con un controlador previo es una actualización; si no, la primera instalación
+            if (navigator.serviceWorker.controller) {
+              config.onUpdate && config.onUpdate(registration);
+            } else {
+              config.onSuccess && config.onSuccess(registration);
+            }
+          };
+        };
+      })
+      .catch((error) => {
+        console.error('Error al registrar el service worker:', error);
+      });
+  });
+};
+
+export const unregister = () => {
+  if ('serviceWorker' in navigator) {
+    navigator.serviceWorker.ready
+      .then((registration) => registration.unregister())
+      .catch((error) => {
+        console.error(error.message);
+      });
+  }
+};
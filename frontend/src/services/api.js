@@ -46,6 +46,21 @@ export const anthropometryService = {
       console.error('Error al obtener recomendaciones:', error);
       throw error;
     }
+  },
+
+  // Enviar un bloque de mediciones guardadas sin conexión (idempotente por clientId y secuencia)
+  syncMeasurements: async (clientId, start, measurements) => {
+    try {
+      const response = await apiClient.post('/measurements/sync', {
+        client_id: clientId,
+        start,
+        measurements,
+      });
+      return response.data;
+    } catch (error) {
+      console.error('Error al sincronizar mediciones:', error);
+      throw error;
+    }
   }
 };
 
@@ -0,0 +1,171 @@
+/**
+ * Cola de mediciones guardadas sin conexión.
+ *
+ * Las mediciones con atleta se guardan en localStorage con un número de
+ * secuencia por dispositivo y se envían por bloques a /api/measurements/sync
+ * cuando hay conexión. El servidor guarda cada (dispositivo, secuencia) una
+ * sola vez, así que reenviar un bloque cuya respuesta se perdió no duplica
+ * mediciones. El servidor recalcula los resultados y sigue siendo la referencia.
+ * Los fallos de red y del servidor (5xx) se reintentan; si el servidor rechaza
+ * un bloque entero (4xx), sus mediciones pasan a rechazadas para no bloquear
+ * el resto de la cola.
+ */
+
+import { anthropometryService } from './api';
+import { CALCULATION_VERSION } from '../engine/calculators';
+
+const STORAGE_KEY = 'anthrocalc.syncQueue';
+// Mediciones por envío (el backend admite hasta SYNC_MAX_MEASUREMENTS)
+const BATCH_SIZE = 100;
+// Rechazos que se conservan para mostrarlos
+const MAX_REJECTED = 50;
+
+const newClientId = () => (
+  window.crypto && window.crypto.randomUUID
+    ? window.crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`
+);
+
+const loadState = () => {
+  try {
+    const stored = JSON.parse(window.localStorage.getItem(STORAGE_KEY));
+    if (stored && stored.clientId) {
+      return stored;
+    }
+  } catch (error) {
+    console.error('Cola de sincronización dañada, se reinicia:', error);
+  }
+  return { clientId: newClientId(), nextSeq: 0, items: [], rejected: [], serverVersion: null };
+};
+
+let state = loadState();
+let syncing = false;
+const listeners = new Set();
+
+const saveState = () => {
+  window.localStorage.setItem(STORAGE_KEY, JSON.stringify(state));
+};
+
+export const getStatus = () => ({
+  online: navigator.onLine,
+  syncing,
+  pending: state.items.length,
+  rejected: state.rejected,
+  serverVersion: state.serverVersion,
+  // El servidor calcula con otra versión de las fórmulas que el motor local
+  versionMismatch: state.serverVersion !== null && state.serverVersion !== CALCULATION_VERSION,
+});
+
+const notify = () => {
+  const status = getStatus();
+  listeners.forEach((listener) => listener(status));
+};
+
+// Registra una función que recibe el estado de la cola; devuelve la baja
+export const subscribe = (listener) => {
+  listeners.add(listener);
+  listener(getStatus());
+  return () => listeners.delete(listener);
+};
+
+// Errores 4xx que merece la pena reintentar (tiempo agotado, demasiadas peticiones)
+const RETRYABLE_STATUSES = [408, 429];
+
+// El servidor rechaza la petición (4xx): reenviarla daría el mismo resultado
+const isClientError = (error) => {
+  const status = error.response ? error.response.status : 0;
+  return status >= 400 && status < 500 && !RETRYABLE_STATUSES.includes(status);
+};
+
+// Envía un bloque y devuelve sus rechazos; si el servidor rechaza el bloque
+// entero (p. ej. 400 o 413), todas sus mediciones pasan a rechazadas
+const sendBatch = async (batch) => {
+  try {
+    const response = await anthropometryService.syncMeasurements(
+      state.clientId,
+      batch[0].seq,
+      batch.map((item) => item.measurement)
+    );
+    const rejected = response.rejected.map((item) => ({
+      ...item,
+      measurement: batch[item.seq - batch[0].seq].measurement,
+    }));
+    return { rejected, serverVersion: response.calculation_version };
+  } catch (error) {
+    if (!isClientError(error)) {
+      throw error;
+    }
+    const message = (error.response.data && error.response.data.error) || `Error ${error.response.status}`;
+    const rejected = batch.map((item) => ({ seq: item.seq, error: message, measurement: item.measurement }));
+    return { rejected, serverVersion: state.serverVersion };
+  }
+};
+
+// Envía la cola por bloques; se detiene en el primer fallo de red o del
+// servidor (5xx) y se reintenta en el siguiente evento 'online' o la
+// siguiente medición
+export const flush = async () => {
+  if (syncing || !navigator.onLine || !state.items.length) {
+    return;
+  }
+  syncing = true;
+  notify();
+  try {
+    while (state.items.length) {
+      // La cola siempre es un tramo contiguo de secuencias
+      const batch = state.items.slice(0, BATCH_SIZE);
+      const { rejected, serverVersion } = await sendBatch(batch);
+      state = {
+        ...state,
+        items: state.items.slice(batch.length),
+        rejected: [...state.rejected, ...rejected].slice(-MAX_REJECTED),
+        serverVersion,
+      };
+      saveState();
+      notify();
+    }
+  } catch (error) {
+    console.error('Sincronización pendiente:', error);
+  } finally {
+    syncing = false;
+    notify();
+  }
+};
+
+// Guarda una medición ({athlete_id, session_date, ...mediciones}) para sincronizarla
+export const enqueue = (measurement) => {
+  state = {
+    ...state,
+    nextSeq: state.nextSeq + 1,
+    items: [...state.items, { seq: state.nextSeq, measurement }],
+  };
+  saveState();
+  notify();
+  flush();
+};
+
+// Descarta los rechazos ya revisados
+export const clearRejected = () => {
+  state = { ...state, rejected: [] };
+  saveState();
+  notify();
+};
+
+// Anota la versión de cálculo del servidor (p. ej. la de /api/health)
+export const setServerVersion = (version) => {
+  state = { ...state, serverVersion: version };
+  saveState();
+  notify();
+};
+
+// Sincroniza al arrancar y cada vez que vuelve la conexión
+export const startSync = () => {
+  window.addEventListener('online', flush);
+  window.addEventListener('online', notify);
+  window.addEventListener('offline', notify);
+  flush();
+};
+
+const syncQueue = { enqueue, flush, subscribe, getStatus, clearRejected, setServerVersion, startSync };
+
+export default syncQueue;
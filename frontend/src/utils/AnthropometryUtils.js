@@ -19,6 +19,48 @@ export const getStatusFromValue = (value, thresholds) => {
     }
   };
   
+  // Estado de una métrica: el calculado por el servidor (results.status) o,
+  // si la respuesta no lo incluye, el obtenido con los umbrales locales.
+  // A los menores de 18 años (respuesta con 'growth') no se les aplican los
+  // umbrales de adultos: las métricas sin estado quedan neutras
+  export const getMetricStatus = (results, metric, thresholds) => {
+    if (results.status && results.status[metric]) {
+      return results.status[metric];
+    }
+    if (results.growth) {
+      return 'neutral';
+    }
+    return getStatusFromValue(results[metric], thresholds);
+  };
+  
+  // Etiqueta para las métricas sin referencia de adultos en menores de 18 años
+  export const NO_ADULT_REFERENCE = { label: 'Sin referencia adulta (< 18 años)', color: 'default' };
+  
+  const GROWTH_LABELS = {
+    bmi: 'IMC',
+    waist: 'Cintura',
+    triceps_fold: 'Tríceps',
+    subscapular_fold: 'Subescapular',
+  };
+  
+  const GROWTH_COLORS = { optimal: 'success', warning: 'warning', alert: 'error' };
+  
+  // Franja de la puntuación z para la edad de la primera medida disponible
+  // (results.growth); null si la respuesta no la incluye
+  export const getGrowthBand = (results, ...measures) => {
+    const measure = measures.find((name) => (
+      results.growth && results.growth[name] && results.growth[name].z !== null
+    ));
+    if (!measure) {
+      return null;
+    }
+    const { z, percentile, status } = results.growth[measure];
+    return {
+      label: `${GROWTH_LABELS[measure]} para la edad: z ${z} (P${percentile})`,
+      color: GROWTH_COLORS[status] || 'default',
+    };
+  };
+  
   // Definición de umbrales para diferentes métricas antropométricas
   export const getThresholds = (gender) => {
     return {